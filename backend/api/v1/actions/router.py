@@ -9,10 +9,13 @@ from backend.core.database import get_database
 from backend.api.v1.auth.router import get_current_user_dep
 from backend.models.player.player import Player
 from backend.models.actions.action import Action
+from backend.models.player.views import PlayerEconomy
+from backend.services.player.repository import PlayerRepository
+from backend.services.traits.trait_deltas import change_traits
 
 router = APIRouter(prefix="/actions", tags=["actions"])
 
-def calculate_basic_karma(action_type: str, actor: Player, target: Player, amount: int = 0) -> dict:
+def calculate_basic_karma(action_type: str, actor: Player, target: PlayerEconomy, amount: int = 0) -> dict:
     """
     Basic karma calculation (rule-based, before AI integration).
     Returns: {karma_change: int, trait_changes: dict, message: str}
@@ -110,37 +113,8 @@ def calculate_basic_karma(action_type: str, actor: Player, target: Player, amoun
     }
 
 async def apply_trait_changes(db: AsyncIOMotorDatabase, player_id: str, trait_changes: dict):
-    """Apply trait changes to a player."""
-    update_dict = {}
-    for trait, change in trait_changes.items():
-        # Handle both regular traits and meta traits
-        if trait in ["reputation", "influence", "fame", "infamy", "trustworthiness",
-                     "combat_rating", "tactical_mastery", "survival_instinct",
-                     "business_acumen", "market_intuition", "wealth_management",
-                     "enlightenment", "karmic_balance", "divine_favor",
-                     "guild_loyalty", "political_power", "diplomatic_skill",
-                     "legendary_status", "mentorship", "historical_impact"]:
-            update_dict[f"meta_traits.{trait}"] = change
-        else:
-            update_dict[f"traits.{trait}"] = change
-
-    if update_dict:
-        # Build update operations
-        for key, value in update_dict.items():
-            await db.players.update_one(
-                {"_id": player_id},
-                {"$inc": {key: value}}
-            )
-
-            # Clamp values between 0 and 100
-            await db.players.update_one(
-                {"_id": player_id, key: {"$gt": 100}},
-                {"$set": {key: 100}}
-            )
-            await db.players.update_one(
-                {"_id": player_id, key: {"$lt": 0}},
-                {"$set": {key: 0}}
-            )
+    """Apply trait changes to a player, clamped to 0-100, and record any milestones and unlocks."""
+    await change_traits(db, player_id, trait_changes)
 
 @router.post("/hack", response_model=ActionResponse)
 async def hack_player(
@@ -153,12 +127,12 @@ async def hack_player(
     Success depends on hacking skill vs target's technical knowledge.
     """
     # Get target player
-    target_dict = await db.players.find_one({"_id": action.target_id})
-    if not target_dict:
+    target = await PlayerRepository(db).get(
+        action.target_id, PlayerEconomy, traits=("technical_knowledge", "tactical_mastery")
+    )
+    if not target:
         raise HTTPException(status_code=404, detail="Target player not found")
 
-    target = Player(**target_dict)
-
     # Can't hack yourself
     if target.id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot hack yourself")
@@ -166,8 +140,8 @@ async def hack_player(
     # Calculate success chance
     hacker_skill = current_user.traits.hacking + \
         current_user.traits.technical_knowledge
-    target_defense = target.traits.technical_knowledge + \
-        target.meta_traits.tactical_mastery
+    target_defense = target.trait("technical_knowledge") + \
+        target.trait("tactical_mastery")
 
     success_chance = min(
         80, max(20, (hacker_skill / (hacker_skill + target_defense)) * 100))
@@ -261,12 +235,10 @@ async def help_player(
     Help another player by giving them credits.
     """
     # Get target player
-    target_dict = await db.players.find_one({"_id": action.target_id})
-    if not target_dict:
+    target = await PlayerRepository(db).get(action.target_id, PlayerEconomy)
+    if not target:
         raise HTTPException(status_code=404, detail="Target player not found")
 
-    target = Player(**target_dict)
-
     # Can't help yourself
     if target.id == current_user.id:
         raise HTTPException(status_code=400, detail="Cannot help yourself")
@@ -334,12 +306,12 @@ async def steal_from_player(
     Steal credits from another player (more aggressive than hacking).
     """
     # Get target player
-    target_dict = await db.players.find_one({"_id": action.target_id})
-    if not target_dict:
+    target = await PlayerRepository(db).get(
+        action.target_id, PlayerEconomy, traits=("perception", "survival_instinct")
+    )
+    if not target:
         raise HTTPException(status_code=404, detail="Target player not found")
 
-    target = Player(**target_dict)
-
     # Can't steal from yourself
     if target.id == current_user.id:
         raise HTTPException(
@@ -347,8 +319,8 @@ async def steal_from_player(
 
     # Calculate success chance (stealth-based)
     thief_skill = current_user.traits.stealth + current_user.traits.dexterity
-    target_awareness = target.traits.perception + \
-        target.meta_traits.survival_instinct
+    target_awareness = target.trait("perception") + \
+        target.trait("survival_instinct")
 
     success_chance = min(
         75, max(15, (thief_skill / (thief_skill + target_awareness)) * 100))
@@ -442,12 +414,10 @@ async def donate_to_player(
     Donate credits to another player (more generous than helping).
     """
     # Get target player
-    target_dict = await db.players.find_one({"_id": action.target_id})
-    if not target_dict:
+    target = await PlayerRepository(db).get(action.target_id, PlayerEconomy)
+    if not target:
         raise HTTPException(status_code=404, detail="Target player not found")
 
-    target = Player(**target_dict)
-
     # Can't donate to yourself
     if target.id == current_user.id:
         raise HTTPException(
@@ -518,12 +488,10 @@ async def trade_with_player(
     For now, this is a simplified direct trade (will be expanded with accept/reject later).
     """
     # Get target player
-    target_dict = await db.players.find_one({"_id": action.target_id})
-    if not target_dict:
+    target = await PlayerRepository(db).get(action.target_id, PlayerEconomy)
+    if not target:
         raise HTTPException(status_code=404, detail="Target player not found")
 
-    target = Player(**target_dict)
-
     # Can't trade with yourself
     if target.id == current_user.id:
         raise HTTPException(
@@ -7,6 +7,7 @@ from .schemas import LoginRequest, RegisterRequest, TokenResponse
 from backend.core.database import get_database
 from backend.core.security import verify_password, get_password_hash, create_access_token, decode_access_token
 from backend.models.player.player import Player, PlayerCreate, PlayerResponse
+from backend.services.social.graph import social_graph
 
 router = APIRouter(prefix="/auth", tags=["authentication"])
 security = HTTPBearer()
@@ -185,6 +186,7 @@ async def logout(
         {"_id": payload.get("sub")},
         {"$set": {"online": False}}
     )
+    social_graph.forget(payload.get("sub"))
 
     return {"message": "Successfully logged out"}
 
@@ -0,0 +1,4 @@
+"""API module for game definition catalogs."""
+from .router import router
+
+__all__ = ["router"]
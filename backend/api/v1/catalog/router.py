@@ -0,0 +1,83 @@
+"""Catalog routes - static game definitions served from cached bytes with ETags."""
+
+from typing import Any, Awaitable, Callable, Hashable, Optional, Type
+
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from pydantic import BaseModel
+
+from backend.services.catalog import Catalog, get_catalog
+from backend.services.catalog.catalog import serialize
+
+router = APIRouter(prefix="/catalog", tags=["catalog"])
+
+PUBLIC_CACHE_CONTROL = "public, max-age=300"
+PRIVATE_CACHE_CONTROL = "private, no-cache"
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return "*" in candidates or any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+async def catalog_response(
+    request: Request,
+    catalog: Catalog,
+    key: Hashable,
+    build: Callable[[], Awaitable[Any]],
+    response_model: Optional[Type[BaseModel]] = None,
+    cache_control: str = PRIVATE_CACHE_CONTROL
+) -> Response:
+    """Serve ``build()`` for ``key`` from the catalog's cached bytes.
+
+    The body is built and serialized once per key; requests whose
+    ``If-None-Match`` carries the current ETag get an empty 304.
+    """
+    cached = catalog.cached_body(key)
+    if cached is None:
+        data = await build()
+        if response_model is not None:
+            body = response_model.model_validate(data).model_dump_json().encode()
+        else:
+            body = serialize(data)
+        cached = catalog.cache_body(key, body)
+
+    body, etag = cached
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if _etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _catalog_or_404(name: str) -> Catalog:
+    try:
+        return get_catalog(name)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+
+
+@router.get("/{name}")
+async def get_catalog_definitions(name: str, request: Request):
+    """Every definition in a catalog with its facet counts."""
+    catalog = _catalog_or_404(name)
+
+    async def build():
+        return catalog.describe()
+
+    return await catalog_response(request, catalog, ("all",), build, cache_control=PUBLIC_CACHE_CONTROL)
+
+
+@router.get("/{name}/{item_id}")
+async def get_catalog_definition(name: str, item_id: str, request: Request):
+    """A single definition by ID."""
+    catalog = _catalog_or_404(name)
+    item = catalog.get(item_id)
+    if item is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Definition not found")
+
+    async def build():
+        return item
+
+    return await catalog_response(request, catalog, ("item", item_id), build, cache_control=PUBLIC_CACHE_CONTROL)
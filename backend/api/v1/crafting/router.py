@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from ....core.security import get_current_user
 from ....services.crafting.crafter import CraftingService
 from ....services.player.profile import PlayerService
+from ..catalog.router import catalog_response
 from .schemas import (
     CraftItemRequest,
     CraftItemResponse,
+    CraftQueueRequest,
     RecipeListResponse,
     RecipeDetailResponse,
     CraftingMaterialsResponse
@@ -15,18 +17,31 @@ router = APIRouter(prefix="/crafting", tags=["crafting"])
 
 @router.get("/recipes", response_model=RecipeListResponse)
 async def get_all_recipes(
+    request: Request,
     category: str = None,
     min_level: int = None,
     current_user: dict = Depends(get_current_user)
 ):
     """Get all available crafting recipes."""
     crafting_service = CraftingService()
-    recipes = await crafting_service.get_recipes(
-        player_level=current_user.get("level", 1),
-        category=category,
-        min_level=min_level
+    player_level = current_user.get("level", 1)
+
+    async def build():
+        recipes = await crafting_service.get_recipes(
+            player_level=player_level,
+            category=category,
+            min_level=min_level
+        )
+        return {"recipes": recipes, "total": len(recipes)}
+
+    # Unlocked flags depend only on the level, so responses are shared per level
+    return await catalog_response(
+        request,
+        crafting_service.recipe_manager.catalog,
+        ("recipes", category, min_level, player_level),
+        build,
+        response_model=RecipeListResponse
     )
-    return {"recipes": recipes, "total": len(recipes)}
 
 
 @router.get("/recipes/{recipe_id}", response_model=RecipeDetailResponse)
@@ -65,29 +80,42 @@ async def craft_item(
     """Craft an item using a recipe."""
     crafting_service = CraftingService()
 
-    # Check if player has required materials
-    can_craft = await crafting_service.can_craft(
-        current_user["_id"],
-        request.recipe_id,
-        request.quantity
-    )
+    # Materials and level are checked against the same read the craft is applied to
+    try:
+        result = await crafting_service.craft_item(
+            current_user["_id"],
+            request.recipe_id,
+            request.quantity
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    if not can_craft:
+    if not result["success"]:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Insufficient materials or level requirement not met"
+            detail=result["error"]
         )
 
-    # Craft the item
-    result = await crafting_service.craft_item(
-        current_user["_id"],
-        request.recipe_id,
-        request.quantity
-    )
-
     return result
 
 
+@router.post("/craft/queue")
+async def craft_queue(
+    request: CraftQueueRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Craft several recipes in order with a single inventory update."""
+    crafting_service = CraftingService()
+
+    try:
+        return await crafting_service.craft_queue(
+            current_user["_id"],
+            [(job.recipe_id, job.quantity) for job in request.jobs]
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
 @router.post("/dismantle/{item_id}")
 async def dismantle_item(
     item_id: str,
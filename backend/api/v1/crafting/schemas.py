@@ -9,6 +9,11 @@ class CraftItemRequest(BaseModel):
                           description="Quantity to craft")
 
 
+class CraftQueueRequest(BaseModel):
+    jobs: List[CraftItemRequest] = Field(..., min_length=1, max_length=50,
+                                         description="Crafts to run in order")
+
+
 class MaterialRequirement(BaseModel):
     material_id: str
     material_name: str
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from backend.core.database import get_database
 from backend.services.guilds.management import GuildManagementService
@@ -62,11 +62,21 @@ async def list_guilds(
 @router.get("/{guild_id}", response_model=dict)
 async def get_guild(
     guild_id: str,
+    include_members: bool = False,
+    member_sort: str = Query("rank", regex="^(rank|contribution|joined)$"),
+    member_page: int = Query(1, ge=1),
+    member_page_size: int = Query(50, ge=1, le=100),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
-    """Get guild by ID"""
+    """Get guild by ID (members only when include_members is set)"""
     service = GuildManagementService(db)
-    guild = await service.get_guild(guild_id)
+    guild = await service.get_guild(
+        guild_id,
+        include_members=include_members,
+        member_sort=member_sort,
+        member_page=member_page,
+        member_page_size=member_page_size
+    )
 
     if not guild:
         raise HTTPException(status_code=404, detail="Guild not found")
@@ -109,12 +119,14 @@ async def leave_guild(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.get("/{guild_id}/members", response_model=List[dict])
+@router.get("/{guild_id}/members", response_model=dict)
 async def get_guild_members(
     guild_id: str,
+    sort: str = Query("rank", regex="^(rank|contribution|joined)$"),
+    page: int = Query(1, ge=1),
+    page_size: int = Query(50, ge=1, le=100),
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
-    """Get all guild members"""
+    """Get a page of guild members sorted by rank, contribution or join date"""
     service = GuildManagementService(db)
-    members = await service.get_guild_members(guild_id)
-    return members
+    return await service.get_guild_members(guild_id, sort=sort, page=page, page_size=page_size)
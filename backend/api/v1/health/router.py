@@ -81,3 +81,9 @@ async def ai_metrics(window_minutes: int = 60):
 async def db_metrics(window_minutes: int = 60):
     """Get database metrics for specified time window."""
     return metrics_collector.get_db_metrics(window_minutes)
+
+
+@router.get("/metrics/jobs", response_model=Dict[str, Any])
+async def job_metrics(window_minutes: int = 60):
+    """Get background job metrics for specified time window."""
+    return metrics_collector.get_job_metrics(window_minutes)
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from ....core.security import get_current_user
 from ....services.investments.portfolio import InvestmentService
+from ..catalog.router import catalog_response
 from .schemas import (
     PortfolioResponse,
     InvestmentOpportunityResponse,
@@ -24,17 +25,28 @@ async def get_portfolio(
 
 @router.get("/opportunities", response_model=InvestmentOpportunityResponse)
 async def get_investment_opportunities(
+    request: Request,
     risk_level: str = None,
     min_return: float = None,
     current_user: dict = Depends(get_current_user)
 ):
     """Get available investment opportunities."""
     investment_service = InvestmentService()
-    opportunities = await investment_service.get_opportunities(
-        risk_level=risk_level,
-        min_return=min_return
+
+    async def build():
+        opportunities = await investment_service.get_opportunities(
+            risk_level=risk_level,
+            min_return=min_return
+        )
+        return {"opportunities": opportunities}
+
+    return await catalog_response(
+        request,
+        investment_service.opportunities.catalog,
+        ("opportunities", risk_level, min_return),
+        build,
+        response_model=InvestmentOpportunityResponse
     )
-    return {"opportunities": opportunities}
 
 
 @router.post("/invest", response_model=MakeInvestmentResponse)
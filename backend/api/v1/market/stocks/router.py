@@ -1,6 +1,7 @@
 """Stock market routes."""
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timedelta
 from typing import Dict, Any, List
 
 from backend.api.deps import get_current_user
@@ -127,3 +128,29 @@ async def get_stock_history(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(e)
         )
+
+
+@router.get("/candles/{ticker}")
+async def get_stock_candles(
+    ticker: str,
+    interval: str = "1h",
+    hours: int = 24
+):
+    """Get OHLC candles (1m, 1h or 1d) for the last ``hours`` hours."""
+    try:
+        candles = await stock_service.get_candles(
+            ticker,
+            interval,
+            start=datetime.utcnow() - timedelta(hours=hours)
+        )
+        return {"ticker": ticker.upper(), "interval": interval, "candles": candles}
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
@@ -2,11 +2,12 @@
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from typing import Optional
-from datetime import datetime
 
 from ....core.database import get_database
 from ....services.quests.manager import QuestManager
 from ....services.quests.generator import QuestGenerator
+from ....services.quests.reset_pipeline import QuestResetPipeline
+from ....services.player.inventory_manager import inventory_of
 from ....models.quests.quest import QuestType, QuestStatus
 from .schemas import (
     QuestResponse,
@@ -35,8 +36,7 @@ async def get_available_quests(
     player_level = current_player.get("level", 1)
     player_karma = current_player.get("karma_points", 0)
     player_traits = current_player.get("traits", {})
-    player_items = [item["item_id"]
-        for item in current_player.get("items", [])]
+    player_items = list(inventory_of(current_player))
 
     quests = await manager.get_available_quests(
         player_id=current_player["_id"],
@@ -212,33 +212,14 @@ async def get_daily_quests(
     db = Depends(get_database),
 ):
     """Get daily quests"""
-    manager = QuestManager(db)
-    generator = QuestGenerator(db)
-
-    # Check if daily quests exist for today
-    daily_quests = await manager.get_player_quests(
+    # Pre-generated before the daily reset; generated here only if missing
+    daily_quests = await QuestResetPipeline(db).get_period_quests(
         player_id=current_player["_id"],
-        quest_type=QuestType.DAILY,
-        status=None,  # Any status
+        player=current_player,
+        period="daily",
     )
 
-    # Filter to today's quests
-    today = datetime.utcnow().date()
-    today_quests = [
-        q for q in daily_quests
-        if datetime.fromisoformat(q["generated_at"].replace("Z", "+00:00")).date() == today
-    ]
-
-    # Generate new daily quests if needed (should be 3)
-    if len(today_quests) < 3:
-        new_quests = await generator.generate_daily_quests(
-            player_id=current_player["_id"],
-            player=current_player,
-            count=3 - len(today_quests),
-        )
-        today_quests.extend(new_quests)
-
-    return {"quests": today_quests, "total": len(today_quests)}
+    return {"quests": daily_quests, "total": len(daily_quests)}
 
 
 @router.get("/weekly", response_model=QuestListResponse)
@@ -247,25 +228,13 @@ async def get_weekly_quests(
     db = Depends(get_database),
 ):
     """Get weekly quests"""
-    manager = QuestManager(db)
-    generator = QuestGenerator(db)
-
-    # Check if weekly quests exist
-    weekly_quests = await manager.get_player_quests(
+    # Pre-generated before the weekly reset; generated here only if missing
+    weekly_quests = await QuestResetPipeline(db).get_period_quests(
         player_id=current_player["_id"],
-        quest_type=QuestType.WEEKLY,
-        status=None,
+        player=current_player,
+        period="weekly",
     )
 
-    # Generate if needed (should be 5)
-    if len(weekly_quests) < 5:
-        new_quests = await generator.generate_weekly_quests(
-            player_id=current_player["_id"],
-            player=current_player,
-            count=5 - len(weekly_quests),
-        )
-        weekly_quests.extend(new_quests)
-
     return {"quests": weekly_quests, "total": len(weekly_quests)}
 
 
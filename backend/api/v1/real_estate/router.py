@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from ....core.security import get_current_user
 from ....services.real_estate.manager import RealEstateService
+from ..catalog.router import catalog_response
 from .schemas import (
     PropertyListResponse,
     PropertyDetailResponse,
@@ -15,6 +16,7 @@ router = APIRouter(prefix="/real-estate", tags=["real-estate"])
 
 @router.get("/properties", response_model=PropertyListResponse)
 async def get_available_properties(
+    request: Request,
     property_type: str = None,
     max_price: int = None,
     territory_id: int = None,
@@ -22,12 +24,22 @@ async def get_available_properties(
 ):
     """Get all available properties for sale."""
     real_estate_service = RealEstateService()
-    properties = await real_estate_service.get_available_properties(
-        property_type=property_type,
-        max_price=max_price,
-        territory_id=territory_id
+
+    async def build():
+        properties = await real_estate_service.get_available_properties(
+            property_type=property_type,
+            max_price=max_price,
+            territory_id=territory_id
+        )
+        return {"properties": properties, "total": len(properties)}
+
+    return await catalog_response(
+        request,
+        real_estate_service.property_types.catalog,
+        ("available", property_type, max_price, territory_id),
+        build,
+        response_model=PropertyListResponse
     )
-    return {"properties": properties, "total": len(properties)}
 
 
 @router.get("/my-properties")
@@ -1,7 +1,7 @@
 """Robot marketplace routes."""
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from backend.api.deps import get_current_user
 from backend.services.robots.marketplace import RobotMarketplace
@@ -14,12 +14,36 @@ marketplace = RobotMarketplace()
 @router.get("/")
 async def get_marketplace_listings(
     limit: int = 50,
-    skip: int = 0
+    robot_type: Optional[str] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    min_level: Optional[int] = None,
+    max_level: Optional[int] = None,
+    sort: str = "newest",
+    cursor: Optional[str] = None
 ):
-    """Get all robot marketplace listings."""
+    """Browse robot marketplace listings (pass next_cursor to get the next page)."""
     try:
-        listings = await marketplace.get_listings(limit=limit, skip=skip)
-        return {"listings": listings, "total": len(listings)}
+        page = await marketplace.get_listings(
+            limit=limit,
+            robot_type=robot_type,
+            min_price=min_price,
+            max_price=max_price,
+            min_level=min_level,
+            max_level=max_level,
+            sort=sort,
+            cursor=cursor
+        )
+        return {
+            "listings": page["listings"],
+            "total": len(page["listings"]),
+            "next_cursor": page["next_cursor"]
+        }
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -39,7 +39,7 @@ async def get_my_battle_pass_progress(
 ):
     """Get current player's battle pass progress."""
     bp_service = BattlePassService()
-    battle_pass = await bp_service.get_active_battle_pass()
+    battle_pass = await bp_service.get_active_battle_pass(summary_only=True)
 
     if not battle_pass:
         raise HTTPException(status_code=404, detail="No active battle pass")
@@ -58,7 +58,7 @@ async def purchase_premium_battle_pass(
 ):
     """Purchase premium battle pass."""
     bp_service = BattlePassService()
-    battle_pass = await bp_service.get_active_battle_pass()
+    battle_pass = await bp_service.get_active_battle_pass(summary_only=True)
 
     if not battle_pass:
         raise HTTPException(status_code=404, detail="No active battle pass")
@@ -80,7 +80,7 @@ async def claim_battle_pass_rewards(
 ):
     """Claim battle pass rewards for a specific tier."""
     bp_service = BattlePassService()
-    battle_pass = await bp_service.get_active_battle_pass()
+    battle_pass = await bp_service.get_active_battle_pass(summary_only=True)
 
     if not battle_pass:
         raise HTTPException(status_code=404, detail="No active battle pass")
@@ -1,7 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from backend.core.database import get_database
-from backend.services.social.relationships import RelationshipService
+from backend.services.social.relationships import RELATIONSHIP_PAGE, RelationshipService
+from backend.services.player.visibility import VisibilityService, serialize_profile, visible_projection
 from backend.api.deps import get_current_user
 from backend.models.social.relationship import RelationshipType
 from typing import List, Optional
@@ -16,17 +17,16 @@ async def get_nearby_players(
     limit: int = 20
 ):
     """Get nearby online players"""
-    # Get players in same location/territory
-    cursor = db.players.find(
+    # Get players in same location/territory, with what I'm allowed to see
+    return await VisibilityService().visible_players(
+        db,
+        current_user["_id"],
         {
             "_id": {"$ne": current_user["_id"]},
             "online": True
         },
-        {"password_hash": 0}
-    ).limit(limit)
-
-    players = await cursor.to_list(length=limit)
-    return players
+        limit
+    )
 
 
 @router.get("/online", response_model=List[dict])
@@ -38,20 +38,22 @@ async def get_online_players(
     """Get all online players"""
     cursor = db.players.find(
         {"online": True},
-        {"password_hash": 0}
+        projection=visible_projection()
     ).skip(skip).limit(limit)
 
     players = await cursor.to_list(length=limit)
-    return players
+    return [serialize_profile(player) for player in players]
 
 
-@router.get("/relationships", response_model=List[dict])
+@router.get("/relationships", response_model=dict)
 async def get_my_relationships(
     current_user: dict = Depends(get_current_user),
     db: AsyncIOMotorDatabase = Depends(get_database),
-    type: Optional[str] = None
+    type: Optional[str] = None,
+    after: Optional[str] = None,
+    limit: int = Query(RELATIONSHIP_PAGE, ge=1, le=RELATIONSHIP_PAGE)
 ):
-    """Get my relationships"""
+    """Get my relationships (pass next_cursor as after to get the next page)"""
     service = RelationshipService(db)
 
     relationship_type = None
@@ -62,13 +64,13 @@ async def get_my_relationships(
             raise HTTPException(
                 status_code=400, detail="Invalid relationship type")
 
-    relationships = await service.get_player_relationships(
+    return await service.get_player_relationships(
         player_id=current_user["_id"],
-        type=relationship_type
+        type=relationship_type,
+        after=after,
+        limit=limit
     )
 
-    return relationships
-
 
 @router.get("/players/{player_id}", response_model=dict)
 async def get_player_profile(
@@ -76,21 +78,10 @@ async def get_player_profile(
     db: AsyncIOMotorDatabase = Depends(get_database)
 ):
     """Get public player profile"""
-    player = await db.players.find_one(
-        {"_id": player_id},
-        {"password_hash": 0}
-    )
+    # Respects privacy settings; ghost and phantom players show only their name
+    player = await VisibilityService().get_public_profile(db, player_id)
 
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
 
-    # Respect privacy settings
-    visibility = player.get("visibility", {})
-    if visibility.get("privacy_tier") in ["ghost", "phantom"]:
-        # Return minimal info
-        return {
-            "_id": player["_id"],
-            "username": player.get("username", "Hidden")
-        }
-
     return player
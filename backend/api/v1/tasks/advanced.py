@@ -11,6 +11,7 @@ from backend.core.security import decode_access_token
 from backend.services.tasks.combat_task_generator import CombatTaskGenerator
 from backend.services.tasks.economic_task_generator import EconomicTaskGenerator
 from backend.services.tasks.relationship_task_generator import RelationshipTaskGenerator
+from backend.services.social.graph import social_graph
 from backend.services.tasks.guild_task_generator import GuildTaskGenerator
 from backend.services.tasks.ethical_dilemma_generator import EthicalDilemmaGenerator
 from backend.services.tasks.difficulty_scaler import DifficultyScaler
@@ -69,7 +70,8 @@ async def generate_advanced_tasks(
             task = generator.generate_economic_task(player_level, player_credits, player_traits)
         elif request.task_type == TaskType.RELATIONSHIP:
             generator = RelationshipTaskGenerator()
-            task = generator.generate_relationship_task(player_level, player_traits)
+            connections = await social_graph.connections(db, player_id)
+            task = generator.generate_relationship_task(player_level, player_traits, connections)
         elif request.task_type == TaskType.GUILD:
             generator = GuildTaskGenerator()
             is_guild_member = player_dict.get("guild_id") is not None
@@ -12,6 +12,7 @@ from backend.core.security import decode_access_token
 from backend.services.tasks.coop_task_generator import CoopTaskGenerator
 from backend.services.tasks.competitive_task_generator import CompetitiveTaskGenerator
 from backend.services.tasks.pvp_moral_task_generator import PvPMoralTaskGenerator
+from backend.services.traits.trait_deltas import change_traits
 
 router = APIRouter(prefix="/multiplayer", tags=["multiplayer-tasks"])
 security = HTTPBearer()
@@ -381,13 +382,7 @@ async def complete_pvp_moral_task(
         # Update player's traits and rewards
         player_effects = result["player_effects"]["effects"]
         if "traits" in player_effects:
-            for trait, change in player_effects["traits"].items():
-                current_value = player_dict.get("traits", {}).get(trait, 50)
-                new_value = max(0, min(100, current_value + change))
-                await db.players.update_one(
-                    {"_id": player_id},
-                    {"$set": {f"traits.{trait}": new_value}}
-                )
+            await change_traits(db, player_id, player_effects["traits"], default=50)
         
         # Apply other rewards
         if "xp" in player_effects:
@@ -6,6 +6,7 @@ from backend.api.deps import get_current_player
 from backend.models.player.player import Player
 from backend.services.tournaments.manager import TournamentManager
 from .schemas import (
+    TournamentMatchResponse,
     TournamentResponse,
     RegisterTournamentRequest
 )
@@ -59,6 +60,8 @@ async def register_for_tournament(
 @router.get("/{tournament_id}/bracket")
 async def get_tournament_bracket(
     tournament_id: str,
+    bracket: Optional[str] = Query(None, description="winners, losers, final or swiss"),
+    round_number: Optional[int] = Query(None, ge=1, description="Only this round"),
     current_player: Player = Depends(get_current_player)
 ):
     """Get tournament bracket."""
@@ -68,9 +71,10 @@ async def get_tournament_bracket(
     if not tournament:
         raise HTTPException(status_code=404, detail="Tournament not found")
 
+    matches = await manager.get_bracket(tournament_id, bracket, round_number)
     return {
         "tournament_id": tournament_id,
-        "matches": tournament.get("matches", []),
+        "matches": [TournamentMatchResponse(**match) for match in matches],
         "current_round": tournament.get("current_round", 0),
         "total_rounds": tournament.get("total_rounds", 0)
     }
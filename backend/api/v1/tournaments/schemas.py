@@ -8,6 +8,7 @@ from datetime import datetime
 class TournamentMatchResponse(BaseModel):
     """Tournament match information."""
     match_id: str
+    bracket: str
     round_number: int
     bracket_position: int
     player1_id: Optional[str]
@@ -15,6 +16,7 @@ class TournamentMatchResponse(BaseModel):
     winner_id: Optional[str]
     score: Optional[Dict[str, int]]
     status: str
+    next_match_id: Optional[str] = None
 
     class Config:
         from_attributes = True
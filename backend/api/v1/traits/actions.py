@@ -1,22 +1,19 @@
 """API endpoints for trait actions and abilities."""
 
+from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status
 from typing import Optional, Dict, List
 from pydantic import BaseModel, Field
 from backend.core.deps import get_current_player, get_database
-from backend.services.player.trait_ability_service import TraitAbilityService
+from backend.services.cooldowns import cooldowns
+from backend.services.player.trait_ability_service import TRAIT_ABILITIES, TRAIT_COOLDOWNS, TraitAbilityService
+from backend.services.traits.ability_engine import AbilityEngine
 
 # Import all trait abilities
-from backend.services.traits.hacking_ability import HackingAbility
 from backend.services.traits.negotiation_ability import NegotiationAbility
-from backend.services.traits.stealth_ability import StealthAbility
-from backend.services.traits.leadership_ability import LeadershipAbility
-from backend.services.traits.meditation_ability import MeditationAbility
 from backend.services.traits.telekinesis_ability import TelekinesisAbility
 from backend.services.traits.pyrokinesis_ability import PyrokinesisAbility
 from backend.services.traits.cryokinesis_ability import CryokinesisAbility
-from backend.services.traits.empathy_ability import EmpathyAbility
-from backend.services.traits.integrity_ability import IntegrityAbility
 from backend.services.traits.compassion_ability import CompassionAbility
 from backend.services.traits.honesty_ability import HonestyAbility
 from backend.services.traits.envy_ability import EnvyAbility
@@ -27,8 +24,6 @@ from backend.services.traits.luck_ability import LuckAbility
 from backend.services.traits.resilience_ability import ResilienceAbility
 from backend.services.traits.wisdom_ability import WisdomAbility
 from backend.services.traits.adaptability_ability import AdaptabilityAbility
-from backend.services.traits.greed_ability import GreedAbility
-from backend.services.traits.arrogance_ability import ArroganceAbility
 
 router = APIRouter()
 
@@ -134,6 +129,18 @@ async def unequip_trait(
         "message": f"Trait unequipped from slot {slot_number}"
     }
 
+# ===== TRAIT ABILITIES =====
+
+async def _execute_ability(db, current_player: dict, action_type: str, target_id: Optional[str] = None) -> Dict:
+    """Run an ability through the ability engine, turning refusals into 400s."""
+    try:
+        return await AbilityEngine(db).execute(current_player, action_type, target_id)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
 # ===== TRAIT ABILITIES - SKILLS =====
 
 @router.post("/actions/hacking/credit-hack")
@@ -144,77 +151,7 @@ async def use_credit_hack(
 ):
     """Use Hacking skill to steal credits from target player."""
     
-    if not request.target_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Target player ID required"
-        )
-    
-    service = TraitAbilityService(db)
-    
-    # Check if can use ability
-    can_use, message, cooldown = await service.can_use_ability(
-        current_player["_id"],
-        "hacking"
-    )
-    
-    if not can_use:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"{message}" + (f" ({cooldown}s remaining)" if cooldown else "")
-        )
-    
-    # Check range
-    if "position" not in current_player:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Position not available"
-        )
-    
-    nearby_players = await service.get_players_in_range(
-        current_player["position"],
-        100,  # 100m range
-        current_player["_id"]
-    )
-    
-    target_in_range = any(p["player_id"] == request.target_id for p in nearby_players)
-    if not target_in_range:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Target not in range (need within 100m)"
-        )
-    
-    # Execute hack
-    hacking_service = HackingAbility(db)
-    hacker_level = current_player.get("level", 1)
-    hacking_trait_level = int(current_player.get("traits", {}).get("hacking", 1))
-    
-    result = await hacking_service.credit_hack(
-        hacker_id=current_player["_id"],
-        target_id=request.target_id,
-        hacker_level=hacker_level,
-        hacker_trait_level=hacking_trait_level
-    )
-    
-    # If successful, consume energy and start cooldown
-    if result["success"]:
-        await service.consume_energy(current_player["_id"], "hacking")
-        await service.start_cooldown(current_player["_id"], "hacking", "skill")
-        
-        # Log usage
-        await service.log_trait_usage(
-            player_id=current_player["_id"],
-            trait_id="hacking",
-            trait_type="skill",
-            action_type="credit_hack",
-            target_id=request.target_id,
-            success=True,
-            karma_change=-result.get("karma_loss", 0),
-            credits_affected=result.get("amount_stolen", 0),
-            location=current_player.get("position")
-        )
-    
-    return result
+    return await _execute_ability(db, current_player, "credit_hack", request.target_id)
 
 @router.post("/actions/stealth/shadow-walk")
 async def use_shadow_walk(
@@ -223,44 +160,7 @@ async def use_shadow_walk(
 ):
     """Activate Stealth - Shadow Walk ability."""
     
-    service = TraitAbilityService(db)
-    
-    # Check if can use
-    can_use, message, cooldown = await service.can_use_ability(
-        current_player["_id"],
-        "stealth"
-    )
-    
-    if not can_use:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"{message}" + (f" ({cooldown}s remaining)" if cooldown else "")
-        )
-    
-    # Execute stealth
-    stealth_service = StealthAbility(db)
-    stealth_trait_level = int(current_player.get("traits", {}).get("stealth", 1))
-    
-    result = await stealth_service.shadow_walk(
-        player_id=current_player["_id"],
-        trait_level=stealth_trait_level
-    )
-    
-    # Consume energy and start cooldown
-    await service.consume_energy(current_player["_id"], "stealth")
-    await service.start_cooldown(current_player["_id"], "stealth", "skill")
-    
-    # Log usage
-    await service.log_trait_usage(
-        player_id=current_player["_id"],
-        trait_id="stealth",
-        trait_type="skill",
-        action_type="shadow_walk",
-        success=True,
-        location=current_player.get("position")
-    )
-    
-    return result
+    return await _execute_ability(db, current_player, "shadow_walk")
 
 @router.post("/actions/leadership/rally-cry")
 async def use_rally_cry(
@@ -269,53 +169,7 @@ async def use_rally_cry(
 ):
     """Activate Leadership - Rally Cry to buff nearby allies."""
     
-    service = TraitAbilityService(db)
-    
-    # Check if can use
-    can_use, message, cooldown = await service.can_use_ability(
-        current_player["_id"],
-        "leadership"
-    )
-    
-    if not can_use:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"{message}" + (f" ({cooldown}s remaining)" if cooldown else "")
-        )
-    
-    if "position" not in current_player:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Position not available"
-        )
-    
-    # Execute rally cry
-    leadership_service = LeadershipAbility(db)
-    leadership_trait_level = int(current_player.get("traits", {}).get("leadership", 1))
-    
-    result = await leadership_service.rally_cry(
-        leader_id=current_player["_id"],
-        leader_position=current_player["position"],
-        trait_level=leadership_trait_level
-    )
-    
-    if result["success"]:
-        # Consume energy and start cooldown
-        await service.consume_energy(current_player["_id"], "leadership")
-        await service.start_cooldown(current_player["_id"], "leadership", "skill")
-        
-        # Log usage
-        await service.log_trait_usage(
-            player_id=current_player["_id"],
-            trait_id="leadership",
-            trait_type="skill",
-            action_type="rally_cry",
-            success=True,
-            karma_change=5,
-            location=current_player.get("position")
-        )
-    
-    return result
+    return await _execute_ability(db, current_player, "rally_cry")
 
 # ===== TRAIT ABILITIES - SUPERPOWER TOOLS =====
 
@@ -326,46 +180,7 @@ async def use_karmic_trace(
 ):
     """Use Meditation superpower to track those who wronged you."""
     
-    service = TraitAbilityService(db)
-    
-    # Check if can use
-    can_use, message, cooldown = await service.can_use_ability(
-        current_player["_id"],
-        "meditation_sp"
-    )
-    
-    if not can_use:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"{message}" + (f" ({cooldown}s remaining)" if cooldown else "")
-        )
-    
-    # Execute karmic trace
-    meditation_service = MeditationAbility(db)
-    meditation_trait_level = int(current_player.get("traits", {}).get("meditation", 1))
-    
-    result = await meditation_service.karmic_trace(
-        player_id=current_player["_id"],
-        trait_level=meditation_trait_level
-    )
-    
-    if result["success"]:
-        # Consume energy and start cooldown
-        await service.consume_energy(current_player["_id"], "meditation_sp")
-        await service.start_cooldown(current_player["_id"], "meditation_sp", "superpower_tool")
-        
-        # Log usage
-        await service.log_trait_usage(
-            player_id=current_player["_id"],
-            trait_id="meditation_sp",
-            trait_type="superpower_tool",
-            action_type="karmic_trace",
-            success=True,
-            karma_change=10,
-            location=current_player.get("position")
-        )
-    
-    return result
+    return await _execute_ability(db, current_player, "karmic_trace")
 
 # ===== TRAIT ABILITIES - VIRTUES =====
 
@@ -377,54 +192,7 @@ async def use_emotional_shield(
 ):
     """Use Empathy to absorb ally's mental afflictions."""
     
-    if not request.target_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Target ally ID required"
-        )
-    
-    service = TraitAbilityService(db)
-    
-    # Check if can use
-    can_use, message, cooldown = await service.can_use_ability(
-        current_player["_id"],
-        "empathy"
-    )
-    
-    if not can_use:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"{message}" + (f" ({cooldown}s remaining)" if cooldown else "")
-        )
-    
-    # Execute emotional shield
-    empathy_service = EmpathyAbility(db)
-    empathy_trait_level = int(current_player.get("traits", {}).get("empathy", 1))
-    
-    result = await empathy_service.emotional_shield(
-        caster_id=current_player["_id"],
-        target_id=request.target_id,
-        trait_level=empathy_trait_level
-    )
-    
-    if result["success"]:
-        # Consume energy and start cooldown
-        await service.consume_energy(current_player["_id"], "empathy")
-        await service.start_cooldown(current_player["_id"], "empathy", "virtue")
-        
-        # Log usage
-        await service.log_trait_usage(
-            player_id=current_player["_id"],
-            trait_id="empathy",
-            trait_type="virtue",
-            action_type="emotional_shield",
-            target_id=request.target_id,
-            success=True,
-            karma_change=10,
-            location=current_player.get("position")
-        )
-    
-    return result
+    return await _execute_ability(db, current_player, "emotional_shield", request.target_id)
 
 @router.post("/actions/integrity/unbreakable-will")
 async def use_unbreakable_will(
@@ -433,45 +201,7 @@ async def use_unbreakable_will(
 ):
     """Use Integrity to become immune to control effects."""
     
-    service = TraitAbilityService(db)
-    
-    # Check if can use
-    can_use, message, cooldown = await service.can_use_ability(
-        current_player["_id"],
-        "integrity"
-    )
-    
-    if not can_use:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"{message}" + (f" ({cooldown}s remaining)" if cooldown else "")
-        )
-    
-    # Execute unbreakable will
-    integrity_service = IntegrityAbility(db)
-    integrity_trait_level = int(current_player.get("traits", {}).get("integrity", 1))
-    
-    result = await integrity_service.unbreakable_will(
-        player_id=current_player["_id"],
-        trait_level=integrity_trait_level
-    )
-    
-    # Consume energy and start cooldown
-    await service.consume_energy(current_player["_id"], "integrity")
-    await service.start_cooldown(current_player["_id"], "integrity", "virtue")
-    
-    # Log usage
-    await service.log_trait_usage(
-        player_id=current_player["_id"],
-        trait_id="integrity",
-        trait_type="virtue",
-        action_type="unbreakable_will",
-        success=True,
-        karma_change=8,
-        location=current_player.get("position")
-    )
-    
-    return result
+    return await _execute_ability(db, current_player, "unbreakable_will")
 
 # ===== TRAIT ABILITIES - VICES =====
 
@@ -483,55 +213,7 @@ async def use_plunder(
 ):
     """Use Greed to plunder extra loot from defeated enemy."""
     
-    if not request.target_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Target enemy ID required"
-        )
-    
-    service = TraitAbilityService(db)
-    
-    # Check if can use
-    can_use, message, cooldown = await service.can_use_ability(
-        current_player["_id"],
-        "greed"
-    )
-    
-    if not can_use:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"{message}" + (f" ({cooldown}s remaining)" if cooldown else "")
-        )
-    
-    # Execute plunder
-    greed_service = GreedAbility(db)
-    greed_trait_level = int(current_player.get("traits", {}).get("greed", 1))
-    
-    result = await greed_service.plunder(
-        plunderer_id=current_player["_id"],
-        target_id=request.target_id,
-        trait_level=greed_trait_level
-    )
-    
-    if result["success"]:
-        # Consume energy and start cooldown
-        await service.consume_energy(current_player["_id"], "greed")
-        await service.start_cooldown(current_player["_id"], "greed", "vice")
-        
-        # Log usage
-        await service.log_trait_usage(
-            player_id=current_player["_id"],
-            trait_id="greed",
-            trait_type="vice",
-            action_type="plunder",
-            target_id=request.target_id,
-            success=True,
-            karma_change=-15,
-            credits_affected=result.get("extra_credits", 0),
-            location=current_player.get("position")
-        )
-    
-    return result
+    return await _execute_ability(db, current_player, "plunder", request.target_id)
 
 @router.post("/actions/arrogance/crushing-ego")
 async def use_crushing_ego(
@@ -541,54 +223,7 @@ async def use_crushing_ego(
 ):
     """Use Arrogance to debuff and taunt enemy."""
     
-    if not request.target_id:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Target player ID required"
-        )
-    
-    service = TraitAbilityService(db)
-    
-    # Check if can use
-    can_use, message, cooldown = await service.can_use_ability(
-        current_player["_id"],
-        "arrogance"
-    )
-    
-    if not can_use:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"{message}" + (f" ({cooldown}s remaining)" if cooldown else "")
-        )
-    
-    # Execute crushing ego
-    arrogance_service = ArroganceAbility(db)
-    arrogance_trait_level = int(current_player.get("traits", {}).get("arrogance", 1))
-    
-    result = await arrogance_service.crushing_ego(
-        caster_id=current_player["_id"],
-        target_id=request.target_id,
-        trait_level=arrogance_trait_level
-    )
-    
-    if result["success"]:
-        # Consume energy and start cooldown
-        await service.consume_energy(current_player["_id"], "arrogance")
-        await service.start_cooldown(current_player["_id"], "arrogance", "vice")
-        
-        # Log usage
-        await service.log_trait_usage(
-            player_id=current_player["_id"],
-            trait_id="arrogance",
-            trait_type="vice",
-            action_type="crushing_ego",
-            target_id=request.target_id,
-            success=True,
-            karma_change=-10,
-            location=current_player.get("position")
-        )
-    
-    return result
+    return await _execute_ability(db, current_player, "crushing_ego", request.target_id)
 
 # ===== UTILITY ENDPOINTS =====
 
@@ -615,30 +250,24 @@ async def get_active_cooldowns(
 ):
     """Get all active cooldowns for player."""
     
-    from datetime import datetime
-    
-    cursor = db.trait_cooldowns.find({
-        "player_id": current_player["_id"],
-        "is_active": True
-    })
-    
-    cooldowns = await cursor.to_list(length=None)
-    
-    # Calculate remaining time
-    for cd in cooldowns:
-        if cd["available_at"] > datetime.utcnow():
-            cd["seconds_remaining"] = int((cd["available_at"] - datetime.utcnow()).total_seconds())
-        else:
-            cd["seconds_remaining"] = 0
-            # Mark as inactive
-            await db.trait_cooldowns.update_one(
-                {"_id": cd["_id"]},
-                {"$set": {"is_active": False}}
-            )
+    now = datetime.utcnow()
+    active = await cooldowns.active(current_player["_id"], TRAIT_COOLDOWNS)
+    
+    cooldown_list = [
+        {
+            "player_id": current_player["_id"],
+            "trait_id": trait_id,
+            "trait_type": TRAIT_ABILITIES.get(trait_id, {}).get("type"),
+            "available_at": available_at,
+            "is_active": True,
+            "seconds_remaining": int(max(0.0, (available_at - now).total_seconds()))
+        }
+        for trait_id, available_at in active.items()
+    ]
     
     return {
-        "cooldowns": cooldowns,
-        "total": len(cooldowns)
+        "cooldowns": cooldown_list,
+        "total": len(cooldown_list)
     }
 
 
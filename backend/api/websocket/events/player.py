@@ -1,6 +1,8 @@
 import logging
 from typing import Dict, Any
 from backend.api.websocket.manager import manager
+from backend.api.websocket.interest import interest
+from backend.services.world.position_index import position_index
 
 logger = logging.getLogger(__name__)
 
@@ -11,15 +13,13 @@ async def handle_player_event(event_name: str, data: Dict[str, Any], player_id:
         # Player moved in the game world
         location = data.get("location", {})
 
-        # Broadcast to nearby players (for now, broadcast to all)
-        await manager.broadcast({
-            "type": "player",
-            "event": "player_moved",
-            "data": {
-                "player_id": player_id,
-                "location": location
+        # Replicated to nearby players in the next batched "moves" frame
+        if not await position_index.update(player_id, location) or not interest.move(player_id, location):
+            return {
+                "type": "player",
+                "event": "location_updated",
+                "data": {"success": False, "error": "Invalid location"}
             }
-        }, exclude=[player_id])
 
         return {
             "type": "player",
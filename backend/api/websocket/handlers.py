@@ -2,6 +2,9 @@ from fastapi import WebSocket, WebSocketDisconnect, Query, status
 from jose import JWTError, jwt
 import logging
 from .manager import manager
+from .interest import interest
+from backend.core.database import get_database
+from backend.services.world.position_index import position_index
 from .events.player import handle_player_event
 
 logger = logging.getLogger(__name__)
@@ -128,6 +131,12 @@ async def websocket_endpoint(
         
         logger.info(f"Player {username} ({player_id}) connected via WebSocket")
 
+        # Place the player at their last position so they see nearby movers before moving
+        player = await get_database().players.find_one({"_id": player_id}, projection={"position": 1})
+        if player and player.get("position"):
+            await position_index.update(player_id, player["position"], persist=False)
+            interest.move(player_id, player["position"])
+
         # Listen for messages
         while True:
             data = await websocket.receive_json()
@@ -144,6 +153,8 @@ async def websocket_endpoint(
     except WebSocketDisconnect:
         logger.info(f"Player {username} ({player_id}) disconnected")
         manager.disconnect(player_id)
+        interest.leave(player_id)
+        await position_index.remove(player_id)
         
         # Broadcast player left
         await manager.broadcast({
@@ -158,6 +169,8 @@ async def websocket_endpoint(
     except Exception as e:
         logger.error(f"WebSocket error for player {player_id}: {e}", exc_info=True)
         manager.disconnect(player_id)
+        interest.leave(player_id)
+        await position_index.remove(player_id)
         try:
             await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
         except:
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.api.websocket.manager import ConnectionManager, manager
+from backend.monitoring.metrics import metrics_collector
+from backend.services.world.spatial_grid import Cell, SpatialGrid, as_point
+
+logger = logging.getLogger(__name__)
+
+# A mover is replicated to everyone within one cell of it in each direction
+AOI_CELL_SIZE = 100.0
+# Movement frames sent per second
+AOI_TICK_HZ = 15
+# Frames are sent by this many concurrent senders, so one slow socket doesn't hold up the tick
+AOI_SENDERS = 32
+# Tick timings are summed and recorded as one job run per this many seconds
+AOI_METRICS_INTERVAL = 60.0
+
+
+class InterestManager:
+    """Replicates player movement only to players in neighbouring grid cells.
+
+    Location updates are recorded in a spatial hash grid and coalesced: a
+    player moving several times within a tick is sent once, at their latest
+    location. Every tick each recipient gets a single batched ``moves``
+    frame with the movers in its area of interest. A mover that changed
+    cell during the tick is also sent to the area it left, so those players
+    see it go.
+    """
+
+    def __init__(
+        self,
+        connections: ConnectionManager,
+        cell_size: float = AOI_CELL_SIZE,
+        tick_hz: float = AOI_TICK_HZ
+    ):
+        self.connections = connections
+        self.grid = SpatialGrid(cell_size)
+        self.tick_interval = 1 / tick_hz
+        # Movers this tick: {player_id: (cell at the start of the tick, latest location)}
+        self.pending: Dict[str, Tuple[Optional[Cell], Dict[str, Any]]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._window = self._new_window()
+
+    def move(self, player_id: str, location: Dict[str, Any]) -> bool:
+        """Record a player's new location; False if it isn't a valid position"""
+        point = as_point(location)
+        if point is None:
+            return False
+        old_cell, _ = self.grid.move(player_id, point)
+        started_in = self.pending[player_id][0] if player_id in self.pending else old_cell
+        self.pending[player_id] = (started_in, location)
+        return True
+
+    def leave(self, player_id: str) -> None:
+        self.grid.remove(player_id)
+        self.pending.pop(player_id, None)
+
+    def frames(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Take this tick's moves, grouped by the player each one is sent to.
+
+        Moves are bucketed by cell and each occupied cell's view (the moves in
+        the block of cells around it) is built once and shared by everyone in
+        that cell, so a tick costs O(cells + recipients) plus the moves sent.
+        """
+        pending, self.pending = self.pending, {}
+        arrivals: Dict[Cell, List[Dict[str, Any]]] = {}
+        departures: Dict[Cell, List[Tuple[Cell, Dict[str, Any]]]] = {}
+        for mover, (started_in, location) in pending.items():
+            cell = self.grid.cell_of.get(mover)
+            if cell is None:
+                continue
+            move = {"player_id": mover, "location": location}
+            arrivals.setdefault(cell, []).append(move)
+            if started_in is not None and started_in != cell:
+                departures.setdefault(started_in, []).append((cell, move))
+
+        frames: Dict[str, List[Dict[str, Any]]] = {}
+        for cell, members in self.grid.cells.items():
+            block = set(self._block(cell))
+            view = [move for nearby in block for move in arrivals.get(nearby, ())]
+            # Movers that left this area this tick, unless they're still in it
+            view.extend(
+                move for nearby in block for now_in, move in departures.get(nearby, ())
+                if now_in not in block
+            )
+            if not view:
+                continue
+            for recipient in members:
+                if recipient in pending:
+                    own = [move for move in view if move["player_id"] != recipient]
+                    if own:
+                        frames[recipient] = own
+                else:
+                    frames[recipient] = view
+        return frames
+
+    def _block(self, cell: Cell):
+        cx, cy = cell
+        return ((x, y) for x in range(cx - 1, cx + 2) for y in range(cy - 1, cy + 2))
+
+    async def flush(self) -> int:
+        """Send one ``moves`` frame to every player with movers in view; returns frames sent"""
+        if not self.pending:
+            return 0
+        started = time.perf_counter()
+        movers = len(self.pending)
+        frames = self.frames()
+
+        # Players dropped by the connection manager stop being tracked
+        for player_id in [p for p in frames if p not in self.connections.active_connections]:
+            self.leave(player_id)
+            del frames[player_id]
+
+        outgoing = list(frames.items())
+
+        async def send(share: List[Tuple[str, List[Dict[str, Any]]]]):
+            for player_id, moves in share:
+                await self.connections.send_personal_message({
+                    "type": "player",
+                    "event": "moves",
+                    "data": {"moves": moves}
+                }, player_id)
+
+        await asyncio.gather(*(send(outgoing[i::AOI_SENDERS]) for i in range(min(AOI_SENDERS, len(outgoing)))))
+
+        self._record_tick(time.perf_counter() - started, movers, frames)
+        return len(frames)
+
+    @staticmethod
+    def _new_window() -> Dict[str, Any]:
+        return {"started": time.monotonic(), "ticks": 0, "duration": 0.0, "slowest": 0.0,
+                "movers": 0, "frames": 0, "moves_sent": 0}
+
+    def _record_tick(self, duration: float, movers: int, frames: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Add one tick to the current window, recording the window once it is long enough"""
+        window = self._window
+        window["ticks"] += 1
+        window["duration"] += duration
+        window["slowest"] = max(window["slowest"], duration)
+        window["movers"] += movers
+        window["frames"] += len(frames)
+        window["moves_sent"] += sum(len(moves) for moves in frames.values())
+        if time.monotonic() - window["started"] < AOI_METRICS_INTERVAL:
+            return
+        metrics_collector.record_job(
+            "aoi_tick",
+            window["duration"] / window["ticks"],
+            items=window["movers"],
+            ticks=window["ticks"],
+            slowest_tick=window["slowest"],
+            frames=window["frames"],
+            moves_sent=window["moves_sent"]
+        )
+        self._window = self._new_window()
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error replicating movement: {e}")
+            await asyncio.sleep(max(0.0, self.tick_interval - (time.monotonic() - started)))
+
+
+# Global interest manager instance
+interest = InterestManager(manager)
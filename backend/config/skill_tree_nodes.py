@@ -3,6 +3,7 @@
 Each trait has 20 nodes with branching paths at nodes 10-15.
 """
 
+from functools import lru_cache
 from typing import Dict, List, Any
 
 # Node structure:
@@ -13,8 +14,9 @@ from typing import Dict, List, Any
 # - bonus_value: effect value
 # - branch: None, 'A', or 'B' (branches at node 10)
 
+@lru_cache(maxsize=None)
 def get_all_skill_trees() -> Dict[str, List[Dict[str, Any]]]:
-    """Get all skill tree configurations for 80 traits."""
+    """Get all skill tree configurations for 80 traits (built once; treat as read-only)."""
     trees = {}
 
     # VIRTUES (20 traits)
@@ -483,16 +483,18 @@ ALL_SUPERPOWERS: List[Dict[str, Any]] = [
     }
 ]
 
+SUPERPOWERS_BY_ID: Dict[str, Dict[str, Any]] = {power["id"]: power for power in ALL_SUPERPOWERS}
+SUPERPOWERS_BY_TIER: Dict[int, List[Dict[str, Any]]] = {}
+for _power in ALL_SUPERPOWERS:
+    SUPERPOWERS_BY_TIER.setdefault(_power["tier"], []).append(_power)
+
 def get_superpower_by_id(power_id: str) -> Dict[str, Any]:
     """Get superpower definition by ID."""
-    for power in ALL_SUPERPOWERS:
-        if power["id"] == power_id:
-            return power
-    return None
+    return SUPERPOWERS_BY_ID.get(power_id)
 
 def get_superpowers_by_tier(tier: int) -> List[Dict[str, Any]]:
     """Get all superpowers in a specific tier."""
-    return [p for p in ALL_SUPERPOWERS if p["tier"] == tier]
+    return list(SUPERPOWERS_BY_TIER.get(tier, []))
 
 def check_unlock_conditions(player_traits: Dict[str, float], power_id: str) -> bool:
     """Check if player meets unlock conditions for a power."""
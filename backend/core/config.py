@@ -66,6 +66,9 @@ class Settings(BaseSettings):
     STARTING_CREDITS: int = 1000
     STARTING_KARMA: int = 0
 
+    # Trait history storage: "columnar" (bucketed float32 arrays) or "documents"
+    TRAIT_SNAPSHOT_STORAGE: str = os.environ.get('TRAIT_SNAPSHOT_STORAGE', 'columnar')
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -56,6 +56,7 @@ class Battle(BaseModel):
     guild_war_id: Optional[str] = None
     territory_id: Optional[int] = None
     arena_match_id: Optional[str] = None
+    tournament_match_id: Optional[str] = None
 
     class Config:
         json_schema_extra = {
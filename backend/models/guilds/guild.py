@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import Dict, List
 from pydantic import BaseModel, Field
 from enum import Enum
 import uuid
@@ -30,10 +30,11 @@ class Guild(BaseModel):
     leader_id: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
-    # Members
-    members: List[GuildMember] = Field(default_factory=list)
+    # Members live in the guild_members collection; these are denormalized counters
     total_members: int = 1
     max_members: int = 50  # Can be upgraded
+    rank_counts: Dict[str, int] = Field(default_factory=dict)
+    total_contribution: int = 0
 
     # Progression
     level: int = 1
@@ -12,6 +12,7 @@ class Territory(BaseModel):
     controlling_guild_id: Optional[str] = None
     controlled_since: Optional[datetime] = None
     contested: bool = False
+    version: int = 0  # Bumped on every ownership change (compare-and-swap)
 
     # Benefits
     passive_income: int = 100  # Credits per day
@@ -38,7 +38,11 @@ class InventoryItem(BaseModel):
 
 
 class PlayerInventory(BaseModel):
-    """Player inventory collection."""
+    """Player inventory collection.
+
+    This is the API view. On the player document the inventory is stored as
+    stacks keyed by item id (see ``services.player.inventory_manager``).
+    """
 
     player_id: str = Field(..., description='Player ID')
     items: List[InventoryItem] = Field(
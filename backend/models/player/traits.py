@@ -105,3 +105,17 @@ class MetaTraitsModel(BaseModel):
     legendary_status: float = Field(default=50.0, ge=0, le=100)
     mentorship: float = Field(default=50.0, ge=0, le=100)
     historical_impact: float = Field(default=50.0, ge=0, le=100)
+
+
+# Fixed field order used wherever traits are stored or processed as arrays.
+TRAIT_FIELDS = tuple(TraitsModel.model_fields)
+META_TRAIT_FIELDS = tuple(MetaTraitsModel.model_fields)
+ALL_TRAIT_FIELDS = TRAIT_FIELDS + META_TRAIT_FIELDS
+TRAIT_INDEX = {name: index for index, name in enumerate(ALL_TRAIT_FIELDS)}
+DEFAULT_TRAIT_VALUE = 50.0
+_META_TRAIT_SET = frozenset(META_TRAIT_FIELDS)
+
+
+def trait_field(trait: str) -> str:
+    """Player document path of a trait or meta trait"""
+    return f"meta_traits.{trait}" if trait in _META_TRAIT_SET else f"traits.{trait}"
@@ -0,0 +1,82 @@
+"""Partial player models for projected reads.
+
+Each view lists the document fields it needs in ``FIELDS`` and validates
+only those. A read through a view decodes and checks a few fields
+instead of the whole player document (80 traits, meta traits,
+inventory, properties, investments).
+"""
+
+from typing import ClassVar, Dict, Iterable, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from backend.models.player.player import Currencies, Visibility
+from backend.models.player.traits import DEFAULT_TRAIT_VALUE, trait_field
+
+IDENTITY_FIELDS = ("username", "level", "economic_class", "moral_class", "online")
+COMBAT_TRAITS = ("endurance", "physical_strength", "dexterity", "resilience", "perception", "speed", "focus")
+
+
+class PlayerView(BaseModel):
+    """Base of the partial player models: the id plus whatever the projection loaded"""
+    FIELDS: ClassVar[Tuple[str, ...]] = ()
+
+    id: str = Field(..., alias="_id")
+    # Only the traits the projection asked for
+    traits: Dict[str, float] = Field(default_factory=dict)
+    meta_traits: Dict[str, float] = Field(default_factory=dict)
+
+    class Config:
+        populate_by_name = True
+
+    @classmethod
+    def projection(cls, traits: Iterable[str] = ()) -> Dict[str, int]:
+        """MongoDB projection for this view, plus any single ``traits`` asked for"""
+        return {field: 1 for field in (*cls.FIELDS, *(trait_field(trait) for trait in traits))}
+
+    def trait(self, name: str) -> float:
+        """A loaded trait or meta trait; traits that weren't set have the default value"""
+        value = self.traits.get(name, self.meta_traits.get(name))
+        return DEFAULT_TRAIT_VALUE if value is None else value
+
+
+class PlayerIdentity(PlayerView):
+    """Who a player is: name, level and classes"""
+    FIELDS: ClassVar[Tuple[str, ...]] = IDENTITY_FIELDS
+
+    username: str
+    level: int = 1
+    economic_class: str = "middle"
+    moral_class: str = "average"
+    online: bool = False
+
+
+class PlayerCombat(PlayerIdentity):
+    """Identity plus the traits combat stats and initiative are computed from"""
+    FIELDS: ClassVar[Tuple[str, ...]] = IDENTITY_FIELDS + tuple(f"traits.{trait}" for trait in COMBAT_TRAITS)
+
+
+class PlayerEconomy(PlayerIdentity):
+    """Identity plus balances and karma"""
+    FIELDS: ClassVar[Tuple[str, ...]] = IDENTITY_FIELDS + ("currencies", "karma_points")
+
+    currencies: Currencies = Field(default_factory=Currencies)
+    karma_points: int = 0
+
+
+class PlayerTraits(PlayerView):
+    """All 80 traits, without the rest of the document"""
+    FIELDS: ClassVar[Tuple[str, ...]] = ("traits", "meta_traits")
+
+
+class PlayerSocial(PlayerIdentity):
+    """Identity plus what other players see and relate to"""
+    FIELDS: ClassVar[Tuple[str, ...]] = IDENTITY_FIELDS + (
+        "karma_points", "visibility", "guild_id", "guild_rank", "mentor_id"
+    )
+
+    karma_points: int = 0
+    visibility: Visibility = Field(default_factory=Visibility)
+    guild_id: Optional[str] = None
+    guild_rank: Optional[str] = None
+    mentor_id: Optional[str] = None
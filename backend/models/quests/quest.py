@@ -17,6 +17,7 @@ class QuestType(str, Enum):
 
 class QuestStatus(str, Enum):
     """Quest status enumeration."""
+    SCHEDULED = "scheduled"  # Pre-generated for the next daily/weekly period
     AVAILABLE = "available"
     ACTIVE = "active"
     COMPLETED = "completed"
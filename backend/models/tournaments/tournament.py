@@ -33,15 +33,25 @@ class BracketType(str, Enum):
 
 
 class TournamentMatch(BaseModel):
-    """Single match in a tournament."""
+    """Single match in a tournament, stored in ``tournament_matches``."""
     match_id: str
+    tournament_id: str
+    bracket: str = "winners"  # winners, losers, final, swiss
     round_number: int
     bracket_position: int
     player1_id: Optional[str] = None
     player2_id: Optional[str] = None
+    filled: int = 0  # sides decided, by a player or a bye
     winner_id: Optional[str] = None
+    loser_id: Optional[str] = None
     score: Optional[Dict[str, int]] = None
-    status: str = "pending"  # pending, in_progress, completed
+    status: str = "pending"  # pending, ready, in_progress, completed, bye
+    # Where the winner and (double elimination) the loser play next
+    next_match_id: Optional[str] = None
+    next_side: Optional[int] = None
+    loser_match_id: Optional[str] = None
+    loser_side: Optional[int] = None
+    battle_id: Optional[str] = None
     scheduled_time: Optional[datetime] = None
     completed_time: Optional[datetime] = None
 
@@ -78,14 +88,14 @@ class Tournament(BaseModel):
         None, description="Minimum karma requirement")
     entry_fee: int = Field(default=0, description="Credits required to enter")
 
-    # Participants
-    registered_players: List[str] = Field(default_factory=list)
+    # Participants (one TournamentParticipant record each)
     total_registered: int = 0
 
-    # Bracket
-    matches: List[TournamentMatch] = Field(default_factory=list)
+    # Bracket (matches are TournamentMatch documents)
     current_round: int = 0
     total_rounds: int = 0
+    pending_matches: int = Field(
+        default=0, description="Unfinished matches of the current Swiss round")
 
     # Rewards
     prize_pool: int = 0
@@ -117,6 +127,8 @@ class TournamentParticipant(BaseModel):
     losses: int = 0
     placement: Optional[int] = None
     eliminated: bool = False
+    opponents: List[str] = Field(default_factory=list)
+    byes: int = 0
 
     class Config:
         from_attributes = True
@@ -70,6 +70,19 @@ class MetricsCollector:
         })
         self.counters[f'actions_{action_type}'] += 1
 
+    def record_job(self, job: str, duration: float, items: int = 0, **details):
+        """Record a background job run (refreshes, ticks, batches)."""
+        self.metrics['jobs'].append({
+            'job': job,
+            'duration': duration,
+            'items': items,
+            'details': details,
+            'timestamp': datetime.utcnow()
+        })
+        self.counters[f'jobs_{job}'] += 1
+        self.gauges[f'job_{job}_last_duration'] = duration
+        self.gauges[f'job_{job}_last_items'] = items
+
     def get_system_metrics(self) -> Dict[str, Any]:
         """Get current system metrics."""
         return {
@@ -162,6 +175,32 @@ class MetricsCollector:
             })
         }
 
+    def get_job_metrics(self, window_minutes: int = 60) -> Dict[str, Any]:
+        """Get background job metrics for the last N minutes."""
+        cutoff = datetime.utcnow() - timedelta(minutes=window_minutes)
+        recent_runs = [
+            j for j in self.metrics['jobs']
+            if j['timestamp'] > cutoff
+        ]
+
+        by_job = defaultdict(list)
+        for run in recent_runs:
+            by_job[run['job']].append(run)
+
+        return {
+            'total_runs': len(recent_runs),
+            'by_job': {
+                job: {
+                    'runs': len(runs),
+                    'avg_duration': round(sum(r['duration'] for r in runs) / len(runs), 3),
+                    'max_duration': round(max(r['duration'] for r in runs), 3),
+                    'total_items': sum(r['items'] for r in runs),
+                    'last_details': runs[-1]['details'],
+                }
+                for job, runs in by_job.items()
+            }
+        }
+
     def get_summary(self) -> Dict[str, Any]:
         """Get comprehensive metrics summary."""
         return {
@@ -169,6 +208,7 @@ class MetricsCollector:
             'api': self.get_api_metrics(),
             'ai': self.get_ai_metrics(),
             'database': self.get_db_metrics(),
+            'jobs': self.get_job_metrics(),
             'counters': dict(self.counters),
             'gauges': dict(self.gauges),
             'uptime_seconds': time.time() - self.start_time
@@ -1,4 +1,6 @@
 """Main FastAPI server entry point."""
+import asyncio
+import logging
 import sys
 import os
 from pathlib import Path
@@ -46,8 +48,10 @@ from backend.api.v1.crafting.router import router as crafting_router
 from backend.api.v1.health.router import router as health_router
 from backend.api.v1.investments.router import router as investments_router
 from backend.api.v1.real_estate.router import router as real_estate_router
+from backend.api.v1.catalog.router import router as catalog_router
 from backend.api.websocket.handlers import websocket_endpoint
 
+logger = logging.getLogger(__name__)
 
 # Create FastAPI app
 app = FastAPI(
@@ -98,6 +102,7 @@ app.include_router(crafting_router, prefix="/api")
 app.include_router(health_router, prefix="/api")
 app.include_router(investments_router, prefix="/api")
 app.include_router(real_estate_router, prefix="/api")
+app.include_router(catalog_router, prefix="/api")
 
 
 @app.get("/")
@@ -148,6 +153,20 @@ app.websocket("/ws")(websocket_endpoint)
 from backend.tasks.world_item_spawner import start_spawner, stop_spawner
 
 
+async def _run_startup_step(name, step) -> None:
+    """Run one startup step, logging its failure without stopping the others"""
+    try:
+        await step()
+    except Exception:
+        logger.exception(f"Startup step failed: {name}")
+
+
+async def _run_startup_steps(steps) -> None:
+    for name, step in steps:
+        await _run_startup_step(name, step)
+    logger.info("Startup migrations and backfills finished")
+
+
 @app.on_event("startup")
 async def startup_event():
     """Start background tasks and services on application startup."""
@@ -166,6 +185,49 @@ async def startup_event():
     except Exception as e:
         print(f"MongoDB connection failed: {e}")
     
+    # Indexes for array-backed / bucketed collections; a failed step doesn't skip the rest
+    print("Ensuring database indexes...")
+    from backend.services.tasks.trait_snapshot_store import TraitSnapshotStore
+    from backend.services.quests.reset_pipeline import QuestResetPipeline
+    from backend.services.quests.leaderboard import QuestLeaderboardService
+    from backend.services.guilds.membership import GuildMembershipService
+    from backend.services.economy.ledger import CurrencyLedger
+    from backend.services.economy.tick import EconomyTickEngine
+    from backend.services.market.engine import MarketEngine
+    from backend.services.robots.listings import RobotListingReadModel
+    from backend.services.seasonal.battle_pass import BattlePassService
+    from backend.services.tasks.task_achievement_manager import TaskAchievementManager
+    from backend.services.cooldowns import cooldowns
+    from backend.services.social.graph import social_graph
+    from backend.services.tournaments.brackets import BracketEngine
+    index_steps = [
+        ("trait snapshot indexes", lambda: TraitSnapshotStore(db).ensure_indexes()),
+        ("quest reset indexes", lambda: QuestResetPipeline(db).ensure_indexes()),
+        ("quest leaderboard indexes", lambda: QuestLeaderboardService(db).ensure_indexes()),
+        ("guild membership indexes", lambda: GuildMembershipService(db).ensure_indexes()),
+        ("currency ledger indexes", lambda: CurrencyLedger(db).ensure_indexes()),
+        ("economy tick indexes", lambda: EconomyTickEngine(db).ensure_indexes()),
+        ("market indexes", lambda: MarketEngine(db, {}).ensure_indexes()),
+        ("robot listing indexes", lambda: RobotListingReadModel(db).ensure_indexes()),
+        ("battle pass indexes", lambda: BattlePassService().ensure_indexes()),
+        ("task achievement indexes", lambda: TaskAchievementManager(db).ensure_indexes()),
+        ("cooldown indexes", lambda: cooldowns.ensure_indexes(db)),
+        ("social graph indexes", lambda: social_graph.ensure_indexes(db)),
+        ("tournament bracket indexes", lambda: BracketEngine(db).ensure_indexes()),
+    ]
+    for name, step in index_steps:
+        await _run_startup_step(name, step)
+    print("Database indexes ensured!")
+
+    # Migrations and backfills run in the background so startup doesn't wait on them
+    background_steps = [
+        ("robot listing backfill", lambda: RobotListingReadModel(db).backfill()),
+        ("social graph backfill", lambda: social_graph.backfill(db)),
+    ]
+    if settings.TRAIT_SNAPSHOT_STORAGE == "columnar":
+        background_steps.insert(0, ("trait snapshot migration", lambda: TraitSnapshotStore(db).migrate_documents()))
+    app.state.startup_backfills = asyncio.create_task(_run_startup_steps(background_steps))
+    
     # Gemini AI initialization
     print("Initializing Gemini AI Task Generator...")
     try:
@@ -183,6 +245,55 @@ async def startup_event():
     except Exception as e:
         print(f"World spawner warning: {e}")
     
+    # Cooldowns (Redis when reachable, otherwise in process)
+    print("Starting cooldown service...")
+    try:
+        from backend.services.cooldowns import cooldowns
+        await cooldowns.start(db, settings.REDIS_URL)
+        print("Cooldown service started successfully!")
+    except Exception as e:
+        print(f"Cooldown service warning: {e}")
+    
+    # Deadlines (training completion, item expiry)
+    print("Starting deadline scheduler...")
+    try:
+        from backend.tasks.deadline_scheduler import deadline_scheduler
+        from backend.services.robots.training import RobotTrainingService
+        training_service = RobotTrainingService()
+        deadline_scheduler.register(
+            "robot_training",
+            training_service.complete_due_training,
+            training_service.pending_deadlines
+        )
+        await deadline_scheduler.start()
+        print("Deadline scheduler started successfully!")
+    except Exception as e:
+        print(f"Deadline scheduler warning: {e}")
+    
+    # Movement replication (area of interest)
+    print("Starting movement replication...")
+    try:
+        from backend.api.websocket.interest import interest
+        from backend.services.world.position_index import position_index
+        await position_index.start(db, settings.REDIS_URL)
+        await interest.start()
+        print("Movement replication started successfully!")
+    except Exception as e:
+        print(f"Movement replication warning: {e}")
+
+    # Trim in-process metrics history every hour
+    from backend.monitoring.metrics import metrics_cleanup_task
+    app.state.metrics_cleanup = asyncio.create_task(metrics_cleanup_task())
+    
+    # Scheduled jobs (quest resets, karma queue, cache cleanup)
+    print("Starting background scheduler...")
+    try:
+        from backend.tasks.ai_scheduler import setup_ai_tasks
+        await setup_ai_tasks(db)
+        print("Background scheduler started successfully!")
+    except Exception as e:
+        print(f"Background scheduler warning: {e}")
+    
     print("\nBACKEND READY!")
     print(f"API available at: http://0.0.0.0:8001")
     print(f"API Docs: http://0.0.0.0:8001/docs")
@@ -195,6 +306,25 @@ async def shutdown_event():
     print("[Server] Stopping world item spawner...")
     await stop_spawner()
     print("[Server] World item spawner stopped")
+    from backend.tasks.deadline_scheduler import deadline_scheduler
+    await deadline_scheduler.stop()
+    from backend.api.websocket.interest import interest
+    await interest.stop()
+    if getattr(app.state, "metrics_cleanup", None):
+        app.state.metrics_cleanup.cancel()
+    if getattr(app.state, "startup_backfills", None):
+        app.state.startup_backfills.cancel()
+    from backend.services.world.position_index import position_index
+    from backend.core.database import get_database
+    await position_index.stop(get_database())
+    from backend.services.cooldowns import cooldowns
+    await cooldowns.stop(get_database())
+    from backend.tasks.ai_scheduler import ai_scheduler
+    await ai_scheduler.shutdown(get_database())
+    from backend.services.guilds.wars import flush_war_points
+    await flush_war_points()
+    from backend.services.economy.ledger import flush_ledgers
+    await flush_ledgers()
 
 
 if __name__ == "__main__":
@@ -1,8 +1,11 @@
+from datetime import datetime
 from typing import Dict, List, Optional, Tuple
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from backend.models.achievements import (
     PlayerAchievements, AchievementDefinition, AchievementCategory,
-    AchievementRarity, AchievementProgress
+    AchievementRarity, AchievementProgress, UnlockedAchievement
 )
+from backend.services.achievements.engine import AchievementIndex
 import logging
 
 logger = logging.getLogger(__name__)
@@ -284,6 +287,29 @@ ACHIEVEMENT_DEFINITIONS = {
     ),
 }
 
+
+def requirement_fields(definition: AchievementDefinition) -> List[str]:
+    """Player fields an achievement's requirements read."""
+    requirements = definition.requirements or {}
+    fields = []
+    if "trait" in requirements:
+        fields.append(f"traits.{requirements['trait']}")
+    if "mastered_traits" in requirements:
+        fields.append("traits")
+    if "karma" in requirements:
+        fields.append("karma_points")
+    if "level" in requirements:
+        fields.append("level")
+    return fields
+
+
+ACHIEVEMENT_INDEX = AchievementIndex(
+    ACHIEVEMENT_DEFINITIONS.values(),
+    requirement_fields,
+    key=lambda definition: definition.achievement_id
+)
+
+
 class AchievementService:
     """Service for managing player achievements"""
 
@@ -319,6 +345,77 @@ class AchievementService:
 
         return False, None
 
+    @staticmethod
+    def check_changed(
+        player_achievements: PlayerAchievements,
+        changed_fields: List[str],
+        player_data: Dict
+    ) -> List[AchievementDefinition]:
+        """Achievements unlocked by a change to ``changed_fields`` (e.g. ``traits.empathy``).
+
+        Only definitions whose requirements read a changed field are checked.
+        """
+        unlocked = {a.achievement_id for a in player_achievements.unlocked_achievements}
+        return [
+            definition for definition in ACHIEVEMENT_INDEX.affected(changed_fields)
+            if (definition.repeatable or definition.achievement_id not in unlocked)
+            and AchievementService._check_requirements(definition, player_data)
+        ]
+
+    @staticmethod
+    async def award_changed(
+        db: AsyncIOMotorDatabase,
+        player_id: str,
+        changed_fields: List[str]
+    ) -> List[AchievementDefinition]:
+        """Unlock the achievements completed by a change to ``changed_fields``.
+
+        Called after trait, karma and level changes. Reads only the fields the
+        affected achievements need; each unlock is a conditional push, so
+        concurrent changes unlock an achievement once.
+        """
+        affected = ACHIEVEMENT_INDEX.affected(changed_fields)
+        if not affected:
+            return []
+        fields = {"achievements"} | {field for d in affected for field in requirement_fields(d)}
+        # MongoDB rejects a projection holding both a path and its parent
+        projection = {
+            field: 1 for field in fields
+            if not any(field.startswith(f"{parent}.") for parent in fields)
+        }
+        player = await db.players.find_one({"_id": player_id}, projection=projection)
+        if not player:
+            return []
+        achievements = (
+            PlayerAchievements(**{"player_id": player_id, **player["achievements"]}) if player.get("achievements")
+            else AchievementService.initialize_achievements(player_id)
+        )
+
+        unlocked = []
+        for definition in AchievementService.check_changed(achievements, changed_fields, player):
+            entry = UnlockedAchievement(
+                achievement_id=definition.achievement_id,
+                unlocked_at=datetime.utcnow(),
+                points_earned=definition.points,
+                rarity=definition.rarity
+            ).dict()
+            entry["rarity"] = definition.rarity.value
+            query = {"_id": player_id}
+            if not definition.repeatable:
+                query["achievements.unlocked_achievements.achievement_id"] = {"$ne": definition.achievement_id}
+            result = await db.players.update_one(query, {
+                "$set": {"achievements.player_id": player_id},
+                "$push": {
+                    "achievements.unlocked_achievements": entry,
+                    "achievements.recent_unlocks": {"$each": [definition.achievement_id], "$position": 0, "$slice": 10}
+                },
+                "$inc": {"achievements.total_points": definition.points}
+            })
+            if result.modified_count:
+                logger.info(f"Achievement unlocked: {player_id} - {definition.achievement_id}")
+                unlocked.append(definition)
+        return unlocked
+
     @staticmethod
     def _check_requirements(definition: AchievementDefinition, player_data: Dict) -> bool:
         """Check if requirements are met"""
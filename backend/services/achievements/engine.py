@@ -0,0 +1,64 @@
+"""Achievement engine - definitions indexed by the counters they watch."""
+
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional
+
+
+def counter_path(*parts: Any) -> Optional[str]:
+    """Dotted counter path, or None if a part is missing or unsafe as a field name."""
+    names = [str(part) for part in parts if part is not None]
+    if len(names) != len(parts) or any(not n or '.' in n or n.startswith('$') for n in names):
+        return None
+    return '.'.join(names)
+
+
+def counter_value(counters: Dict[str, Any], path: str) -> Any:
+    """Value at a dotted path in a nested counters dict (0 if unset)."""
+    value: Any = counters
+    for name in path.split('.'):
+        if not isinstance(value, dict) or name not in value:
+            return 0
+        value = value[name]
+    return value
+
+
+class AchievementIndex:
+    """Achievement definitions grouped by the counter each one depends on.
+
+    ``watches(definition)`` returns the dotted counter paths a definition
+    reads. When counters change, ``affected`` returns just the definitions
+    watching a changed path, a parent of it (``traits`` for
+    ``traits.empathy``) or a child of it, so evaluating a change costs
+    O(affected definitions) instead of a pass over every definition.
+    """
+
+    def __init__(
+        self,
+        definitions: Iterable[Any],
+        watches: Callable[[Any], Iterable[str]],
+        key: Callable[[Any], Hashable]
+    ):
+        self.key = key
+        self.watching: Dict[str, List[Any]] = {}
+        self.below: Dict[str, List[Any]] = {}
+        for definition in definitions:
+            for path in watches(definition):
+                self.watching.setdefault(path, []).append(definition)
+                parts = path.split('.')
+                for depth in range(1, len(parts)):
+                    self.below.setdefault('.'.join(parts[:depth]), []).append(definition)
+
+    def affected(self, changed: Iterable[str]) -> List[Any]:
+        """Definitions watching any of the changed counter paths, each once."""
+        seen = set()
+        found = []
+        for path in changed:
+            parts = path.split('.')
+            candidates = [d for depth in range(1, len(parts) + 1)
+                          for d in self.watching.get('.'.join(parts[:depth]), ())]
+            candidates.extend(self.below.get(path, ()))
+            for definition in candidates:
+                definition_key = self.key(definition)
+                if definition_key not in seen:
+                    seen.add(definition_key)
+                    found.append(definition)
+        return found
@@ -1,13 +1,21 @@
 """Action cooldown management service."""
 
+import time
 from typing import Dict, Any, Optional
-from datetime import datetime, timedelta
+from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from bson import ObjectId
+
+from backend.services.cooldowns import cooldowns
 
 
 class CooldownManager:
-    """Manage action cooldowns."""
+    """Manage action cooldowns.
+
+    Cooldowns are held by the shared cooldown service under the ``action``
+    namespace, so checks never query MongoDB.
+    """
+
+    NAMESPACE = 'action'
 
     # Cooldown durations in seconds
     COOLDOWNS = {
@@ -27,8 +35,7 @@ class CooldownManager:
             db: MongoDB database instance
         """
         self.db = db
-        self.players = db.players
-        self.cooldowns = db.action_cooldowns
+        self.cooldowns = cooldowns
 
     async def set_cooldown(
         self,
@@ -47,25 +54,7 @@ class CooldownManager:
             Datetime when cooldown expires
         """
         duration = duration_seconds or self.COOLDOWNS.get(action_type, 60)
-        expires_at = datetime.utcnow() + timedelta(seconds=duration)
-
-        await self.cooldowns.update_one(
-            {
-                'player_id': player_id,
-                'action_type': action_type
-            },
-            {
-                '$set': {
-                    'player_id': player_id,
-                    'action_type': action_type,
-                    'expires_at': expires_at,
-                    'set_at': datetime.utcnow()
-                }
-            },
-            upsert=True
-        )
-
-        return expires_at
+        return await self.cooldowns.set(player_id, self.NAMESPACE, action_type, duration)
 
     async def check_cooldown(self, player_id: str, action_type: str) -> Dict[str, Any]:
         """Check if action is on cooldown.
@@ -77,25 +66,9 @@ class CooldownManager:
         Returns:
             Dictionary with cooldown status
         """
-        cooldown = await self.cooldowns.find_one({
-            'player_id': player_id,
-            'action_type': action_type
-        })
-
-        if not cooldown:
-            return {
-                'on_cooldown': False,
-                'can_perform': True,
-                'expires_at': None,
-                'remaining_seconds': 0
-            }
-
-        expires_at = cooldown['expires_at']
-        now = datetime.utcnow()
+        expires_at = await self.cooldowns.expires_at(player_id, self.NAMESPACE, action_type)
 
-        if now >= expires_at:
-            # Cooldown expired, clean up
-            await self.cooldowns.delete_one({'_id': cooldown['_id']})
+        if not expires_at:
             return {
                 'on_cooldown': False,
                 'can_perform': True,
@@ -103,7 +76,7 @@ class CooldownManager:
                 'remaining_seconds': 0
             }
 
-        remaining = (expires_at - now).total_seconds()
+        remaining = max(0.0, (expires_at - datetime.utcnow()).total_seconds())
 
         return {
             'on_cooldown': True,
@@ -123,12 +96,7 @@ class CooldownManager:
         Returns:
             True if cooldown was cleared
         """
-        result = await self.cooldowns.delete_one({
-            'player_id': player_id,
-            'action_type': action_type
-        })
-
-        return result.deleted_count > 0
+        return await self.cooldowns.clear(player_id, self.NAMESPACE, action_type)
 
     async def get_all_cooldowns(self, player_id: str) -> Dict[str, Dict[str, Any]]:
         """Get all active cooldowns for a player.
@@ -139,23 +107,16 @@ class CooldownManager:
         Returns:
             Dictionary of action types to cooldown info
         """
-        cursor = self.cooldowns.find({'player_id': player_id})
-        cooldowns = {}
         now = datetime.utcnow()
+        cooldowns = {}
 
-        async for cooldown in cursor:
-            expires_at = cooldown['expires_at']
-
-            if now < expires_at:
-                remaining = (expires_at - now).total_seconds()
-                cooldowns[cooldown['action_type']] = {
-                    'expires_at': expires_at,
-                    'remaining_seconds': int(remaining),
-                    'remaining_minutes': round(remaining / 60, 1)
-                }
-            else:
-                # Clean up expired cooldown
-                await self.cooldowns.delete_one({'_id': cooldown['_id']})
+        for action_type, expires_at in (await self.cooldowns.active(player_id, self.NAMESPACE)).items():
+            remaining = max(0.0, (expires_at - now).total_seconds())
+            cooldowns[action_type] = {
+                'expires_at': expires_at,
+                'remaining_seconds': int(remaining),
+                'remaining_minutes': round(remaining / 60, 1)
+            }
 
         return cooldowns
 
@@ -175,34 +136,22 @@ class CooldownManager:
         Returns:
             Updated cooldown info
         """
-        cooldown = await self.cooldowns.find_one({
-            'player_id': player_id,
-            'action_type': action_type
-        })
-
-        if not cooldown:
+        if not await self.cooldowns.expires_at(player_id, self.NAMESPACE, action_type):
             return {'on_cooldown': False}
 
-        new_expires_at = cooldown['expires_at'] - \
-            timedelta(seconds=reduction_seconds)
-        now = datetime.utcnow()
+        new_expires_at = await self.cooldowns.reduce(
+            player_id, self.NAMESPACE, action_type, reduction_seconds
+        )
 
-        if new_expires_at <= now:
+        if new_expires_at is None:
             # Cooldown completely removed
-            await self.cooldowns.delete_one({'_id': cooldown['_id']})
             return {
                 'on_cooldown': False,
                 'can_perform': True,
                 'removed': True
             }
 
-        # Update cooldown
-        await self.cooldowns.update_one(
-            {'_id': cooldown['_id']},
-            {'$set': {'expires_at': new_expires_at}}
-        )
-
-        remaining = (new_expires_at - now).total_seconds()
+        remaining = (new_expires_at - datetime.utcnow()).total_seconds()
 
         return {
             'on_cooldown': True,
@@ -215,11 +164,9 @@ class CooldownManager:
     async def cleanup_expired_cooldowns(self) -> int:
         """Clean up all expired cooldowns (maintenance task).
         
+        Cooldowns now lapse on their own in the cooldown service.
+        
         Returns:
             Number of cooldowns cleaned up
         """
-        result = await self.cooldowns.delete_many({
-            'expires_at': {'$lt': datetime.utcnow()}
-        })
-
-        return result.deleted_count
+        return self.cooldowns.store.expire(time.time())
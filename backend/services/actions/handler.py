@@ -5,6 +5,8 @@ from ..karma.calculator import KarmaCalculator
 from .validator import ActionValidator
 from .processor import ActionProcessor
 from backend.core.database import get_database
+from backend.services.achievements.achievement_service import AchievementService
+from backend.services.traits.trait_deltas import apply_trait_delta
 import uuid
 
 class ActionHandler:
@@ -76,6 +78,16 @@ class ActionHandler:
                 }
             )
 
+        if karma_changes["actor_karma"] > 0:
+            await AchievementService.award_changed(self.db, actor_id, ["karma_points"])
+        if target_id and karma_changes.get("target_karma", 0) > 0:
+            await AchievementService.award_changed(self.db, target_id, ["karma_points"])
+
+        # Milestones and unlocks crossed, measured from the documents read above
+        await self._record_trait_delta(actor, karma_changes["actor_traits"])
+        if target_id and karma_changes.get("target_karma"):
+            await self._record_trait_delta(target, karma_changes.get("target_traits", {}))
+
         # Log action history
         action_log = {
             "_id": str(uuid.uuid4()),
@@ -95,3 +107,13 @@ class ActionHandler:
             "karma_changes": karma_changes,
             "message": result.get("message", "Action completed successfully")
         }
+
+    async def _record_trait_delta(self, player: Dict[str, Any], trait_changes: Dict[str, float]):
+        """Record milestones and unlocks for trait changes just applied to ``player``"""
+        if not trait_changes:
+            return
+        old_traits = player.get("traits", {})
+        await apply_trait_delta(
+            self.db, player["_id"], old_traits,
+            {trait: old_traits.get(trait, 0) + change for trait, change in trait_changes.items()}
+        )
@@ -0,0 +1,3 @@
+from .catalog import Catalog, get_catalog
+
+__all__ = ["Catalog", "get_catalog"]
@@ -0,0 +1,183 @@
+"""Game definition catalogs - static definitions loaded once into indexed, read-only views."""
+
+import hashlib
+import json
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Serialized responses kept per catalog; the oldest is dropped past this
+MAX_CACHED_BODIES = 512
+
+
+def serialize(data: Any) -> bytes:
+    return json.dumps(data, separators=(",", ":"), default=str).encode()
+
+
+def etag_of(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+
+
+class Catalog:
+    """An indexed view over a fixed list of definitions.
+
+    Items are indexed by id and by each field in ``index_fields``, kept sorted
+    by ``sort_field`` so ranges on it are a bisect, and facet counts are
+    computed up front. Query results and serialized response bodies are
+    shared between requests: callers must treat items as read-only and copy
+    before adding per-player fields.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        items: Iterable[Dict[str, Any]],
+        index_fields: Tuple[str, ...] = (),
+        sort_field: Optional[str] = None,
+        id_field: str = "id"
+    ):
+        self.name = name
+        self.index_fields = index_fields
+        self.sort_field = sort_field
+        items = list(items)
+        if sort_field:
+            items.sort(key=lambda item: item.get(sort_field, 0))
+        self.items: Tuple[Dict[str, Any], ...] = tuple(items)
+        self.by_id: Dict[Hashable, Dict[str, Any]] = {item[id_field]: item for item in self.items}
+
+        self.indexes: Dict[str, Dict[Any, Tuple[int, ...]]] = {}
+        for field in index_fields:
+            positions: Dict[Any, List[int]] = {}
+            for position, item in enumerate(self.items):
+                positions.setdefault(item.get(field), []).append(position)
+            self.indexes[field] = {value: tuple(found) for value, found in positions.items()}
+        self.facets: Dict[str, Dict[Any, int]] = {
+            field: {value: len(found) for value, found in index.items() if value is not None}
+            for field, index in self.indexes.items()
+        }
+        self._sort_keys = [item.get(sort_field, 0) for item in self.items] if sort_field else []
+
+        self.etag = etag_of(serialize(self.items))
+        self._bodies: Dict[Hashable, Tuple[bytes, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def get(self, item_id: Hashable) -> Optional[Dict[str, Any]]:
+        return self.by_id.get(item_id)
+
+    def select(
+        self,
+        low: Optional[Any] = None,
+        high: Optional[Any] = None,
+        **equals: Any
+    ) -> List[Dict[str, Any]]:
+        """Items matching every non-None ``field=value`` with ``low <= sort_field <= high``"""
+        start, stop = 0, len(self.items)
+        if low is not None:
+            start = bisect_left(self._sort_keys, low)
+        if high is not None:
+            stop = bisect_right(self._sort_keys, high)
+
+        matched: Optional[set] = None
+        for field, value in equals.items():
+            if value is None:
+                continue
+            if field not in self.indexes:
+                raise ValueError(f"{self.name} catalog is not indexed by {field}")
+            found = self.indexes[field].get(value, ())
+            matched = set(found) if matched is None else matched.intersection(found)
+
+        if matched is None:
+            return list(self.items[start:stop])
+        return [self.items[position] for position in sorted(matched) if start <= position < stop]
+
+    def describe(self) -> Dict[str, Any]:
+        """The whole catalog with its facets"""
+        return {
+            "name": self.name,
+            "items": list(self.items),
+            "facets": {
+                field: [{"value": value, "count": count} for value, count in counts.items()]
+                for field, counts in self.facets.items()
+            },
+            "total": len(self.items),
+            "version": self.etag.strip('"'),
+        }
+
+    def cached_body(self, key: Hashable) -> Optional[Tuple[bytes, str]]:
+        return self._bodies.get(key)
+
+    def cache_body(self, key: Hashable, body: bytes) -> Tuple[bytes, str]:
+        """Keep a serialized response for ``key``; returns (body, ETag)"""
+        if len(self._bodies) >= MAX_CACHED_BODIES:
+            self._bodies.pop(next(iter(self._bodies)))
+        self._bodies[key] = (body, etag_of(body))
+        return self._bodies[key]
+
+
+def _load_properties() -> Catalog:
+    from backend.services.real_estate.property_types import PropertyTypes
+    return Catalog(
+        "properties",
+        PropertyTypes.definitions().values(),
+        index_fields=("property_type", "territory_id", "status"),
+        sort_field="price"
+    )
+
+
+def _load_recipes() -> Catalog:
+    from backend.services.crafting.recipes import RecipeManager
+    return Catalog(
+        "recipes",
+        RecipeManager.definitions().values(),
+        index_fields=("category",),
+        sort_field="level_required"
+    )
+
+
+def _load_investments() -> Catalog:
+    from backend.services.investments.opportunities import InvestmentOpportunities
+    return Catalog(
+        "investments",
+        InvestmentOpportunities.definitions().values(),
+        index_fields=("investment_type", "risk_level"),
+        sort_field="expected_return"
+    )
+
+
+def _load_superpowers() -> Catalog:
+    from backend.config.superpower_definitions import ALL_SUPERPOWERS
+    return Catalog("superpowers", ALL_SUPERPOWERS, index_fields=("tier",))
+
+
+def _load_skill_tree_nodes() -> Catalog:
+    from backend.config.skill_tree_nodes import get_all_skill_trees
+    nodes = [
+        {"id": f"{trait}:{node['node_id']}{node.get('branch') or ''}", "trait_name": trait, **node}
+        for trait, tree in get_all_skill_trees().items()
+        for node in tree
+    ]
+    return Catalog(
+        "skill_tree_nodes",
+        nodes,
+        index_fields=("trait_name", "bonus_type", "branch"),
+        sort_field="level_required"
+    )
+
+
+CATALOG_LOADERS: Dict[str, Callable[[], Catalog]] = {
+    "properties": _load_properties,
+    "recipes": _load_recipes,
+    "investments": _load_investments,
+    "superpowers": _load_superpowers,
+    "skill_tree_nodes": _load_skill_tree_nodes,
+}
+
+
+@lru_cache(maxsize=None)
+def get_catalog(name: str) -> Catalog:
+    """The catalog called ``name``, built on first use"""
+    if name not in CATALOG_LOADERS:
+        raise ValueError(f"Unknown catalog: {name}")
+    return CATALOG_LOADERS[name]()
@@ -8,7 +8,9 @@ from bson import ObjectId
 from backend.core.database import get_database
 from backend.models.combat.battle import Battle, CombatChallenge, Combatant, CombatLogEntry
 from backend.services.combat.calculator import CombatCalculator
+from backend.services.economy.ledger import player_key
 from backend.services.player.profile import PlayerProfileService
+from backend.services.player.repository import PlayerRepository
 
 
 class CombatEngine:
@@ -25,11 +27,12 @@ class CombatEngine:
         combat_type: str = "duel"
     ) -> Dict[str, Any]:
         """Create a combat challenge."""
-        db = await get_database()
+        db = get_database()
 
         # Get player data
-        challenger = await db.players.find_one({"_id": ObjectId(challenger_id)})
-        target = await db.players.find_one({"_id": ObjectId(target_id)})
+        players = PlayerRepository(db)
+        challenger = await players.find(player_key(challenger_id), "identity")
+        target = await players.find(player_key(target_id), "identity")
 
         if not challenger or not target:
             raise ValueError("Player not found")
@@ -64,7 +67,7 @@ class CombatEngine:
         accepter_id: str
     ) -> Dict[str, Any]:
         """Accept a combat challenge and start battle."""
-        db = await get_database()
+        db = get_database()
 
         # Get challenge
         challenge = await db.combat_challenges.find_one({"_id": ObjectId(challenge_id)})
@@ -97,7 +100,7 @@ class CombatEngine:
 
     async def decline_challenge(self, challenge_id: str, decliner_id: str):
         """Decline a combat challenge."""
-        db = await get_database()
+        db = get_database()
 
         challenge = await db.combat_challenges.find_one({"_id": ObjectId(challenge_id)})
         if not challenge:
@@ -111,18 +114,36 @@ class CombatEngine:
             {"$set": {"status": "declined"}}
         )
 
+    async def create_tournament_battle(
+        self,
+        player1_id: str,
+        player2_id: str,
+        match_id: str
+    ) -> Dict[str, Any]:
+        """Start the battle of a tournament match; its result advances the bracket."""
+        return await self._create_battle(
+            player1_id=player1_id,
+            player2_id=player2_id,
+            battle_type="tournament",
+            tournament_match_id=match_id
+        )
+
     async def _create_battle(
         self,
         player1_id: str,
         player2_id: str,
-        battle_type: str = "duel"
+        battle_type: str = "duel",
+        tournament_match_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Create a new battle instance."""
-        db = await get_database()
+        db = get_database()
 
         # Get players
-        player1 = await db.players.find_one({"_id": ObjectId(player1_id)})
-        player2 = await db.players.find_one({"_id": ObjectId(player2_id)})
+        players = PlayerRepository(db)
+        player1 = await players.find(player_key(player1_id), "combat")
+        player2 = await players.find(player_key(player2_id), "combat")
+        if not player1 or not player2:
+            raise ValueError("Player not found")
 
         # Calculate combat stats
         stats1 = await self.calculator.calculate_combat_stats(player1)
@@ -156,7 +177,8 @@ class CombatEngine:
         # Create battle
         battle = Battle(
             battle_type=battle_type,
-            combatants=turn_order
+            combatants=turn_order,
+            tournament_match_id=tournament_match_id
         )
 
         # Store in database
@@ -191,7 +213,7 @@ class CombatEngine:
         ability_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """Execute a combat action."""
-        db = await get_database()
+        db = get_database()
 
         # Get battle
         battle_doc = await db.battles.find_one({"id": battle_id})
@@ -241,6 +263,8 @@ class CombatEngine:
             {"id": battle_id},
             {"$set": battle.model_dump()}
         )
+        if battle.status == "completed":
+            await self._report_tournament_result(db, battle, battle.winner)
 
         return result
 
@@ -316,9 +340,17 @@ class CombatEngine:
                 return True
         return False
 
+    async def _report_tournament_result(self, db, battle: Battle, winner_id: Optional[str]):
+        """Advance the tournament bracket a finished battle belongs to."""
+        if not battle.tournament_match_id or not winner_id:
+            return
+        from backend.services.tournaments.brackets import BracketEngine
+        hp = {c.player_id: c.hp for c in battle.combatants}
+        await BracketEngine(db).report_result(battle.tournament_match_id, winner_id, hp)
+
     async def get_active_battle(self, player_id: str) -> Optional[Dict[str, Any]]:
         """Get active battle for a player."""
-        db = await get_database()
+        db = get_database()
         battle = await db.battles.find_one({
             "status": "active",
             "combatants.player_id": player_id
@@ -327,7 +359,7 @@ class CombatEngine:
 
     async def get_combat_state(self, battle_id: str) -> Dict[str, Any]:
         """Get current combat state."""
-        db = await get_database()
+        db = get_database()
         battle = await db.battles.find_one({"id": battle_id})
         if not battle:
             raise ValueError("Battle not found")
@@ -335,7 +367,7 @@ class CombatEngine:
 
     async def attempt_flee(self, battle_id: str, player_id: str) -> Dict[str, Any]:
         """Attempt to flee from combat."""
-        db = await get_database()
+        db = get_database()
         battle_doc = await db.battles.find_one({"id": battle_id})
         if not battle_doc:
             raise ValueError("Battle not found")
@@ -360,6 +392,10 @@ class CombatEngine:
                 {"id": battle_id},
                 {"$set": battle.model_dump()}
             )
+            # The opponent wins a tournament match by default
+            winner_id = next(
+                (c.player_id for c in battle.combatants if c.player_id != player_id), None)
+            await self._report_tournament_result(db, battle, winner_id)
 
             return {"success": True, "message": "Successfully fled from battle!"}
         else:
@@ -372,7 +408,7 @@ class CombatEngine:
         skip: int = 0
     ) -> List[Dict[str, Any]]:
         """Get combat history for a player."""
-        db = await get_database()
+        db = get_database()
         history = await db.battles.find(
             {
                 "combatants.player_id": player_id,
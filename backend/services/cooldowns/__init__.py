@@ -0,0 +1,5 @@
+"""Cooldown services."""
+
+from .service import CooldownService, cooldowns
+
+__all__ = ["CooldownService", "cooldowns"]
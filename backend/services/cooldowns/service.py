@@ -0,0 +1,380 @@
+"""Cooldown service - one store for action, task and trait cooldowns.
+
+Cooldowns are kept out of MongoDB on the hot path. With Redis they are
+keys with a PX expiry; without it they live in process and a timer wheel
+reclaims them once they lapse. Every change is also queued as an event and
+written to the ``cooldown_events`` collection in batches, for analytics and
+so an in-process store can be restored after a restart.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+try:
+    from redis import asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+# Seconds covered by one lap of the timer wheel, one slot per second
+WHEEL_SLOTS = 512
+# Queued cooldown events are written to MongoDB this often
+EVENT_FLUSH_INTERVAL = 5.0
+# Events kept while MongoDB is unreachable; the oldest are dropped beyond this
+MAX_PENDING_EVENTS = 50_000
+# How long a player's Redis key index outlives their last cooldown
+INDEX_TTL_SECONDS = 24 * 3600
+
+
+def as_datetime(epoch: float) -> datetime:
+    """Epoch seconds as a naive UTC datetime, like the rest of the stored timestamps"""
+    return EPOCH + timedelta(seconds=epoch)
+
+
+def as_epoch(moment: datetime) -> float:
+    return (moment - EPOCH).total_seconds()
+
+
+class TimerWheel:
+    """Hashed timing wheel of expiry times, one slot per second.
+
+    An entry is hashed into the slot for its expiry second. Each tick only
+    looks at that tick's slot, dropping the entries that are due and
+    leaving those due on a later lap, so expiring costs O(entries due)
+    rather than a scan of everything outstanding.
+    """
+
+    def __init__(self, slots: int = WHEEL_SLOTS):
+        self.slots: List[Dict[Tuple[str, str], float]] = [{} for _ in range(slots)]
+        self.cursor: Optional[int] = None
+
+    def _slot(self, expires: float) -> Dict[Tuple[str, str], float]:
+        return self.slots[int(expires) % len(self.slots)]
+
+    def schedule(self, entry: Tuple[str, str], expires: float) -> None:
+        self._slot(expires)[entry] = expires
+
+    def cancel(self, entry: Tuple[str, str], expires: float) -> None:
+        self._slot(expires).pop(entry, None)
+
+    def advance(self, now: float) -> List[Tuple[str, str]]:
+        """Move the wheel up to ``now``; returns the entries that have lapsed"""
+        tick = int(now)
+        start = tick if self.cursor is None else self.cursor + 1
+        # After a stall longer than a lap, every slot is visited once
+        start = max(start, tick - len(self.slots) + 1)
+        due = []
+        for current in range(start, tick + 1):
+            slot = self.slots[current % len(self.slots)]
+            lapsed = [entry for entry, expires in slot.items() if expires <= now]
+            for entry in lapsed:
+                del slot[entry]
+            due.extend(lapsed)
+        self.cursor = tick
+        return due
+
+
+class MemoryCooldownStore:
+    """In-process cooldowns: ``{player_id: {key: expiry}}``, expired by a timer wheel"""
+
+    def __init__(self):
+        self.expiry: Dict[str, Dict[str, float]] = {}
+        self.wheel = TimerWheel()
+
+    async def get(self, player_id: str, key: str) -> Optional[float]:
+        expires = self.expiry.get(player_id, {}).get(key)
+        return expires if expires is not None and expires > time.time() else None
+
+    async def get_all(self, player_id: str) -> Dict[str, float]:
+        now = time.time()
+        return {key: expires for key, expires in self.expiry.get(player_id, {}).items() if expires > now}
+
+    async def set(self, player_id: str, key: str, expires: float) -> None:
+        keys = self.expiry.setdefault(player_id, {})
+        if key in keys:
+            self.wheel.cancel((player_id, key), keys[key])
+        keys[key] = expires
+        self.wheel.schedule((player_id, key), expires)
+
+    async def claim(self, player_id: str, key: str, expires: float) -> Optional[float]:
+        """Set the cooldown unless one is running; returns the running one's expiry if so"""
+        running = await self.get(player_id, key)
+        if running is not None:
+            return running
+        await self.set(player_id, key, expires)
+        return None
+
+    async def clear(self, player_id: str, key: str) -> bool:
+        keys = self.expiry.get(player_id, {})
+        expires = keys.pop(key, None)
+        if expires is None:
+            return False
+        self.wheel.cancel((player_id, key), expires)
+        if not keys:
+            del self.expiry[player_id]
+        return expires > time.time()
+
+    def expire(self, now: float) -> int:
+        """Drop lapsed cooldowns; returns how many"""
+        lapsed = self.wheel.advance(now)
+        for player_id, key in lapsed:
+            keys = self.expiry.get(player_id)
+            if keys is not None:
+                keys.pop(key, None)
+                if not keys:
+                    del self.expiry[player_id]
+        return len(lapsed)
+
+
+class RedisCooldownStore:
+    """Cooldowns as Redis keys with a PX expiry, plus a per-player index set.
+
+    ``cooldown:{player}:{key}`` holds the expiry in epoch milliseconds and
+    lapses on its own. ``cooldowns:{player}`` lists the player's keys so
+    all of them can be read in one pipelined round-trip.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    @staticmethod
+    def _key(player_id: str, key: str) -> str:
+        return f"cooldown:{player_id}:{key}"
+
+    @staticmethod
+    def _index(player_id: str) -> str:
+        return f"cooldowns:{player_id}"
+
+    def _indexed(self, pipe, player_id: str, key: str) -> None:
+        pipe.sadd(self._index(player_id), key)
+        pipe.expire(self._index(player_id), INDEX_TTL_SECONDS)
+
+    async def get(self, player_id: str, key: str) -> Optional[float]:
+        value = await self.client.get(self._key(player_id, key))
+        return int(value) / 1000 if value is not None else None
+
+    async def get_all(self, player_id: str) -> Dict[str, float]:
+        keys = sorted(await self.client.smembers(self._index(player_id)))
+        if not keys:
+            return {}
+        async with self.client.pipeline(transaction=False) as pipe:
+            for key in keys:
+                pipe.get(self._key(player_id, key))
+            values = await pipe.execute()
+        lapsed = [key for key, value in zip(keys, values) if value is None]
+        if lapsed:
+            await self.client.srem(self._index(player_id), *lapsed)
+        return {key: int(value) / 1000 for key, value in zip(keys, values) if value is not None}
+
+    async def set(self, player_id: str, key: str, expires: float) -> None:
+        ttl = max(1, int((expires - time.time()) * 1000))
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(player_id, key), int(expires * 1000), px=ttl)
+            self._indexed(pipe, player_id, key)
+            await pipe.execute()
+
+    async def claim(self, player_id: str, key: str, expires: float) -> Optional[float]:
+        """SET NX: returns the running cooldown's expiry if one was already set"""
+        ttl = max(1, int((expires - time.time()) * 1000))
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(player_id, key), int(expires * 1000), px=ttl, nx=True)
+            pipe.get(self._key(player_id, key))
+            self._indexed(pipe, player_id, key)
+            claimed, value, _, _ = await pipe.execute()
+        if claimed:
+            return None
+        return int(value) / 1000 if value is not None else None
+
+    async def clear(self, player_id: str, key: str) -> bool:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.delete(self._key(player_id, key))
+            pipe.srem(self._index(player_id), key)
+            deleted, _ = await pipe.execute()
+        return bool(deleted)
+
+    def expire(self, now: float) -> int:
+        # Redis expires keys itself
+        return 0
+
+
+class CooldownService:
+    """Cooldowns for every system, keyed by player, namespace and name.
+
+    Namespaces keep the systems apart: ``action`` for player actions,
+    ``task`` for task types and ``trait`` for trait abilities. Checks and
+    claims go to the store only and never wait on MongoDB.
+    """
+
+    def __init__(self, store=None):
+        self.store = store or MemoryCooldownStore()
+        self.events: Deque[Dict] = deque(maxlen=MAX_PENDING_EVENTS)
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def key(namespace: str, name: str) -> str:
+        return f"{namespace}:{name}"
+
+    def _record(self, event: str, player_id: str, namespace: str, name: str, expires: Optional[float]) -> None:
+        self.events.append({
+            "event": event,
+            "player_id": player_id,
+            "namespace": namespace,
+            "name": name,
+            "expires_at": as_datetime(expires) if expires is not None else None,
+            "at": datetime.utcnow()
+        })
+
+    async def expires_at(self, player_id: str, namespace: str, name: str) -> Optional[datetime]:
+        """When a running cooldown ends, None if it isn't on cooldown"""
+        expires = await self.store.get(player_id, self.key(namespace, name))
+        return as_datetime(expires) if expires is not None else None
+
+    async def remaining(self, player_id: str, namespace: str, name: str) -> float:
+        """Seconds left on a cooldown, 0 if it's ready"""
+        expires = await self.store.get(player_id, self.key(namespace, name))
+        return max(0.0, expires - time.time()) if expires is not None else 0.0
+
+    async def set(self, player_id: str, namespace: str, name: str, seconds: float) -> datetime:
+        """Start (or restart) a cooldown; returns when it ends"""
+        expires = time.time() + seconds
+        await self.store.set(player_id, self.key(namespace, name), expires)
+        self._record("set", player_id, namespace, name, expires)
+        return as_datetime(expires)
+
+    async def claim(self, player_id: str, namespace: str, name: str, seconds: float) -> Tuple[bool, datetime]:
+        """Start a cooldown only if none is running, atomically.
+
+        Returns (claimed, expiry): the new expiry if claimed, otherwise the
+        expiry of the cooldown already running.
+        """
+        expires = time.time() + seconds
+        running = await self.store.claim(player_id, self.key(namespace, name), expires)
+        if running is not None:
+            return False, as_datetime(running)
+        self._record("set", player_id, namespace, name, expires)
+        return True, as_datetime(expires)
+
+    async def clear(self, player_id: str, namespace: str, name: str) -> bool:
+        """End a cooldown early; False if it wasn't running"""
+        cleared = await self.store.clear(player_id, self.key(namespace, name))
+        if cleared:
+            self._record("clear", player_id, namespace, name, None)
+        return cleared
+
+    async def reduce(self, player_id: str, namespace: str, name: str, seconds: float) -> Optional[datetime]:
+        """Take ``seconds`` off a running cooldown; returns the new expiry, None once it's over"""
+        key = self.key(namespace, name)
+        expires = await self.store.get(player_id, key)
+        if expires is None:
+            return None
+        expires -= seconds
+        if expires <= time.time():
+            await self.clear(player_id, namespace, name)
+            return None
+        await self.store.set(player_id, key, expires)
+        self._record("set", player_id, namespace, name, expires)
+        return as_datetime(expires)
+
+    async def all_for(self, player_id: str) -> Dict[str, Dict[str, datetime]]:
+        """Every running cooldown for a player in one store read: ``{namespace: {name: expiry}}``"""
+        grouped: Dict[str, Dict[str, datetime]] = {}
+        for key, expires in (await self.store.get_all(player_id)).items():
+            namespace, _, name = key.partition(":")
+            grouped.setdefault(namespace, {})[name] = as_datetime(expires)
+        return grouped
+
+    async def active(self, player_id: str, namespace: str) -> Dict[str, datetime]:
+        """Running cooldowns in one namespace: ``{name: expiry}``"""
+        return (await self.all_for(player_id)).get(namespace, {})
+
+    async def flush(self, db: AsyncIOMotorDatabase) -> int:
+        """Write queued cooldown events to ``cooldown_events``"""
+        if not self.events:
+            return 0
+        events = list(self.events)
+        self.events.clear()
+        try:
+            await db.cooldown_events.insert_many(events, ordered=False)
+        except Exception:
+            self.events.extendleft(reversed(events))
+            raise
+        return len(events)
+
+    async def load(self, db: AsyncIOMotorDatabase) -> int:
+        """Restore still-running cooldowns into an in-process store from the event log"""
+        now = datetime.utcnow()
+        restored = 0
+        async for latest in db.cooldown_events.aggregate([
+            {"$match": {"at": {"$gte": now - timedelta(seconds=INDEX_TTL_SECONDS)}}},
+            {"$sort": {"at": -1}},
+            {"$group": {
+                "_id": {"player_id": "$player_id", "namespace": "$namespace", "name": "$name"},
+                "event": {"$first": "$event"},
+                "expires_at": {"$first": "$expires_at"}
+            }},
+            {"$match": {"event": "set", "expires_at": {"$gt": now}}}
+        ]):
+            entry = latest["_id"]
+            await self.store.set(
+                entry["player_id"],
+                self.key(entry["namespace"], entry["name"]),
+                as_epoch(latest["expires_at"])
+            )
+            restored += 1
+        return restored
+
+    async def ensure_indexes(self, db: AsyncIOMotorDatabase) -> None:
+        await db.cooldown_events.create_index([("player_id", 1), ("at", -1)])
+        await db.cooldown_events.create_index("at")
+
+    async def start(self, db: AsyncIOMotorDatabase, redis_url: Optional[str] = None) -> None:
+        """Use Redis when it answers, otherwise the in-process store restored from MongoDB"""
+        if self._task is not None:
+            return
+        if REDIS_AVAILABLE and redis_url:
+            client = aioredis.from_url(redis_url, encoding="utf-8", decode_responses=True)
+            try:
+                await client.ping()
+                self.store = RedisCooldownStore(client)
+                logger.info("Cooldowns stored in Redis")
+            except Exception as e:
+                logger.warning(f"Redis unavailable for cooldowns ({e}); keeping them in process")
+        if isinstance(self.store, MemoryCooldownStore):
+            await self.load(db)
+        self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self, db: AsyncIOMotorDatabase) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush(db)
+
+    async def _run(self, db: AsyncIOMotorDatabase):
+        last_flush = time.monotonic()
+        while True:
+            await asyncio.sleep(1.0)
+            self.store.expire(time.time())
+            if time.monotonic() - last_flush >= EVENT_FLUSH_INTERVAL:
+                last_flush = time.monotonic()
+                try:
+                    await self.flush(db)
+                except Exception as e:
+                    logger.error(f"Failed to persist cooldown events: {e}")
+
+
+# Shared by every cooldown check in this process
+cooldowns = CooldownService()
@@ -1,4 +1,5 @@
 from .crafter import CraftingService
+from .engine import CraftingEngine
 from .recipes import RecipeManager
 
-__all__ = ["CraftingService", "RecipeManager"]
+__all__ = ["CraftingService", "CraftingEngine", "RecipeManager"]
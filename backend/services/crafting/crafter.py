@@ -1,10 +1,9 @@
-from typing import List, Dict, Optional
-from datetime import datetime
-import random
-from ...models.player.player import Player
-from ...models.economy.transaction import Transaction
+from typing import List, Dict, Optional, Tuple
+from ...core.database import get_database
+from ..economy.ledger import player_key
+from ..player.inventory_manager import inventory_of
+from .engine import CraftingEngine, material_counts
 from .recipes import RecipeManager
-import uuid
 
 
 class CraftingService:
@@ -12,6 +11,8 @@ class CraftingService:
 
     def __init__(self):
         self.recipe_manager = RecipeManager()
+        self.db = get_database()
+        self.engine = CraftingEngine(self.db)
 
     async def get_recipes(
         self,
@@ -20,24 +21,16 @@ class CraftingService:
         min_level: Optional[int] = None
     ) -> List[Dict]:
         """Get available recipes for player."""
-        all_recipes = await self.recipe_manager.get_all_recipes()
-
-        filtered_recipes = []
-        for recipe in all_recipes:
-            # Filter by category
-            if category and recipe.get("category") != category:
-                continue
-
-            # Filter by min level
-            if min_level and recipe.get("level_required", 0) < min_level:
-                continue
-
-            # Add unlocked status
-            recipe["unlocked"] = player_level >= recipe.get(
-                "level_required", 0)
-            filtered_recipes.append(recipe)
+        recipes = self.recipe_manager.catalog.select(
+            low=min_level or None,
+            category=category or None
+        )
 
-        return filtered_recipes
+        # Catalog recipes are shared; add the unlocked status to copies
+        return [
+            {**recipe, "unlocked": player_level >= recipe.get("level_required", 0)}
+            for recipe in recipes
+        ]
 
     async def get_recipe_by_id(self, recipe_id: str) -> Optional[Dict]:
         """Get recipe by ID."""
@@ -50,7 +43,9 @@ class CraftingService:
         quantity: int = 1
     ) -> bool:
         """Check if player can craft item."""
-        player = await Player.find_one({"_id": player_id})
+        player = await self.db.players.find_one(
+            {"_id": player_key(player_id)}, projection={"items": 1, "inventory": 1, "level": 1}
+        )
         if not player:
             return False
 
@@ -63,23 +58,11 @@ class CraftingService:
             return False
 
         # Check materials
-        player_inventory = player.get("items", [])
-        materials_required = recipe.get("materials_required", [])
-
-        for material in materials_required:
-            material_id = material["material_id"]
-            required_qty = material["quantity"] * quantity
-
-            # Find material in inventory
-            inventory_item = next(
-                (item for item in player_inventory if item["item_id"] == material_id),
-                None
-            )
-
-            if not inventory_item or inventory_item["quantity"] < required_qty:
-                return False
-
-        return True
+        counts = material_counts(inventory_of(player))
+        return all(
+            counts.get(material["material_id"], 0) >= material["quantity"] * quantity
+            for material in recipe.get("materials_required", [])
+        )
 
     async def craft_item(
         self,
@@ -87,136 +70,38 @@ class CraftingService:
         recipe_id: str,
         quantity: int = 1
     ) -> Dict:
-        """Craft an item."""
-        player = await Player.find_one({"_id": player_id})
-        recipe = await self.recipe_manager.get_recipe(recipe_id)
+        """Craft an item (``quantity`` times, in one inventory update)."""
+        outcome = await self.engine.craft_queue(player_id, [(recipe_id, quantity)])
+        result = outcome["results"][0]
 
-        if not player or not recipe:
-            return {"success": False, "error": "Invalid player or recipe"}
-
-        # Calculate success rate (base + player skill bonuses)
-        base_success = recipe.get("success_rate", 0.95)
-        player_crafting_skill = player.get(
-            "traits", {}).get("engineering", 50) / 100
-        success_rate = min(0.99, base_success + (player_crafting_skill * 0.05))
-
-        crafted_items = []
-        total_xp = 0
-        materials_consumed = []
-
-        for i in range(quantity):
-            # Roll for success
-            if random.random() <= success_rate:
-                # Successful craft
-                item_id = str(uuid.uuid4())
-                result_item = recipe.get("result_item", {})
-
-                crafted_items.append({
-                    "item_id": item_id,
-                    "name": result_item.get("name"),
-                    "type": result_item.get("type"),
-                    "quantity": 1
-                })
-
-                total_xp += recipe.get("xp_reward", 10)
-
-        # Consume materials
-        player_inventory = player.get("items", [])
-        for material in recipe.get("materials_required", []):
-            material_id = material["material_id"]
-            consumed_qty = material["quantity"] * len(crafted_items)
-
-            # Update inventory
-            for item in player_inventory:
-                if item["item_id"] == material_id:
-                    item["quantity"] -= consumed_qty
-                    materials_consumed.append({
-                        "material_id": material_id,
-                        "name": material.get("name"),
-                        "quantity": consumed_qty
-                    })
-                    break
-
-        # Add crafted items to inventory
-        for crafted in crafted_items:
-            player_inventory.append(crafted)
-
-        # Update player
-        await Player.update_one(
-            {"_id": player_id},
-            {
-                "$set": {"items": player_inventory},
-                "$inc": {"xp": total_xp}
-            }
-        )
-
-        # Log transaction
-        await Transaction.insert_one({
-            "player_id": player_id,
-            "type": "crafting",
-            "details": {
-                "recipe_id": recipe_id,
-                "quantity": len(crafted_items),
-                "materials": materials_consumed
-            },
-            "timestamp": datetime.utcnow()
-        })
+        if not result["success"]:
+            return {"success": False, "error": result["error"]}
 
         return {
             "success": True,
-            "item_id": crafted_items[0]["item_id"] if crafted_items else None,
-            "item_name": recipe["result_item"]["name"],
-            "quantity_crafted": len(crafted_items),
-            "xp_gained": total_xp,
-            "materials_consumed": materials_consumed,
+            "item_id": result.get("item_id"),
+            "item_name": result["item_name"],
+            "quantity_crafted": result["quantity_crafted"],
+            "xp_gained": result["xp_gained"],
+            "materials_consumed": result["materials_consumed"],
             "bonus_received": None
         }
 
+    async def craft_queue(
+        self,
+        player_id: str,
+        jobs: List[Tuple[str, int]]
+    ) -> Dict:
+        """Craft a queue of (recipe_id, quantity) jobs in one inventory update."""
+        return await self.engine.craft_queue(player_id, jobs)
+
     async def dismantle_item(
         self,
         player_id: str,
         item_id: str
     ) -> Optional[Dict]:
         """Dismantle an item to get materials."""
-        player = await Player.find_one({"_id": player_id})
-        if not player:
-            return None
-
-        # Find item in inventory
-        player_inventory = player.get("items", [])
-        item = next((i for i in player_inventory if i.get(
-            "item_id") == item_id), None)
-
-        if not item:
-            return None
-
-        # Calculate materials returned (50-75% of original)
-        return_rate = random.uniform(0.5, 0.75)
-        materials_returned = []
-
-        # Remove item from inventory
-        player_inventory = [
-            i for i in player_inventory if i.get("item_id") != item_id]
-
-        # Add materials (simplified - would lookup recipe materials)
-        # For now, return generic materials
-        materials_returned.append({
-            "material_id": "scrap_metal",
-            "name": "Scrap Metal",
-            "quantity": int(5 * return_rate)
-        })
-
-        # Update player
-        await Player.update_one(
-            {"_id": player_id},
-            {"$set": {"items": player_inventory}}
-        )
-
-        return {
-            "success": True,
-            "item_dismantled": item.get("name"),
-            "materials_returned": materials_returned
-        }
+        return await self.engine.dismantle(player_id, item_id)
 
     async def get_crafting_history(
         self,
@@ -224,9 +109,9 @@ class CraftingService:
         limit: int = 50
     ) -> List[Dict]:
         """Get player's crafting history."""
-        transactions = await Transaction.find(
+        transactions = await self.db.transactions.find(
             {"player_id": player_id, "type": "crafting"}
-        ).sort("timestamp", -1).limit(limit).to_list()
+        ).sort("timestamp", -1).limit(limit).to_list(length=limit)
 
         return [
             {
@@ -235,7 +120,7 @@ class CraftingService:
                 "item_crafted": "Item",
                 "quantity": t.get("details", {}).get("quantity", 1),
                 "success": True,
-                "xp_gained": 10
+                "xp_gained": t.get("details", {}).get("xp_gained", 10)
             }
             for t in transactions
         ]
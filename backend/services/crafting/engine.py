@@ -0,0 +1,272 @@
+"""Crafting engine - plans a whole craft queue in memory and applies it in one conditional update."""
+
+import asyncio
+import random
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from ..catalog import get_catalog
+from ..economy.ledger import player_key
+from ..player.inventory_manager import INVENTORY_FIELD, NOT_LEGACY, InventoryManager, inventory_of, is_legacy, item_path
+
+MAX_CRAFT_ATTEMPTS = 5
+CRAFT_BACKOFF_SECONDS = 0.02
+MAX_QUEUE_LENGTH = 50
+MAX_SUCCESS_RATE = 0.99
+
+PLAYER_CRAFTING_FIELDS = {"items": 1, "inventory": 1, "level": 1, "traits.engineering": 1}
+
+# Drops stacks that crafting emptied, server-side in one update
+PRUNE_EMPTY_STACKS = [{
+    "$set": {
+        INVENTORY_FIELD: {
+            "$arrayToObject": {
+                "$filter": {
+                    "input": {"$objectToArray": f"${INVENTORY_FIELD}"},
+                    "cond": {"$gt": ["$$this.v.quantity", 0]}
+                }
+            }
+        }
+    }
+}]
+
+
+def material_counts(stacks: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    """Quantity held per item id"""
+    return {item_id: stack.get("quantity", 0) for item_id, stack in stacks.items()}
+
+
+def success_rate(recipe: Dict[str, Any], engineering: float) -> float:
+    """Recipe success rate plus the player's engineering bonus"""
+    return min(MAX_SUCCESS_RATE, recipe.get("success_rate", 0.95) + engineering / 100 * 0.05)
+
+
+def plan_crafts(
+    stacks: Dict[str, Dict[str, Any]],
+    player_level: int,
+    engineering: float,
+    jobs: List[Tuple[Dict[str, Any], int]],
+    rng: random.Random
+) -> Tuple[Dict[str, int], Dict[str, int], List[Dict[str, Any]], int]:
+    """Run a craft queue against an in-memory view of the inventory.
+
+    Jobs are checked in order against what the earlier jobs left over; a job
+    that can't be afforded in full is rejected without touching the rest.
+    Materials are consumed for successful crafts only. Crafted items stack
+    under their recipe id.
+
+    Returns (materials used, items produced, per-job results, total xp).
+    """
+    counts = material_counts(stacks)
+    used: Dict[str, int] = {}
+    produced: Dict[str, int] = {}
+    results = []
+    total_xp = 0
+
+    for recipe, quantity in jobs:
+        result: Dict[str, Any] = {"recipe_id": recipe["id"], "quantity_requested": quantity}
+        if player_level < recipe.get("level_required", 0):
+            results.append({**result, "success": False, "error": "Level requirement not met"})
+            continue
+        materials = recipe.get("materials_required", [])
+        if any(counts.get(m["material_id"], 0) < m["quantity"] * quantity for m in materials):
+            results.append({**result, "success": False, "error": "Insufficient materials"})
+            continue
+
+        rate = success_rate(recipe, engineering)
+        crafted = sum(1 for _ in range(quantity) if rng.random() <= rate)
+
+        consumed = []
+        for material in materials:
+            amount = material["quantity"] * crafted
+            counts[material["material_id"]] -= amount
+            used[material["material_id"]] = used.get(material["material_id"], 0) + amount
+            consumed.append({"material_id": material["material_id"], "name": material.get("name"), "quantity": amount})
+
+        if crafted:
+            produced[recipe["id"]] = produced.get(recipe["id"], 0) + crafted
+            counts[recipe["id"]] = counts.get(recipe["id"], 0) + crafted
+        xp = recipe.get("xp_reward", 10) * crafted
+        total_xp += xp
+        results.append({
+            **result,
+            "success": True,
+            "item_id": recipe["id"] if crafted else None,
+            "item_name": recipe.get("result_item", {}).get("name"),
+            "quantity_crafted": crafted,
+            "xp_gained": xp,
+            "materials_consumed": consumed,
+        })
+
+    return used, produced, results, total_xp
+
+
+def net_consumption(used: Dict[str, int], produced: Dict[str, int]) -> Dict[str, int]:
+    """Amount of each item the queue takes out of the inventory, after what it crafts back"""
+    net = {item_id: amount - produced.get(item_id, 0) for item_id, amount in used.items()}
+    return {item_id: amount for item_id, amount in net.items() if amount > 0}
+
+
+def emptied_stacks(stacks: Dict[str, Dict[str, Any]], used: Dict[str, int], produced: Dict[str, int]) -> bool:
+    """Whether applying the queue leaves any stack it consumed from at zero"""
+    counts = material_counts(stacks)
+    return any(
+        counts.get(item_id, 0) - amount + produced.get(item_id, 0) <= 0
+        for item_id, amount in used.items() if amount
+    )
+
+
+def craft_update(
+    used: Dict[str, int],
+    produced: Dict[str, int],
+    total_xp: int,
+    recipes: Dict[str, Dict[str, Any]],
+    now: datetime
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Filter and update applying a planned queue: material guards, then one ``$inc`` per stack.
+
+    Items crafted earlier in the queue and used by a later job only need
+    guarding for the part the inventory has to supply.
+    """
+    condition = {
+        item_path(item_id, "quantity"): {"$gte": amount}
+        for item_id, amount in net_consumption(used, produced).items()
+    }
+    increments: Dict[str, int] = {}
+    for item_id, amount in used.items():
+        if amount:
+            increments[item_path(item_id, "quantity")] = -amount
+    for item_id, amount in produced.items():
+        path = item_path(item_id, "quantity")
+        increments[path] = increments.get(path, 0) + amount
+    if total_xp:
+        increments["xp"] = total_xp
+
+    update: Dict[str, Any] = {"$inc": increments}
+    if produced:
+        result_fields = {}
+        for item_id in produced:
+            result_item = recipes[item_id].get("result_item", {})
+            result_fields[item_path(item_id, "name")] = result_item.get("name")
+            result_fields[item_path(item_id, "item_type")] = result_item.get("type")
+            result_fields[item_path(item_id, "rarity")] = result_item.get("rarity", "common")
+        update["$set"] = result_fields
+        update["$min"] = {item_path(item_id, "acquired_at"): now for item_id in produced}
+    return condition, update
+
+
+class CraftingEngine:
+    """Applies craft queues and dismantles as single conditional inventory updates.
+
+    The player's inventory is read once and the whole queue is planned in
+    memory. The result is written as one update of ``$inc`` on each touched
+    stack, guarded by a minimum quantity for every material the queue
+    consumes beyond what it crafts. If another write took the materials
+    first, the queue is re-planned against the fresh inventory, up to
+    ``MAX_CRAFT_ATTEMPTS`` times.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, rng: Optional[random.Random] = None):
+        self.db = db
+        self.players = db.players
+        self.log = db.transactions
+        self.inventory = InventoryManager(db)
+        self.recipes = get_catalog("recipes")
+        self.rng = rng or random.Random()
+
+    async def craft_queue(self, player_id: str, jobs: List[Tuple[str, int]]) -> Dict[str, Any]:
+        """Craft every (recipe_id, quantity) job in order"""
+        if not jobs:
+            raise ValueError("Craft queue is empty")
+        if len(jobs) > MAX_QUEUE_LENGTH:
+            raise ValueError(f"Craft queue is limited to {MAX_QUEUE_LENGTH} jobs")
+        recipe_jobs = []
+        for recipe_id, quantity in jobs:
+            recipe = self.recipes.get(recipe_id)
+            if not recipe:
+                raise ValueError(f"Recipe not found: {recipe_id}")
+            if quantity <= 0:
+                raise ValueError("Quantity must be positive")
+            recipe_jobs.append((recipe, quantity))
+
+        key = player_key(player_id)
+        for attempt in range(MAX_CRAFT_ATTEMPTS):
+            player = await self.players.find_one({"_id": key}, projection=PLAYER_CRAFTING_FIELDS)
+            if not player:
+                raise ValueError("Player not found")
+            if is_legacy(player):
+                await self.inventory.migrate(player_id)
+                continue
+
+            stacks = inventory_of(player)
+            used, produced, results, total_xp = plan_crafts(
+                stacks,
+                player.get("level", 1),
+                player.get("traits", {}).get("engineering", 50),
+                recipe_jobs,
+                self.rng
+            )
+            crafted = [result for result in results if result["success"] and result["quantity_crafted"]]
+            if not crafted:
+                return {"success": any(r["success"] for r in results), "results": results, "xp_gained": 0}
+
+            now = datetime.utcnow()
+            condition, update = craft_update(used, produced, total_xp, self.recipes.by_id, now)
+            applied = await self.players.update_one({"_id": key, **NOT_LEGACY, **condition}, update)
+            if applied.modified_count:
+                if emptied_stacks(stacks, used, produced):
+                    await self.players.update_one({"_id": key}, PRUNE_EMPTY_STACKS)
+                await self.log.insert_many([
+                    {
+                        "player_id": player_id,
+                        "type": "crafting",
+                        "details": {
+                            "recipe_id": result["recipe_id"],
+                            "quantity": result["quantity_crafted"],
+                            "materials": result["materials_consumed"],
+                            "xp_gained": result["xp_gained"]
+                        },
+                        "timestamp": now
+                    }
+                    for result in crafted
+                ], ordered=False)
+                return {"success": True, "results": results, "xp_gained": total_xp}
+
+            await asyncio.sleep(CRAFT_BACKOFF_SECONDS * (attempt + 1) * (1 + self.rng.random()))
+
+        raise ValueError("Inventory is changing too quickly; try again")
+
+    async def dismantle(self, player_id: str, item_id: str, return_rate: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Turn one of an item into scrap in one conditional update; None if the item isn't owned"""
+        # Simplified: every item returns generic scrap
+        rate = return_rate if return_rate is not None else self.rng.uniform(0.5, 0.75)
+        scrap = {"material_id": "scrap_metal", "name": "Scrap Metal", "quantity": int(5 * rate)}
+
+        update: Dict[str, Any] = {"$inc": {item_path(item_id, "quantity"): -1}}
+        if scrap["quantity"]:
+            update["$inc"][item_path("scrap_metal", "quantity")] = scrap["quantity"]
+            update["$set"] = {item_path("scrap_metal", "name"): scrap["name"]}
+            update["$min"] = {item_path("scrap_metal", "acquired_at"): datetime.utcnow()}
+
+        for _ in range(2):
+            player = await self.players.find_one_and_update(
+                {"_id": player_key(player_id), **NOT_LEGACY, item_path(item_id, "quantity"): {"$gte": 1}},
+                update,
+                projection={item_path(item_id): 1}
+            )
+            if player is not None:
+                break
+            if not await self.inventory.migrate(player_id):
+                return None
+        else:
+            return None
+
+        stack = player[INVENTORY_FIELD][item_id]
+        if stack.get("quantity", 0) <= 1:
+            await self.players.update_one(
+                {"_id": player["_id"], item_path(item_id, "quantity"): {"$lte": 0}},
+                {"$unset": {item_path(item_id): ""}}
+            )
+        return {"success": True, "item_dismantled": stack.get("name"), "materials_returned": [scrap]}
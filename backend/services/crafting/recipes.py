@@ -1,14 +1,18 @@
 from typing import List, Dict, Optional
 
+from ..catalog import get_catalog
+
 
 class RecipeManager:
     """Manages crafting recipes."""
 
     def __init__(self):
-        self.recipes = self._load_recipes()
+        self.catalog = get_catalog("recipes")
+        self.recipes = self.catalog.by_id
 
-    def _load_recipes(self) -> Dict[str, Dict]:
-        """Load recipes from configuration."""
+    @staticmethod
+    def definitions() -> Dict[str, Dict]:
+        """Load recipes from configuration (once, into the recipes catalog)."""
         # In production, this would load from database or config file
         # For now, return hardcoded recipes
         return {
@@ -124,7 +128,7 @@ class RecipeManager:
 
     async def get_all_recipes(self) -> List[Dict]:
         """Get all available recipes."""
-        return list(self.recipes.values())
+        return list(self.catalog.items)
 
     async def get_recipe(self, recipe_id: str) -> Optional[Dict]:
         """Get a specific recipe by ID."""
@@ -132,14 +136,8 @@ class RecipeManager:
 
     async def get_recipes_by_category(self, category: str) -> List[Dict]:
         """Get recipes by category."""
-        return [
-            recipe for recipe in self.recipes.values()
-            if recipe.get("category") == category
-        ]
+        return self.catalog.select(category=category)
 
     async def get_recipes_by_level(self, min_level: int, max_level: int = 100) -> List[Dict]:
         """Get recipes by level range."""
-        return [
-            recipe for recipe in self.recipes.values()
-            if min_level <= recipe.get("level_required", 0) <= max_level
-        ]
+        return self.catalog.select(low=min_level, high=max_level)
@@ -1,6 +1,7 @@
 """Economy services."""
 
 from .currency import CurrencyService
+from .ledger import CurrencyLedger
 from .transactions import TransactionService
 
-__all__ = ["CurrencyService", "TransactionService"]
+__all__ = ["CurrencyService", "CurrencyLedger", "TransactionService"]
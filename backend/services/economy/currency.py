@@ -1,23 +1,23 @@
 """Currency management service."""
 
-from typing import Dict, Any
-from bson import ObjectId
-from datetime import datetime
+from typing import Dict, Any, List, Optional
+from motor.motor_asyncio import AsyncIOMotorDatabase
 
 from backend.core.database import get_database
+from .ledger import CURRENCY_TYPES, CurrencyLedger
 
 
 class CurrencyService:
     """Manage player currencies and conversions."""
 
-    CURRENCY_TYPES = [
-        "credits",
-        "karma_tokens",
-        "dark_matter",
-        "prestige_points",
-        "guild_coins",
-        "legacy_shards"
-    ]
+    CURRENCY_TYPES = CURRENCY_TYPES
+
+    def __init__(self, db: Optional[AsyncIOMotorDatabase] = None):
+        self._db = db
+
+    @property
+    def ledger(self) -> CurrencyLedger:
+        return CurrencyLedger(self._db if self._db is not None else get_database())
 
     async def get_balance(
         self,
@@ -25,16 +25,7 @@ class CurrencyService:
         currency_type: str = "credits"
     ) -> int:
         """Get player's currency balance."""
-        if currency_type not in self.CURRENCY_TYPES:
-            raise ValueError(f"Invalid currency type: {currency_type}")
-
-        db = await get_database()
-        player = await db.players.find_one({"_id": ObjectId(player_id)})
-
-        if not player:
-            raise ValueError("Player not found")
-
-        return player.get("currencies", {}).get(currency_type, 0)
+        return await self.ledger.balance(player_id, currency_type)
 
     async def add_currency(
         self,
@@ -44,35 +35,7 @@ class CurrencyService:
         reason: str = "generic"
     ) -> Dict[str, Any]:
         """Add currency to player's balance."""
-        if currency_type not in self.CURRENCY_TYPES:
-            raise ValueError(f"Invalid currency type: {currency_type}")
-
-        if amount <= 0:
-            raise ValueError("Amount must be positive")
-
-        db = await get_database()
-
-        # Update balance
-        result = await db.players.update_one(
-            {"_id": ObjectId(player_id)},
-            {
-                "$inc": {f"currencies.{currency_type}": amount}
-            }
-        )
-
-        if result.modified_count == 0:
-            raise ValueError("Failed to update balance")
-
-        # Log transaction
-        await self._log_transaction(
-            player_id=player_id,
-            currency_type=currency_type,
-            amount=amount,
-            transaction_type="earn",
-            reason=reason
-        )
-
-        new_balance = await self.get_balance(player_id, currency_type)
+        new_balance = await self.ledger.credit(player_id, currency_type, amount, reason)
 
         return {
             "success": True,
@@ -88,42 +51,8 @@ class CurrencyService:
         amount: int,
         reason: str = "purchase"
     ) -> Dict[str, Any]:
-        """Deduct currency from player's balance."""
-        if currency_type not in self.CURRENCY_TYPES:
-            raise ValueError(f"Invalid currency type: {currency_type}")
-
-        if amount <= 0:
-            raise ValueError("Amount must be positive")
-
-        # Check balance
-        current_balance = await self.get_balance(player_id, currency_type)
-
-        if current_balance < amount:
-            raise ValueError(f"Insufficient {currency_type}")
-
-        db = await get_database()
-
-        # Deduct balance
-        result = await db.players.update_one(
-            {"_id": ObjectId(player_id)},
-            {
-                "$inc": {f"currencies.{currency_type}": -amount}
-            }
-        )
-
-        if result.modified_count == 0:
-            raise ValueError("Failed to update balance")
-
-        # Log transaction
-        await self._log_transaction(
-            player_id=player_id,
-            currency_type=currency_type,
-            amount=-amount,
-            transaction_type="spend",
-            reason=reason
-        )
-
-        new_balance = await self.get_balance(player_id, currency_type)
+        """Deduct currency from player's balance (fails atomically if it doesn't cover it)."""
+        new_balance = await self.ledger.debit(player_id, currency_type, amount, reason)
 
         return {
             "success": True,
@@ -140,27 +69,7 @@ class CurrencyService:
         amount: int
     ) -> Dict[str, Any]:
         """Transfer currency between players."""
-        if currency_type not in self.CURRENCY_TYPES:
-            raise ValueError(f"Invalid currency type: {currency_type}")
-
-        if amount <= 0:
-            raise ValueError("Amount must be positive")
-
-        # Deduct from sender
-        await self.deduct_currency(
-            from_player_id,
-            currency_type,
-            amount,
-            reason=f"transfer_to_{to_player_id}"
-        )
-
-        # Add to receiver
-        await self.add_currency(
-            to_player_id,
-            currency_type,
-            amount,
-            reason=f"transfer_from_{from_player_id}"
-        )
+        await self.ledger.transfer(from_player_id, to_player_id, currency_type, amount)
 
         return {
             "success": True,
@@ -170,6 +79,10 @@ class CurrencyService:
             "amount": amount
         }
 
+    async def transfer_batch(self, transfers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply many transfers at once (see ``CurrencyLedger.transfer_batch``)."""
+        return await self.ledger.transfer_batch(transfers)
+
     async def convert_currency(
         self,
         player_id: str,
@@ -192,6 +105,10 @@ class CurrencyService:
             raise ValueError(
                 f"Cannot convert {from_currency} to {to_currency}")
 
+        converted_amount = int(amount * rate)
+        if converted_amount <= 0:
+            raise ValueError("Amount too small to convert")
+
         # Deduct source currency
         await self.deduct_currency(
             player_id,
@@ -201,7 +118,6 @@ class CurrencyService:
         )
 
         # Add target currency
-        converted_amount = int(amount * rate)
         await self.add_currency(
             player_id,
             to_currency,
@@ -218,28 +134,6 @@ class CurrencyService:
             "rate": rate
         }
 
-    async def _log_transaction(
-        self,
-        player_id: str,
-        currency_type: str,
-        amount: int,
-        transaction_type: str,
-        reason: str
-    ):
-        """Log a currency transaction."""
-        db = await get_database()
-
-        transaction = {
-            "player_id": player_id,
-            "currency_type": currency_type,
-            "amount": amount,
-            "transaction_type": transaction_type,
-            "reason": reason,
-            "timestamp": datetime.utcnow()
-        }
-
-        await db.currency_transactions.insert_one(transaction)
-
     async def get_transaction_history(
         self,
         player_id: str,
@@ -247,10 +141,4 @@ class CurrencyService:
         skip: int = 0
     ) -> list:
         """Get player's transaction history."""
-        db = await get_database()
-
-        transactions = await db.currency_transactions.find(
-            {"player_id": player_id}
-        ).sort("timestamp", -1).skip(skip).limit(limit).to_list(length=limit)
-
-        return transactions
+        return await self.ledger.history(player_id, limit=limit, skip=skip)
@@ -0,0 +1,393 @@
+"""Currency ledger - conditional atomic balance updates with a buffered, append-only log."""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set, Tuple, Union
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+
+logger = logging.getLogger(__name__)
+
+CURRENCY_TYPES = [
+    "credits",
+    "karma_tokens",
+    "dark_matter",
+    "prestige_points",
+    "guild_coins",
+    "legacy_shards"
+]
+
+# Entries are written when this many are buffered, or after the flush interval
+LEDGER_BATCH_SIZE = 200
+LEDGER_FLUSH_INTERVAL = 0.5
+# Longest wait between retries while MongoDB keeps rejecting a flush
+LEDGER_MAX_RETRY_INTERVAL = 5.0
+
+
+def player_key(player_id: str) -> Union[str, ObjectId]:
+    """Players created through auth use string ids; older records use ObjectIds"""
+    return ObjectId(player_id) if ObjectId.is_valid(player_id) else player_id
+
+
+class LedgerWriter:
+    """Buffers ledger entries and appends them with ``insert_many``.
+
+    Entries are never updated once written. A flush is triggered when
+    ``LEDGER_BATCH_SIZE`` entries are buffered or ``LEDGER_FLUSH_INTERVAL``
+    after the first buffered entry, whichever comes first, and the timer
+    keeps flushing until the buffer is empty. Each entry gets its ``_id``
+    when it is buffered, so a batch that failed part way can be retried
+    whole: entries that did land come back as duplicate keys and are skipped.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, batch_size: int = LEDGER_BATCH_SIZE,
+                 flush_interval: float = LEDGER_FLUSH_INTERVAL):
+        self.entries = db.currency_transactions
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer: List[Dict[str, Any]] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        # Size-triggered flushes, referenced until they finish
+        self._tasks: Set[asyncio.Task] = set()
+
+    def append(self, entry: Dict[str, Any]) -> None:
+        entry.setdefault("_id", ObjectId())
+        self._buffer.append(entry)
+        if len(self._buffer) >= self.batch_size:
+            task = asyncio.create_task(self._flush_logged())
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> int:
+        """Write every buffered entry; returns the number written"""
+        batch, self._buffer = self._buffer, []
+        if not batch:
+            return 0
+        try:
+            await self.entries.insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            # Duplicate keys are entries an earlier attempt already wrote
+            retry = [
+                batch[error["index"]]
+                for error in e.details.get("writeErrors", [])
+                if error.get("code") != 11000
+            ]
+            if retry:
+                self._buffer[:0] = retry
+                raise
+            return len(batch)
+        except Exception:
+            # Keep the entries for the next flush rather than losing them
+            self._buffer[:0] = batch
+            raise
+        return len(batch)
+
+    async def _flush_later(self):
+        delay = self.flush_interval
+        while True:
+            await asyncio.sleep(delay)
+            if await self._flush_logged():
+                delay = self.flush_interval
+            else:
+                delay = min(delay * 2, LEDGER_MAX_RETRY_INTERVAL)
+            # Entries buffered during the flush, or put back by a failure
+            if not self._buffer:
+                return
+
+    async def _flush_logged(self) -> bool:
+        try:
+            await self.flush()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to write currency ledger entries: {e}")
+            return False
+
+
+# One writer per database so every service instance shares the buffer
+_writers: Dict[Tuple[int, str], LedgerWriter] = {}
+
+
+def get_ledger_writer(db: AsyncIOMotorDatabase) -> LedgerWriter:
+    key = (id(db.client), db.name)
+    if key not in _writers:
+        _writers[key] = LedgerWriter(db)
+    return _writers[key]
+
+
+async def flush_ledgers() -> None:
+    """Write every buffered ledger entry (used on shutdown)"""
+    for writer in list(_writers.values()):
+        await writer.flush()
+
+
+class CurrencyLedger:
+    """Balance updates as single conditional ``find_one_and_update`` calls.
+
+    A debit only matches when the balance covers it, so concurrent purchases
+    cannot overdraw, and the updated balance comes back from the same call.
+    """
+
+    # Learned on first use; None until a transaction has been attempted
+    _transactions_supported: Optional[bool] = None
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.players = db.players
+        self.writer = get_ledger_writer(db)
+
+    async def ensure_indexes(self):
+        """Create the index used by transaction history"""
+        await self.writer.entries.create_index([("player_id", 1), ("timestamp", -1)])
+
+    @staticmethod
+    def _validate(currency_type: str, amount: int):
+        if currency_type not in CURRENCY_TYPES:
+            raise ValueError(f"Invalid currency type: {currency_type}")
+        if amount <= 0:
+            raise ValueError("Amount must be positive")
+
+    async def balance(self, player_id: str, currency_type: str = "credits") -> int:
+        """Read a single balance"""
+        if currency_type not in CURRENCY_TYPES:
+            raise ValueError(f"Invalid currency type: {currency_type}")
+        field = f"currencies.{currency_type}"
+        player = await self.players.find_one({"_id": player_key(player_id)}, projection={field: 1})
+        if not player:
+            raise ValueError("Player not found")
+        return player.get("currencies", {}).get(currency_type, 0)
+
+    async def credit(self, player_id: str, currency_type: str, amount: int, reason: str = "generic") -> int:
+        """Add to a balance; returns the new balance"""
+        self._validate(currency_type, amount)
+        field = f"currencies.{currency_type}"
+        player = await self.players.find_one_and_update(
+            {"_id": player_key(player_id)},
+            {"$inc": {field: amount}},
+            projection={field: 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if not player:
+            raise ValueError("Player not found")
+
+        balance = player["currencies"][currency_type]
+        self._record(player_id, currency_type, amount, "earn", reason, balance)
+        return balance
+
+    async def debit(self, player_id: str, currency_type: str, amount: int, reason: str = "purchase") -> int:
+        """Subtract from a balance if it covers ``amount``; returns the new balance"""
+        self._validate(currency_type, amount)
+        field = f"currencies.{currency_type}"
+        player = await self.players.find_one_and_update(
+            {"_id": player_key(player_id), field: {"$gte": amount}},
+            {"$inc": {field: -amount}},
+            projection={field: 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if not player:
+            # Only the failure path pays for telling the two cases apart
+            if not await self.players.count_documents({"_id": player_key(player_id)}, limit=1):
+                raise ValueError("Player not found")
+            raise ValueError(f"Insufficient {currency_type}")
+
+        balance = player["currencies"][currency_type]
+        self._record(player_id, currency_type, -amount, "spend", reason, balance)
+        return balance
+
+    async def transfer(
+        self,
+        from_player_id: str,
+        to_player_id: str,
+        currency_type: str,
+        amount: int,
+        reason: Optional[str] = None
+    ) -> Dict[str, int]:
+        """Move currency between players; the sender is refunded if the credit fails"""
+        sender_balance = await self.debit(
+            from_player_id, currency_type, amount, reason or f"transfer_to_{to_player_id}"
+        )
+        try:
+            receiver_balance = await self.credit(
+                to_player_id, currency_type, amount, reason or f"transfer_from_{from_player_id}"
+            )
+        except ValueError:
+            await self.credit(from_player_id, currency_type, amount, f"refund_transfer_to_{to_player_id}")
+            raise
+
+        return {"from_balance": sender_balance, "to_balance": receiver_balance}
+
+    async def transfer_batch(self, transfers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply many transfers with one conditional debit per sender and one bulk credit.
+
+        Each transfer is a dict with ``from_player_id``, ``to_player_id``,
+        ``currency_type``, ``amount`` and an optional ``reason``. A sender's
+        transfers in the same currency are debited together, so they either all
+        go through or all fail with "Insufficient ...". Debits and credits run in
+        one transaction when the deployment supports it; otherwise senders whose
+        credits didn't land are refunded.
+        """
+        for transfer in transfers:
+            self._validate(transfer["currency_type"], transfer["amount"])
+
+        # One lookup so credits never go to players that don't exist
+        player_ids = {t["from_player_id"] for t in transfers} | {t["to_player_id"] for t in transfers}
+        existing = {
+            str(player["_id"])
+            async for player in self.players.find(
+                {"_id": {"$in": [player_key(player_id) for player_id in player_ids]}},
+                projection={"_id": 1}
+            )
+        }
+
+        debits: Dict[Tuple[str, str], int] = {}
+        for transfer in transfers:
+            if transfer["from_player_id"] in existing and transfer["to_player_id"] in existing:
+                key = (transfer["from_player_id"], transfer["currency_type"])
+                debits[key] = debits.get(key, 0) + transfer["amount"]
+
+        async def debit_sender(sender: str, currency_type: str, total: int, session=None) -> Optional[str]:
+            field = f"currencies.{currency_type}"
+            result = await self.players.update_one(
+                {"_id": player_key(sender), field: {"$gte": total}},
+                {"$inc": {field: -total}},
+                session=session
+            )
+            return None if result.modified_count else f"Insufficient {currency_type}"
+
+        def outcome(failed: Dict[Tuple[str, str], str]) -> List[Dict[str, Any]]:
+            results = []
+            for transfer in transfers:
+                if transfer["from_player_id"] not in existing or transfer["to_player_id"] not in existing:
+                    results.append({**transfer, "success": False, "error": "Player not found"})
+                    continue
+                key = (transfer["from_player_id"], transfer["currency_type"])
+                if key in failed:
+                    results.append({**transfer, "success": False, "error": failed[key]})
+                    continue
+                results.append({**transfer, "success": True})
+            return results
+
+        def credits_of(results: List[Dict[str, Any]]) -> Dict[Tuple[str, str], int]:
+            return self._totals([
+                (result["to_player_id"], result["currency_type"], result["amount"])
+                for result in results if result["success"]
+            ])
+
+        async def apply(session=None) -> List[Dict[str, Any]]:
+            # A session runs one operation at a time
+            failed = {}
+            for (sender, currency_type), total in debits.items():
+                error = await debit_sender(sender, currency_type, total, session=session)
+                if error:
+                    failed[(sender, currency_type)] = error
+            results = outcome(failed)
+            await self._apply_credits(credits_of(results), session=session)
+            return results
+
+        if CurrencyLedger._transactions_supported is not False:
+            try:
+                async with await self.db.client.start_session() as session:
+                    results = await session.with_transaction(apply)
+                CurrencyLedger._transactions_supported = True
+                self._record_transfers(results)
+                return results
+            except OperationFailure as e:
+                # IllegalOperation: standalone servers have no transactions
+                if e.code != 20:
+                    raise
+                CurrencyLedger._transactions_supported = False
+
+        outcomes = await asyncio.gather(*(
+            debit_sender(sender, currency_type, total)
+            for (sender, currency_type), total in debits.items()
+        ))
+        results = outcome({key: error for key, error in zip(debits, outcomes) if error})
+        credits = credits_of(results)
+        try:
+            await self._apply_credits(credits)
+        except Exception as e:
+            # Refund the senders of every credit that may not have landed
+            if isinstance(e, BulkWriteError):
+                keys = list(credits)
+                lost = {keys[error["index"]] for error in e.details.get("writeErrors", [])}
+            else:
+                lost = set(credits)
+            logger.error(f"Transfer credits failed, refunding {len(lost)} receivers' senders: {e}")
+            refunds = []
+            for result in results:
+                if result["success"] and (result["to_player_id"], result["currency_type"]) in lost:
+                    result.update(success=False, error="Transfer failed")
+                    refunds.append((result["from_player_id"], result["currency_type"], result["amount"]))
+            await self._apply_credits(self._totals(refunds))
+
+        self._record_transfers(results)
+        return results
+
+    def _record_transfers(self, results: List[Dict[str, Any]]) -> None:
+        for result in results:
+            if result["success"]:
+                self._record(result["from_player_id"], result["currency_type"], -result["amount"], "spend",
+                             result.get("reason") or f"transfer_to_{result['to_player_id']}")
+                self._record(result["to_player_id"], result["currency_type"], result["amount"], "earn",
+                             result.get("reason") or f"transfer_from_{result['from_player_id']}")
+
+    @staticmethod
+    def _totals(amounts: List[Tuple[str, str, int]]) -> Dict[Tuple[str, str], int]:
+        totals: Dict[Tuple[str, str], int] = {}
+        for player_id, currency_type, amount in amounts:
+            totals[(player_id, currency_type)] = totals.get((player_id, currency_type), 0) + amount
+        return totals
+
+    async def _apply_credits(self, totals: Dict[Tuple[str, str], int], session=None) -> None:
+        if not totals:
+            return
+        await self.players.bulk_write(
+            [
+                UpdateOne({"_id": player_key(player_id)}, {"$inc": {f"currencies.{currency_type}": total}})
+                for (player_id, currency_type), total in totals.items()
+            ],
+            ordered=False,
+            session=session
+        )
+
+    async def credit_many(self, credits: List[Tuple[str, str, int, str]]) -> None:
+        """Apply many credits of (player_id, currency_type, amount, reason) in one bulk write"""
+        for _, currency_type, amount, _ in credits:
+            self._validate(currency_type, amount)
+        await self._apply_credits(self._totals([credit[:3] for credit in credits]))
+        for player_id, currency_type, amount, reason in credits:
+            self._record(player_id, currency_type, amount, "earn", reason)
+
+    async def history(self, player_id: str, limit: int = 50, skip: int = 0) -> List[Dict[str, Any]]:
+        """Get a player's ledger entries, newest first"""
+        # Make the player's own recent entries visible before reading
+        await self.writer.flush()
+        return await self.writer.entries.find(
+            {"player_id": player_id}
+        ).sort("timestamp", -1).skip(skip).limit(limit).to_list(length=limit)
+
+    def _record(
+        self,
+        player_id: str,
+        currency_type: str,
+        amount: int,
+        transaction_type: str,
+        reason: str,
+        balance_after: Optional[int] = None
+    ):
+        entry = {
+            "player_id": player_id,
+            "currency_type": currency_type,
+            "amount": amount,
+            "transaction_type": transaction_type,
+            "reason": reason,
+            "timestamp": datetime.utcnow()
+        }
+        if balance_after is not None:
+            entry["balance_after"] = balance_after
+        self.writer.append(entry)
@@ -0,0 +1,295 @@
+"""Economy tick - periodic batch payout of property income, investment accruals and dividends."""
+
+import logging
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from backend.monitoring.metrics import metrics_collector
+from backend.services.market.stocks import StockMarketService
+
+logger = logging.getLogger(__name__)
+
+TICK_INTERVAL = timedelta(hours=1)
+# A late tick never pays out more than this much elapsed time
+MAX_TICK_ELAPSED = timedelta(days=1)
+DEFAULT_CHUNK_SIZE = 1000
+# Warn when a full tick takes longer than this
+TICK_TIME_BUDGET_SECONDS = 60.0
+
+# Daily standard deviation of investment returns at "medium" risk
+INVESTMENT_DAILY_VOLATILITY = 0.01
+RISK_MULTIPLIERS = {"low": 0.5, "medium": 1.0, "high": 1.5, "very_high": 2.0}
+
+PLAYER_ECONOMY_FIELDS = {
+    "properties.passive_income": 1,
+    "investments.id": 1,
+    "investments.amount_invested": 1,
+    "investments.current_value": 1,
+    "investments.expected_return": 1,
+    "investments.risk_level": 1,
+    "investments.maturity_date": 1,
+    "investments.status": 1,
+    "economy.income_carry": 1,
+}
+
+
+def tick_slot(now: datetime) -> datetime:
+    """Start of the ``TICK_INTERVAL`` slot containing ``now``"""
+    epoch = datetime(1970, 1, 1)
+    return now - (now - epoch) % TICK_INTERVAL
+
+
+def _payout(accrued: np.ndarray, carry: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Split fractional accruals into whole credits paid now and the carry kept for later"""
+    total = accrued + carry
+    paid = np.floor(total)
+    return paid.astype(np.int64), total - paid
+
+
+def accrue_players(
+    players: List[Dict[str, Any]],
+    elapsed_days: float,
+    now: datetime,
+    rng: np.random.Generator
+) -> Tuple[List[UpdateOne], Dict[str, float]]:
+    """Compute one tick of property income and investment accruals for a chunk of players.
+
+    Returns the player updates and the chunk totals.
+    """
+    n = len(players)
+    if not n:
+        return [], {"players": 0, "property_income": 0, "investment_accrual": 0.0}
+
+    # Property income: flatten every property, then sum per owner
+    property_counts = np.fromiter((len(p.get("properties") or ()) for p in players), dtype=np.int64, count=n)
+    incomes = np.fromiter(
+        (prop.get("passive_income", 0) for p in players for prop in (p.get("properties") or ())),
+        dtype=np.float64, count=int(property_counts.sum())
+    )
+    daily_income = np.bincount(np.repeat(np.arange(n), property_counts), weights=incomes, minlength=n)
+    carry = np.fromiter(
+        ((p.get("economy") or {}).get("income_carry", 0.0) for p in players), dtype=np.float64, count=n
+    )
+    paid, carry = _payout(daily_income * elapsed_days, carry)
+
+    # Investments: accrue expected return plus a risk-scaled shock, once per tick
+    owners: List[int] = []
+    positions: List[int] = []
+    investment_ids: List[Any] = []
+    values: List[float] = []
+    returns: List[float] = []
+    risks: List[float] = []
+    for row, player in enumerate(players):
+        for position, inv in enumerate(player.get("investments") or ()):
+            if inv.get("status", "active") != "active":
+                continue
+            maturity = inv.get("maturity_date")
+            if maturity is not None and maturity <= now:
+                continue
+            owners.append(row)
+            positions.append(position)
+            investment_ids.append(inv.get("id"))
+            values.append(inv.get("current_value", inv.get("amount_invested", 0)))
+            returns.append(inv.get("expected_return", 5.0))
+            risks.append(RISK_MULTIPLIERS.get(inv.get("risk_level", "medium"), 1.0))
+
+    current = np.asarray(values, dtype=np.float64)
+    drift = np.asarray(returns, dtype=np.float64) / 100 / 365 * elapsed_days
+    shock = rng.standard_normal(len(current)) * INVESTMENT_DAILY_VOLATILITY * np.sqrt(elapsed_days)
+    updated = np.maximum(current * (1 + drift + shock * np.asarray(risks, dtype=np.float64)), 0.0).round(2)
+
+    investment_sets: Dict[int, Dict[str, Any]] = {}
+    investment_guards: Dict[int, Dict[str, Any]] = {}
+    for row, position, inv_id, value in zip(owners, positions, investment_ids, updated.tolist()):
+        investment_sets.setdefault(row, {})[f"investments.{position}.current_value"] = value
+        # Skip the update if the array shifted since it was read (withdrawal mid-tick)
+        investment_guards.setdefault(row, {})[f"investments.{position}.id"] = inv_id
+
+    updates = []
+    for row, player in enumerate(players):
+        fields = {
+            "economy.income_carry": float(carry[row]),
+            "economy.daily_income": float(daily_income[row]),
+            "economy.last_income": int(paid[row]),
+            "economy.last_tick_at": now,
+            **investment_sets.get(row, {}),
+        }
+        update: Dict[str, Any] = {"$set": fields}
+        if paid[row]:
+            update["$inc"] = {"currencies.credits": int(paid[row])}
+        updates.append(UpdateOne({"_id": player["_id"], **investment_guards.get(row, {})}, update))
+
+    return updates, {
+        "players": n,
+        "property_income": int(paid.sum()),
+        "investment_accrual": float((updated - current).sum()),
+    }
+
+
+def accrue_dividends(
+    portfolios: List[Dict[str, Any]],
+    tickers: List[str],
+    daily_dividend_per_share: np.ndarray,
+    elapsed_days: float
+) -> Tuple[List[UpdateOne], List[UpdateOne], int]:
+    """Compute one tick of stock dividends for a chunk of portfolios.
+
+    Returns (player credit updates, portfolio updates, total paid).
+    """
+    n = len(portfolios)
+    if not n:
+        return [], [], 0
+
+    holdings = np.array(
+        [[max((portfolio.get("holdings") or {}).get(ticker, 0), 0) for ticker in tickers] for portfolio in portfolios],
+        dtype=np.float64
+    ).reshape(n, len(tickers))
+    carry = np.fromiter((portfolio.get("dividend_carry", 0.0) for portfolio in portfolios), dtype=np.float64, count=n)
+    paid, carry = _payout(holdings @ daily_dividend_per_share * elapsed_days, carry)
+
+    player_updates = []
+    portfolio_updates = []
+    for row, portfolio in enumerate(portfolios):
+        update: Dict[str, Any] = {"$set": {"dividend_carry": float(carry[row])}}
+        if paid[row]:
+            update["$inc"] = {"dividends_paid": int(paid[row])}
+            player_updates.append(UpdateOne(
+                {"_id": portfolio["player_id"]},
+                {"$inc": {"currencies.credits": int(paid[row])}}
+            ))
+        portfolio_updates.append(UpdateOne({"_id": portfolio["_id"]}, update))
+
+    return player_updates, portfolio_updates, int(paid.sum())
+
+
+class EconomyTickEngine:
+    """Runs the periodic economy tick over every player.
+
+    Players and stock portfolios are streamed in chunks; each chunk is
+    computed over numpy arrays and written back with one unordered
+    ``bulk_write``. Per-tick totals are stored in ``economy_ticks``, so reads
+    (portfolio values, income summaries) only look up stored fields. Each
+    tick slot is claimed in ``job_claims`` first, so however many workers
+    fire the tick, it pays out once per slot.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, chunk_size: int = DEFAULT_CHUNK_SIZE, seed: Optional[int] = None):
+        self.db = db
+        self.players = db.players
+        self.portfolios = db.portfolios
+        self.stocks = db.stocks
+        self.ticks = db.economy_ticks
+        self.claims = db.job_claims
+        self.chunk_size = chunk_size
+        self.rng = np.random.default_rng(seed)
+
+    async def ensure_indexes(self):
+        """Create the index used to find the previous tick"""
+        await self.ticks.create_index([("started_at", -1)])
+
+    async def _elapsed_days(self, now: datetime) -> float:
+        previous = await self.ticks.find_one({}, projection={"started_at": 1}, sort=[("started_at", -1)])
+        elapsed = now - previous["started_at"] if previous else TICK_INTERVAL
+        elapsed = min(max(elapsed, timedelta(0)), MAX_TICK_ELAPSED)
+        return elapsed.total_seconds() / 86400
+
+    async def claim_tick(self, now: datetime) -> bool:
+        """Claim the tick slot containing ``now``; False if it was already claimed"""
+        slot = tick_slot(now)
+        try:
+            await self.claims.update_one(
+                {"_id": "economy_tick", "slot": {"$lt": slot}},
+                {"$set": {"slot": slot, "claimed_at": now}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Another worker already claimed this slot (or a later one)
+            return False
+        return True
+
+    async def run_tick(self, now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """Pay out one tick to every player; returns the tick totals, or None if already run"""
+        started = time.perf_counter()
+        now = now or datetime.utcnow()
+        if not await self.claim_tick(now):
+            logger.info(f"Economy tick for {tick_slot(now):%Y-%m-%d %H:%M} already claimed")
+            return None
+        elapsed_days = await self._elapsed_days(now)
+
+        totals = {"players": 0, "property_income": 0, "investment_accrual": 0.0, "portfolios": 0, "dividends": 0}
+
+        cursor = self.players.find(
+            {"$or": [{"properties.0": {"$exists": True}}, {"investments.0": {"$exists": True}}]},
+            projection=PLAYER_ECONOMY_FIELDS
+        ).batch_size(self.chunk_size)
+        chunk: List[Dict[str, Any]] = []
+        async for player in cursor:
+            chunk.append(player)
+            if len(chunk) >= self.chunk_size:
+                await self._apply_player_chunk(chunk, elapsed_days, now, totals)
+                chunk = []
+        if chunk:
+            await self._apply_player_chunk(chunk, elapsed_days, now, totals)
+
+        tickers, per_share = await self._daily_dividend_per_share()
+        cursor = self.portfolios.find(
+            {}, projection={"player_id": 1, "holdings": 1, "dividend_carry": 1}
+        ).batch_size(self.chunk_size)
+        chunk = []
+        async for portfolio in cursor:
+            chunk.append(portfolio)
+            if len(chunk) >= self.chunk_size:
+                await self._apply_dividend_chunk(chunk, tickers, per_share, elapsed_days, totals)
+                chunk = []
+        if chunk:
+            await self._apply_dividend_chunk(chunk, tickers, per_share, elapsed_days, totals)
+
+        duration = time.perf_counter() - started
+        tick = {
+            "_id": str(uuid.uuid4()),
+            "started_at": now,
+            "elapsed_days": elapsed_days,
+            "duration_ms": round(duration * 1000, 2),
+            **totals,
+        }
+        await self.ticks.insert_one(tick)
+        metrics_collector.record_job("economy_tick", duration, items=totals["players"], **totals)
+
+        if duration > TICK_TIME_BUDGET_SECONDS:
+            logger.warning(f"Economy tick took {duration:.1f}s (budget {TICK_TIME_BUDGET_SECONDS:.0f}s)")
+        return tick
+
+    async def _daily_dividend_per_share(self) -> Tuple[List[str], np.ndarray]:
+        prices = {
+            stock["ticker"]: stock["price"]
+            async for stock in self.stocks.find({}, projection={"ticker": 1, "price": 1})
+        }
+        tickers = list(StockMarketService.COMPANIES)
+        per_share = np.array([
+            prices.get(ticker, company["base_price"]) * company.get("dividend_yield", 0.0) / 365
+            for ticker, company in StockMarketService.COMPANIES.items()
+        ], dtype=np.float64)
+        return tickers, per_share
+
+    async def _apply_player_chunk(self, chunk, elapsed_days, now, totals):
+        updates, chunk_totals = accrue_players(chunk, elapsed_days, now, self.rng)
+        if updates:
+            await self.players.bulk_write(updates, ordered=False)
+        for key, value in chunk_totals.items():
+            totals[key] += value
+
+    async def _apply_dividend_chunk(self, chunk, tickers, per_share, elapsed_days, totals):
+        player_updates, portfolio_updates, paid = accrue_dividends(chunk, tickers, per_share, elapsed_days)
+        if player_updates:
+            await self.players.bulk_write(player_updates, ordered=False)
+        if portfolio_updates:
+            await self.portfolios.bulk_write(portfolio_updates, ordered=False)
+        totals["portfolios"] += len(chunk)
+        totals["dividends"] += paid
@@ -24,7 +24,7 @@ class TransactionService:
         metadata: Dict[str, Any] = None
     ) -> str:
         """Create a transaction record."""
-        db = await get_database()
+        db = get_database()
 
         transaction_id = str(uuid.uuid4())
 
@@ -50,15 +50,22 @@ class TransactionService:
         transaction_id: str
     ) -> Dict[str, Any]:
         """Execute a pending transaction."""
-        db = await get_database()
+        db = get_database()
 
-        transaction = await db.transactions.find_one({"transaction_id": transaction_id})
+        # Claim the transaction so it can only be executed once
+        transaction = await db.transactions.find_one_and_update(
+            {"transaction_id": transaction_id, "status": "pending"},
+            {"$set": {"status": "processing"}}
+        )
 
         if not transaction:
-            raise ValueError("Transaction not found")
-
-        if transaction["status"] != "pending":
-            raise ValueError(f"Transaction already {transaction['status']}")
+            existing = await db.transactions.find_one(
+                {"transaction_id": transaction_id},
+                projection={"status": 1}
+            )
+            if not existing:
+                raise ValueError("Transaction not found")
+            raise ValueError(f"Transaction already {existing['status']}")
 
         try:
             # Execute based on type
@@ -117,7 +124,7 @@ class TransactionService:
         transaction_id: str
     ) -> Dict[str, Any]:
         """Cancel a pending transaction."""
-        db = await get_database()
+        db = get_database()
 
         result = await db.transactions.update_one(
             {"transaction_id": transaction_id, "status": "pending"},
@@ -139,7 +146,7 @@ class TransactionService:
         transaction_id: str
     ) -> Dict[str, Any]:
         """Get transaction status."""
-        db = await get_database()
+        db = get_database()
 
         transaction = await db.transactions.find_one({"transaction_id": transaction_id})
 
@@ -1,5 +1,6 @@
 from .management import GuildManagementService
+from .membership import GuildMembershipService
 from .territories import TerritoryService
 from .wars import GuildWarService
 
-__all__ = ["GuildManagementService", "TerritoryService", "GuildWarService"]
+__all__ = ["GuildManagementService", "GuildMembershipService", "TerritoryService", "GuildWarService"]
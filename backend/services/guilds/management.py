@@ -1,6 +1,7 @@
 from typing import Optional, List
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from backend.models.guilds.guild import Guild, GuildMember, GuildRank
+from backend.models.guilds.guild import Guild, GuildRank
+from backend.services.guilds.membership import GuildMembershipService
 
 
 class GuildManagementService:
@@ -8,25 +9,33 @@ class GuildManagementService:
         self.db = db
         self.guilds = db.guilds
         self.players = db.players
+        self.membership = GuildMembershipService(db)
 
     async def create_guild(self, name: str, tag: str, description: str, leader_id: str) -> Guild:
         """Create a new guild"""
         # Check if tag is unique
-        existing = await self.guilds.find_one({"tag": tag})
+        existing = await self.guilds.find_one({"tag": tag}, projection={"_id": 1})
         if existing:
             raise ValueError("Guild tag already exists")
 
-        # Create guild
+        # Create guild; the leader's slot is added through the membership store
         guild = Guild(
             name=name,
             tag=tag,
             description=description,
             leader_id=leader_id,
-            members=[GuildMember(player_id=leader_id, rank=GuildRank.LEADER)],
-            total_members=1
+            total_members=0
         )
 
         await self.guilds.insert_one(guild.model_dump())
+        try:
+            await self.membership.add_member(guild.id, leader_id, GuildRank.LEADER, enforce_capacity=False)
+        except Exception:
+            # The leader is already in a guild; don't leave an empty one behind
+            await self.guilds.delete_one({"id": guild.id})
+            raise
+        guild.total_members = 1
+        guild.rank_counts = {GuildRank.LEADER.value: 1}
 
         # Update player's guild
         await self.players.update_one(
@@ -41,28 +50,16 @@ class GuildManagementService:
 
     async def join_guild(self, guild_id: str, player_id: str) -> bool:
         """Player joins a guild"""
-        guild = await self.guilds.find_one({"id": guild_id})
+        guild = await self._get_guild_summary(guild_id)
         if not guild:
             raise ValueError("Guild not found")
 
-        # Check if guild is full
-        if guild.get("total_members", 0) >= guild.get("max_members", 50):
-            raise ValueError("Guild is full")
-
         # Check if recruitment is open
         if not guild.get("recruitment_open", True):
             raise ValueError("Guild recruitment is closed")
 
-        # Add member
-        new_member = GuildMember(player_id=player_id, rank=GuildRank.RECRUIT)
-
-        await self.guilds.update_one(
-            {"id": guild_id},
-            {
-                "$push": {"members": new_member.model_dump()},
-                "$inc": {"total_members": 1}
-            }
-        )
+        # Capacity is checked atomically against the member counter
+        await self.membership.add_member(guild_id, player_id, GuildRank.RECRUIT)
 
         # Update player
         await self.players.update_one(
@@ -77,7 +74,7 @@ class GuildManagementService:
 
     async def leave_guild(self, guild_id: str, player_id: str) -> bool:
         """Player leaves guild"""
-        guild = await self.guilds.find_one({"id": guild_id})
+        guild = await self._get_guild_summary(guild_id)
         if not guild:
             raise ValueError("Guild not found")
 
@@ -87,13 +84,7 @@ class GuildManagementService:
                 "Leader must transfer leadership or disband guild")
 
         # Remove member
-        await self.guilds.update_one(
-            {"id": guild_id},
-            {
-                "$pull": {"members": {"player_id": player_id}},
-                "$inc": {"total_members": -1}
-            }
-        )
+        await self.membership.remove_member(guild_id, player_id)
 
         # Update player
         await self.players.update_one(
@@ -105,16 +96,12 @@ class GuildManagementService:
 
     async def kick_member(self, guild_id: str, player_id: str, kicker_id: str) -> bool:
         """Kick a member from guild"""
-        guild = await self.guilds.find_one({"id": guild_id})
+        guild = await self._get_guild_summary(guild_id)
         if not guild:
             raise ValueError("Guild not found")
 
         # Check permissions (only leader and officers can kick)
-        kicker_member = next(
-            (m for m in guild.get("members", [])
-             if m.get("player_id") == kicker_id),
-            None
-        )
+        kicker_member = await self.membership.get_member(guild_id, kicker_id)
 
         if not kicker_member or kicker_member.get("rank") not in ["leader", "officer"]:
             raise ValueError("Insufficient permissions")
@@ -124,13 +111,8 @@ class GuildManagementService:
             raise ValueError("Cannot kick the leader")
 
         # Remove member
-        await self.guilds.update_one(
-            {"id": guild_id},
-            {
-                "$pull": {"members": {"player_id": player_id}},
-                "$inc": {"total_members": -1}
-            }
-        )
+        if not await self.membership.remove_member(guild_id, player_id):
+            raise ValueError("Player is not a member of this guild")
 
         # Update player
         await self.players.update_one(
@@ -142,7 +124,7 @@ class GuildManagementService:
 
     async def promote_member(self, guild_id: str, player_id: str, new_rank: GuildRank, promoter_id: str) -> bool:
         """Promote/demote a member"""
-        guild = await self.guilds.find_one({"id": guild_id})
+        guild = await self._get_guild_summary(guild_id)
         if not guild:
             raise ValueError("Guild not found")
 
@@ -155,10 +137,8 @@ class GuildManagementService:
             raise ValueError("Use transfer_leadership for this")
 
         # Update member rank
-        await self.guilds.update_one(
-            {"id": guild_id, "members.player_id": player_id},
-            {"$set": {"members.$.rank": new_rank.value}}
-        )
+        if not await self.membership.set_rank(guild_id, player_id, new_rank):
+            raise ValueError("Player is not a member of this guild")
 
         # Update player
         await self.players.update_one(
@@ -171,7 +151,7 @@ class GuildManagementService:
     async def contribute_to_bank(self, guild_id: str, player_id: str, credits: int) -> bool:
         """Contribute credits to guild bank"""
         # Check player has enough credits
-        player = await self.players.find_one({"_id": player_id})
+        player = await self.players.find_one({"_id": player_id}, projection={"currencies.credits": 1})
         if not player or player.get("currencies", {}).get("credits", 0) < credits:
             raise ValueError("Insufficient credits")
 
@@ -187,28 +167,54 @@ class GuildManagementService:
         )
 
         # Update member contribution
-        await self.guilds.update_one(
-            {"id": guild_id, "members.player_id": player_id},
-            {"$inc": {"members.$.contribution": credits}}
-        )
+        await self._ensure_migrated(guild_id)
+        await self.membership.add_contribution(guild_id, player_id, credits)
 
         return True
 
-    async def get_guild(self, guild_id: str) -> Optional[dict]:
-        """Get guild by ID"""
-        return await self.guilds.find_one({"id": guild_id})
+    async def get_guild(
+        self,
+        guild_id: str,
+        include_members: bool = False,
+        member_sort: str = "rank",
+        member_page: int = 1,
+        member_page_size: int = 50
+    ) -> Optional[dict]:
+        """Get guild by ID; members are only loaded when asked for"""
+        guild = await self._get_guild_summary(guild_id)
+        if not guild:
+            return None
+
+        if include_members:
+            guild["roster"] = await self.membership.get_roster(
+                guild_id, sort=member_sort, page=member_page, page_size=member_page_size
+            )
+        return guild
 
     async def list_guilds(self, skip: int = 0, limit: int = 20) -> List[dict]:
         """List all guilds"""
-        cursor = self.guilds.find({}).skip(skip).limit(limit)
+        cursor = self.guilds.find({}, projection={"members": 0}).skip(skip).limit(limit)
         return await cursor.to_list(length=limit)
 
-    async def get_guild_members(self, guild_id: str) -> List[dict]:
-        """Get all guild members with player details"""
-        guild = await self.guilds.find_one({"id": guild_id})
-        if not guild:
-            return []
+    async def get_guild_members(
+        self,
+        guild_id: str,
+        sort: str = "rank",
+        page: int = 1,
+        page_size: int = 50
+    ) -> dict:
+        """Get one page of guild members with player details"""
+        await self._ensure_migrated(guild_id)
+        return await self.membership.get_roster(guild_id, sort=sort, page=page, page_size=page_size)
+
+    async def _get_guild_summary(self, guild_id: str) -> Optional[dict]:
+        """Fetch the guild without members, migrating legacy embedded members once"""
+        # $slice 0 returns [] for legacy guilds without pulling the array
+        guild = await self.guilds.find_one({"id": guild_id}, projection={"members": {"$slice": 0}})
+        if guild and "members" in guild:
+            await self.membership.migrate_embedded_members(guild_id)
+            guild = await self.guilds.find_one({"id": guild_id}, projection={"members": 0})
+        return guild
 
-        member_ids = [m.get("player_id") for m in guild.get("members", [])]
-        cursor = self.players.find({"_id": {"$in": member_ids}})
-        return await cursor.to_list(length=len(member_ids))
+    async def _ensure_migrated(self, guild_id: str) -> None:
+        await self._get_guild_summary(guild_id)
@@ -0,0 +1,249 @@
+from typing import Optional, Dict, Any
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from backend.models.guilds.guild import GuildMember, GuildRank
+
+# Sort position of each rank in rosters (leader first)
+RANK_ORDER = {
+    GuildRank.LEADER.value: 0,
+    GuildRank.OFFICER.value: 1,
+    GuildRank.VETERAN.value: 2,
+    GuildRank.MEMBER.value: 3,
+    GuildRank.RECRUIT.value: 4,
+}
+
+ROSTER_SORTS = {
+    "rank": [("rank_order", ASCENDING), ("joined_at", ASCENDING)],
+    "contribution": [("contribution", DESCENDING), ("joined_at", ASCENDING)],
+    "joined": [("joined_at", ASCENDING)],
+}
+
+# Public player fields shown next to roster entries
+ROSTER_PLAYER_FIELDS = {
+    "username": 1,
+    "level": 1,
+    "karma_points": 1,
+    "economic_class": 1,
+    "moral_class": 1,
+    "online": 1,
+}
+
+MAX_PAGE_SIZE = 100
+
+
+class GuildMembershipService:
+    """Guild membership stored out-of-document in ``guild_members``.
+
+    One document per (guild, player) keeps guild documents small no matter
+    how many members a guild has. The guild keeps denormalized counters
+    (``total_members`` and ``rank_counts``) that are updated together
+    with membership changes.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.members = db.guild_members
+        self.guilds = db.guilds
+        self.players = db.players
+
+    async def ensure_indexes(self):
+        """Create roster and lookup indexes"""
+        # A player belongs to at most one guild
+        await self.members.create_index("player_id", unique=True)
+        await self.members.create_index([("guild_id", ASCENDING), ("rank_order", ASCENDING), ("joined_at", ASCENDING)])
+        await self.members.create_index([("guild_id", ASCENDING), ("contribution", DESCENDING), ("joined_at", ASCENDING)])
+        await self.members.create_index([("guild_id", ASCENDING), ("joined_at", ASCENDING)])
+
+    @staticmethod
+    def _member_doc(guild_id: str, member: GuildMember) -> Dict[str, Any]:
+        doc = member.model_dump(mode="python")
+        rank = member.rank.value if isinstance(member.rank, GuildRank) else member.rank
+        doc.update({
+            "_id": f"{guild_id}:{member.player_id}",
+            "guild_id": guild_id,
+            "rank": rank,
+            "rank_order": RANK_ORDER.get(rank, len(RANK_ORDER)),
+        })
+        return doc
+
+    async def add_member(
+        self,
+        guild_id: str,
+        player_id: str,
+        rank: GuildRank = GuildRank.RECRUIT,
+        enforce_capacity: bool = True
+    ) -> dict:
+        """Add a member, reserving a slot on the guild's counter first"""
+        guild_filter = {"id": guild_id}
+        if enforce_capacity:
+            guild_filter["$expr"] = {"$lt": ["$total_members", {"$ifNull": ["$max_members", 50]}]}
+
+        reserved = await self.guilds.update_one(
+            guild_filter,
+            {"$inc": {"total_members": 1, f"rank_counts.{rank.value}": 1}}
+        )
+        if not reserved.matched_count:
+            raise ValueError("Guild is full")
+
+        member = self._member_doc(guild_id, GuildMember(player_id=player_id, rank=rank))
+        try:
+            await self.members.insert_one(member)
+        except DuplicateKeyError:
+            # Release the reserved slot
+            await self.guilds.update_one(
+                {"id": guild_id},
+                {"$inc": {"total_members": -1, f"rank_counts.{rank.value}": -1}}
+            )
+            raise ValueError("Player is already in a guild")
+
+        return member
+
+    async def remove_member(self, guild_id: str, player_id: str) -> bool:
+        """Remove a member and release their slot"""
+        removed = await self.members.find_one_and_delete(
+            {"_id": f"{guild_id}:{player_id}"},
+            projection={"rank": 1}
+        )
+        if not removed:
+            return False
+
+        await self.guilds.update_one(
+            {"id": guild_id},
+            {"$inc": {"total_members": -1, f"rank_counts.{removed['rank']}": -1}}
+        )
+        return True
+
+    async def set_rank(self, guild_id: str, player_id: str, new_rank: GuildRank) -> bool:
+        """Change a member's rank and move the rank counters"""
+        previous = await self.members.find_one_and_update(
+            {"_id": f"{guild_id}:{player_id}"},
+            {"$set": {"rank": new_rank.value, "rank_order": RANK_ORDER[new_rank.value]}},
+            projection={"rank": 1}
+        )
+        if not previous:
+            return False
+
+        if previous["rank"] != new_rank.value:
+            await self.guilds.update_one(
+                {"id": guild_id},
+                {"$inc": {
+                    f"rank_counts.{previous['rank']}": -1,
+                    f"rank_counts.{new_rank.value}": 1
+                }}
+            )
+        return True
+
+    async def add_contribution(self, guild_id: str, player_id: str, amount: int) -> bool:
+        """Credit a member's contribution and the guild total"""
+        result = await self.members.update_one(
+            {"_id": f"{guild_id}:{player_id}"},
+            {"$inc": {"contribution": amount}}
+        )
+        if result.modified_count:
+            await self.guilds.update_one(
+                {"id": guild_id},
+                {"$inc": {"total_contribution": amount}}
+            )
+        return bool(result.modified_count)
+
+    async def get_member(self, guild_id: str, player_id: str) -> Optional[dict]:
+        """Get one membership record by its primary key"""
+        return await self.members.find_one({"_id": f"{guild_id}:{player_id}"})
+
+    async def get_roster(
+        self,
+        guild_id: str,
+        sort: str = "rank",
+        page: int = 1,
+        page_size: int = 50,
+        with_players: bool = True
+    ) -> Dict[str, Any]:
+        """Get one sorted page of a guild's roster"""
+        if sort not in ROSTER_SORTS:
+            raise ValueError(f"Unknown roster sort: {sort}")
+
+        page = max(page, 1)
+        page_size = max(1, min(page_size, MAX_PAGE_SIZE))
+
+        cursor = self.members.find(
+            {"guild_id": guild_id},
+            projection={"_id": 0, "rank_order": 0}
+        ).sort(ROSTER_SORTS[sort]).skip((page - 1) * page_size).limit(page_size)
+        entries = await cursor.to_list(length=page_size)
+
+        if with_players and entries:
+            player_ids = [entry["player_id"] for entry in entries]
+            players = {
+                player["_id"]: player
+                async for player in self.players.find(
+                    {"_id": {"$in": player_ids}},
+                    projection=ROSTER_PLAYER_FIELDS
+                )
+            }
+            for entry in entries:
+                player = players.get(entry["player_id"], {})
+                entry.update({k: player.get(k) for k in ROSTER_PLAYER_FIELDS})
+
+        guild = await self.guilds.find_one({"id": guild_id}, projection={"total_members": 1})
+        total = guild.get("total_members", 0) if guild else 0
+
+        return {
+            "guild_id": guild_id,
+            "members": entries,
+            "page": page,
+            "page_size": page_size,
+            "total": total,
+            "has_more": page * page_size < total
+        }
+
+    async def migrate_embedded_members(self, guild_id: str) -> int:
+        """Move a legacy embedded ``members`` array into ``guild_members``.
+
+        Called lazily when a guild that still has the array is touched.
+        Returns the number of members this call moved.
+        """
+        guild = await self.guilds.find_one(
+            {"id": guild_id, "members": {"$exists": True}},
+            projection={"members": 1}
+        )
+        if not guild:
+            return 0
+
+        docs = [
+            self._member_doc(guild_id, GuildMember(**member))
+            for member in guild.get("members", [])
+        ]
+        inserted = 0
+        if docs:
+            try:
+                inserted = len((await self.members.insert_many(docs, ordered=False)).inserted_ids)
+            except BulkWriteError as e:
+                # Some members were migrated by a concurrent request, or already
+                # belong to another guild; neither counts twice below
+                inserted = e.details.get("nInserted", 0)
+
+        # Counters come from what guild_members actually holds for the guild
+        rank_counts: Dict[str, int] = {}
+        total_members = 0
+        total_contribution = 0
+        async for row in self.members.aggregate([
+            {"$match": {"guild_id": guild_id}},
+            {"$group": {"_id": "$rank", "count": {"$sum": 1}, "contribution": {"$sum": "$contribution"}}}
+        ]):
+            rank_counts[row["_id"]] = row["count"]
+            total_members += row["count"]
+            total_contribution += row["contribution"]
+
+        await self.guilds.update_one(
+            {"id": guild_id},
+            {
+                "$unset": {"members": ""},
+                "$set": {
+                    "total_members": total_members,
+                    "rank_counts": rank_counts,
+                    "total_contribution": total_contribution
+                }
+            }
+        )
+        return inserted
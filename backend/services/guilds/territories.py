@@ -1,10 +1,25 @@
+import asyncio
+import random
 from datetime import datetime
 from typing import Optional, List
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
 from backend.models.guilds.territory import Territory, TERRITORIES
 
+MAX_CAPTURE_ATTEMPTS = 5
+CAPTURE_BACKOFF_SECONDS = 0.02
+TERRITORY_STATE_FIELDS = {
+    "territory_id": 1,
+    "controlling_guild_id": 1,
+    "defense_level": 1,
+    "version": 1
+}
+
 
 class TerritoryService:
+    # Learned on first use; None until a transaction has been attempted
+    _transactions_supported: Optional[bool] = None
+
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.territories = db.territories
@@ -34,97 +49,167 @@ class TerritoryService:
 
     async def capture_territory(self, territory_id: int, guild_id: str) -> bool:
         """Capture a territory"""
-        territory = await self.territories.find_one({"territory_id": territory_id})
-        if not territory:
-            raise ValueError("Territory not found")
-
-        # Check if already controlled
-        if territory.get("controlling_guild_id") == guild_id:
-            raise ValueError("Already controlling this territory")
-
-        # Remove from previous controller
-        old_controller = territory.get("controlling_guild_id")
-        if old_controller:
-            await self.guilds.update_one(
-                {"id": old_controller},
-                {"$pull": {"controlled_territories": territory_id}}
+        for attempt in range(MAX_CAPTURE_ATTEMPTS):
+            territory = await self.territories.find_one(
+                {"territory_id": territory_id},
+                projection=TERRITORY_STATE_FIELDS
             )
+            if not territory:
+                raise ValueError("Territory not found")
 
-        # Update territory
-        await self.territories.update_one(
-            {"territory_id": territory_id},
-            {
-                "$set": {
-                    "controlling_guild_id": guild_id,
-                    "controlled_since": datetime.utcnow(),
-                    "contested": False,
-                    "last_attacked": datetime.utcnow()
-                }
-            }
-        )
+            # Check if already controlled
+            if territory.get("controlling_guild_id") == guild_id:
+                raise ValueError("Already controlling this territory")
 
-        # Add to new controller
-        await self.guilds.update_one(
-            {"id": guild_id},
-            {"$addToSet": {"controlled_territories": territory_id}}
-        )
+            if await self._change_owner(territory, guild_id):
+                return True
+            await self._backoff(attempt)
 
-        return True
+        raise ValueError("Territory is heavily contested, try again")
 
     async def attack_territory(self, territory_id: int, attacker_guild_id: str) -> dict:
         """Initiate territory attack"""
-        territory = await self.territories.find_one({"territory_id": territory_id})
-        if not territory:
-            raise ValueError("Territory not found")
-
-        defender_guild_id = territory.get("controlling_guild_id")
-        if not defender_guild_id:
-            # Unclaimed territory, capture directly
-            await self.capture_territory(territory_id, attacker_guild_id)
-            return {"success": True, "message": "Territory captured without resistance"}
+        for attempt in range(MAX_CAPTURE_ATTEMPTS):
+            territory = await self.territories.find_one(
+                {"territory_id": territory_id},
+                projection=TERRITORY_STATE_FIELDS
+            )
+            if not territory:
+                raise ValueError("Territory not found")
 
-        if defender_guild_id == attacker_guild_id:
-            raise ValueError("Cannot attack your own territory")
+            defender_guild_id = territory.get("controlling_guild_id")
+            if not defender_guild_id:
+                # Unclaimed territory, capture directly
+                if await self._change_owner(territory, attacker_guild_id):
+                    return {"success": True, "message": "Territory captured without resistance"}
+                await self._backoff(attempt)
+                continue
 
-        # Mark as contested
-        await self.territories.update_one(
-            {"territory_id": territory_id},
-            {
-                "$set": {
-                    "contested": True,
-                    "last_attacked": datetime.utcnow()
-                }
-            }
-        )
+            if defender_guild_id == attacker_guild_id:
+                raise ValueError("Cannot attack your own territory")
 
-        # Determine outcome (simplified - can be enhanced with more complex logic)
-        attacker_guild = await self.guilds.find_one({"id": attacker_guild_id})
-        defender_guild = await self.guilds.find_one({"id": defender_guild_id})
-
-        attacker_power = attacker_guild.get(
-            "level", 1) * attacker_guild.get("total_members", 1)
-        defender_power = (defender_guild.get("level", 1) * defender_guild.get("total_members", 1) *
-                         territory.get("defense_level", 1))
-
-        if attacker_power > defender_power:
-            await self.capture_territory(territory_id, attacker_guild_id)
-            return {
-                "success": True,
-                "message": "Territory captured!",
-                "attacker_power": attacker_power,
-                "defender_power": defender_power
-            }
-        else:
+            # Mark as contested
             await self.territories.update_one(
                 {"territory_id": territory_id},
-                {"$set": {"contested": False}}
+                {
+                    "$set": {
+                        "contested": True,
+                        "last_attacked": datetime.utcnow()
+                    }
+                }
             )
-            return {
-                "success": False,
-                "message": "Attack repelled!",
-                "attacker_power": attacker_power,
-                "defender_power": defender_power
+
+            # Determine outcome (simplified - can be enhanced with more complex logic)
+            guilds = {
+                guild["id"]: guild
+                async for guild in self.guilds.find(
+                    {"id": {"$in": [attacker_guild_id, defender_guild_id]}},
+                    projection={"id": 1, "level": 1, "total_members": 1}
+                )
             }
+            attacker_guild = guilds.get(attacker_guild_id, {})
+            defender_guild = guilds.get(defender_guild_id, {})
+
+            attacker_power = attacker_guild.get(
+                "level", 1) * attacker_guild.get("total_members", 1)
+            defender_power = (defender_guild.get("level", 1) * defender_guild.get("total_members", 1) *
+                             territory.get("defense_level", 1))
+
+            if attacker_power > defender_power:
+                # Only wins against the owner we evaluated; otherwise re-evaluate
+                if not await self._change_owner(territory, attacker_guild_id):
+                    await self._backoff(attempt)
+                    continue
+                return {
+                    "success": True,
+                    "message": "Territory captured!",
+                    "attacker_power": attacker_power,
+                    "defender_power": defender_power
+                }
+            else:
+                await self.territories.update_one(
+                    {"territory_id": territory_id, "version": self._version_filter(territory)},
+                    {"$set": {"contested": False}}
+                )
+                return {
+                    "success": False,
+                    "message": "Attack repelled!",
+                    "attacker_power": attacker_power,
+                    "defender_power": defender_power
+                }
+
+        raise ValueError("Territory is heavily contested, try again")
+
+    @staticmethod
+    def _version_filter(territory: dict):
+        """Match the version that was read; legacy documents have no version yet"""
+        version = territory.get("version", 0)
+        return version if version else {"$in": [0, None]}
+
+    async def _change_owner(self, territory: dict, new_guild_id: str) -> bool:
+        """Compare-and-swap territory ownership against the version that was read.
+
+        The territory update and both guilds' controlled_territories updates run
+        in one transaction when the deployment supports it.
+        """
+        territory_id = territory["territory_id"]
+        old_guild_id = territory.get("controlling_guild_id")
+        now = datetime.utcnow()
+
+        async def apply(session=None) -> bool:
+            result = await self.territories.update_one(
+                {"territory_id": territory_id, "version": self._version_filter(territory)},
+                {
+                    "$set": {
+                        "controlling_guild_id": new_guild_id,
+                        "controlled_since": now,
+                        "contested": False,
+                        "last_attacked": now
+                    },
+                    "$inc": {"version": 1}
+                },
+                session=session
+            )
+            if not result.modified_count:
+                return False
+
+            # Remove from previous controller
+            if old_guild_id:
+                await self.guilds.update_one(
+                    {"id": old_guild_id},
+                    {"$pull": {"controlled_territories": territory_id}},
+                    session=session
+                )
+
+            # Add to new controller
+            await self.guilds.update_one(
+                {"id": new_guild_id},
+                {"$addToSet": {"controlled_territories": territory_id}},
+                session=session
+            )
+            return True
+
+        return await self._run_transaction(apply)
+
+    async def _run_transaction(self, apply):
+        """Run ``apply`` in a transaction, or directly on deployments without them"""
+        if TerritoryService._transactions_supported is not False:
+            try:
+                async with await self.db.client.start_session() as session:
+                    result = await session.with_transaction(apply)
+                TerritoryService._transactions_supported = True
+                return result
+            except OperationFailure as e:
+                # IllegalOperation: standalone servers have no transactions
+                if e.code != 20:
+                    raise
+                TerritoryService._transactions_supported = False
+        return await apply()
+
+    @staticmethod
+    async def _backoff(attempt: int):
+        """Jittered backoff so losing attackers don't retry in lockstep"""
+        await asyncio.sleep(random.uniform(0, CAPTURE_BACKOFF_SECONDS * (attempt + 1)))
 
     async def defend_territory(self, territory_id: int, guild_id: str) -> bool:
         """Defend territory (upgrade defense)"""
@@ -1,14 +1,163 @@
+import asyncio
+import logging
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Dict, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from backend.models.guilds.war import GuildWar, WarStatus
 
+logger = logging.getLogger(__name__)
+
+# First guild to reach this many points wins
+WAR_VICTORY_POINTS = 1000
+# Contributions to the same war within one window are written as a single $inc
+WAR_POINT_FLUSH_INTERVAL = 0.25
+# Longest wait between retries while MongoDB keeps rejecting a flush
+WAR_POINT_MAX_RETRY_INTERVAL = 5.0
+
+
+class WarPointAccumulator:
+    """Coalesces war point contributions in memory and applies them in batches.
+
+    Contributions are summed per war and side for a short window, then written
+    as one ``$inc`` per war in an unordered bulk write, so busy wars don't
+    serialize on a single document. Points still count while peace is being
+    negotiated; points for wars that have ended are dropped by the status
+    filter, and victory goes through the conditional status transition in
+    ``GuildWarService.end_war``, so a war ends only once. A flush that fails
+    puts its points back, and the flush loop keeps running until nothing is
+    pending, so points added mid-flush are never stranded.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, flush_interval: float = WAR_POINT_FLUSH_INTERVAL):
+        self.db = db
+        self.wars = db.guild_wars
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, Dict[str, int]] = {}
+        # war_id -> (attacker_guild_id, defender_guild_id); sides never change
+        self._sides: Dict[str, Tuple[str, str]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+
+    async def add(self, war_id: str, guild_id: str, points: int) -> None:
+        """Queue points for a guild; they are applied on the next flush"""
+        field = await self._points_field(war_id, guild_id)
+        pending = self._pending.setdefault(war_id, {})
+        pending[field] = pending.get(field, 0) + points
+
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def flush(self) -> List[str]:
+        """Apply pending contributions; returns ids of wars that were won"""
+        async with self._flush_lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return []
+
+            writes = [
+                UpdateOne({"id": war_id, "status": {"$ne": WarStatus.ENDED.value}}, {"$inc": increments})
+                for war_id, increments in pending.items()
+            ]
+            try:
+                await self.wars.bulk_write(writes, ordered=False)
+            except BulkWriteError as e:
+                failed = {error["index"] for error in e.details.get("writeErrors", [])}
+                self._requeue({war_id: pending[war_id] for i, war_id in enumerate(pending) if i in failed})
+                raise
+            except Exception:
+                self._requeue(pending)
+                raise
+
+            finished = await self.wars.find(
+                {
+                    "id": {"$in": list(pending)},
+                    "status": {"$ne": WarStatus.ENDED.value},
+                    "$or": [
+                        {"attacker_points": {"$gte": WAR_VICTORY_POINTS}},
+                        {"defender_points": {"$gte": WAR_VICTORY_POINTS}}
+                    ]
+                },
+                projection={"id": 1, "attacker_guild_id": 1, "defender_guild_id": 1,
+                            "attacker_points": 1, "defender_points": 1}
+            ).to_list(length=None)
+
+        won = []
+        service = GuildWarService(self.db)
+        for war in finished:
+            if war.get("attacker_points", 0) >= war.get("defender_points", 0):
+                winner = war["attacker_guild_id"]
+            else:
+                winner = war["defender_guild_id"]
+            if await service.end_war(war["id"], winner):
+                won.append(war["id"])
+            self._sides.pop(war["id"], None)
+        return won
+
+    def _requeue(self, batch: Dict[str, Dict[str, int]]) -> None:
+        """Merge a batch that wasn't written back into the pending points"""
+        for war_id, increments in batch.items():
+            pending = self._pending.setdefault(war_id, {})
+            for field, points in increments.items():
+                pending[field] = pending.get(field, 0) + points
+
+    async def _flush_later(self):
+        delay = self.flush_interval
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self.flush()
+                delay = self.flush_interval
+            except Exception as e:
+                logger.error(f"Failed to flush war points: {e}")
+                delay = min(delay * 2, WAR_POINT_MAX_RETRY_INTERVAL)
+            # Points added while flushing (or put back after a failure) get another pass
+            if not self._pending:
+                return
+
+    async def _points_field(self, war_id: str, guild_id: str) -> str:
+        sides = self._sides.get(war_id)
+        if sides is None:
+            war = await self.wars.find_one(
+                {"id": war_id},
+                projection={"attacker_guild_id": 1, "defender_guild_id": 1}
+            )
+            if not war:
+                raise ValueError("War not found")
+            sides = (war.get("attacker_guild_id"), war.get("defender_guild_id"))
+            self._sides[war_id] = sides
+
+        if guild_id == sides[0]:
+            return "attacker_points"
+        if guild_id == sides[1]:
+            return "defender_points"
+        raise ValueError("Guild not part of this war")
+
+
+# One accumulator per database, shared by the per-request services
+_accumulators: Dict[Tuple[int, str], WarPointAccumulator] = {}
+
+
+def get_war_point_accumulator(db: AsyncIOMotorDatabase) -> WarPointAccumulator:
+    key = (id(db.client), db.name)
+    if key not in _accumulators:
+        _accumulators[key] = WarPointAccumulator(db)
+    return _accumulators[key]
+
+
+async def flush_war_points() -> None:
+    """Apply every pending contribution (used on shutdown)"""
+    for accumulator in list(_accumulators.values()):
+        await accumulator.flush()
+
 
 class GuildWarService:
     def __init__(self, db: AsyncIOMotorDatabase):
         self.db = db
         self.wars = db.guild_wars
         self.guilds = db.guilds
+        self.points = get_war_point_accumulator(db)
 
     async def declare_war(self, attacker_guild_id: str, defender_guild_id: str, target_territory: Optional[int] = None) -> GuildWar:
         """Declare war on another guild"""
@@ -59,32 +208,16 @@ class GuildWarService:
 
         return war
 
-    async def add_war_points(self, war_id: str, guild_id: str, points: int) -> bool:
-        """Add war points to a guild"""
-        war = await self.wars.find_one({"id": war_id})
-        if not war:
-            raise ValueError("War not found")
-
-        if war.get("attacker_guild_id") == guild_id:
-            await self.wars.update_one(
-                {"id": war_id},
-                {"$inc": {"attacker_points": points}}
-            )
-        elif war.get("defender_guild_id") == guild_id:
-            await self.wars.update_one(
-                {"id": war_id},
-                {"$inc": {"defender_points": points}}
-            )
-        else:
-            raise ValueError("Guild not part of this war")
-
-        # Check if war should end (first to 1000 points wins)
-        updated_war = await self.wars.find_one({"id": war_id})
-        if updated_war.get("attacker_points", 0) >= 1000:
-            await self.end_war(war_id, updated_war.get("attacker_guild_id"))
-        elif updated_war.get("defender_points", 0) >= 1000:
-            await self.end_war(war_id, updated_war.get("defender_guild_id"))
+    async def add_war_points(self, war_id: str, guild_id: str, points: int, flush: bool = False) -> bool:
+        """Add war points to a guild.
 
+        Points are coalesced with other contributions to the same war and
+        applied within ``WAR_POINT_FLUSH_INTERVAL``; pass ``flush`` to apply
+        them (and settle a victory) before returning.
+        """
+        await self.points.add(war_id, guild_id, points)
+        if flush:
+            await self.points.flush()
         return True
 
     async def offer_peace(self, war_id: str, offering_guild_id: str, terms: dict) -> bool:
@@ -138,22 +271,23 @@ class GuildWarService:
         return True
 
     async def end_war(self, war_id: str, winner_guild_id: Optional[str]) -> bool:
-        """End a war"""
-        war = await self.wars.find_one({"id": war_id})
-        if not war:
-            raise ValueError("War not found")
-
-        # Update war
-        await self.wars.update_one(
-            {"id": war_id},
+        """End a war; returns False if it had already ended"""
+        # Conditional transition so concurrent victories/peace end the war once
+        war = await self.wars.find_one_and_update(
+            {"id": war_id, "status": {"$ne": WarStatus.ENDED.value}},
             {
                 "$set": {
                     "status": WarStatus.ENDED.value,
                     "ended_at": datetime.utcnow(),
                     "winner_guild_id": winner_guild_id
                 }
-            }
+            },
+            projection={"attacker_guild_id": 1, "defender_guild_id": 1}
         )
+        if not war:
+            if not await self.wars.count_documents({"id": war_id}, limit=1):
+                raise ValueError("War not found")
+            return False
 
         # Remove from guilds' active wars
         await self.guilds.update_one(
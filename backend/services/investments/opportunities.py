@@ -1,14 +1,18 @@
 from typing import List, Dict, Optional
 
+from ..catalog import get_catalog
+
 
 class InvestmentOpportunities:
     """Manages investment opportunities."""
 
     def __init__(self):
-        self.opportunities = self._initialize_opportunities()
+        self.catalog = get_catalog("investments")
+        self.opportunities = self.catalog.by_id
 
-    def _initialize_opportunities(self) -> Dict[str, Dict]:
-        """Initialize investment opportunities."""
+    @staticmethod
+    def definitions() -> Dict[str, Dict]:
+        """Investment opportunity definitions, loaded once into the investments catalog."""
         return {
             "tech_startup_1": {
                 "id": "tech_startup_1",
@@ -118,7 +122,7 @@ class InvestmentOpportunities:
 
     def get_all_opportunities(self) -> List[Dict]:
         """Get all investment opportunities."""
-        return list(self.opportunities.values())
+        return list(self.catalog.items)
 
     def get_opportunity_by_id(self, opportunity_id: str) -> Optional[Dict]:
         """Get a specific opportunity by ID."""
@@ -126,14 +130,8 @@ class InvestmentOpportunities:
 
     def get_opportunities_by_type(self, investment_type: str) -> List[Dict]:
         """Get opportunities by type."""
-        return [
-            opp for opp in self.opportunities.values()
-            if opp.get("investment_type") == investment_type
-        ]
+        return self.catalog.select(investment_type=investment_type)
 
     def get_opportunities_by_risk(self, risk_level: str) -> List[Dict]:
         """Get opportunities by risk level."""
-        return [
-            opp for opp in self.opportunities.values()
-            if opp.get("risk_level") == risk_level
-        ]
+        return self.catalog.select(risk_level=risk_level)
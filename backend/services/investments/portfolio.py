@@ -1,6 +1,6 @@
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
-import random
+from ...core.database import get_database
 from ...models.player.player import Player
 from ...models.economy.transaction import Transaction
 from .opportunities import InvestmentOpportunities
@@ -13,8 +13,13 @@ class InvestmentService:
         self.opportunities = InvestmentOpportunities()
 
     async def get_portfolio(self, player_id: str) -> Dict:
-        """Get player's investment portfolio."""
-        player = await Player.find_one({"_id": player_id})
+        """Get player's investment portfolio.
+
+        Values are accrued by the economy tick, so this is a plain lookup.
+        """
+        player = await get_database().players.find_one(
+            {"_id": player_id}, projection={"investments": 1}
+        )
         if not player:
             return {
                 "total_invested": 0,
@@ -24,50 +29,29 @@ class InvestmentService:
                 "investments": []
             }
 
-        investments = player.get("investments", [])
-
-        total_invested = sum(inv.get("amount_invested", 0)
-                             for inv in investments)
-        current_value = sum(inv.get("current_value", 0) for inv in investments)
+        investments = []
+        for inv in player.get("investments", []):
+            amount_invested = inv.get("amount_invested", 0)
+            current_value = inv.get("current_value", amount_invested)
+            investments.append({
+                **inv,
+                "current_value": current_value,
+                "profit_loss": current_value - amount_invested,
+                "profit_loss_percentage": (current_value - amount_invested) / (amount_invested or 1) * 100
+            })
+
+        total_invested = sum(inv.get("amount_invested", 0) for inv in investments)
+        current_value = sum(inv["current_value"] for inv in investments)
         total_profit_loss = current_value - total_invested
         roi_percentage = (total_profit_loss / total_invested * \
                           100) if total_invested > 0 else 0.0
 
-        # Update current values (simulate market changes)
-        updated_investments = []
-        for inv in investments:
-            # Simulate market fluctuation
-            days_held = (datetime.utcnow() - \
-                         inv.get("investment_date", datetime.utcnow())).days
-            expected_return = inv.get("expected_return", 5.0)
-            risk_multiplier = {"low": 0.5, "medium": 1.0, "high": 1.5, "very_high": 2.0}.get(
-                inv.get("risk_level", "medium"), 1.0
-            )
-
-            # Calculate current value with some randomness
-            daily_return = (expected_return / 365) / 100
-            market_variance = random.uniform(-0.02, 0.02) * risk_multiplier
-            total_return = (daily_return + market_variance) * days_held
-
-            current_val = int(inv.get("amount_invested", 0)
-                              * (1 + total_return))
-
-            updated_inv = inv.copy()
-            updated_inv["current_value"] = current_val
-            updated_inv["profit_loss"] = current_val - \
-                inv.get("amount_invested", 0)
-            updated_inv["profit_loss_percentage"] = (
-                (current_val - inv.get("amount_invested", 0)) / \
-                 inv.get("amount_invested", 1) * 100
-            )
-            updated_investments.append(updated_inv)
-
         return {
             "total_invested": total_invested,
-            "current_value": sum(i["current_value"] for i in updated_investments),
-            "total_profit_loss": sum(i["profit_loss"] for i in updated_investments),
+            "current_value": current_value,
+            "total_profit_loss": total_profit_loss,
             "roi_percentage": roi_percentage,
-            "investments": updated_investments
+            "investments": investments
         }
 
     async def get_opportunities(
@@ -76,17 +60,10 @@ class InvestmentService:
         min_return: Optional[float] = None
     ) -> List[Dict]:
         """Get available investment opportunities."""
-        all_opportunities = self.opportunities.get_all_opportunities()
-
-        filtered = []
-        for opp in all_opportunities:
-            if risk_level and opp.get("risk_level") != risk_level:
-                continue
-            if min_return and opp.get("expected_return", 0) < min_return:
-                continue
-            filtered.append(opp)
-
-        return filtered
+        return self.opportunities.catalog.select(
+            low=min_return or None,
+            risk_level=risk_level or None
+        )
 
     async def make_investment(
         self,
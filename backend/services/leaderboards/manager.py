@@ -1,8 +1,12 @@
 """Leaderboard Manager Service."""
 
-from typing import Dict, Optional, Any
+from typing import Dict, Iterable, Optional, Any
 from datetime import datetime
 from backend.core.database import get_database
+from backend.services.player.visibility import visible_projection
+
+# Player fields an entry shows, with guilds only where the player shows theirs
+ENTRY_SETTINGS = ("guild",)
 
 
 class LeaderboardManager:
@@ -74,20 +78,26 @@ class LeaderboardManager:
         collection = getattr(self.db, config["collection"])
         field = config["field"]
 
-        # Get sorted entries
-        cursor = collection.find().sort(field, -1).limit(limit)
+        # Get sorted entries (guild documents never need their legacy member arrays)
+        if config["collection"] == "guilds":
+            projection = {"members": 0}
+        else:
+            projection = {**visible_projection(ENTRY_SETTINGS, traits=False), field: 1}
+        cursor = collection.find({}, projection=projection).sort(field, -1).limit(limit)
         entries = await cursor.to_list(length=limit)
+        guild_names = await self._get_guild_names(entry.get("guild_id") for entry in entries)
 
         # Format entries
-        formatted_entries = []
-        for rank, entry in enumerate(entries, 1):
-            formatted_entry = await self._format_entry(
+        formatted_entries = [
+            self._format_entry(
                 entry=entry,
                 rank=rank,
                 field=field,
-                leaderboard_type=leaderboard_type
+                leaderboard_type=leaderboard_type,
+                guild_names=guild_names
             )
-            formatted_entries.append(formatted_entry)
+            for rank, entry in enumerate(entries, 1)
+        ]
 
         # Get total count
         total_entries = await collection.count_documents({})
@@ -117,11 +127,20 @@ class LeaderboardManager:
 
         entries = await cursor.to_list(length=limit)
 
+        # Get player data
+        players = {
+            player["_id"]: player
+            async for player in self.db.players.find(
+                {"_id": {"$in": [entry["player_id"] for entry in entries]}},
+                projection=visible_projection(ENTRY_SETTINGS, traits=False)
+            )
+        }
+        guild_names = await self._get_guild_names(player.get("guild_id") for player in players.values())
+
         # Format entries
         formatted_entries = []
         for rank, entry in enumerate(entries, 1):
-            # Get player data
-            player = await self.db.players.find_one({"_id": entry["player_id"]})
+            player = players.get(entry["player_id"])
             if not player:
                 continue
 
@@ -131,7 +150,7 @@ class LeaderboardManager:
                 "username": player.get("username", "Unknown"),
                 "value": entry.get(season_field, 0),
                 "level": player.get("level"),
-                "guild_name": await self._get_guild_name(player.get("guild_id")),
+                "guild_name": guild_names.get(player.get("guild_id")),
                 "title": player.get("active_title"),
                 "change_24h": None  # Would need historical data
             }
@@ -150,12 +169,13 @@ class LeaderboardManager:
             "season_id": season_id
         }
 
-    async def _format_entry(
+    def _format_entry(
         self,
         entry: Dict[str, Any],
         rank: int,
         field: str,
-        leaderboard_type: str
+        leaderboard_type: str,
+        guild_names: Dict[str, str]
     ) -> Dict[str, Any]:
         """Format a leaderboard entry."""
         # Get nested field value
@@ -178,18 +198,19 @@ class LeaderboardManager:
         else:
             formatted["username"] = entry.get("username", "Unknown")
             formatted["level"] = entry.get("level")
-            formatted["guild_name"] = await self._get_guild_name(entry.get("guild_id"))
+            formatted["guild_name"] = guild_names.get(entry.get("guild_id"))
             formatted["title"] = entry.get("active_title")
 
         return formatted
 
-    async def _get_guild_name(self, guild_id: Optional[str]) -> Optional[str]:
-        """Get guild name from ID."""
-        if not guild_id:
-            return None
+    async def _get_guild_names(self, guild_ids: Iterable[Optional[str]]) -> Dict[str, str]:
+        """Guild names by ID, in one query."""
+        guild_ids = sorted({guild_id for guild_id in guild_ids if guild_id})
+        if not guild_ids:
+            return {}
 
-        guild = await self.db.guilds.find_one({"_id": guild_id})
-        return guild.get("name") if guild else None
+        cursor = self.db.guilds.find({"id": {"$in": guild_ids}}, projection={"id": 1, "name": 1})
+        return {guild["id"]: guild.get("name") async for guild in cursor}
 
     async def get_player_rank(
         self,
@@ -226,7 +247,9 @@ class LeaderboardManager:
         field = config["field"]
 
         # Get player data
-        player = await collection.find_one({"_id": player_id})
+        player = await collection.find_one(
+            {"_id": player_id}, projection={field: 1, "username": 1, "name": 1}
+        )
         if not player:
             raise ValueError("Player not found")
 
@@ -295,7 +318,7 @@ class LeaderboardManager:
                       100) if total_players > 0 else 0
 
         # Get player data
-        player = await self.db.players.find_one({"_id": player_id})
+        player = await self.db.players.find_one({"_id": player_id}, projection={"username": 1})
         username = player.get("username", "Unknown") if player else "Unknown"
 
         return {
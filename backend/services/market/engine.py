@@ -0,0 +1,408 @@
+"""Stock market engine - micro-batched order matching, atomic price moves and OHLC candles."""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+
+from backend.services.economy.ledger import CurrencyLedger
+
+logger = logging.getLogger(__name__)
+
+# Orders arriving within this window are matched together
+MATCH_INTERVAL = 0.1
+# Net shares that move a price by 100% (before the per-batch cap)
+MARKET_DEPTH = 100_000
+MAX_BATCH_MOVE = 0.02
+MIN_PRICE = 1.0
+# How long price reads may be served from the per-process copy
+PRICE_CACHE_TTL = 1.0
+
+CANDLE_LENGTHS = {
+    "1m": timedelta(minutes=1),
+    "1h": timedelta(hours=1),
+    "1d": timedelta(days=1),
+}
+CANDLE_INTERVALS = tuple(CANDLE_LENGTHS)
+
+
+def candle_slot(interval: str, at: datetime) -> Tuple[datetime, str]:
+    """Bucket start and slot key of the candle containing ``at``.
+
+    Buckets hold 60 minute candles per hour, 24 hourly candles per day and
+    one daily candle per day of the month.
+    """
+    if interval == "1m":
+        return at.replace(minute=0, second=0, microsecond=0), f"{at.minute:02d}"
+    if interval == "1h":
+        return at.replace(hour=0, minute=0, second=0, microsecond=0), f"{at.hour:02d}"
+    return at.replace(day=1, hour=0, minute=0, second=0, microsecond=0), f"{at.day:02d}"
+
+
+def candle_time(interval: str, bucket_start: datetime, slot: str) -> datetime:
+    """Start time of a candle from its bucket and slot key"""
+    if interval == "1m":
+        return bucket_start + timedelta(minutes=int(slot))
+    if interval == "1h":
+        return bucket_start + timedelta(hours=int(slot))
+    return bucket_start + timedelta(days=int(slot) - 1)
+
+
+def failed_writes(error: Exception, count: int) -> Set[int]:
+    """Indexes of a bulk write's operations that didn't apply; all of them unless the error says"""
+    if isinstance(error, BulkWriteError):
+        return {write_error["index"] for write_error in error.details.get("writeErrors", [])}
+    return set(range(count))
+
+
+def clearing_move(net_shares: int) -> float:
+    """Relative price change caused by a batch's net order imbalance"""
+    return float(np.clip(net_shares / MARKET_DEPTH, -MAX_BATCH_MOVE, MAX_BATCH_MOVE))
+
+
+class Order:
+    """A pending market order, resolved when its batch settles"""
+
+    def __init__(self, player_id: str, ticker: str, side: str, quantity: int):
+        self.player_id = player_id
+        self.ticker = ticker
+        self.side = side
+        self.quantity = quantity
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class MarketEngine:
+    """Batches market orders per process against prices kept in MongoDB.
+
+    Market orders are queued per ticker and matched every ``MATCH_INTERVAL``.
+    All orders in a batch fill at the price read when the batch settles: buys
+    and sells cross each other and the remainder trades against the market
+    maker, whose price then moves with the net imbalance. Settlement uses
+    conditional debits (credits for buys, holdings for sells) run
+    concurrently, followed by bulk writes. Orders whose delivery fails have
+    their debit given back and fail; the rest of the batch still fills.
+
+    Every worker runs its own engine, so price moves are applied in MongoDB
+    as relative updates on the stored price and compound with the other
+    workers' batches instead of overwriting them. Each move feeds 1m/1h/1d
+    OHLC candles stored in bucketed ``stock_candles`` documents, whose open is
+    whichever price reached the slot first. ``prices`` is a read-only copy,
+    refreshed every ``PRICE_CACHE_TTL`` seconds.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, companies: Dict[str, Dict[str, Any]]):
+        self.db = db
+        self.stocks = db.stocks
+        self.portfolios = db.portfolios
+        self.candles = db.stock_candles
+        self.ledger = CurrencyLedger(db)
+        self.companies = companies
+        self.prices: Dict[str, float] = {}
+        self.book: Dict[str, List[Order]] = {}
+        self._loaded_at: Optional[float] = None
+        self._match_task: Optional[asyncio.Task] = None
+        self._match_lock = asyncio.Lock()
+
+    async def ensure_indexes(self):
+        """Create the index used for candle range reads"""
+        await self.candles.create_index([("ticker", 1), ("interval", 1), ("bucket_start", 1)])
+
+    async def load(self):
+        """Refresh the copy of current prices unless it is fresh enough"""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < PRICE_CACHE_TTL:
+            return
+        prices = {ticker: company["base_price"] for ticker, company in self.companies.items()}
+        async for stock in self.stocks.find({}, projection={"ticker": 1, "price": 1}):
+            prices[stock["ticker"]] = stock["price"]
+        self.prices = prices
+        self._loaded_at = time.monotonic()
+
+    async def price(self, ticker: str) -> float:
+        await self.load()
+        if ticker not in self.prices:
+            raise ValueError("Stock not found")
+        return self.prices[ticker]
+
+    async def submit(self, player_id: str, ticker: str, side: str, quantity: int) -> Dict[str, Any]:
+        """Queue a market order and wait for its batch to settle"""
+        await self.load()
+        if ticker not in self.prices:
+            raise ValueError("Stock not found")
+        if quantity <= 0:
+            raise ValueError("Quantity must be positive")
+
+        order = Order(player_id, ticker, side, quantity)
+        self.book.setdefault(ticker, []).append(order)
+        if self._match_task is None or self._match_task.done():
+            self._match_task = asyncio.create_task(self._match_later())
+        return await order.future
+
+    async def _match_later(self):
+        while True:
+            await asyncio.sleep(MATCH_INTERVAL)
+            try:
+                await self.match()
+            except Exception as e:
+                logger.error(f"Failed to match stock orders: {e}")
+            # Orders submitted while the batch was settling
+            if not self.book:
+                return
+
+    async def match(self):
+        """Match and settle every queued order"""
+        async with self._match_lock:
+            book, self.book = self.book, {}
+            orders = [order for ticker_orders in book.values() for order in ticker_orders]
+            if not orders:
+                return
+            try:
+                await self._settle(book)
+            except Exception as e:
+                for order in orders:
+                    if not order.future.done():
+                        order.future.set_exception(e)
+
+    async def _settle(self, book: Dict[str, List[Order]]):
+        now = datetime.utcnow()
+        price_of = {ticker: self.prices[ticker] for ticker in book}
+        # Fill at the stored price; other workers may have moved it
+        async for stock in self.stocks.find({"ticker": {"$in": list(book)}}, projection={"ticker": 1, "price": 1}):
+            price_of[stock["ticker"]] = stock["price"]
+
+        def cost(order: Order) -> int:
+            return int(price_of[order.ticker] * order.quantity)
+
+        async def reserve(order: Order) -> bool:
+            try:
+                if order.side == "buy":
+                    await self.ledger.debit(order.player_id, "credits", cost(order), f"buy_stock_{order.ticker}")
+                    return True
+                result = await self.portfolios.update_one(
+                    {"player_id": order.player_id, f"holdings.{order.ticker}": {"$gte": order.quantity}},
+                    {"$inc": {f"holdings.{order.ticker}": -order.quantity}, "$set": {"updated_at": now}}
+                )
+                if not result.modified_count:
+                    order.future.set_exception(ValueError("Insufficient shares"))
+                    return False
+                return True
+            except ValueError as e:
+                order.future.set_exception(e)
+                return False
+
+        orders = [order for ticker_orders in book.values() for order in ticker_orders]
+        reserved = await asyncio.gather(*(reserve(order) for order in orders))
+        filled = [order for order, ok in zip(orders, reserved) if ok]
+
+        filled, failures = await self._deliver(filled, cost, now)
+
+        volume: Dict[str, int] = {}
+        net: Dict[str, int] = {}
+        for order in filled:
+            volume[order.ticker] = volume.get(order.ticker, 0) + order.quantity
+            signed = order.quantity if order.side == "buy" else -order.quantity
+            net[order.ticker] = net.get(order.ticker, 0) + signed
+
+        moves = {ticker: 1 + clearing_move(net[ticker]) for ticker in volume}
+        try:
+            await self._publish(moves, volume, now)
+        except Exception as e:
+            # The trades are done; only the price move and candles are missing
+            logger.error(f"Failed to publish stock price moves: {e}")
+
+        for order in filled:
+            total = cost(order)
+            order.future.set_result({
+                "success": True,
+                "ticker": order.ticker,
+                "quantity": order.quantity,
+                "price_per_share": price_of[order.ticker],
+                "total_cost" if order.side == "buy" else "total_proceeds": total,
+                "message": f"{'Bought' if order.side == 'buy' else 'Sold'} {order.quantity} shares of {order.ticker}"
+            })
+        for order, error in failures:
+            order.future.set_exception(error)
+
+    async def _deliver(self, orders: List[Order], cost, now: datetime) -> Tuple[List[Order], List[Tuple[Order, Exception]]]:
+        """Give buyers their shares and sellers their credits.
+
+        Returns the orders delivered, and the orders that weren't with the
+        error that stopped them. Those have their reserved credits refunded
+        or shares restored.
+        """
+        failed: Dict[Tuple[str, str], Exception] = {}
+
+        buys = [order for order in orders if order.side == "buy"]
+        bought: Dict[str, Dict[str, int]] = {}
+        for order in buys:
+            holdings = bought.setdefault(order.player_id, {})
+            holdings[f"holdings.{order.ticker}"] = holdings.get(f"holdings.{order.ticker}", 0) + order.quantity
+        if bought:
+            buyers = list(bought)
+            try:
+                # One upsert per player so a player's orders can't create two portfolios
+                await self.portfolios.bulk_write(
+                    [
+                        UpdateOne({"player_id": player_id}, {"$inc": bought[player_id], "$set": {"updated_at": now}}, upsert=True)
+                        for player_id in buyers
+                    ],
+                    ordered=False
+                )
+            except Exception as e:
+                failed.update(((buyers[index], "buy"), e) for index in failed_writes(e, len(buyers)))
+
+        sells = [order for order in orders if order.side == "sell" and cost(order) > 0]
+        if sells:
+            # credit_many writes once per player, in order of first appearance
+            sellers = list(dict.fromkeys(order.player_id for order in sells))
+            try:
+                await self.ledger.credit_many([
+                    (order.player_id, "credits", cost(order), f"sell_stock_{order.ticker}") for order in sells
+                ])
+            except Exception as e:
+                failed.update(((sellers[index], "sell"), e) for index in failed_writes(e, len(sellers)))
+
+        undone = [order for order in orders if (order.player_id, order.side) in failed]
+        if undone:
+            await self._undo(undone, cost, now)
+        return (
+            [order for order in orders if (order.player_id, order.side) not in failed],
+            [(order, failed[(order.player_id, order.side)]) for order in undone]
+        )
+
+    async def _undo(self, orders: List[Order], cost, now: datetime):
+        """Give back what ``reserve`` took from orders that couldn't be delivered"""
+        refunds = [
+            (order.player_id, "credits", cost(order), f"refund_buy_stock_{order.ticker}")
+            for order in orders if order.side == "buy" and cost(order) > 0
+        ]
+        restored: Dict[str, Dict[str, int]] = {}
+        for order in orders:
+            if order.side == "sell":
+                holdings = restored.setdefault(order.player_id, {})
+                holdings[f"holdings.{order.ticker}"] = holdings.get(f"holdings.{order.ticker}", 0) + order.quantity
+        try:
+            if refunds:
+                await self.ledger.credit_many(refunds)
+            if restored:
+                await self.portfolios.bulk_write(
+                    [
+                        UpdateOne({"player_id": player_id}, {"$inc": holdings, "$set": {"updated_at": now}})
+                        for player_id, holdings in restored.items()
+                    ],
+                    ordered=False
+                )
+        except Exception as e:
+            logger.error(f"Failed to undo stock orders, needs manual repair: refunds={refunds} shares={restored}: {e}")
+
+    async def random_walk(self, max_change_percent: float = 5.0, rng: Optional[np.random.Generator] = None):
+        """Move every price by an independent uniform step (AI Economist tick)"""
+        await self.load()
+        rng = rng or np.random.default_rng()
+        tickers = list(self.prices)
+        change = rng.uniform(-max_change_percent, max_change_percent, len(tickers)) / 100
+        await self._publish(dict(zip(tickers, (1 + change).tolist())), {}, datetime.utcnow())
+
+    async def _move_price(self, ticker: str, factor: float, volume: int, now: datetime) -> float:
+        """Scale the stored price by ``factor`` in one atomic update; returns the new price"""
+        previous = {"$ifNull": ["$price", self.companies.get(ticker, {}).get("base_price", MIN_PRICE)]}
+        price = {"$max": [MIN_PRICE, {"$round": [{"$multiply": [previous, factor]}, 2]}]}
+        stock = await self.stocks.find_one_and_update(
+            {"ticker": ticker},
+            [{"$set": {
+                "price": price,
+                "change_24h": {"$round": [{"$subtract": [price, previous]}, 2]},
+                "change_percent": {"$round": [{"$multiply": [{"$divide": [{"$subtract": [price, previous]}, previous]}, 100]}, 2]},
+                "volume": {"$add": [{"$ifNull": ["$volume", 0]}, volume]},
+                "last_updated": now
+            }}],
+            projection={"price": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return stock["price"]
+
+    async def _publish(self, moves: Dict[str, float], volume: Dict[str, int], now: datetime):
+        """Apply relative price moves and fold the new prices into the candles"""
+        if not moves:
+            return
+
+        tickers = list(moves)
+        new_prices = dict(zip(tickers, await asyncio.gather(*(
+            self._move_price(ticker, moves[ticker], volume.get(ticker, 0), now) for ticker in tickers
+        ))))
+        self.prices.update(new_prices)
+
+        candle_updates = []
+        for ticker, price in new_prices.items():
+            for interval in CANDLE_INTERVALS:
+                bucket_start, slot = candle_slot(interval, now)
+                candle = f"$candles.{slot}"
+                candle_updates.append(UpdateOne(
+                    {"_id": f"{ticker}:{interval}:{bucket_start:%Y%m%d%H}"},
+                    [{"$set": {
+                        "ticker": ticker,
+                        "interval": interval,
+                        "bucket_start": bucket_start,
+                        # Whichever worker reaches the slot first opens the candle
+                        f"candles.{slot}": {
+                            "o": {"$ifNull": [f"{candle}.o", price]},
+                            "h": {"$max": [f"{candle}.h", price]},
+                            "l": {"$min": [f"{candle}.l", price]},
+                            "c": price,
+                            "v": {"$add": [{"$ifNull": [f"{candle}.v", 0]}, volume.get(ticker, 0)]}
+                        }
+                    }}],
+                    upsert=True
+                ))
+        await self.candles.bulk_write(candle_updates, ordered=False)
+
+    async def get_candles(
+        self,
+        ticker: str,
+        interval: str,
+        start: datetime,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """OHLC candles for ``ticker`` between ``start`` and ``end``"""
+        if interval not in CANDLE_INTERVALS:
+            raise ValueError(f"Unknown candle interval: {interval}")
+        end = end or datetime.utcnow()
+        first_bucket, _ = candle_slot(interval, start)
+
+        cursor = self.candles.find(
+            {"ticker": ticker, "interval": interval, "bucket_start": {"$gte": first_bucket, "$lte": end}}
+        ).sort("bucket_start", 1)
+
+        candles = []
+        async for bucket in cursor:
+            for slot in sorted(bucket.get("candles", {})):
+                candle = bucket["candles"][slot]
+                at = candle_time(interval, bucket["bucket_start"], slot)
+                if at + CANDLE_LENGTHS[interval] <= start or at > end:
+                    continue
+                candles.append({
+                    "time": at,
+                    "open": candle.get("o", candle.get("c")),
+                    "high": candle.get("h"),
+                    "low": candle.get("l"),
+                    "close": candle.get("c"),
+                    "volume": candle.get("v", 0)
+                })
+        return candles
+
+
+# One engine per database; the order book lives in this process
+_engines: Dict[Tuple[int, str], MarketEngine] = {}
+
+
+def get_market_engine(db: AsyncIOMotorDatabase, companies: Dict[str, Dict[str, Any]]) -> MarketEngine:
+    key = (id(db.client), db.name)
+    if key not in _engines:
+        _engines[key] = MarketEngine(db, companies)
+    return _engines[key]
@@ -2,61 +2,72 @@
 
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
-import random
 
 from backend.core.database import get_database
 from backend.services.economy.currency import CurrencyService
+from .engine import MarketEngine, get_market_engine
 
 
 class StockMarketService:
     """Manage stock market operations."""
 
-    # Virtual companies in Karma Nexus world
+    # Virtual companies in Karma Nexus world (dividend_yield is annual,
+    # paid out to shareholders by the economy tick)
     COMPANIES = {
         "ROBO": {
             "name": "RoboCorp Industries",
             "description": "Leading robot manufacturer",
             "sector": "Technology",
-            "base_price": 100.0
+            "base_price": 100.0,
+            "dividend_yield": 0.02
         },
         "HACK": {
             "name": "HackerGuild Inc",
             "description": "Cyber security and hacking services",
             "sector": "Technology",
-            "base_price": 75.0
+            "base_price": 75.0,
+            "dividend_yield": 0.01
         },
         "MEDIC": {
             "name": "MediTech Solutions",
             "description": "Healthcare and medical services",
             "sector": "Healthcare",
-            "base_price": 120.0
+            "base_price": 120.0,
+            "dividend_yield": 0.03
         },
         "KARMA": {
             "name": "Karma Energy Corp",
             "description": "Spiritual energy and karma trading",
             "sector": "Energy",
-            "base_price": 90.0
+            "base_price": 90.0,
+            "dividend_yield": 0.04
         },
         "GUILD": {
             "name": "Guild Holdings",
             "description": "Guild management and territory",
             "sector": "Real Estate",
-            "base_price": 150.0
+            "base_price": 150.0,
+            "dividend_yield": 0.05
         },
         "NEXUS": {
             "name": "Nexus Systems",
             "description": "AI and neural network development",
             "sector": "AI",
-            "base_price": 200.0
+            "base_price": 200.0,
+            "dividend_yield": 0.0
         }
     }
 
     def __init__(self):
         self.currency_service = CurrencyService()
 
+    @property
+    def engine(self) -> MarketEngine:
+        return get_market_engine(get_database(), self.COMPANIES)
+
     async def initialize_market(self):
         """Initialize stock market with base prices."""
-        db = await get_database()
+        db = get_database()
 
         for ticker, company_data in self.COMPANIES.items():
             existing = await db.stocks.find_one({"ticker": ticker})
@@ -78,13 +89,13 @@ class StockMarketService:
 
     async def get_all_stocks(self) -> List[Dict[str, Any]]:
         """Get all stocks."""
-        db = await get_database()
+        db = get_database()
         stocks = await db.stocks.find().to_list(length=100)
         return stocks
 
     async def get_stock(self, ticker: str) -> Dict[str, Any] | None:
         """Get specific stock information."""
-        db = await get_database()
+        db = get_database()
         stock = await db.stocks.find_one({"ticker": ticker.upper()})
         return stock
 
@@ -94,55 +105,8 @@ class StockMarketService:
         ticker: str,
         quantity: int
     ) -> Dict[str, Any]:
-        """Buy stocks."""
-        ticker = ticker.upper()
-
-        # Get stock
-        stock = await self.get_stock(ticker)
-        if not stock:
-            raise ValueError("Stock not found")
-
-        # Calculate cost
-        cost = int(stock["price"] * quantity)
-
-        # Check balance
-        balance = await self.currency_service.get_balance(player_id, "credits")
-        if balance < cost:
-            raise ValueError("Insufficient credits")
-
-        # Deduct credits
-        await self.currency_service.deduct_currency(
-            player_id,
-            "credits",
-            cost,
-            reason=f"buy_stock_{ticker}"
-        )
-
-        # Add to portfolio
-        db = await get_database()
-        await db.portfolios.update_one(
-            {"player_id": player_id},
-            {
-                "$inc": {f"holdings.{ticker}": quantity},
-                "$set": {"updated_at": datetime.utcnow()}
-            },
-            upsert=True
-        )
-
-        # Update volume
-        await db.stocks.update_one(
-            {"ticker": ticker},
-            {"$inc": {"volume": quantity}}
-        )
-
-        return {
-            "success": True,
-            "ticker": ticker,
-            "quantity": quantity,
-            "price_per_share": stock["price"],
-            "total_cost": cost,
-            "message": f"Bought {quantity} shares of {ticker}"
-        }
+        """Buy stocks (filled by the market engine's next matching batch)."""
+        return await self.engine.submit(player_id, ticker.upper(), "buy", quantity)
 
     async def sell_stock(
         self,
@@ -150,66 +114,12 @@ class StockMarketService:
         ticker: str,
         quantity: int
     ) -> Dict[str, Any]:
-        """Sell stocks."""
-        ticker = ticker.upper()
-
-        # Get stock
-        stock = await self.get_stock(ticker)
-        if not stock:
-            raise ValueError("Stock not found")
-
-        # Check portfolio
-        db = await get_database()
-        portfolio = await db.portfolios.find_one({"player_id": player_id})
-
-        if not portfolio:
-            raise ValueError("No portfolio found")
-
-        holdings = portfolio.get("holdings", {})
-        current_quantity = holdings.get(ticker, 0)
-
-        if current_quantity < quantity:
-            raise ValueError(
-                f"Insufficient shares. You have {current_quantity}")
-
-        # Calculate proceeds
-        proceeds = int(stock["price"] * quantity)
-
-        # Remove from portfolio
-        await db.portfolios.update_one(
-            {"player_id": player_id},
-            {
-                "$inc": {f"holdings.{ticker}": -quantity},
-                "$set": {"updated_at": datetime.utcnow()}
-            }
-        )
-
-        # Add credits
-        await self.currency_service.add_currency(
-            player_id,
-            "credits",
-            proceeds,
-            reason=f"sell_stock_{ticker}"
-        )
-
-        # Update volume
-        await db.stocks.update_one(
-            {"ticker": ticker},
-            {"$inc": {"volume": quantity}}
-        )
-
-        return {
-            "success": True,
-            "ticker": ticker,
-            "quantity": quantity,
-            "price_per_share": stock["price"],
-            "total_proceeds": proceeds,
-            "message": f"Sold {quantity} shares of {ticker}"
-        }
+        """Sell stocks (filled by the market engine's next matching batch)."""
+        return await self.engine.submit(player_id, ticker.upper(), "sell", quantity)
 
     async def get_portfolio(self, player_id: str) -> Dict[str, Any]:
         """Get player's stock portfolio."""
-        db = await get_database()
+        db = get_database()
 
         portfolio = await db.portfolios.find_one({"player_id": player_id})
 
@@ -224,24 +134,29 @@ class StockMarketService:
 
         holdings = portfolio.get("holdings", {})
 
-        # Calculate current value
+        # Calculate current value from the engine's in-memory prices
+        engine = self.engine
+        await engine.load()
+        changes = {
+            stock["ticker"]: stock.get("change_percent", 0)
+            async for stock in db.stocks.find({}, projection={"ticker": 1, "change_percent": 1})
+        }
+
         total_value = 0
         detailed_holdings = []
 
         for ticker, quantity in holdings.items():
-            if quantity > 0:
-                stock = await self.get_stock(ticker)
-                if stock:
-                    current_value = stock["price"] * quantity
-                    total_value += current_value
+            if quantity > 0 and ticker in engine.prices:
+                current_value = engine.prices[ticker] * quantity
+                total_value += current_value
 
-                    detailed_holdings.append({
-                        "ticker": ticker,
-                        "quantity": quantity,
-                        "current_price": stock["price"],
-                        "current_value": current_value,
-                        "change_percent": stock.get("change_percent", 0)
-                    })
+                detailed_holdings.append({
+                    "ticker": ticker,
+                    "quantity": quantity,
+                    "current_price": engine.prices[ticker],
+                    "current_value": current_value,
+                    "change_percent": changes.get(ticker, 0)
+                })
 
         return {
             "player_id": player_id,
@@ -252,62 +167,35 @@ class StockMarketService:
 
     async def update_stock_prices(self):
         """Update all stock prices (called periodically by AI Economist)."""
-        db = await get_database()
-
-        stocks = await self.get_all_stocks()
-
-        for stock in stocks:
-            # Random price movement (±5%)
-            change_percent = random.uniform(-5.0, 5.0)
-            new_price = stock["price"] * (1 + change_percent / 100)
-
-            # Ensure minimum price
-            new_price = max(1.0, new_price)
-
-            change_24h = new_price - stock["price"]
-
-            await db.stocks.update_one(
-                {"ticker": stock["ticker"]},
-                {
-                    "$set": {
-                        "price": round(new_price, 2),
-                        "change_24h": round(change_24h, 2),
-                        "change_percent": round(change_percent, 2),
-                        "last_updated": datetime.utcnow()
-                    }
-                }
-            )
+        await self.engine.random_walk(max_change_percent=5.0)
 
     async def get_stock_history(
         self,
         ticker: str,
         days: int = 30
     ) -> List[Dict[str, Any]]:
-        """Get historical stock prices."""
-        db = await get_database()
-
-        history = await db.stock_history.find({
-            "ticker": ticker.upper(),
-            "date": {"$gte": datetime.utcnow() - timedelta(days=days)}
-        }).sort("date", 1).to_list(length=days)
-
-        return history
-
-    async def record_daily_price(self):
-        """Record daily closing prices for history."""
-        db = await get_database()
-
-        stocks = await self.get_all_stocks()
-
-        for stock in stocks:
-            history_entry = {
-                "ticker": stock["ticker"],
-                "date": datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0),
-                "open": stock["price"],
-                "close": stock["price"],
-                "high": stock["price"],
-                "low": stock["price"],
-                "volume": stock.get("volume", 0)
+        """Get daily price history, served from daily candles."""
+        candles = await self.get_candles(ticker, "1d", datetime.utcnow() - timedelta(days=days))
+        return [
+            {
+                "ticker": ticker.upper(),
+                "date": candle["time"],
+                "open": candle["open"],
+                "close": candle["close"],
+                "high": candle["high"],
+                "low": candle["low"],
+                "volume": candle["volume"]
             }
+            for candle in candles
+        ]
 
-            await db.stock_history.insert_one(history_entry)
+    async def get_candles(
+        self,
+        ticker: str,
+        interval: str = "1h",
+        start: datetime = None,
+        end: datetime = None
+    ) -> List[Dict[str, Any]]:
+        """Get OHLC candles (1m, 1h or 1d) for a stock."""
+        start = start or datetime.utcnow() - timedelta(days=1)
+        return await self.engine.get_candles(ticker.upper(), interval, start, end)
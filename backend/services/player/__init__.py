@@ -5,11 +5,13 @@ from backend.services.player.progression import ProgressionService
 from backend.services.player.visibility import VisibilityService
 from backend.services.player.stats_calculator import StatsCalculator
 from backend.services.player.inventory_manager import InventoryManager
+from backend.services.player.repository import PlayerRepository
 
 __all__ = [
     'TraitsService',
     'ProgressionService',
     'VisibilityService',
     'StatsCalculator',
-    'InventoryManager'
+    'InventoryManager',
+    'PlayerRepository'
 ]
@@ -1,9 +1,84 @@
-"""Player inventory management service."""
+"""Player inventory management service.
+
+Inventories are stored on the player as a map keyed by item id::
+
+    {"inventory": {"health_potion_01": {"quantity": 5, "equipped": False, ...}}}
+
+so lookups are a key access and writes are ``$inc``/``$set``/``$unset`` on a
+single stack. Players still holding the old ``items`` array, or an
+``inventory`` that was written as an array, are migrated the first time an
+inventory operation misses on them.
+"""
 
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from bson import ObjectId
+from pymongo import ReturnDocument
+
+from backend.services.economy.ledger import player_key
+
+INVENTORY_FIELD = 'inventory'
+
+# Matches players whose inventory has been migrated (or never had an array)
+NOT_LEGACY = {
+    'items': {'$not': {'$type': 'array'}},
+    INVENTORY_FIELD: {'$not': {'$type': 'array'}},
+}
+LEGACY = {'$or': [{'items': {'$type': 'array'}}, {INVENTORY_FIELD: {'$type': 'array'}}]}
+
+
+def item_path(item_id: str, field: Optional[str] = None) -> str:
+    """Dotted path of a stack (or one of its fields) in the inventory map."""
+    if not item_id or '.' in item_id or item_id.startswith('$'):
+        raise ValueError(f'Invalid item id: {item_id}')
+    path = f'{INVENTORY_FIELD}.{item_id}'
+    return f'{path}.{field}' if field else path
+
+
+def stacks_from_items(items: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Convert a legacy ``items`` array into inventory stacks, merging duplicates."""
+    stacks: Dict[str, Dict[str, Any]] = {}
+    for item in items:
+        item_id = item.get('item_id')
+        if not item_id:
+            continue
+        fields = {k: v for k, v in item.items() if k != 'item_id'}
+        fields['quantity'] = item.get('quantity', 1)
+        if item_id in stacks:
+            stacks[item_id]['quantity'] += fields['quantity']
+        else:
+            stacks[item_id] = fields
+    return stacks
+
+
+def is_legacy(player: Dict[str, Any]) -> bool:
+    """Whether the player document still holds an inventory array."""
+    return isinstance(player.get('items'), list) or isinstance(player.get(INVENTORY_FIELD), list)
+
+
+def inventory_of(player: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """A player's stacks by item id, whichever format the document is in."""
+    inventory = player.get(INVENTORY_FIELD)
+    stacks = dict(inventory) if isinstance(inventory, dict) else {}
+    legacy = [
+        item
+        for field in ('items', INVENTORY_FIELD)
+        if isinstance(player.get(field), list)
+        for item in player[field]
+    ]
+    if legacy:
+        for item_id, stack in stacks_from_items(legacy).items():
+            if item_id in stacks:
+                stacks[item_id] = {**stack, **stacks[item_id],
+                                   'quantity': stacks[item_id].get('quantity', 0) + stack['quantity']}
+            else:
+                stacks[item_id] = stack
+    return {item_id: stack for item_id, stack in stacks.items() if stack.get('quantity', 0) > 0}
+
+
+def as_item(item_id: str, stack: Dict[str, Any]) -> Dict[str, Any]:
+    """A stack in the item shape returned by the API."""
+    return {'item_id': item_id, **stack}
 
 
 class InventoryManager:
@@ -11,13 +86,59 @@ class InventoryManager:
 
     def __init__(self, db: AsyncIOMotorDatabase):
         """Initialize inventory manager.
-        
+
         Args:
             db: MongoDB database instance
         """
         self.db = db
         self.players = db.players
 
+    async def migrate(self, player_id: str) -> bool:
+        """Move a player's legacy ``items`` or array ``inventory`` into the inventory map.
+
+        Args:
+            player_id: Player ID
+
+        Returns:
+            True if the player was migrated
+        """
+        key = player_key(player_id)
+        player = await self.players.find_one(
+            {'_id': key, **LEGACY},
+            {'items': 1, INVENTORY_FIELD: 1}
+        )
+        if not player:
+            return False
+
+        # Only applies if neither format changed since the read
+        result = await self.players.update_one(
+            {'_id': key, 'items': player.get('items'), INVENTORY_FIELD: player.get(INVENTORY_FIELD)},
+            {'$set': {INVENTORY_FIELD: inventory_of(player)}, '$unset': {'items': ''}}
+        )
+        return result.modified_count > 0 or await self.players.count_documents(
+            {'_id': key, **NOT_LEGACY}, limit=1
+        ) > 0
+
+    async def _update_stack(
+        self,
+        player_id: str,
+        condition: Dict[str, Any],
+        update: Dict[str, Any],
+        item_id: str
+    ) -> Optional[Dict[str, Any]]:
+        """Apply one conditional update, migrating the player first if needed."""
+        query = {'_id': player_key(player_id), **NOT_LEGACY, **condition}
+        for _ in range(2):
+            player = await self.players.find_one_and_update(
+                query,
+                update,
+                projection={item_path(item_id): 1},
+                return_document=ReturnDocument.AFTER
+            )
+            if player is not None or not await self.migrate(player_id):
+                return player
+        return None
+
     async def add_item(
         self,
         player_id: str,
@@ -26,53 +147,36 @@ class InventoryManager:
         item_data: Optional[Dict[str, Any]] = None
     ) -> Dict[str, Any]:
         """Add item to player inventory.
-        
+
         Args:
             player_id: Player ID
             item_id: Item identifier
             quantity: Quantity to add
             item_data: Optional item metadata
-            
+
         Returns:
             Updated inventory item
         """
-        player = await self.players.find_one({'_id': ObjectId(player_id)})
+        update: Dict[str, Any] = {
+            '$inc': {item_path(item_id, 'quantity'): quantity},
+            # Only sets the time on a new stack
+            '$min': {item_path(item_id, 'acquired_at'): datetime.utcnow()}
+        }
+        fields = {
+            item_path(item_id, field): value
+            for field, value in (item_data or {}).items()
+            if field not in ('item_id', 'quantity', 'acquired_at')
+        }
+        if fields:
+            update['$set'] = fields
+
+        player = await self._update_stack(player_id, {}, update, item_id)
         if not player:
             raise ValueError(f'Player {player_id} not found')
 
-        inventory = player.get('items', [])
-
-        # Check if item already exists
-        existing_item = None
-        for item in inventory:
-            if item['item_id'] == item_id:
-                existing_item = item
-                break
-
-        if existing_item:
-            # Update quantity
-            await self.players.update_one(
-                {'_id': ObjectId(player_id), 'items.item_id': item_id},
-                {'$inc': {'items.$.quantity': quantity}}
-            )
-            existing_item['quantity'] += quantity
-            return existing_item
-        else:
-            # Add new item
-            new_item = {
-                'item_id': item_id,
-                'quantity': quantity,
-                'equipped': False,
-                'acquired_at': datetime.utcnow(),
-                **(item_data or {})
-            }
-
-            await self.players.update_one(
-                {'_id': ObjectId(player_id)},
-                {'$push': {'items': new_item}}
-            )
-
-            return new_item
+        stack = player[INVENTORY_FIELD][item_id]
+        stack.setdefault('equipped', False)
+        return as_item(item_id, stack)
 
     async def remove_item(
         self,
@@ -81,95 +185,104 @@ class InventoryManager:
         quantity: int = 1
     ) -> bool:
         """Remove item from player inventory.
-        
+
         Args:
             player_id: Player ID
             item_id: Item identifier
             quantity: Quantity to remove
-            
+
         Returns:
             True if item was removed
         """
-        player = await self.players.find_one({'_id': ObjectId(player_id)})
-        if not player:
-            raise ValueError(f'Player {player_id} not found')
+        # Decrease quantity
+        decreased = await self._update_stack(
+            player_id,
+            {item_path(item_id, 'quantity'): {'$gt': quantity}},
+            {'$inc': {item_path(item_id, 'quantity'): -quantity}},
+            item_id
+        )
+        if decreased:
+            return True
 
-        inventory = player.get('items', [])
-
-        for item in inventory:
-            if item['item_id'] == item_id:
-                if item['quantity'] <= quantity:
-                    # Remove entire item
-                    await self.players.update_one(
-                        {'_id': ObjectId(player_id)},
-                        {'$pull': {'items': {'item_id': item_id}}}
-                    )
-                else:
-                    # Decrease quantity
-                    await self.players.update_one(
-                        {'_id': ObjectId(player_id), 'items.item_id': item_id},
-                        {'$inc': {'items.$.quantity': -quantity}}
-                    )
-                return True
-
-        return False
+        # Remove entire item
+        removed = await self._update_stack(
+            player_id,
+            {item_path(item_id, 'quantity'): {'$gt': 0}},
+            {'$unset': {item_path(item_id): ''}},
+            item_id
+        )
+        return removed is not None
+
+    async def _set_equipped(self, player_id: str, item_id: str, equipped: bool) -> bool:
+        player = await self._update_stack(
+            player_id,
+            {item_path(item_id, 'quantity'): {'$gt': 0}, item_path(item_id, 'equipped'): {'$ne': equipped}},
+            {'$set': {item_path(item_id, 'equipped'): equipped}},
+            item_id
+        )
+        return player is not None
 
     async def equip_item(self, player_id: str, item_id: str) -> bool:
         """Equip an item.
-        
+
         Args:
             player_id: Player ID
             item_id: Item identifier
-            
+
         Returns:
             True if item was equipped
         """
-        result = await self.players.update_one(
-            {'_id': ObjectId(player_id), 'items.item_id': item_id},
-            {'$set': {'items.$.equipped': True}}
-        )
-
-        return result.modified_count > 0
+        return await self._set_equipped(player_id, item_id, True)
 
     async def unequip_item(self, player_id: str, item_id: str) -> bool:
         """Unequip an item.
-        
+
         Args:
             player_id: Player ID
             item_id: Item identifier
-            
+
         Returns:
             True if item was unequipped
         """
-        result = await self.players.update_one(
-            {'_id': ObjectId(player_id), 'items.item_id': item_id},
-            {'$set': {'items.$.equipped': False}}
-        )
+        return await self._set_equipped(player_id, item_id, False)
 
-        return result.modified_count > 0
+    async def get_stacks(self, player_id: str) -> Dict[str, Dict[str, Any]]:
+        """Get player's inventory stacks keyed by item id.
 
-    async def get_inventory(self, player_id: str) -> List[Dict[str, Any]]:
-        """Get player's full inventory.
-        
         Args:
             player_id: Player ID
-            
+
         Returns:
-            List of inventory items
+            Stacks by item id
         """
         player = await self.players.find_one(
-            {'_id': ObjectId(player_id)},
-            {'items': 1}
+            {'_id': player_key(player_id)},
+            {'items': 1, INVENTORY_FIELD: 1}
         )
+        if not player:
+            return {}
+        if is_legacy(player):
+            await self.migrate(player_id)
+        return inventory_of(player)
+
+    async def get_inventory(self, player_id: str) -> List[Dict[str, Any]]:
+        """Get player's full inventory.
+
+        Args:
+            player_id: Player ID
 
-        return player.get('items', []) if player else []
+        Returns:
+            List of inventory items
+        """
+        stacks = await self.get_stacks(player_id)
+        return [as_item(item_id, stack) for item_id, stack in stacks.items()]
 
     async def get_equipped_items(self, player_id: str) -> List[Dict[str, Any]]:
         """Get player's equipped items.
-        
+
         Args:
             player_id: Player ID
-            
+
         Returns:
             List of equipped items
         """
@@ -178,43 +291,34 @@ class InventoryManager:
 
     async def has_item(self, player_id: str, item_id: str, quantity: int = 1) -> bool:
         """Check if player has specific item.
-        
+
         Args:
             player_id: Player ID
             item_id: Item identifier
             quantity: Required quantity
-            
+
         Returns:
             True if player has the item in required quantity
         """
-        player = await self.players.find_one(
-            {
-                '_id': ObjectId(player_id),
-                'items': {
-                    '$elemMatch': {
-                        'item_id': item_id,
-                        'quantity': {'$gte': quantity}
-                    }
-                }
-            }
-        )
-
-        return player is not None
+        return await self.get_item_count(player_id, item_id) >= quantity
 
     async def get_item_count(self, player_id: str, item_id: str) -> int:
         """Get count of specific item in inventory.
-        
+
         Args:
             player_id: Player ID
             item_id: Item identifier
-            
+
         Returns:
             Item quantity
         """
-        inventory = await self.get_inventory(player_id)
-
-        for item in inventory:
-            if item['item_id'] == item_id:
-                return item.get('quantity', 0)
-
-        return 0
+        player = await self.players.find_one(
+            {'_id': player_key(player_id)},
+            {'items': 1, item_path(item_id): 1}
+        )
+        if not player:
+            return 0
+        if is_legacy(player):
+            # The stack path can't be projected out of an array
+            return (await self.get_stacks(player_id)).get(item_id, {}).get('quantity', 0)
+        return inventory_of(player).get(item_id, {}).get('quantity', 0)
@@ -7,6 +7,7 @@ from backend.models.player.item_acquisition import ItemAcquisition
 from backend.models.world.world_item import WorldItem
 from backend.services.world.item_spawn_service import ItemSpawnService
 from backend.services.world.item_discovery_service import ItemDiscoveryService
+from backend.services.traits.trait_deltas import apply_trait_delta
 import uuid
 
 class ItemAcquisitionService:
@@ -194,6 +195,9 @@ class ItemAcquisitionService:
                 {"_id": player_id},
                 {"$set": {field_name: new_value}}
             )
+            await apply_trait_delta(
+                self.db, player_id, {skill_name: current_value}, {skill_name: new_value}
+            )
             
             return True, f"Skill '{skill_name}' increased to {new_value}"
         
@@ -220,6 +224,9 @@ class ItemAcquisitionService:
                 {"_id": player_id},
                 {"$set": {field_name: new_value}}
             )
+            await apply_trait_delta(
+                self.db, player_id, {meta_name: current_value}, {meta_name: new_value}
+            )
             
             return True, f"Meta trait '{meta_name}' increased to {new_value}"
         
@@ -4,6 +4,7 @@ from typing import Optional, Dict, Any
 from datetime import datetime
 from backend.core.database import get_database
 from fastapi import HTTPException
+from backend.services.player.visibility import public_profiles
 
 class PlayerProfileService:
     """Service for managing player profiles."""
@@ -47,10 +48,22 @@ class PlayerProfileService:
 
     async def update_visibility(self, player_id: str, visibility_settings: Dict[str, Any]) -> bool:
         """Update player visibility settings."""
-        return await self.update_player(
-            player_id,
-            {"visibility": visibility_settings}
-        )
+        try:
+            result = await self.collection.update_one(
+                {"_id": player_id},
+                {
+                    "$set": {
+                        "visibility": visibility_settings,
+                        "last_action": datetime.utcnow()
+                    },
+                    "$inc": {"visibility_version": 1}
+                }
+            )
+            public_profiles.invalidate(player_id)
+            return result.modified_count > 0
+        except Exception as e:
+            print(f"Error updating player: {e}")
+            return False
 
     async def get_online_players(self, limit: int = 50) -> list:
         """Get online players."""
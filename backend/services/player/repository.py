@@ -0,0 +1,78 @@
+"""Player repository - projected reads of player documents.
+
+Hot paths read players through a named view instead of loading the
+whole document and validating it into ``Player``. The views are
+identity, combat, economy, traits and social. Only the view's fields
+cross the wire, get decoded and get validated.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Type, TypeVar, Union
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from backend.models.player.views import (
+    PlayerCombat, PlayerEconomy, PlayerIdentity, PlayerSocial, PlayerTraits, PlayerView
+)
+
+PLAYER_VIEWS: Dict[str, Type[PlayerView]] = {
+    "identity": PlayerIdentity,
+    "combat": PlayerCombat,
+    "economy": PlayerEconomy,
+    "traits": PlayerTraits,
+    "social": PlayerSocial,
+}
+
+View = TypeVar("View", bound=PlayerView)
+
+
+def player_view(view: Union[str, Type[View]]) -> Type[View]:
+    if isinstance(view, str):
+        if view not in PLAYER_VIEWS:
+            raise ValueError(f"Unknown player view: {view}")
+        return PLAYER_VIEWS[view]
+    return view
+
+
+class PlayerRepository:
+    """Projected reads of the players collection.
+
+    ``traits`` adds single traits or meta traits to a view's projection,
+    e.g. the one or two traits an action compares. ``find`` returns the
+    projected document for code that works on dicts. ``get`` and
+    ``get_many`` return the view model.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.players = db.players
+
+    async def find(
+        self,
+        player_id: Any,
+        view: Union[str, Type[PlayerView]],
+        traits: Iterable[str] = ()
+    ) -> Optional[Dict[str, Any]]:
+        return await self.players.find_one(
+            {"_id": player_id},
+            projection=player_view(view).projection(traits)
+        )
+
+    async def get(
+        self,
+        player_id: Any,
+        view: Union[str, Type[View]],
+        traits: Iterable[str] = ()
+    ) -> Optional[View]:
+        model = player_view(view)
+        doc = await self.find(player_id, model, traits)
+        return model(**doc) if doc else None
+
+    async def get_many(
+        self,
+        player_ids: List[Any],
+        view: Union[str, Type[View]],
+        traits: Iterable[str] = ()
+    ) -> Dict[Any, View]:
+        """Several players in one query, keyed by id; missing players are left out"""
+        model = player_view(view)
+        cursor = self.players.find({"_id": {"$in": list(player_ids)}}, projection=model.projection(traits))
+        return {doc["_id"]: model(**doc) async for doc in cursor}
@@ -1,8 +1,20 @@
 """Player statistics calculator service."""
 
-from typing import Dict, Any
+from functools import lru_cache
+from typing import Dict, Any, Tuple
 import math
 
+import numpy as np
+
+from backend.models.player.traits import DEFAULT_TRAIT_VALUE
+from backend.services.player.trait_engine import DERIVED_FIELDS, RequirementMatrix, derived_traits, trait_vector
+
+
+@lru_cache(maxsize=256)
+def _requirement_matrix(requirements: Tuple[Tuple[str, float], ...]) -> RequirementMatrix:
+    """Requirements compiled once per distinct requirement set"""
+    return RequirementMatrix({'power': dict(requirements)})
+
 
 class StatsCalculator:
     """Calculate player stats from traits and level."""
@@ -62,51 +74,10 @@ class StatsCalculator:
         Returns:
             Dictionary with calculated derived traits
         """
-        traits = player.get('traits', {})
-
-        # Social derived traits
-        charisma = traits.get('charisma', 50)
-        kindness = traits.get('kindness', 50)
-        honesty = traits.get('honesty', 50)
-        deceit = traits.get('deceit', 50)
-
-        # Calculate reputation (charisma + kindness - deceit)
-        reputation = int((charisma + kindness - deceit) / 3)
-        reputation = max(0, min(100, reputation))
-
-        # Calculate influence (charisma + leadership)
-        leadership = traits.get('leadership', 50)
-        influence = int((charisma + leadership) / 2)
-
-        # Calculate trustworthiness (honesty + integrity - deceit)
-        integrity = traits.get('integrity', 50)
-        trustworthiness = int((honesty + integrity - deceit) / 3)
-        trustworthiness = max(0, min(100, trustworthiness))
-
-        # Economic traits
-        trading = traits.get('trading', 50)
-        negotiation = traits.get('negotiation', 50)
-        greed = traits.get('greed', 50)
-        perception_trait = traits.get('perception', 50)
-
-        business_acumen = int((trading + negotiation) / 2)
-        market_intuition = int((trading + perception_trait) / 2)
-
-        # Spiritual traits
-        meditation = traits.get('meditation', 50)
-        wisdom = traits.get('wisdom', 50)
-
-        enlightenment = int((meditation + wisdom) / 2)
-
-        return {
-            'reputation': reputation,
-            'influence': influence,
-            'trustworthiness': trustworthiness,
-            'business_acumen': business_acumen,
-            'market_intuition': market_intuition,
-            'enlightenment': enlightenment,
-            'karmic_balance': 50  # Base value, adjusted by karma
-        }
+        vector = trait_vector(player.get('traits', {}), missing=DEFAULT_TRAIT_VALUE, dtype=np.float64)
+        derived = dict(zip(DERIVED_FIELDS, derived_traits(vector).tolist()))
+        derived['karmic_balance'] = 50  # Base value, adjusted by karma
+        return derived
 
     @staticmethod
     def calculate_power_unlock_requirements(
@@ -123,45 +94,24 @@ class StatsCalculator:
             Dictionary with unlock status and missing requirements
         """
         requirements = superpower.get('requirements', {})
-        missing = []
-        met = True
-
-        for trait_name, required_value in requirements.items():
-            player_value = player_traits.get(trait_name, 0)
-            if player_value < required_value:
-                met = False
-                missing.append({
-                    'trait': trait_name,
-                    'required': required_value,
-                    'current': player_value,
-                    'difference': required_value - player_value
-                })
+        matrix = _requirement_matrix(tuple(requirements.items()))
+        vector = trait_vector(player_traits, missing=0, dtype=np.float64)
+        missing = [
+            {
+                'trait': trait_name,
+                'required': required_value,
+                'current': player_traits.get(trait_name, 0),
+                'difference': required_value - player_traits.get(trait_name, 0)
+            }
+            for trait_name, required_value, _ in matrix.shortfalls(vector, 'power')
+        ]
 
         return {
-            'unlockable': met,
+            'unlockable': not missing,
             'missing_requirements': missing,
-            'progress_percentage': StatsCalculator._calculate_progress_percentage(
-                requirements, player_traits
-            )
+            'progress_percentage': round(float(matrix.progress(vector)[0]), 2)
         }
 
-    @staticmethod
-    def _calculate_progress_percentage(
-        requirements: Dict[str, int],
-        player_traits: Dict[str, int]
-    ) -> float:
-        """Calculate overall progress towards meeting requirements."""
-        if not requirements:
-            return 100.0
-
-        total_progress = 0
-        for trait_name, required_value in requirements.items():
-            current_value = player_traits.get(trait_name, 0)
-            trait_progress = min(100, (current_value / required_value) * 100)
-            total_progress += trait_progress
-
-        return round(total_progress / len(requirements), 2)
-
     @staticmethod
     def calculate_level_progress(xp: int, level: int) -> Dict[str, Any]:
         """Calculate level progression.
@@ -5,6 +5,10 @@ from backend.models.player.superpowers import (
 from datetime import datetime
 import logging
 
+import numpy as np
+
+from backend.services.player.trait_engine import RequirementMatrix, trait_vector
+
 logger = logging.getLogger(__name__)
 
 # All 25 superpowers with their requirements
@@ -251,6 +255,11 @@ SUPERPOWER_DEFINITIONS = {
     ),
 }
 
+# Every power's requirements as one threshold matrix, for checking all powers at once
+SUPERPOWER_REQUIREMENTS = RequirementMatrix({
+    power_id: power_def.requirements for power_id, power_def in SUPERPOWER_DEFINITIONS.items()
+})
+
 class SuperpowerService:
     """Service for managing player superpowers"""
 
@@ -324,18 +333,22 @@ class SuperpowerService:
     @staticmethod
     def get_available_powers(player_traits: Dict[str, float]) -> List[Dict]:
         """Get list of powers player can unlock"""
+        vector = trait_vector(player_traits, dtype=np.float64)
         available = []
 
-        for power_id, power_def in SUPERPOWER_DEFINITIONS.items():
-            eligible, message = SuperpowerService.check_unlock_eligibility(
-                player_traits, power_id
-            )
+        for power_id, eligible in zip(SUPERPOWER_REQUIREMENTS.names, SUPERPOWER_REQUIREMENTS.eligible(vector)):
+            power_def = SUPERPOWER_DEFINITIONS[power_id]
+            if eligible:
+                message = "Requirements met"
+            else:
+                trait, min_value, _ = SUPERPOWER_REQUIREMENTS.shortfalls(vector, power_id)[0]
+                message = f"Requires {trait} >= {min_value}"
             available.append({
                 "power_id": power_id,
                 "name": power_def.name,
                 "description": power_def.description,
                 "tier": power_def.tier,
-                "eligible": eligible,
+                "eligible": bool(eligible),
                 "requirements": power_def.requirements,
                 "message": message
             })
@@ -6,7 +6,12 @@ from typing import Optional, Dict, List
 import math
 import random
 from backend.models.player.equipped_traits import PlayerEquippedTraits, EquippedTrait
-from backend.models.player.trait_cooldown import TraitCooldown, TraitUsageHistory
+from backend.models.player.trait_cooldown import TraitUsageHistory
+from backend.services.cooldowns import cooldowns
+from backend.services.world.position_index import position_dict, position_index
+
+# Cooldown service namespace for trait abilities
+TRAIT_COOLDOWNS = "trait"
 
 # Trait ability configurations
 TRAIT_ABILITIES = {
@@ -221,23 +226,9 @@ class TraitAbilityService:
             return False, "Trait not equipped", None
         
         # Check cooldown
-        active_cooldown = await self.db.trait_cooldowns.find_one({
-            "player_id": player_id,
-            "trait_id": trait_id,
-            "is_active": True
-        })
-        
-        if active_cooldown:
-            cooldown = TraitCooldown(**active_cooldown)
-            if datetime.utcnow() < cooldown.available_at:
-                seconds_remaining = int((cooldown.available_at - datetime.utcnow()).total_seconds())
-                return False, f"Ability on cooldown", seconds_remaining
-            else:
-                # Cooldown expired, mark as inactive
-                await self.db.trait_cooldowns.update_one(
-                    {"_id": active_cooldown["_id"]},
-                    {"$set": {"is_active": False}}
-                )
+        seconds_remaining = await cooldowns.remaining(player_id, TRAIT_COOLDOWNS, trait_id)
+        if seconds_remaining:
+            return False, f"Ability on cooldown", int(seconds_remaining)
         
         # Check energy
         player = await self.db.players.find_one({"_id": player_id})
@@ -268,21 +259,7 @@ class TraitAbilityService:
         if not trait_config:
             return False
         
-        cooldown_seconds = trait_config["cooldown_seconds"]
-        now = datetime.utcnow()
-        available_at = now + timedelta(seconds=cooldown_seconds)
-        
-        cooldown = TraitCooldown(
-            player_id=player_id,
-            trait_id=trait_id,
-            trait_type=trait_type,
-            used_at=now,
-            available_at=available_at,
-            cooldown_seconds=cooldown_seconds,
-            is_active=True
-        )
-        
-        await self.db.trait_cooldowns.insert_one(cooldown.model_dump())
+        await cooldowns.set(player_id, TRAIT_COOLDOWNS, trait_id, trait_config["cooldown_seconds"])
         return True
     
     async def consume_energy(
@@ -386,32 +363,27 @@ class TraitAbilityService:
         range_meters: float,
         exclude_player_id: Optional[str] = None
     ) -> List[Dict]:
-        """Get all players within range of a position."""
-        
-        # Get all online players with positions
-        cursor = self.db.players.find({
-            "status.is_online": True,
-            "position": {"$exists": True}
-        })
+        """Get all online players within range of a position, nearest first."""
         
-        all_players = await cursor.to_list(length=None)
-        nearby_players = []
+        # Positions come from the live index; only the players in range are loaded
+        nearby = await position_index.within(center_position, range_meters, exclude=exclude_player_id)
+        if not nearby:
+            return []
         
-        for player in all_players:
-            if exclude_player_id and player["_id"] == exclude_player_id:
-                continue
-            
-            if "position" in player:
-                distance = self.calculate_distance(center_position, player["position"])
-                if distance <= range_meters:
-                    nearby_players.append({
-                        "player_id": player["_id"],
-                        "username": player.get("username", "Unknown"),
-                        "position": player["position"],
-                        "distance": round(distance, 2),
-                        "level": player.get("level", 1)
-                    })
+        cursor = self.db.players.find(
+            {"_id": {"$in": [player_id for player_id, _, _ in nearby]}},
+            projection={"username": 1, "level": 1}
+        )
+        players = {player["_id"]: player async for player in cursor}
         
-        # Sort by distance
-        nearby_players.sort(key=lambda x: x["distance"])
-        return nearby_players
\ No newline at end of file
+        return [
+            {
+                "player_id": player_id,
+                "username": players[player_id].get("username", "Unknown"),
+                "position": position_dict(point),
+                "distance": round(distance, 2),
+                "level": players[player_id].get("level", 1)
+            }
+            for player_id, point, distance in nearby
+            if player_id in players
+        ]
\ No newline at end of file
@@ -0,0 +1,162 @@
+"""Trait engine - trait vectors and compiled requirement matrices.
+
+A player's 80 traits (``TraitsModel`` then ``MetaTraitsModel`` fields, in
+``ALL_TRAIT_FIELDS`` order) are one fixed-index vector, and many players
+are one (players x traits) matrix. Superpower and unlock requirements are
+compiled once into threshold matrices, so eligibility, progress, derived
+stats and top-k are array operations for one player or for a whole
+leaderboard at a time.
+
+Batches are float32. Per-player paths that return trait values or
+truncated stats pass ``dtype=np.float64`` so results match the stored
+values exactly.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.models.player.traits import ALL_TRAIT_FIELDS, META_TRAIT_FIELDS, TRAIT_FIELDS, TRAIT_INDEX
+
+TRAIT_DTYPE = np.float32
+TRAIT_COUNT = len(ALL_TRAIT_FIELDS)
+
+
+def trait_vector(
+    traits: Optional[Dict[str, Any]],
+    meta_traits: Optional[Dict[str, Any]] = None,
+    missing: float = np.nan,
+    dtype=TRAIT_DTYPE
+) -> np.ndarray:
+    """Trait dicts as one vector; traits not given (or unknown names) are ``missing``"""
+    vector = np.full(TRAIT_COUNT, missing, dtype=dtype)
+    for values in (traits, meta_traits):
+        for name, value in (values or {}).items():
+            index = TRAIT_INDEX.get(name)
+            if index is not None and value is not None:
+                vector[index] = value
+    return vector
+
+
+def model_vector(traits_model, meta_traits_model, dtype=TRAIT_DTYPE) -> np.ndarray:
+    """A player's ``TraitsModel`` and ``MetaTraitsModel`` as one vector, without dumping them"""
+    return np.fromiter(
+        [getattr(traits_model, name) for name in TRAIT_FIELDS]
+        + [getattr(meta_traits_model, name) for name in META_TRAIT_FIELDS],
+        dtype=dtype,
+        count=TRAIT_COUNT
+    )
+
+
+class RequirementMatrix:
+    """Named sets of minimum trait values, compiled into a threshold matrix.
+
+    Only the traits some set requires are kept as columns: ``thresholds``
+    is (sets x required traits) with NaN where a set doesn't require that
+    trait. A set requiring a trait that isn't one of the 80 can never be met.
+    """
+
+    def __init__(self, requirements: Dict[str, Dict[str, float]]):
+        self.names = list(requirements)
+        self.requirements = requirements
+        required = sorted({TRAIT_INDEX[trait] for needs in requirements.values() for trait in needs if trait in TRAIT_INDEX})
+        self.columns = np.array(required, dtype=np.intp)
+        column_of = {index: column for column, index in enumerate(required)}
+
+        self.thresholds = np.full((len(self.names), len(required)), np.nan, dtype=np.float64)
+        self.unknown = np.zeros(len(self.names), dtype=bool)
+        for row, needs in enumerate(requirements.values()):
+            for trait, minimum in needs.items():
+                if trait in TRAIT_INDEX:
+                    self.thresholds[row, column_of[TRAIT_INDEX[trait]]] = minimum
+                else:
+                    self.unknown[row] = True
+        self.required = ~np.isnan(self.thresholds)
+        self.counts = self.required.sum(axis=1) + np.array(
+            [sum(trait not in TRAIT_INDEX for trait in needs) for needs in requirements.values()]
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _values(self, vectors: np.ndarray) -> np.ndarray:
+        # (..., 1, required traits), broadcast against the (sets, required traits) thresholds
+        return np.asarray(vectors)[..., self.columns][..., np.newaxis, :]
+
+    def met(self, vectors: np.ndarray) -> np.ndarray:
+        """(..., sets, required traits): whether each requirement is met (missing traits never are)"""
+        with np.errstate(invalid="ignore"):
+            return (self._values(vectors) >= self.thresholds) | ~self.required
+
+    def eligible(self, vectors: np.ndarray) -> np.ndarray:
+        """(..., sets): whether every requirement of each set is met"""
+        return self.met(vectors).all(axis=-1) & ~self.unknown
+
+    def progress(self, vectors: np.ndarray) -> np.ndarray:
+        """(..., sets): average percentage of each requirement reached, missing traits counting as 0"""
+        values = np.nan_to_num(self._values(vectors).astype(np.float64), nan=0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            reached = np.where(self.required, np.minimum(100.0, values / self.thresholds * 100), 0.0)
+        totals = reached.sum(axis=-1)
+        return np.where(self.counts > 0, totals / np.maximum(self.counts, 1), 100.0)
+
+    def eligible_names(self, vector: np.ndarray) -> List[str]:
+        return [name for name, ok in zip(self.names, self.eligible(vector)) if ok]
+
+    def shortfalls(self, vector: np.ndarray, name: str) -> List[Tuple[str, float, float]]:
+        """(trait, required, current) for each unmet requirement of one set, in definition order"""
+        missing = []
+        for trait, minimum in self.requirements[name].items():
+            index = TRAIT_INDEX.get(trait)
+            current = float(vector[index]) if index is not None else float("nan")
+            if not current >= minimum:
+                missing.append((trait, minimum, current))
+        return missing
+
+
+def top_traits(vectors: np.ndarray, k: int, largest: bool = True) -> np.ndarray:
+    """(..., k) trait indices of the k highest (or lowest) values, best first.
+
+    Ties keep ``ALL_TRAIT_FIELDS`` order, like a stable sort of the trait dict.
+    """
+    values = np.asarray(vectors, dtype=np.float64)
+    keys = -values if largest else values
+    k = max(0, min(k, TRAIT_COUNT))
+    return np.argsort(keys, axis=-1, kind="stable")[..., :k]
+
+
+# Derived traits: (sum of + and - terms) / divisor, truncated like int()
+DERIVED_FORMULAS = {
+    "reputation": ({"charisma": 1, "kindness": 1, "deceit": -1}, 3, True),
+    "influence": ({"charisma": 1, "leadership": 1}, 2, False),
+    "trustworthiness": ({"honesty": 1, "integrity": 1, "deceit": -1}, 3, True),
+    "business_acumen": ({"trading": 1, "negotiation": 1}, 2, False),
+    "market_intuition": ({"trading": 1, "perception": 1}, 2, False),
+    "enlightenment": ({"meditation": 1, "wisdom": 1}, 2, False),
+}
+DERIVED_FIELDS = tuple(DERIVED_FORMULAS)
+_DERIVED_WIDTH = max(len(terms) for terms, _, _ in DERIVED_FORMULAS.values())
+# (derived fields x terms) trait index and sign of each term; unused slots have sign 0
+_DERIVED_INDEX = np.zeros((len(DERIVED_FORMULAS), _DERIVED_WIDTH), dtype=np.intp)
+_DERIVED_SIGN = np.zeros((len(DERIVED_FORMULAS), _DERIVED_WIDTH), dtype=np.float64)
+for _row, (_terms, _, _) in enumerate(DERIVED_FORMULAS.values()):
+    for _slot, (_trait, _sign) in enumerate(_terms.items()):
+        _DERIVED_INDEX[_row, _slot] = TRAIT_INDEX[_trait]
+        _DERIVED_SIGN[_row, _slot] = _sign
+_DERIVED_DIVISORS = np.array([divisor for _, divisor, _ in DERIVED_FORMULAS.values()], dtype=np.float64)
+_DERIVED_CLAMPED = np.array([clamped for _, _, clamped in DERIVED_FORMULAS.values()])
+
+
+def derived_traits(vectors: np.ndarray) -> np.ndarray:
+    """(..., derived fields) integer derived traits; missing base traits should be filled first"""
+    terms = np.where(_DERIVED_SIGN != 0, np.asarray(vectors, dtype=np.float64)[..., _DERIVED_INDEX] * _DERIVED_SIGN, 0.0)
+    # Terms are added left to right, as the formulas are written
+    totals = terms[..., 0]
+    for slot in range(1, _DERIVED_WIDTH):
+        totals = totals + terms[..., slot]
+    raw = np.trunc(totals / _DERIVED_DIVISORS)
+    return np.where(_DERIVED_CLAMPED, np.clip(raw, 0, 100), raw).astype(np.int64)
+
+
+def field_names(indices: Sequence[int]) -> List[str]:
+    return [ALL_TRAIT_FIELDS[index] for index in indices]
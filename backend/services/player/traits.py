@@ -1,6 +1,9 @@
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import Dict, List
+import numpy as np
 from backend.models.player.player import Player
+from backend.models.player.traits import ALL_TRAIT_FIELDS
+from backend.services.player.trait_engine import model_vector, top_traits
 from fastapi import HTTPException
 
 class TraitsService:
@@ -48,35 +51,27 @@ class TraitsService:
 
     def get_top_traits(self, player: Player, limit: int = 10) -> Dict:
         """Get player's highest traits."""
-        all_traits = {**player.traits.model_dump(), **
-                                                 player.meta_traits.model_dump()}
-        sorted_traits = sorted(
-            all_traits.items(), key=lambda x: x[1], reverse=True)
-
         return {
-            "top_traits": [
-                {"name": name, "value": value,
-                    "category": self._get_trait_category(name)}
-                for name, value in sorted_traits[:limit]
-            ],
+            "top_traits": self._ranked_traits(player, limit, largest=True),
             "count": limit
         }
 
     def get_bottom_traits(self, player: Player, limit: int = 10) -> Dict:
         """Get player's lowest traits."""
-        all_traits = {**player.traits.model_dump(), **
-                                                 player.meta_traits.model_dump()}
-        sorted_traits = sorted(all_traits.items(), key=lambda x: x[1])
-
         return {
-            "bottom_traits": [
-                {"name": name, "value": value,
-                    "category": self._get_trait_category(name)}
-                for name, value in sorted_traits[:limit]
-            ],
+            "bottom_traits": self._ranked_traits(player, limit, largest=False),
             "count": limit
         }
 
+    def _ranked_traits(self, player: Player, limit: int, largest: bool) -> List[Dict]:
+        """Top-k over the player's trait vector; ties keep trait field order."""
+        vector = model_vector(player.traits, player.meta_traits, dtype=np.float64)
+        return [
+            {"name": ALL_TRAIT_FIELDS[index], "value": float(vector[index]),
+                "category": self._get_trait_category(ALL_TRAIT_FIELDS[index])}
+            for index in top_traits(vector, limit, largest=largest)
+        ]
+
     def get_trait_details(self, player: Player, trait_name: str) -> Dict:
         """Get detailed information about a specific trait."""
         # Check if trait exists
@@ -139,30 +134,14 @@ class TraitsService:
         if trait_name not in (self.VIRTUES + self.VICES + self.SKILLS + self.META_TRAITS):
             raise HTTPException(status_code=404, detail="Trait not found")
 
-        # Determine if it's a meta trait or regular trait
-        is_meta = trait_name in self.META_TRAITS
-        field_name = f"meta_traits.{trait_name}" if is_meta else f"traits.{trait_name}"
-
-        # Update trait (with clamping to 0-100)
-        await db.players.update_one(
-            {"_id": player_id},
-            {"$inc": {field_name: points}}
-        )
-
-        # Clamp to 100
-        await db.players.update_one(
-            {"_id": player_id, field_name: {"$gt": 100}},
-            {"$set": {field_name: 100}}
-        )
+        # Imported here: the trait services depend on this package's trait engine
+        from backend.services.traits.trait_deltas import change_traits
 
-        # Get updated value
-        player_dict = await db.players.find_one({"_id": player_id})
-        player = Player(**player_dict)
-
-        if is_meta:
-            new_value = getattr(player.meta_traits, trait_name)
-        else:
-            new_value = getattr(player.traits, trait_name)
+        # Update trait (with clamping to 0-100) and record any milestones and unlocks
+        changed = await change_traits(db, player_id, {trait_name: points})
+        if trait_name not in changed["traits"]:
+            raise HTTPException(status_code=404, detail="Player not found")
+        new_value = changed["traits"][trait_name]
 
         return {
             "trait_name": trait_name,
@@ -1,6 +1,45 @@
+"""Player visibility - privacy settings and what other players may see.
+
+A setting in ``visibility`` gates document fields (``cash`` gates
+``currencies`` and so on). A setting the player never stored falls back
+to their tier's default. Untraceable tiers show only the username. The
+tier defaults, the stored overrides and the untraceable rule are
+compiled once into a MongoDB projection of aggregation expressions.
+MongoDB then returns only the fields a viewer may see, in the same
+query that finds the players.
+
+Public profiles are cached in process, keyed by (player, visibility
+version). Every settings change bumps ``visibility_version``.
+"""
+
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from typing import Dict
+from pymongo import ReturnDocument
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 from fastapi import HTTPException
+from backend.models.player.player import Visibility
+from backend.services.social.graph import social_graph
+
+# Shown to every viewer, except that untraceable tiers show only the username
+PROFILE_FIELDS = ("level", "prestige_level", "online", "active_title")
+# Fields each setting reveals (``location`` gates no player field)
+VISIBILITY_FIELDS = {
+    "cash": ("currencies",),
+    "economic_class": ("economic_class",),
+    "moral_class": ("moral_class",),
+    "karma_score": ("karma_points",),
+    "guild": ("guild_id", "guild_rank"),
+    "superpowers": ("superpowers",),
+}
+# Relations that see data a player hides, below the untraceable tiers
+CLOSE_RELATIONS = ("friend", "marriage", "alliance")
+UNTRACEABLE_TIERS = ("ghost", "phantom")
+
+PUBLIC_PROFILE_TTL = 30.0
+MAX_CACHED_PROFILES = 10_000
+
 
 class VisibilityService:
     """Service for managing player visibility/privacy settings."""
@@ -75,11 +114,6 @@ class VisibilityService:
         updates: Dict
     ) -> Dict:
         """Update player's visibility settings."""
-        # Get current player
-        player_dict = await db.players.find_one({"_id": player_id})
-        if not player_dict:
-            raise HTTPException(status_code=404, detail="Player not found")
-
         update_dict = {}
 
         # Handle privacy tier change
@@ -90,6 +124,12 @@ class VisibilityService:
                     status_code=400, detail="Invalid privacy tier")
 
             # Check if player can afford this tier
+            player_dict = await db.players.find_one(
+                {"_id": player_id}, projection={"currencies.credits": 1}
+            )
+            if not player_dict:
+                raise HTTPException(status_code=404, detail="Player not found")
+
             tier_cost = self.PRIVACY_TIERS[tier]["cost"]
             player_credits = player_dict.get(
                 "currencies", {}).get("credits", 0)
@@ -114,14 +154,16 @@ class VisibilityService:
         if not update_dict:
             return {"message": "No changes made"}
 
-        # Update database
-        await db.players.update_one(
+        # Update database; a new version retires cached profiles
+        updated_player = await db.players.find_one_and_update(
             {"_id": player_id},
-            {"$set": update_dict}
+            {"$set": update_dict, "$inc": {"visibility_version": 1}},
+            projection={"visibility": 1},
+            return_document=ReturnDocument.AFTER
         )
-
-        # Get updated visibility
-        updated_player = await db.players.find_one({"_id": player_id})
+        if not updated_player:
+            raise HTTPException(status_code=404, detail="Player not found")
+        public_profiles.invalidate(player_id)
 
         return {
             "message": "Visibility settings updated",
@@ -134,7 +176,7 @@ class VisibilityService:
         player_id: str
     ) -> Dict:
         """Get player's current visibility settings."""
-        player_dict = await db.players.find_one({"_id": player_id})
+        player_dict = await db.players.find_one({"_id": player_id}, projection={"visibility": 1})
         if not player_dict:
             raise HTTPException(status_code=404, detail="Player not found")
 
@@ -162,4 +204,175 @@ class VisibilityService:
         visibility = target_player_dict.get("visibility", {})
 
         # Check specific visibility setting
-        return visibility.get(data_type, False)
\ No newline at end of file
+        return visibility.get(data_type, False)
+
+    async def get_public_profile(self, db: AsyncIOMotorDatabase, player_id: str) -> Optional[Dict]:
+        """What any player may see of ``player_id``, cached per visibility version.
+
+        The current version is read first, which only fetches one field; a
+        cached profile is used only if it was read at that version.
+        """
+        current = await db.players.find_one({"_id": player_id}, projection={"visibility_version": 1})
+        if not current:
+            return None
+        profile = public_profiles.get(player_id, current.get("visibility_version", 0))
+        if profile is not None:
+            return profile
+        doc = await db.players.find_one({"_id": player_id}, projection=visible_projection())
+        if not doc:
+            return None
+        profile = serialize_profile(doc)
+        public_profiles.put(player_id, doc.get("visibility_version", 0), profile)
+        return profile
+
+    async def visible_players(
+        self,
+        db: AsyncIOMotorDatabase,
+        viewer_id: str,
+        query: Dict,
+        limit: int,
+        fields: Iterable[str] = tuple(VISIBILITY_FIELDS),
+        skip: int = 0
+    ) -> List[Dict]:
+        """Players matching ``query``, each with only what ``viewer_id`` may see.
+
+        The viewer's close relations come from the social graph. Each
+        player is annotated with the viewer's ``relations`` to them.
+        That is one graph lookup (usually cached) and one players query.
+        """
+        connections = await social_graph.connections(db, viewer_id)
+        relations: Dict[str, List[str]] = {}
+        for type, player_ids in connections.items():
+            for other in player_ids:
+                relations.setdefault(other, []).append(type)
+        close = sorted(other for other, types in relations.items() if set(types) & set(CLOSE_RELATIONS))
+        cursor = db.players.find(
+            query, projection=visible_projection(tuple(fields), close=close)
+        ).skip(skip).limit(limit)
+        players = []
+        async for doc in cursor:
+            player = serialize_profile(doc)
+            player["relations"] = relations.get(doc["_id"], [])
+            players.append(player)
+        return players
+
+
+class PublicProfileCache:
+    """Public profiles by (player, visibility version), bounded and short-lived.
+
+    Readers look entries up with the player's current visibility version,
+    so a settings change made by any process retires the cached profile at
+    once. The TTL only bounds how stale the rest of the profile can be.
+    """
+
+    def __init__(self, max_entries: int = MAX_CACHED_PROFILES, ttl: float = PUBLIC_PROFILE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        # player_id -> visibility version last read
+        self._versions: Dict[str, int] = {}
+        # (player_id, version) -> (cached at, profile)
+        self._profiles: "OrderedDict[Tuple[str, int], Tuple[float, Dict]]" = OrderedDict()
+
+    def get(self, player_id: str, version: int) -> Optional[Dict]:
+        """The cached profile, if it was read at ``version``"""
+        if self._versions.get(player_id) != version:
+            return None
+        key = (player_id, version)
+        entry = self._profiles.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            self.invalidate(player_id)
+            return None
+        self._profiles.move_to_end(key)
+        return entry[1]
+
+    def put(self, player_id: str, version: int, profile: Dict) -> None:
+        self.invalidate(player_id)
+        self._versions[player_id] = version
+        self._profiles[(player_id, version)] = (time.monotonic(), profile)
+        while len(self._profiles) > self.max_entries:
+            (evicted, _), _ = self._profiles.popitem(last=False)
+            self._versions.pop(evicted, None)
+
+    def invalidate(self, player_id: str) -> None:
+        version = self._versions.pop(player_id, None)
+        if version is not None:
+            self._profiles.pop((player_id, version), None)
+
+
+public_profiles = PublicProfileCache()
+
+
+def _tier_expr() -> Dict:
+    return {"$ifNull": ["$visibility.privacy_tier", "public"]}
+
+
+def _setting_expr(setting: str) -> Any:
+    """A stored setting, else the default of the player's tier, else the model default"""
+    model_default = Visibility.model_fields[setting].default
+    tiers = VisibilityService.PRIVACY_TIERS
+    if all(setting not in tier["defaults"] for tier in tiers.values()):
+        default: Any = model_default
+    else:
+        default = {"$in": [_tier_expr(), [
+            name for name, tier in tiers.items() if tier["defaults"].get(setting, model_default)
+        ]]}
+    return {"$ifNull": [f"$visibility.{setting}", default]}
+
+
+def _shown(condition: Any, value: Any) -> Dict:
+    return {"$cond": [condition, value, "$$REMOVE"]}
+
+
+@lru_cache(maxsize=None)
+def _compiled_projection(fields: Tuple[str, ...], trusted: bool, traits: bool) -> Dict[str, Any]:
+    traceable = {"$not": [{"$in": [_tier_expr(), list(UNTRACEABLE_TIERS)]}]}
+    projection: Dict[str, Any] = {
+        "username": 1,
+        "visibility_version": 1,
+        "privacy_tier": _tier_expr(),
+        **{field: _shown(traceable, f"${field}") for field in PROFILE_FIELDS},
+    }
+    for setting in fields:
+        condition = traceable if trusted else {"$and": [traceable, _setting_expr(setting)]}
+        for field in VISIBILITY_FIELDS[setting]:
+            projection[field] = _shown(condition, f"${field}")
+    if traits:
+        public_traits = {"$filter": {
+            "input": {"$objectToArray": {"$ifNull": ["$traits", {}]}},
+            "cond": True if trusted else {"$in": ["$$this.k", {"$ifNull": ["$visibility.traits_public", []]}]}
+        }}
+        projection["traits"] = _shown(traceable, {"$arrayToObject": public_traits})
+    return projection
+
+
+def visible_projection(
+    fields: Tuple[str, ...] = tuple(VISIBILITY_FIELDS),
+    close: Iterable[str] = (),
+    traits: bool = True
+) -> Dict[str, Any]:
+    """MongoDB projection of what a viewer may see of a player.
+
+    ``fields`` are the visibility settings to include, plus the public
+    traits unless ``traits`` is false. ``close`` lists
+    the viewer's close relations, who also see hidden settings. The
+    projections for strangers and for close relations are compiled once.
+    When both kinds of player can match, the two are picked per player
+    by ``_id``.
+    """
+    public = _compiled_projection(fields, False, traits)
+    close = list(close)
+    if not close:
+        return public
+    trusted = _compiled_projection(fields, True, traits)
+    is_close = {"$in": ["$_id", close]}
+    return {
+        field: expression if trusted[field] == expression else {"$cond": [is_close, trusted[field], expression]}
+        for field, expression in public.items()
+    }
+
+
+def serialize_profile(doc: Dict) -> Dict:
+    """Response for a document read through ``visible_projection``"""
+    profile = dict(doc)
+    profile.pop("visibility_version", None)
+    return profile
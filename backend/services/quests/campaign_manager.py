@@ -6,6 +6,8 @@ from motor.motor_asyncio import AsyncIOMotorClient
 from bson import ObjectId
 import logging
 
+from backend.services.traits.trait_deltas import change_traits
+
 logger = logging.getLogger(__name__)
 
 class CampaignManager:
@@ -210,15 +212,8 @@ class CampaignManager:
 
             # Trait changes
             if "traits" in consequences:
+                await change_traits(self.db, player_id, consequences["traits"])
                 for trait, change in consequences["traits"].items():
-                    player = await self.players.find_one({"_id": player_id})
-                    current = player["traits"].get(trait, 0)
-                    new_value = max(0, min(100, current + change))
-
-                    await self.players.update_one(
-                        {"_id": player_id},
-                        {"$set": {f"traits.{trait}": new_value}}
-                    )
                     applied[f"trait_{trait}"] = change
 
             # Rewards
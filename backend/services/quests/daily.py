@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 from backend.core.database import get_database
 from .generator import QuestGenerator
 from .manager import QuestManager
+from .reset_pipeline import QuestResetPipeline, period_key
 
 
 class DailyQuestService:
@@ -12,51 +13,55 @@ class DailyQuestService:
         self.db = db
         self.generator = None
         self.quest_service = None
+        self.reset_pipeline = None
 
     async def _ensure_initialized(self):
         """Lazy initialization of dependencies."""
         if self.db is None:
-            self.db = await get_database()
+            self.db = get_database()
         if self.generator is None:
             self.generator = QuestGenerator(self.db)
         if self.quest_service is None:
             self.quest_service = QuestManager(self.db)
+        if self.reset_pipeline is None:
+            self.reset_pipeline = QuestResetPipeline(self.db)
 
     async def get_daily_quests(self, player_id: str) -> List[Dict]:
-        """Get or generate daily quests for today."""
+        """Get today's daily quests (pre-generated, or generated if missing)."""
         await self._ensure_initialized()
         
-        player = await self.db.players.find_one({"_id": player_id})
+        player = await self.db.players.find_one(
+            {"_id": player_id},
+            projection={"level": 1, "traits": 1}
+        )
         if not player:
             return []
 
-        # Check if player has quests for today
-        today = datetime.utcnow().date()
-        last_daily_reset = player.get("last_daily_quest_reset")
-
-        # Generate new quests if needed
-        if not last_daily_reset or last_daily_reset.date() < today:
-            await self._generate_new_daily_quests(player_id)
-
-        # Return today's daily quests
-        return await self.quest_service.get_available_quests(
-            player_id,
-            quest_type="daily"
-        )
+        return await self.reset_pipeline.get_period_quests(player_id, player, "daily")
 
     async def _generate_new_daily_quests(self, player_id: str) -> None:
-        """Generate new daily quests."""
+        """Replace today's open daily quests with new ones.
+
+        The replacements take fresh period slots through the reset pipeline,
+        so concurrent refreshes can't give the player two daily sets.
+        """
         await self._ensure_initialized()
         
-        player = await self.db.players.find_one({"_id": player_id})
+        player = await self.db.players.find_one(
+            {"_id": player_id},
+            projection={"level": 1, "traits": 1}
+        )
         if not player:
             return
 
-        # Generate 3 daily quests
-        quest_data_list = await self.generator.generate_daily_quests(player_id, player, count=3)
+        key = period_key("daily")
+        await self.db.quests.update_many(
+            {"player_id": player_id, "period_key": key, "status": {"$in": ["scheduled", "available"]}},
+            {"$set": {"status": "expired", "updated_at": datetime.utcnow()}}
+        )
 
-        for quest_data in quest_data_list:
-            await self.quest_service.create_quest(player_id, quest_data)
+        # Expired quests keep their slots, so the replacements take new ones
+        await self.reset_pipeline.get_period_quests(player_id, player, "daily")
 
         # Update player's last reset time
         await self.db.players.update_one(
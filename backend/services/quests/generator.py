@@ -1,7 +1,8 @@
 """Quest generator service - Creates quests using AI (Oracle)"""
 
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Optional
 import uuid
 import random
 
@@ -55,27 +56,23 @@ class QuestGenerator:
         player_id: str,
         player: Dict[str, Any],
         count: int = 3,
+        period_key: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Generate daily quests"""
-        quests = []
-
-        for i in range(count):
-            # Use simpler template-based generation for daily quests
-            quest = self._generate_simple_quest(
-                player_id=player_id,
-                player=player,
-                quest_type=QuestType.DAILY,
-                difficulty="easy",
-            )
-
-            # Set expiry (daily quests expire at end of day)
-            tomorrow = datetime.utcnow().replace(hour=0, minute=0, second=0,
-                                       microsecond=0) + timedelta(days=1)
-            quest["expires_at"] = tomorrow
-
-            await self.quests.insert_one(quest)
-            quests.append(quest)
-
+        # Set expiry (daily quests expire at end of day)
+        tomorrow = datetime.utcnow().replace(hour=0, minute=0, second=0,
+                                   microsecond=0) + timedelta(days=1)
+        quests = self.build_period_quests(
+            player_id=player_id,
+            player=player,
+            quest_type=QuestType.DAILY,
+            count=count,
+            expires_at=tomorrow,
+            period_key=period_key,
+        )
+
+        if quests:
+            await self.quests.insert_many(quests)
         return quests
 
     async def generate_weekly_quests(
@@ -83,23 +80,49 @@ class QuestGenerator:
         player_id: str,
         player: Dict[str, Any],
         count: int = 5,
+        period_key: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
         """Generate weekly quests"""
-        quests = []
+        # Set expiry (weekly quests expire in 7 days)
+        quests = self.build_period_quests(
+            player_id=player_id,
+            player=player,
+            quest_type=QuestType.WEEKLY,
+            count=count,
+            expires_at=datetime.utcnow() + timedelta(days=7),
+            period_key=period_key,
+        )
+
+        if quests:
+            await self.quests.insert_many(quests)
+        return quests
+
+    def build_period_quests(
+        self,
+        player_id: str,
+        player: Dict[str, Any],
+        quest_type: QuestType,
+        count: int,
+        expires_at: datetime,
+        period_key: Optional[str] = None,
+        status: str = "available",
+    ) -> List[Dict[str, Any]]:
+        """Build daily/weekly quest documents without inserting them"""
+        # Daily quests are easy, weekly quests are harder
+        difficulty = "easy" if quest_type == QuestType.DAILY else "medium"
 
-        for i in range(count):
-            # Weekly quests are harder
+        quests = []
+        for _ in range(count):
             quest = self._generate_simple_quest(
                 player_id=player_id,
                 player=player,
-                quest_type=QuestType.WEEKLY,
-                difficulty="medium",
+                quest_type=quest_type,
+                difficulty=difficulty,
             )
-
-            # Set expiry (weekly quests expire in 7 days)
-            quest["expires_at"] = datetime.utcnow() + timedelta(days=7)
-
-            await self.quests.insert_one(quest)
+            quest["expires_at"] = expires_at
+            quest["status"] = status
+            if period_key:
+                quest["period_key"] = period_key
             quests.append(quest)
 
         return quests
@@ -112,7 +135,6 @@ class QuestGenerator:
         difficulty: str = "medium",
     ) -> Dict[str, Any]:
         """Generate simple quest from templates"""
-        quest_id = str(uuid.uuid4())
         player_level = player.get("level", 1)
 
         # Choose objective types based on player's strong traits
@@ -134,9 +156,36 @@ class QuestGenerator:
         # Select random objective
         obj_type = random.choice(possible_objectives)
 
-        # Generate objective based on type
-        objective = self._create_objective(obj_type, difficulty, player_level)
+        # Static parts are precomputed once per (type, difficulty, level, objective)
+        template = _quest_template(quest_type, difficulty, player_level, obj_type)
+        now = datetime.utcnow()
 
+        quest = dict(template)
+        quest.update({
+            "_id": str(uuid.uuid4()),
+            "player_id": player_id,
+            "generated_at": now,
+            "objectives": [{**template["objectives"][0], "objective_id": str(uuid.uuid4())}],
+            "rewards": {**template["rewards"], "items": [], "trait_boosts": {}},
+            "requirements": {
+                **template["requirements"],
+                "required_traits": {},
+                "required_items": [],
+                "required_quests": [],
+            },
+            "created_at": now,
+            "updated_at": now,
+        })
+        return quest
+
+    @staticmethod
+    def _build_quest_template(
+        quest_type: QuestType,
+        difficulty: str,
+        player_level: int,
+        obj_type: ObjectiveType,
+    ) -> Dict[str, Any]:
+        """Build the player-independent part of a template quest"""
         # Generate quest title and description
         titles = {
             ObjectiveType.HACK: "System Breach",
@@ -154,42 +203,32 @@ class QuestGenerator:
             ObjectiveType.WIN_COMBAT: "Prove yourself in combat.",
         }
 
-        # Calculate rewards based on difficulty
-        rewards = self._calculate_rewards(difficulty, player_level, obj_type)
-
         return {
-            "_id": quest_id,
             "quest_type": quest_type.value,
             "title": titles.get(obj_type, "Quest"),
             "description": descriptions.get(obj_type, "Complete this quest."),
             "lore": None,
-            "player_id": player_id,
             "guild_id": None,
             "generated_by": "system",
-            "generated_at": datetime.utcnow(),
             "seed": None,
             "status": "available",
-            "objectives": [objective],
-            "rewards": rewards,
+            "objectives": [QuestGenerator._create_objective(obj_type, difficulty, player_level)],
+            # Calculate rewards based on difficulty
+            "rewards": QuestGenerator._calculate_rewards(difficulty, player_level, obj_type),
             "requirements": {
                 "min_level": 1,
                 "min_karma": None,
                 "max_karma": None,
-                "required_traits": {},
-                "required_items": [],
-                "required_quests": [],
             },
             "story_data": None,
             "expires_at": None,  # Will be set by caller
             "started_at": None,
             "completed_at": None,
             "completion_time": None,
-            "created_at": datetime.utcnow(),
-            "updated_at": datetime.utcnow(),
         }
 
+    @staticmethod
     def _create_objective(
-        self,
         obj_type: ObjectiveType,
         difficulty: str,
         player_level: int,
@@ -222,8 +261,8 @@ class QuestGenerator:
             "completed": False,
         }
 
+    @staticmethod
     def _calculate_rewards(
-        self,
         difficulty: str,
         player_level: int,
         obj_type: ObjectiveType,
@@ -252,3 +291,14 @@ class QuestGenerator:
             "trait_boosts": {},
             "special": None,
         }
+
+
+@lru_cache(maxsize=1024)
+def _quest_template(
+    quest_type: QuestType,
+    difficulty: str,
+    player_level: int,
+    obj_type: ObjectiveType,
+) -> Dict[str, Any]:
+    """Cached quest template; callers must copy nested dicts before mutating"""
+    return QuestGenerator._build_quest_template(quest_type, difficulty, player_level, obj_type)
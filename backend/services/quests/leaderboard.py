@@ -1,40 +1,107 @@
 """Quest leaderboard service"""
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
+import asyncio
+import logging
+import time
+import uuid
+
+from pymongo.errors import DuplicateKeyError
+
+from ...monitoring.metrics import metrics_collector
+
+logger = logging.getLogger(__name__)
+
+TIMEFRAMES = ("daily", "weekly", "monthly", "all_time")
+
+# How stale each materialized board may get before the scheduled refresh rebuilds it
+REFRESH_INTERVALS = {
+    "daily": timedelta(minutes=5),
+    "weekly": timedelta(minutes=10),
+    "monthly": timedelta(minutes=30),
+    "all_time": timedelta(hours=1),
+    "speedruns": timedelta(minutes=30),
+}
+
+# Speedruns kept per quest type (and overall) in the snapshot
+SPEEDRUN_DEPTH = 1000
+ALL_QUEST_TYPES = "all"
+
+# Background builds of boards requested before their first refresh, one per board
+_cold_builds: Dict[str, asyncio.Task] = {}
 
 
 class QuestLeaderboardService:
-    """Manages quest leaderboards"""
+    """Manages quest leaderboards.
+
+    Leaderboards are materialized per timeframe into ``quest_leaderboard_snapshots``
+    (and speedruns into ``quest_speedrun_snapshots``) by an aggregation that joins
+    usernames with ``$lookup`` and writes rows with ``$merge``. Reads are served
+    from the snapshots; rank lookups hit the ``_id`` index.
+
+    Every refresh writes its rows under its own ``refresh_id`` and then swaps
+    the board's pointer in ``quest_leaderboard_refreshes`` to it, only if no
+    newer refresh has been published meanwhile. Readers follow the pointer,
+    so they never see a half-written board, and concurrent refreshes can't
+    delete each other's rows: the loser drops its own, and the winner drops
+    versions older than the one it replaced.
+    """
 
     def __init__(self, db):
         self.db = db
         self.quests = db.quests
         self.players = db.players
+        self.snapshots = db.quest_leaderboard_snapshots
+        self.speedrun_snapshots = db.quest_speedrun_snapshots
+        self.refreshes = db.quest_leaderboard_refreshes
 
-    async def get_completion_leaderboard(
-        self,
-        timeframe: str = "all_time",
-        limit: int = 100,
-    ) -> List[Dict[str, Any]]:
-        """Get quest completion leaderboard"""
-        # Build time filter
-        time_filter = {}
+    async def ensure_indexes(self) -> None:
+        """Create indexes for the source aggregation and snapshot reads"""
+        await self.quests.create_index([("status", 1), ("completed_at", -1)])
+        await self.quests.create_index([("status", 1), ("completion_time", 1)])
+        await self.snapshots.create_index([("timeframe", 1), ("refresh_id", 1), ("rank", 1)])
+        await self.snapshots.create_index([("timeframe", 1), ("refreshed_at", 1)])
+        await self.speedrun_snapshots.create_index([("refresh_id", 1), ("quest_type", 1), ("rank", 1)])
+        await self.speedrun_snapshots.create_index("refreshed_at")
+
+    def _time_filter(self, timeframe: str) -> Dict[str, Any]:
+        """Build the completed_at filter for a timeframe"""
         if timeframe == "daily":
             start = datetime.utcnow().replace(
                 hour=0, minute=0, second=0, microsecond=0
             )
-            time_filter = {"completed_at": {"$gte": start}}
-        elif timeframe == "weekly":
-            start = datetime.utcnow() - timedelta(days=7)
-            time_filter = {"completed_at": {"$gte": start}}
-        elif timeframe == "monthly":
-            start = datetime.utcnow() - timedelta(days=30)
-            time_filter = {"completed_at": {"$gte": start}}
-
-        # Aggregate completions by player
+            return {"completed_at": {"$gte": start}}
+        if timeframe == "weekly":
+            return {"completed_at": {"$gte": datetime.utcnow() - timedelta(days=7)}}
+        if timeframe == "monthly":
+            return {"completed_at": {"$gte": datetime.utcnow() - timedelta(days=30)}}
+        return {}
+
+    @staticmethod
+    def _username_lookup(local_field: str) -> List[Dict[str, Any]]:
+        """Join only the username of each ranked player"""
+        return [
+            {
+                "$lookup": {
+                    "from": "players",
+                    "localField": local_field,
+                    "foreignField": "_id",
+                    "pipeline": [{"$project": {"_id": 0, "username": 1}}],
+                    "as": "player",
+                }
+            },
+            {"$set": {"username": {"$ifNull": [{"$first": "$player.username"}, "Unknown"]}}},
+        ]
+
+    async def refresh_completion_leaderboard(self, timeframe: str) -> Dict[str, Any]:
+        """Rebuild the materialized completion leaderboard for a timeframe"""
+        started = time.perf_counter()
+        refresh_id = str(uuid.uuid4())
+        refreshed_at = datetime.utcnow()
+
         pipeline = [
-            {"$match": {"status": "completed", **time_filter}},
+            {"$match": {"status": "completed", **self._time_filter(timeframe)}},
             {
                 "$group": {
                     "_id": "$player_id",
@@ -42,26 +109,143 @@ class QuestLeaderboardService:
                     "total_xp_earned": {"$sum": "$rewards.xp"},
                 }
             },
-            {"$sort": {"quests_completed": -1}},
-            {"$limit": limit}
+            {
+                "$setWindowFields": {
+                    "sortBy": {"quests_completed": -1, "total_xp_earned": -1, "_id": 1},
+                    "output": {"rank": {"$documentNumber": {}}},
+                }
+            },
+            *self._username_lookup("_id"),
+            {
+                "$project": {
+                    "_id": {"$concat": [timeframe, ":", refresh_id, ":", {"$toString": "$_id"}]},
+                    "timeframe": timeframe,
+                    "player_id": "$_id",
+                    "username": 1,
+                    "rank": 1,
+                    "quests_completed": 1,
+                    "total_xp_earned": 1,
+                    "refresh_id": refresh_id,
+                    "refreshed_at": refreshed_at,
+                }
+            },
+            {
+                "$merge": {
+                    "into": "quest_leaderboard_snapshots",
+                    "on": "_id",
+                    "whenMatched": "replace",
+                    "whenNotMatched": "insert",
+                }
+            },
         ]
+        await self.quests.aggregate(pipeline).to_list(length=None)
+
+        return await self._publish(
+            board=timeframe,
+            collection=self.snapshots,
+            scope={"timeframe": timeframe},
+            refresh_id=refresh_id,
+            started=started,
+            refreshed_at=refreshed_at,
+        )
+
+    async def refresh_speedrun_leaderboard(self) -> Dict[str, Any]:
+        """Rebuild the materialized speedrun leaderboards (overall and per quest type)"""
+        started = time.perf_counter()
+        refresh_id = str(uuid.uuid4())
+        refreshed_at = datetime.utcnow()
 
-        leaderboard = []
-        rank = 1
-        async for entry in self.quests.aggregate(pipeline):
-            # Get player info
-            player = await self.players.find_one({"_id": entry["_id"]})
+        match = {"$match": {"status": "completed", "completion_time": {"$exists": True, "$gt": 0}}}
 
-            leaderboard.append({
-                "rank": rank,
-                "player_id": entry["_id"],
-                "username": player.get("username") if player else "Unknown",
-                "quests_completed": entry["quests_completed"],
-                "total_xp_earned": entry.get("total_xp_earned", 0),
-            })
-            rank += 1
+        def ranked(partition: Optional[str], key_prefix: Any) -> List[Dict[str, Any]]:
+            window = {
+                "sortBy": {"completion_time": 1, "_id": 1},
+                "output": {"rank": {"$documentNumber": {}}},
+            }
+            if partition:
+                window["partitionBy"] = partition
+            return [
+                {"$setWindowFields": window},
+                {"$match": {"rank": {"$lte": SPEEDRUN_DEPTH}}},
+                *self._username_lookup("player_id"),
+                {
+                    "$project": {
+                        "_id": {"$concat": [refresh_id, ":", key_prefix, ":", {"$toString": "$rank"}]},
+                        "quest_type": key_prefix,
+                        "rank": 1,
+                        "player_id": 1,
+                        "username": 1,
+                        "quest_title": "$title",
+                        "completion_time": 1,
+                        "completed_quest_type": "$quest_type",
+                        "refresh_id": refresh_id,
+                        "refreshed_at": refreshed_at,
+                    }
+                },
+                {
+                    "$merge": {
+                        "into": "quest_speedrun_snapshots",
+                        "on": "_id",
+                        "whenMatched": "replace",
+                        "whenNotMatched": "insert",
+                    }
+                },
+            ]
 
-        return leaderboard
+        await self.quests.aggregate(
+            [match, *ranked(None, ALL_QUEST_TYPES)]
+        ).to_list(length=None)
+        await self.quests.aggregate(
+            [match, *ranked("$quest_type", {"$ifNull": ["$quest_type", "unknown"]})]
+        ).to_list(length=None)
+
+        return await self._publish(
+            board="speedruns",
+            collection=self.speedrun_snapshots,
+            scope={},
+            refresh_id=refresh_id,
+            started=started,
+            refreshed_at=refreshed_at,
+        )
+
+    async def refresh_due(self, force: bool = False) -> List[Dict[str, Any]]:
+        """Refresh every board whose snapshot is older than its refresh interval"""
+        last_refreshes = {
+            doc["_id"]: doc["refreshed_at"]
+            async for doc in self.refreshes.find({}, projection={"refreshed_at": 1})
+        }
+        now = datetime.utcnow()
+
+        results = []
+        for board, interval in REFRESH_INTERVALS.items():
+            last = last_refreshes.get(board)
+            if not force and last and now - last < interval:
+                continue
+            results.append(await self.refresh(board))
+
+        return results
+
+    async def refresh(self, board: str) -> Dict[str, Any]:
+        """Rebuild one board (a timeframe or ``speedruns``)"""
+        if board == "speedruns":
+            return await self.refresh_speedrun_leaderboard()
+        return await self.refresh_completion_leaderboard(board)
+
+    async def get_completion_leaderboard(
+        self,
+        timeframe: str = "all_time",
+        limit: int = 100,
+    ) -> List[Dict[str, Any]]:
+        """Get quest completion leaderboard"""
+        refresh_id = await self._current(timeframe)
+        if refresh_id is None:
+            return []
+
+        cursor = self.snapshots.find(
+            {"timeframe": timeframe, "refresh_id": refresh_id},
+            projection={"_id": 0, "timeframe": 0, "refresh_id": 0, "refreshed_at": 0},
+        ).sort("rank", 1).limit(limit)
+        return await cursor.to_list(length=limit)
 
     async def get_speedrun_leaderboard(
         self,
@@ -69,48 +253,39 @@ class QuestLeaderboardService:
         limit: int = 100,
     ) -> List[Dict[str, Any]]:
         """Get fastest quest completions"""
-        match_filter = {
-            "status": "completed",
-            "completion_time": {"$exists": True, "$gt": 0}
-        }
+        refresh_id = await self._current("speedruns")
+        if refresh_id is None:
+            return []
 
-        if quest_type:
-            match_filter["quest_type"] = quest_type
+        cursor = self.speedrun_snapshots.find(
+            {"refresh_id": refresh_id, "quest_type": quest_type or ALL_QUEST_TYPES},
+        ).sort("rank", 1).limit(limit)
 
-        pipeline = [
-            {"$match": match_filter},
-            {"$sort": {"completion_time": 1}},
-            {"$limit": limit}
+        return [
+            {
+                "rank": entry["rank"],
+                "player_id": entry["player_id"],
+                "username": entry["username"],
+                "quest_title": entry.get("quest_title"),
+                "completion_time": entry["completion_time"],
+                "quest_type": entry.get("completed_quest_type"),
+            }
+            async for entry in cursor
         ]
 
-        speedruns = []
-        rank = 1
-        async for quest in self.quests.aggregate(pipeline):
-            player = await self.players.find_one({"_id": quest["player_id"]})
-
-            speedruns.append({
-                "rank": rank,
-                "player_id": quest["player_id"],
-                "username": player.get("username") if player else "Unknown",
-                "quest_title": quest.get("title"),
-                "completion_time": quest["completion_time"],
-                "quest_type": quest.get("quest_type"),
-            })
-            rank += 1
-
-        return speedruns
-
     async def get_player_rank(
         self,
         player_id: str,
         timeframe: str = "all_time",
     ) -> Dict[str, Any]:
         """Get player's rank on leaderboard"""
-        leaderboard = await self.get_completion_leaderboard(timeframe, limit=10000)
-
-        for entry in leaderboard:
-            if entry["player_id"] == player_id:
-                return entry
+        refresh_id = await self._current(timeframe)
+        entry = refresh_id and await self.snapshots.find_one(
+            {"_id": f"{timeframe}:{refresh_id}:{player_id}"},
+            projection={"_id": 0, "timeframe": 0, "refresh_id": 0, "refreshed_at": 0},
+        )
+        if entry:
+            return entry
 
         return {
             "rank": None,
@@ -118,3 +293,82 @@ class QuestLeaderboardService:
             "quests_completed": 0,
             "message": "Not ranked yet",
         }
+
+    async def _current(self, board: str) -> Optional[str]:
+        """The published ``refresh_id`` of a board.
+
+        A board that has never been refreshed is built in the background
+        rather than in the request, and reads as empty until it lands.
+        """
+        pointer = await self.refreshes.find_one({"_id": board}, projection={"refresh_id": 1})
+        if pointer and pointer.get("refresh_id"):
+            return pointer["refresh_id"]
+
+        if board not in _cold_builds:
+            task = asyncio.create_task(self.refresh(board))
+            _cold_builds[board] = task
+            task.add_done_callback(lambda done: self._cold_build_done(board, done))
+        return None
+
+    @staticmethod
+    def _cold_build_done(board: str, task: asyncio.Task) -> None:
+        _cold_builds.pop(board, None)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Error building quest leaderboard {board}: {task.exception()}")
+
+    async def _publish(
+        self,
+        board: str,
+        collection,
+        scope: Dict[str, Any],
+        refresh_id: str,
+        started: float,
+        refreshed_at: datetime,
+    ) -> Dict[str, Any]:
+        """Point readers at a finished refresh unless a newer one got there first"""
+        duration = time.perf_counter() - started
+        entries = await collection.count_documents({**scope, "refresh_id": refresh_id})
+        result = {
+            "board": board,
+            "refresh_id": refresh_id,
+            "entries": entries,
+            "duration_ms": round(duration * 1000, 2),
+            "refreshed_at": refreshed_at,
+        }
+
+        try:
+            previous = await self.refreshes.find_one_and_update(
+                {
+                    "_id": board,
+                    "$or": [
+                        {"refreshed_at": {"$lt": refreshed_at}},
+                        {"refreshed_at": {"$exists": False}},
+                    ],
+                },
+                {"$set": {k: v for k, v in result.items() if k != "board"}},
+                projection={"refreshed_at": 1},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            previous = None
+            superseded = True
+        else:
+            superseded = False
+
+        if superseded:
+            # A newer refresh is already published; ours is not needed
+            removed = (await collection.delete_many({**scope, "refresh_id": refresh_id})).deleted_count
+            result["superseded"] = True
+        else:
+            # Keep the version we replaced for readers that already hold its id
+            removed = 0
+            if previous and previous.get("refreshed_at"):
+                removed = (await collection.delete_many(
+                    {**scope, "refreshed_at": {"$lt": previous["refreshed_at"]}}
+                )).deleted_count
+
+        result["removed"] = removed
+        metrics_collector.record_job(
+            f"quest_leaderboard_{board}", duration, items=entries, removed=removed
+        )
+        return result
@@ -1,5 +1,6 @@
 from typing import Dict, List
 from ...models.player.player import Player
+from ..player.inventory_manager import inventory_of
 
 
 class QuestRequirementChecker:
@@ -52,10 +53,9 @@ class QuestRequirementChecker:
 
         # Check items
         required_items = requirements.get("required_items", [])
-        player_inventory = player.get("items", [])
-        player_item_ids = [item.get("item_id") for item in player_inventory]
+        player_inventory = inventory_of(player)
         for item_id in required_items:
-            if item_id not in player_item_ids:
+            if item_id not in player_inventory:
                 return {
                     "meets_requirements": False,
                     "reason": f"Requires item: {item_id}"
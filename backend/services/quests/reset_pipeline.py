@@ -0,0 +1,224 @@
+"""Quest reset pipeline - pre-generates daily/weekly quests before rollover"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Tuple
+import logging
+
+from pymongo.errors import BulkWriteError
+
+from ...models.quests.quest import QuestType, QuestStatus
+from .generator import QuestGenerator
+
+logger = logging.getLogger(__name__)
+
+# Players whose quests are pre-generated (others are generated on first request)
+ACTIVE_PLAYER_WINDOW = timedelta(days=7)
+DEFAULT_CHUNK_SIZE = 500
+
+PERIODS = {
+    "daily": {"quest_type": QuestType.DAILY, "count": 3},
+    "weekly": {"quest_type": QuestType.WEEKLY, "count": 5},
+}
+
+# Statuses that belong to a period once it has started
+PERIOD_VISIBLE_STATUSES = [
+    QuestStatus.SCHEDULED.value,
+    QuestStatus.AVAILABLE.value,
+    QuestStatus.ACTIVE.value,
+    QuestStatus.COMPLETED.value,
+]
+
+
+def period_bounds(period: str, at: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+    """Start and end (exclusive) of the daily/weekly period containing ``at``"""
+    at = at or datetime.utcnow()
+    day_start = at.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == "daily":
+        return day_start, day_start + timedelta(days=1)
+    week_start = day_start - timedelta(days=day_start.weekday())
+    return week_start, week_start + timedelta(days=7)
+
+
+def period_key(period: str, at: Optional[datetime] = None) -> str:
+    """Stable key of the period containing ``at`` (e.g. daily:2025-01-31, weekly:2025-W05)"""
+    start, _ = period_bounds(period, at)
+    if period == "daily":
+        return f"daily:{start:%Y-%m-%d}"
+    year, week, _ = start.isocalendar()
+    return f"weekly:{year}-W{week:02d}"
+
+
+class QuestResetPipeline:
+    """Pre-generates next period's daily/weekly quests and swaps them in at reset.
+
+    Quests are staged as ``scheduled`` with a ``period_key`` ahead of rollover,
+    inserted with chunked ``insert_many``. Period-aware readers key on the
+    ``period_key`` of the current period, so staged quests are visible the
+    moment it starts; at reset they are flipped to ``available`` for readers
+    that only look at status. Each quest holds one of its period's numbered
+    ``period_slot`` values, unique per player, so the staged set and the
+    on-demand fallback can never both fill a player's period.
+    """
+
+    def __init__(self, db, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.db = db
+        self.quests = db.quests
+        self.players = db.players
+        self.generator = QuestGenerator(db)
+        self.chunk_size = chunk_size
+
+    async def ensure_indexes(self) -> None:
+        """Create indexes used by staging, swapping and eligibility counts"""
+        await self.quests.create_index([("player_id", 1), ("period_key", 1), ("status", 1)])
+        await self.quests.create_index([("period_key", 1), ("status", 1)])
+        await self.quests.create_index(
+            [("player_id", 1), ("period_key", 1), ("period_slot", 1)],
+            unique=True,
+            partialFilterExpression={"period_slot": {"$exists": True}},
+        )
+
+    async def pregenerate(self, period: str, at: Optional[datetime] = None) -> Dict[str, Any]:
+        """Stage quests for the period following the one containing ``at``"""
+        config = PERIODS[period]
+        _, current_end = period_bounds(period, at)
+        next_start, next_end = period_bounds(period, current_end)
+        key = period_key(period, next_start)
+
+        # Re-running a pre-generation replaces whatever was staged before
+        await self.quests.delete_many({"period_key": key, "status": QuestStatus.SCHEDULED.value})
+
+        cursor = self.players.find(
+            {"last_login": {"$gte": datetime.utcnow() - ACTIVE_PLAYER_WINDOW}},
+            projection={"level": 1, "traits": 1},
+        ).batch_size(self.chunk_size)
+
+        players = 0
+        inserted = 0
+        chunk: List[Dict[str, Any]] = []
+        async for player in cursor:
+            players += 1
+            chunk.extend(self._build_slots(
+                player["_id"], player, period, range(config["count"]), next_end, key,
+                status=QuestStatus.SCHEDULED.value,
+            ))
+            if len(chunk) >= self.chunk_size:
+                inserted += await self._insert_chunk(chunk)
+                chunk = []
+
+        if chunk:
+            inserted += await self._insert_chunk(chunk)
+
+        logger.info(f"Staged {inserted} {period} quests for {players} players ({key})")
+        return {"period_key": key, "players": players, "quests": inserted}
+
+    async def activate(self, period: str, at: Optional[datetime] = None) -> Dict[str, Any]:
+        """Swap in the staged quests of the period containing ``at``"""
+        key = period_key(period, at)
+        now = datetime.utcnow()
+
+        activated = await self.quests.update_many(
+            {"period_key": key, "status": QuestStatus.SCHEDULED.value},
+            {"$set": {"status": QuestStatus.AVAILABLE.value, "updated_at": now}},
+        )
+
+        expired = await self.quests.update_many(
+            {
+                "quest_type": PERIODS[period]["quest_type"].value,
+                "period_key": {"$exists": True, "$ne": key},
+                "status": {"$in": [QuestStatus.SCHEDULED.value, QuestStatus.AVAILABLE.value]},
+            },
+            {"$set": {"status": QuestStatus.EXPIRED.value, "updated_at": now}},
+        )
+
+        logger.info(
+            f"Activated {activated.modified_count} {period} quests ({key}), "
+            f"expired {expired.modified_count}"
+        )
+        return {
+            "period_key": key,
+            "activated": activated.modified_count,
+            "expired": expired.modified_count,
+        }
+
+    async def count_period_quests(self, player_id: str, period: str) -> int:
+        """Count the player's quests for the current period without loading them"""
+        return await self.quests.count_documents(
+            {
+                "player_id": player_id,
+                "period_key": period_key(period),
+                "status": {"$in": PERIOD_VISIBLE_STATUSES},
+            },
+            limit=PERIODS[period]["count"],
+        )
+
+    async def get_period_quests(
+        self,
+        player_id: str,
+        player: Dict[str, Any],
+        period: str,
+    ) -> List[Dict[str, Any]]:
+        """Get the player's quests for the current period.
+
+        Players missed by pre-generation (new or inactive) get their quests
+        generated here, in one ``insert_many``. Concurrent requests race for
+        the same free slots and the unique slot index lets only one quest into
+        each, so the result is re-read when some of ours were turned away.
+        """
+        key = period_key(period)
+        count = PERIODS[period]["count"]
+        period_quests = await self.quests.find(
+            {"player_id": player_id, "period_key": key}
+        ).to_list(length=None)
+        quests = [quest for quest in period_quests if quest.get("status") in PERIOD_VISIBLE_STATUSES][:count]
+
+        missing = count - len(quests)
+        if missing > 0:
+            # Failed quests keep their slot, so replacements take fresh ones
+            taken = {quest.get("period_slot") for quest in period_quests}
+            free = [slot for slot in range(len(period_quests) + missing) if slot not in taken][:missing]
+            _, period_end = period_bounds(period)
+            generated = self._build_slots(player_id, player, period, free, period_end, key)
+            if await self._insert_chunk(generated) == len(generated):
+                quests.extend(generated)
+            else:
+                quests = await self.quests.find({
+                    "player_id": player_id,
+                    "period_key": key,
+                    "status": {"$in": PERIOD_VISIBLE_STATUSES},
+                }).to_list(length=count)
+
+        return quests
+
+    def _build_slots(
+        self,
+        player_id: str,
+        player: Dict[str, Any],
+        period: str,
+        slots,
+        expires_at: datetime,
+        key: str,
+        status: str = QuestStatus.AVAILABLE.value,
+    ) -> List[Dict[str, Any]]:
+        slots = list(slots)
+        quests = self.generator.build_period_quests(
+            player_id=player_id,
+            player=player,
+            quest_type=PERIODS[period]["quest_type"],
+            count=len(slots),
+            expires_at=expires_at,
+            period_key=key,
+            status=status,
+        )
+        for quest, slot in zip(quests, slots):
+            quest["period_slot"] = slot
+        return quests
+
+    async def _insert_chunk(self, chunk: List[Dict[str, Any]]) -> int:
+        """Insert quests, skipping slots that are already filled"""
+        try:
+            result = await self.quests.insert_many(chunk, ordered=False)
+        except BulkWriteError as e:
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+            return e.details.get("nInserted", 0)
+        return len(result.inserted_ids)
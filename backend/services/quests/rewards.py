@@ -5,6 +5,10 @@ from typing import Dict
 from motor.motor_asyncio import AsyncIOMotorClient
 import logging
 
+from backend.services.achievements.achievement_service import AchievementService
+from backend.services.player.inventory_manager import InventoryManager
+from backend.services.traits.trait_deltas import apply_trait_delta
+
 logger = logging.getLogger(__name__)
 
 class RewardDistributor:
@@ -15,6 +19,7 @@ class RewardDistributor:
         self.players = db.players
         self.items = db.items
         self.achievements = db.achievements
+        self.inventory = InventoryManager(db)
 
     async def distribute_rewards(self, player_id: str, rewards: Dict) -> Dict:
         """Distribute quest rewards to player."""
@@ -87,6 +92,18 @@ class RewardDistributor:
                     {"_id": player_id},
                     {"$set": updates}
                 )
+            raised = []
+            if distributed["karma"] > 0:
+                raised.append("karma_points")
+            if "level_up" in distributed:
+                raised.append("level")
+            if raised:
+                await AchievementService.award_changed(self.db, player_id, raised)
+            if distributed["trait_boosts"]:
+                await apply_trait_delta(
+                    self.db, player_id, player["traits"],
+                    {trait: updates[f"traits.{trait}"] for trait in distributed["trait_boosts"]}
+                )
 
             # Log reward distribution
             await self._log_reward_distribution(player_id, distributed)
@@ -115,43 +132,7 @@ class RewardDistributor:
     async def _add_item(self, player_id: str, item_id: str) -> None:
         """Add item to player inventory."""
         try:
-            # Check if item exists in inventory
-            player = await self.players.find_one({"_id": player_id})
-            inventory = player.get("inventory", [])
-
-            # Find existing item
-            existing = None
-            for item in inventory:
-                if item["item_id"] == item_id:
-                    existing = item
-                    break
-
-            if existing:
-                # Increment quantity
-                await self.players.update_one(
-                    {
-                        "_id": player_id,
-                        "inventory.item_id": item_id
-                    },
-                    {
-                        "$inc": {"inventory.$.quantity": 1}
-                    }
-                )
-            else:
-                # Add new item
-                await self.players.update_one(
-                    {"_id": player_id},
-                    {
-                        "$push": {
-                            "inventory": {
-                                "item_id": item_id,
-                                "quantity": 1,
-                                "acquired_at": datetime.utcnow()
-                            }
-                        }
-                    }
-                )
-
+            await self.inventory.add_item(player_id, item_id)
         except Exception as e:
             logger.error(f"Error adding item: {e}")
             raise
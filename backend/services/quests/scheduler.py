@@ -3,6 +3,8 @@
 from datetime import datetime, timedelta
 from typing import Dict
 
+from .reset_pipeline import QuestResetPipeline, PERIODS
+
 
 class QuestScheduler:
     """Schedules automatic quest generation"""
@@ -11,38 +13,21 @@ class QuestScheduler:
         self.db = db
         self.quests = db.quests
         self.players = db.players
+        self.reset_pipeline = QuestResetPipeline(db)
 
     async def check_daily_quests(self, player_id: str) -> bool:
         """Check if player needs daily quests generated"""
-        today = datetime.utcnow().date()
-
-        # Check if player has daily quests for today
-        existing = await self.quests.find({
-            "player_id": player_id,
-            "quest_type": "daily",
-            "generated_at": {
-                "$gte": datetime.combine(today, datetime.min.time())
-            }
-        }).to_list(length=10)
+        existing = await self.reset_pipeline.count_period_quests(player_id, "daily")
 
         # Should have 3 daily quests
-        return len(existing) < 3
+        return existing < PERIODS["daily"]["count"]
 
     async def check_weekly_quests(self, player_id: str) -> bool:
         """Check if player needs weekly quests"""
-        now = datetime.utcnow()
-        week_start = now - timedelta(days=now.weekday())
-        week_start = week_start.replace(
-            hour=0, minute=0, second=0, microsecond=0)
-
-        existing = await self.quests.find({
-            "player_id": player_id,
-            "quest_type": "weekly",
-            "generated_at": {"$gte": week_start}
-        }).to_list(length=10)
+        existing = await self.reset_pipeline.count_period_quests(player_id, "weekly")
 
         # Should have 5 weekly quests
-        return len(existing) < 5
+        return existing < PERIODS["weekly"]["count"]
 
     async def schedule_quest_generation(
         self,
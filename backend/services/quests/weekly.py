@@ -3,6 +3,7 @@ from datetime import datetime, timedelta
 from backend.core.database import get_database
 from .generator import QuestGenerator
 from .manager import QuestManager
+from .reset_pipeline import QuestResetPipeline
 
 
 class WeeklyQuestService:
@@ -12,6 +13,7 @@ class WeeklyQuestService:
         self.db = db
         self.generator = None
         self.quest_service = None
+        self.reset_pipeline = None
 
     async def _ensure_initialized(self):
         """Lazy initialization of dependencies."""
@@ -21,59 +23,21 @@ class WeeklyQuestService:
             self.generator = QuestGenerator(self.db)
         if self.quest_service is None:
             self.quest_service = QuestManager(self.db)
+        if self.reset_pipeline is None:
+            self.reset_pipeline = QuestResetPipeline(self.db)
 
     async def get_weekly_quests(self, player_id: str) -> List[Dict]:
-        """Get or generate weekly quests."""
+        """Get this week's quests (pre-generated, or generated if missing)."""
         await self._ensure_initialized()
         
-        player = await self.db.players.find_one({"_id": player_id})
+        player = await self.db.players.find_one(
+            {"_id": player_id},
+            projection={"level": 1, "traits": 1}
+        )
         if not player:
             return []
 
-        # Check if player has quests for this week
-        current_week = self._get_current_week()
-        last_weekly_reset = player.get("last_weekly_quest_reset")
-
-        # Generate new quests if needed
-        if not last_weekly_reset or self._get_week_number(last_weekly_reset) < current_week:
-            await self._generate_new_weekly_quests(player_id)
-
-        # Return this week's quests
-        return await self.quest_service.get_available_quests(
-            player_id,
-            quest_type="weekly"
-        )
-
-    async def _generate_new_weekly_quests(self, player_id: str) -> None:
-        """Generate new weekly quests."""
-        await self._ensure_initialized()
-        
-        await self.db.players.find_one({"_id": player_id})
-
-        # Generate 5 weekly quests (harder than daily)
-        weekly_templates = [
-            {
-                "title": "Weekly Master",
-                "description": "Complete multiple challenges",
-                "objectives": [
-                    {"description": "Complete 10 actions",
-                        "type": "action", "target": "any", "required": 10}
-                ],
-                "rewards": {"credits": 10000, "xp": 1000, "karma": 50},
-                "difficulty": "hard",
-                "quest_type": "weekly",
-                "expires_at": datetime.utcnow() + timedelta(days=7)
-            }
-        ]
-
-        for quest_data in weekly_templates:
-            await self.quest_service.create_quest(player_id, quest_data)
-
-        # Update player's last reset time
-        await self.db.players.update_one(
-            {"_id": player_id},
-            {"$set": {"last_weekly_quest_reset": datetime.utcnow()}}
-        )
+        return await self.reset_pipeline.get_period_quests(player_id, player, "weekly")
 
     def get_reset_time(self) -> datetime:
         """Get next weekly reset time."""
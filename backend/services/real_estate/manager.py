@@ -1,5 +1,6 @@
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
+from ...core.database import get_database
 from ...models.player.player import Player
 from ...models.economy.transaction import Transaction
 from .property_types import PropertyTypes
@@ -18,27 +19,12 @@ class RealEstateService:
         territory_id: Optional[int] = None
     ) -> List[Dict]:
         """Get available properties for purchase."""
-        all_properties = self.property_types.get_all_properties()
-
-        filtered = []
-        for prop in all_properties:
-            # Filter by type
-            if property_type and prop.get("property_type") != property_type:
-                continue
-
-            # Filter by price
-            if max_price and prop.get("price", 0) > max_price:
-                continue
-
-            # Filter by territory
-            if territory_id and prop.get("territory_id") != territory_id:
-                continue
-
-            # Only show available properties
-            if prop.get("status") == "available":
-                filtered.append(prop)
-
-        return filtered
+        return self.property_types.catalog.select(
+            high=max_price or None,
+            property_type=property_type or None,
+            territory_id=territory_id or None,
+            status="available"
+        )
 
     async def get_player_properties(self, player_id: str) -> List[Dict]:
         """Get properties owned by player."""
@@ -265,17 +251,23 @@ class RealEstateService:
 
     async def calculate_property_income(self, player_id: str) -> Dict:
         """Calculate total income from all properties."""
-        player = await Player.find_one({"_id": player_id})
+        player = await get_database().players.find_one(
+            {"_id": player_id},
+            projection={"properties": 1, "economy": 1}
+        )
         if not player:
             return {"total_daily_income": 0, "properties": []}
 
         player_properties = player.get("properties", [])
         total_income = sum(p.get("passive_income", 0)
                            for p in player_properties)
+        economy = player.get("economy", {})
 
         return {
             "total_daily_income": total_income,
             "total_properties": len(player_properties),
+            "last_payout": economy.get("last_income", 0),
+            "last_payout_at": economy.get("last_tick_at"),
             "properties": [
                 {
                     "property_id": p.get("property_id"),
@@ -1,14 +1,18 @@
 from typing import List, Dict, Optional
 
+from ..catalog import get_catalog
+
 
 class PropertyTypes:
     """Defines available property types and their characteristics."""
 
     def __init__(self):
-        self.properties = self._initialize_properties()
+        self.catalog = get_catalog("properties")
+        self.properties = self.catalog.by_id
 
-    def _initialize_properties(self) -> Dict[str, Dict]:
-        """Initialize property database."""
+    @staticmethod
+    def definitions() -> Dict[str, Dict]:
+        """Property definitions, loaded once into the properties catalog."""
         return {
             "apartment_1": {
                 "id": "apartment_1",
@@ -126,7 +130,7 @@ class PropertyTypes:
 
     def get_all_properties(self) -> List[Dict]:
         """Get all properties."""
-        return list(self.properties.values())
+        return list(self.catalog.items)
 
     def get_property_by_id(self, property_id: str) -> Optional[Dict]:
         """Get a property by ID."""
@@ -134,14 +138,8 @@ class PropertyTypes:
 
     def get_properties_by_type(self, property_type: str) -> List[Dict]:
         """Get properties by type."""
-        return [
-            prop for prop in self.properties.values()
-            if prop.get("property_type") == property_type
-        ]
+        return self.catalog.select(property_type=property_type)
 
     def get_properties_by_territory(self, territory_id: int) -> List[Dict]:
         """Get properties in a specific territory."""
-        return [
-            prop for prop in self.properties.values()
-            if prop.get("territory_id") == territory_id
-        ]
+        return self.catalog.select(territory_id=territory_id)
@@ -0,0 +1,193 @@
+"""Robot marketplace listing read model - denormalized robot details and cursor browsing."""
+
+import base64
+import json
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, UpdateOne
+
+# Robot fields copied onto listings: robot field -> listing field under ``robot_details``
+LISTED_ROBOT_FIELDS = {
+    "name": "name",
+    "robot_type": "type",
+    "level": "level",
+    "stats": "stats",
+}
+
+# Sort name -> (listing field, direction); listing_id breaks ties
+LISTING_SORTS = {
+    "newest": ("listed_at", DESCENDING),
+    "price_asc": ("price", ASCENDING),
+    "price_desc": ("price", DESCENDING),
+    "level_desc": ("robot_details.level", DESCENDING),
+}
+
+MAX_PAGE_SIZE = 100
+
+
+def robot_summary(robot: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of a robot embedded in its listings"""
+    return {
+        "name": robot.get("name"),
+        "type": robot.get("robot_type"),
+        "level": robot.get("level", 1),
+        "stats": robot.get("stats", {}),
+    }
+
+
+def encode_cursor(value: Any, listing_id: str) -> str:
+    if isinstance(value, datetime):
+        value = {"$date": value.isoformat()}
+    raw = json.dumps({"v": value, "id": listing_id}).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[Any, str]:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        value = data["v"]
+        if isinstance(value, dict) and "$date" in value:
+            value = datetime.fromisoformat(value["$date"])
+        return value, data["id"]
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+class RobotListingReadModel:
+    """Listings with the robot's name, type, level and stats embedded.
+
+    Browsing is a single indexed query per page with keyset (cursor)
+    pagination. Robot changes are pushed into the robot's active listings by
+    ``sync_robot``.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.listings = db.robot_listings
+        self.robots = db.robots
+
+    async def ensure_indexes(self):
+        """Create one index per browse shape"""
+        await self.listings.create_index("listing_id", unique=True)
+        await self.listings.create_index([("robot_id", ASCENDING), ("status", ASCENDING)])
+        await self.listings.create_index([("seller_id", ASCENDING), ("status", ASCENDING)])
+        for field, direction in LISTING_SORTS.values():
+            await self.listings.create_index(
+                [("status", ASCENDING), (field, direction), ("listing_id", direction)]
+            )
+            await self.listings.create_index(
+                [("status", ASCENDING), ("robot_details.type", ASCENDING), (field, direction), ("listing_id", direction)]
+            )
+
+    async def sync_robot(self, robot_id: str, changes: Dict[str, Any]) -> int:
+        """Copy changed robot fields into the robot's active listings"""
+        update = {
+            f"robot_details.{LISTED_ROBOT_FIELDS[field]}": value
+            for field, value in changes.items()
+            if field in LISTED_ROBOT_FIELDS
+        }
+        if not update:
+            return 0
+        result = await self.listings.update_many(
+            {"robot_id": robot_id, "status": "active"},
+            {"$set": update}
+        )
+        return result.modified_count
+
+    async def browse(
+        self,
+        limit: int = 50,
+        robot_type: Optional[str] = None,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None,
+        min_level: Optional[int] = None,
+        max_level: Optional[int] = None,
+        sort: str = "newest",
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """One page of active listings plus the cursor of the next page"""
+        if sort not in LISTING_SORTS:
+            raise ValueError(f"Unknown sort: {sort}")
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+        field, direction = LISTING_SORTS[sort]
+
+        query: Dict[str, Any] = {"status": "active"}
+        if robot_type:
+            query["robot_details.type"] = robot_type
+        if min_price is not None or max_price is not None:
+            query["price"] = {
+                **({"$gte": min_price} if min_price is not None else {}),
+                **({"$lte": max_price} if max_price is not None else {}),
+            }
+        if min_level is not None or max_level is not None:
+            query["robot_details.level"] = {
+                **({"$gte": min_level} if min_level is not None else {}),
+                **({"$lte": max_level} if max_level is not None else {}),
+            }
+
+        if cursor:
+            value, listing_id = decode_cursor(cursor)
+            op = "$lt" if direction == DESCENDING else "$gt"
+            query["$or"] = [
+                {field: {op: value}},
+                {field: value, "listing_id": {op: listing_id}},
+            ]
+
+        listings = await self.listings.find(query, projection={"_id": 0}).sort(
+            [(field, direction), ("listing_id", direction)]
+        ).limit(limit + 1).to_list(length=limit + 1)
+
+        has_more = len(listings) > limit
+        listings = listings[:limit]
+        await self._hydrate_legacy(listings)
+
+        next_cursor = None
+        if has_more:
+            last = listings[-1]
+            value = last.get("robot_details", {}).get("level") if field == "robot_details.level" else last.get(field)
+            next_cursor = encode_cursor(value, last["listing_id"])
+
+        return {"listings": listings, "next_cursor": next_cursor}
+
+    async def backfill(self, batch_size: int = 500) -> int:
+        """Embed robot details into active listings created before the read model"""
+        updated = 0
+        while True:
+            batch = await self.listings.find(
+                {"status": "active", "robot_details": {"$exists": False}},
+                projection={"listing_id": 1, "robot_id": 1}
+            ).limit(batch_size).to_list(length=batch_size)
+            if not batch:
+                return updated
+            robots = await self._robots_by_id([listing["robot_id"] for listing in batch])
+            await self.listings.bulk_write(
+                [
+                    UpdateOne(
+                        {"listing_id": listing["listing_id"]},
+                        {"$set": {"robot_details": robot_summary(robots.get(listing["robot_id"], {}))}}
+                    )
+                    for listing in batch
+                ],
+                ordered=False
+            )
+            updated += len(batch)
+
+    async def _hydrate_legacy(self, listings: List[Dict[str, Any]]):
+        """Fill in robot details for listings that predate the read model (one query)"""
+        missing = [listing for listing in listings if "robot_details" not in listing]
+        if not missing:
+            return
+        robots = await self._robots_by_id([listing["robot_id"] for listing in missing])
+        for listing in missing:
+            robot = robots.get(listing["robot_id"])
+            if robot:
+                listing["robot_details"] = robot_summary(robot)
+
+    async def _robots_by_id(self, robot_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        projection = {"id": 1, **{field: 1 for field in LISTED_ROBOT_FIELDS}}
+        return {
+            robot["id"]: robot
+            async for robot in self.robots.find({"id": {"$in": robot_ids}}, projection=projection)
+        }
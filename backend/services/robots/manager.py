@@ -2,9 +2,10 @@
 
 from typing import Dict, Any, List, Optional
 from datetime import datetime
-from bson import ObjectId
 
 from backend.core.database import get_database
+from backend.services.economy.ledger import player_key
+from backend.services.robots.listings import RobotListingReadModel
 
 
 class RobotManager:
@@ -12,7 +13,7 @@ class RobotManager:
 
     async def get_player_robots(self, player_id: str) -> List[Dict[str, Any]]:
         """Get all robots owned by a player."""
-        db = await get_database()
+        db = get_database()
 
         robots = await db.robots.find({"owner_id": player_id}).to_list(length=100)
 
@@ -20,7 +21,7 @@ class RobotManager:
 
     async def get_robot(self, robot_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific robot."""
-        db = await get_database()
+        db = get_database()
 
         robot = await db.robots.find_one({"id": robot_id})
 
@@ -44,12 +45,13 @@ class RobotManager:
         if len(new_name) < 3 or len(new_name) > 30:
             raise ValueError("Name must be 3-30 characters")
 
-        db = await get_database()
+        db = get_database()
 
         await db.robots.update_one(
             {"id": robot_id},
             {"$set": {"name": new_name}}
         )
+        await RobotListingReadModel(db).sync_robot(robot_id, {"name": new_name})
 
         return {
             "success": True,
@@ -71,7 +73,7 @@ class RobotManager:
         if robot["owner_id"] != owner_id:
             raise ValueError("Not your robot")
 
-        db = await get_database()
+        db = get_database()
 
         # Calculate scrap value (50% of original price)
         from backend.services.robots.factory import RobotFactory
@@ -100,7 +102,7 @@ class RobotManager:
 
         # Remove from player's inventory
         await db.players.update_one(
-            {"_id": ObjectId(owner_id)},
+            {"_id": player_key(owner_id)},
             {"$pull": {"robots": robot_id}}
         )
 
@@ -118,13 +120,13 @@ class RobotManager:
     ):
         """Update robot's operational status."""
         valid_statuses = ["idle", "working",
-            "training", "combat", "maintenance"]
+            "training", "combat", "maintenance", "marketplace"]
 
         if status not in valid_statuses:
             raise ValueError(
                 f"Invalid status. Must be one of: {valid_statuses}")
 
-        db = await get_database()
+        db = get_database()
 
         await db.robots.update_one(
             {"id": robot_id},
@@ -161,7 +163,7 @@ class RobotManager:
             xp_for_next_level = current_level * 100
 
         # Update database
-        db = await get_database()
+        db = get_database()
         update_data = {
             "experience": new_exp,
             "level": current_level
@@ -178,6 +180,7 @@ class RobotManager:
             {"id": robot_id},
             {"$set": update_data}
         )
+        await RobotListingReadModel(db).sync_robot(robot_id, update_data)
 
         return {
             "success": True,
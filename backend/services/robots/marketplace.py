@@ -1,12 +1,13 @@
 """Robot marketplace service."""
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime
 import uuid
-from bson import ObjectId
 
 from backend.core.database import get_database
 from backend.services.economy.currency import CurrencyService
+from backend.services.economy.ledger import player_key
+from backend.services.robots.listings import RobotListingReadModel, robot_summary
 from backend.services.robots.manager import RobotManager
 
 
@@ -20,27 +21,25 @@ class RobotMarketplace:
     async def get_listings(
         self,
         limit: int = 50,
-        skip: int = 0
-    ) -> List[Dict[str, Any]]:
-        """Get active marketplace listings."""
-        db = await get_database()
-
-        listings = await db.robot_listings.find(
-            {"status": "active"}
-        ).sort("listed_at", -1).skip(skip).limit(limit).to_list(length=limit)
-
-        # Enhance with robot details
-        for listing in listings:
-            robot = await self.robot_manager.get_robot(listing["robot_id"])
-            if robot:
-                listing["robot_details"] = {
-                    "name": robot["name"],
-                    "type": robot["robot_type"],
-                    "level": robot.get("level", 1),
-                    "stats": robot.get("stats", {})
-                }
-
-        return listings
+        robot_type: Optional[str] = None,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None,
+        min_level: Optional[int] = None,
+        max_level: Optional[int] = None,
+        sort: str = "newest",
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Get a page of active marketplace listings with robot details."""
+        return await RobotListingReadModel(get_database()).browse(
+            limit=limit,
+            robot_type=robot_type,
+            min_price=min_price,
+            max_price=max_price,
+            min_level=min_level,
+            max_level=max_level,
+            sort=sort,
+            cursor=cursor
+        )
 
     async def list_robot(
         self,
@@ -62,7 +61,7 @@ class RobotMarketplace:
             raise ValueError("Price too low (minimum 100 credits)")
 
         # Check if already listed
-        db = await get_database()
+        db = get_database()
         existing = await db.robot_listings.find_one({
             "robot_id": robot_id,
             "status": "active"
@@ -80,7 +79,8 @@ class RobotMarketplace:
             "price": price,
             "status": "active",
             "listed_at": datetime.utcnow(),
-            "views": 0
+            "views": 0,
+            "robot_details": robot_summary(robot)
         }
 
         await db.robot_listings.insert_one(listing)
@@ -100,7 +100,7 @@ class RobotMarketplace:
         buyer_id: str
     ) -> Dict[str, Any]:
         """Buy a robot from marketplace."""
-        db = await get_database()
+        db = get_database()
 
         # Get listing
         listing = await db.robot_listings.find_one({"listing_id": listing_id})
@@ -137,13 +137,13 @@ class RobotMarketplace:
 
         # Remove from seller's inventory
         await db.players.update_one(
-            {"_id": ObjectId(listing["seller_id"])},
+            {"_id": player_key(listing["seller_id"])},
             {"$pull": {"robots": robot_id}}
         )
 
         # Add to buyer's inventory
         await db.players.update_one(
-            {"_id": ObjectId(buyer_id)},
+            {"_id": player_key(buyer_id)},
             {"$push": {"robots": robot_id}}
         )
 
@@ -172,7 +172,7 @@ class RobotMarketplace:
         seller_id: str
     ) -> Dict[str, Any]:
         """Cancel a marketplace listing."""
-        db = await get_database()
+        db = get_database()
 
         listing = await db.robot_listings.find_one({"listing_id": listing_id})
 
@@ -202,7 +202,7 @@ class RobotMarketplace:
 
     async def get_seller_listings(self, seller_id: str) -> List[Dict[str, Any]]:
         """Get all listings by a seller."""
-        db = await get_database()
+        db = get_database()
 
         listings = await db.robot_listings.find({
             "seller_id": seller_id,
@@ -1,9 +1,12 @@
 """Robot training service."""
 
-from typing import Dict, Any, List
+import asyncio
+from typing import Dict, Any, List, Tuple
 from datetime import datetime, timedelta
 
 from backend.core.database import get_database
+from backend.tasks.deadline_scheduler import deadline_scheduler
+from backend.services.robots.listings import RobotListingReadModel
 from backend.services.robots.manager import RobotManager
 from backend.services.economy.currency import CurrencyService
 
@@ -78,7 +81,7 @@ class RobotTrainingService:
             raise ValueError("Not your robot")
 
         # Check if already training
-        db = await get_database()
+        db = get_database()
         existing = await db.robot_training.find_one({
             "robot_id": robot_id,
             "status": "active"
@@ -128,6 +131,7 @@ class RobotTrainingService:
         }
 
         await db.robot_training.insert_one(training_session)
+        deadline_scheduler.schedule("robot_training", robot_id, completes_at)
 
         # Update robot status
         await self.robot_manager.update_robot_status(robot_id, "training")
@@ -144,7 +148,7 @@ class RobotTrainingService:
 
     async def get_training_status(self, robot_id: str) -> Dict[str, Any]:
         """Get current training status for a robot."""
-        db = await get_database()
+        db = get_database()
 
         training = await db.robot_training.find_one({
             "robot_id": robot_id,
@@ -179,7 +183,7 @@ class RobotTrainingService:
         owner_id: str
     ) -> Dict[str, Any]:
         """Complete training and apply rewards."""
-        db = await get_database()
+        db = get_database()
 
         training = await db.robot_training.find_one({
             "robot_id": robot_id,
@@ -199,6 +203,19 @@ class RobotTrainingService:
             raise ValueError(
                 f"Training not complete yet. {int(time_remaining)} seconds remaining")
 
+        # Claim the session first so concurrent completions apply rewards once
+        claimed = await db.robot_training.update_one(
+            {"_id": training["_id"], "status": "active"},
+            {
+                "$set": {
+                    "status": "completed",
+                    "completed_at": now
+                }
+            }
+        )
+        if not claimed.modified_count:
+            raise ValueError("No active training session")
+
         # Get robot
         robot = await self.robot_manager.get_robot(robot_id)
 
@@ -217,6 +234,7 @@ class RobotTrainingService:
             {"id": robot_id},
             {"$set": {"stats": stats}}
         )
+        await RobotListingReadModel(db).sync_robot(robot_id, {"stats": stats})
 
         # Add experience
         xp_gained = rewards["xp"]
@@ -225,17 +243,6 @@ class RobotTrainingService:
         # Update robot status
         await self.robot_manager.update_robot_status(robot_id, "idle")
 
-        # Mark training as complete
-        await db.robot_training.update_one(
-            {"robot_id": robot_id, "status": "active"},
-            {
-                "$set": {
-                    "status": "completed",
-                    "completed_at": now
-                }
-            }
-        )
-
         return {
             "success": True,
             "robot_id": robot_id,
@@ -244,24 +251,38 @@ class RobotTrainingService:
             "message": "Training completed successfully!"
         }
 
-    async def auto_complete_training(self):
-        """Auto-complete all finished training sessions (called by scheduler)."""
-        db = await get_database()
+    async def complete_due_training(self, robot_ids: List[str]) -> int:
+        """Complete the finished sessions of a batch of robots (deadline scheduler handler)."""
+        db = get_database()
 
-        now = datetime.utcnow()
+        sessions = await db.robot_training.find(
+            {
+                "robot_id": {"$in": robot_ids},
+                "status": "active",
+                "completes_at": {"$lte": datetime.utcnow()}
+            },
+            projection={"robot_id": 1, "owner_id": 1}
+        ).to_list(length=len(robot_ids))
+
+        async def complete(training: Dict[str, Any]) -> bool:
+            try:
+                await self.complete_training(training["robot_id"], training["owner_id"])
+                return True
+            except ValueError:
+                # Already completed by the owner or another worker
+                return False
 
-        # Find all completed training sessions
-        completed = await db.robot_training.find({
-            "status": "active",
-            "completes_at": {"$lte": now}
-        }).to_list(length=1000)
+        completed = await asyncio.gather(*(complete(training) for training in sessions))
+        return sum(completed)
 
-        for training in completed:
-            try:
-                await self.complete_training(
-                    robot_id=training["robot_id"],
-                    owner_id=training["owner_id"]
-                )
-            except Exception as e:
-                print(
-                    f"Error auto-completing training for robot {training['robot_id']}: {e}")
+    async def pending_deadlines(self, until: datetime) -> List[Tuple[str, datetime]]:
+        """Robots whose training completes before ``until`` (deadline scheduler rehydration)."""
+        db = get_database()
+
+        return [
+            (training["robot_id"], training["completes_at"])
+            async for training in db.robot_training.find(
+                {"status": "active", "completes_at": {"$lte": until}},
+                projection={"robot_id": 1, "completes_at": 1}
+            )
+        ]
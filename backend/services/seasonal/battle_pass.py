@@ -1,10 +1,47 @@
 """Battle Pass Service."""
 
-from typing import Dict, List, Optional, Any
+from bisect import bisect_right
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
+from pymongo import ASCENDING, ReturnDocument
 from backend.core.database import get_database
 import uuid
 
+# Everything but the tiers; XP and claim paths never need the full document
+PASS_SUMMARY_FIELDS = {"tiers": 0}
+
+
+class CompiledPass:
+    """A battle pass's tiers compiled for lookups.
+
+    Cumulative XP thresholds are kept in a sorted list so the tier reached at
+    any XP total is a bisect, and rewards are indexed by tier number.
+    """
+
+    def __init__(self, battle_pass: Dict[str, Any]):
+        self.pass_id = battle_pass["pass_id"]
+        self.season = battle_pass["season"]
+        self.premium_price = battle_pass.get("premium_price", 0)
+        tiers = sorted(battle_pass.get("tiers", []), key=lambda t: t["xp_required"])
+        self.thresholds: List[int] = [t["xp_required"] for t in tiers]
+        self.tier_numbers: List[int] = [t["tier"] for t in tiers]
+        self.rewards: Dict[int, Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]] = {
+            t["tier"]: (t.get("free_rewards", []), t.get("premium_rewards", [])) for t in tiers
+        }
+
+    def tier_for(self, xp: int) -> int:
+        """Highest tier whose threshold ``xp`` has reached (0 below the first)"""
+        reached = bisect_right(self.thresholds, xp)
+        return self.tier_numbers[reached - 1] if reached else 0
+
+    def crossings(self, old_xp: int, new_xp: int) -> List[int]:
+        """Tiers reached by going from ``old_xp`` to ``new_xp``"""
+        return self.tier_numbers[bisect_right(self.thresholds, old_xp):bisect_right(self.thresholds, new_xp)]
+
+
+# Compiled passes by pass id; a pass's tiers never change after creation
+_compiled_passes: Dict[str, CompiledPass] = {}
+
 
 class BattlePassService:
     """Service for managing battle pass system."""
@@ -12,6 +49,23 @@ class BattlePassService:
     def __init__(self):
         self.db = get_database()
 
+    async def ensure_indexes(self):
+        """Create the lookup indexes for passes and player progress."""
+        await self.db.battle_passes.create_index("pass_id", unique=True)
+        await self.db.player_battle_pass.create_index(
+            [("player_id", ASCENDING), ("pass_id", ASCENDING)], unique=True
+        )
+
+    async def compiled_pass(self, pass_id: str) -> CompiledPass:
+        """The compiled tiers of a pass, loaded from the database once."""
+        compiled = _compiled_passes.get(pass_id)
+        if compiled is None:
+            battle_pass = await self.db.battle_passes.find_one({"pass_id": pass_id})
+            if not battle_pass:
+                raise ValueError("Battle pass not found")
+            compiled = _compiled_passes[pass_id] = CompiledPass(battle_pass)
+        return compiled
+
     async def create_battle_pass(
         self,
         season: int,
@@ -45,6 +99,7 @@ class BattlePassService:
         }
 
         await self.db.battle_passes.insert_one(battle_pass)
+        _compiled_passes[pass_id] = CompiledPass(battle_pass)
         return battle_pass
 
     def _generate_tiers(self) -> List[Dict[str, Any]]:
@@ -186,14 +241,17 @@ class BattlePassService:
 
         return rewards
 
-    async def get_active_battle_pass(self) -> Optional[Dict[str, Any]]:
-        """Get currently active battle pass."""
+    async def get_active_battle_pass(self, summary_only: bool = False) -> Optional[Dict[str, Any]]:
+        """Get currently active battle pass, without its tiers if ``summary_only``."""
         now = datetime.utcnow()
-        battle_pass = await self.db.battle_passes.find_one({
-            "is_active": True,
-            "start_date": {"$lte": now},
-            "end_date": {"$gte": now}
-        })
+        battle_pass = await self.db.battle_passes.find_one(
+            {
+                "is_active": True,
+                "start_date": {"$lte": now},
+                "end_date": {"$gte": now}
+            },
+            projection=PASS_SUMMARY_FIELDS if summary_only else None
+        )
         return battle_pass
 
     async def get_player_progress(
@@ -213,18 +271,12 @@ class BattlePassService:
 
         return progress
 
-    async def _initialize_player_progress(
-        self,
-        player_id: str,
-        pass_id: str
-    ) -> Dict[str, Any]:
-        """Initialize player's battle pass progress."""
-        battle_pass = await self.db.battle_passes.find_one({"pass_id": pass_id})
-
-        progress = {
+    def _new_progress(self, player_id: str, pass_id: str, season: int) -> Dict[str, Any]:
+        """Progress fields of a player who hasn't earned anything yet."""
+        return {
             "player_id": player_id,
             "pass_id": pass_id,
-            "season": battle_pass["season"],
+            "season": season,
             "has_premium": False,
             "current_tier": 0,
             "current_xp": 0,
@@ -238,8 +290,22 @@ class BattlePassService:
             "updated_at": datetime.utcnow()
         }
 
-        await self.db.player_battle_pass.insert_one(progress)
-        return progress
+    async def _initialize_player_progress(
+        self,
+        player_id: str,
+        pass_id: str
+    ) -> Dict[str, Any]:
+        """Initialize player's battle pass progress."""
+        compiled = await self.compiled_pass(pass_id)
+        progress = self._new_progress(player_id, pass_id, compiled.season)
+
+        # Upsert so a concurrent first request can't create a second document
+        return await self.db.player_battle_pass.find_one_and_update(
+            {"player_id": player_id, "pass_id": pass_id},
+            {"$setOnInsert": progress},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
 
     async def add_xp(
         self,
@@ -247,45 +313,45 @@ class BattlePassService:
         pass_id: str,
         xp_amount: int
     ) -> Dict[str, Any]:
-        """Add XP to player's battle pass progress."""
-        progress = await self.get_player_progress(player_id, pass_id)
-        battle_pass = await self.db.battle_passes.find_one({"pass_id": pass_id})
-
-        # Add XP
-        new_xp = progress["current_xp"] + xp_amount
-        new_total_xp = progress["total_xp_earned"] + xp_amount
+        """Add XP to player's battle pass progress.
 
-        # Calculate new tier
-        new_tier = progress["current_tier"]
-        for tier_data in battle_pass["tiers"]:
-            if new_xp >= tier_data["xp_required"]:
-                new_tier = tier_data["tier"]
-            else:
-                break
+        The XP is applied with one ``$inc`` (creating the progress on first
+        gain) and the tiers crossed are resolved against the compiled pass;
+        ``current_tier`` is only written when a tier is actually reached.
+        """
+        compiled = await self.compiled_pass(pass_id)
+        now = datetime.utcnow()
+        initial = self._new_progress(player_id, pass_id, compiled.season)
+        for field in ("current_xp", "total_xp_earned", "last_xp_gain", "updated_at"):
+            del initial[field]
 
-        # Update progress
-        await self.db.player_battle_pass.update_one(
+        progress = await self.db.player_battle_pass.find_one_and_update(
             {"player_id": player_id, "pass_id": pass_id},
             {
-                "$set": {
-                    "current_xp": new_xp,
-                    "current_tier": new_tier,
-                    "total_xp_earned": new_total_xp,
-                    "last_xp_gain": datetime.utcnow(),
-                    "updated_at": datetime.utcnow()
-                }
-            }
+                "$inc": {"current_xp": xp_amount, "total_xp_earned": xp_amount},
+                "$set": {"last_xp_gain": now, "updated_at": now},
+                "$setOnInsert": initial
+            },
+            projection={"current_xp": 1, "current_tier": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
         )
 
-        # Check if tier increased
-        tiers_gained = new_tier - progress["current_tier"]
+        new_xp = progress["current_xp"]
+        tiers_reached = compiled.crossings(new_xp - xp_amount, new_xp)
+        new_tier = max(compiled.tier_for(new_xp), progress.get("current_tier", 0))
+        if new_tier > progress.get("current_tier", 0):
+            await self.db.player_battle_pass.update_one(
+                {"_id": progress["_id"]},
+                {"$max": {"current_tier": new_tier}}
+            )
 
         return {
             "xp_added": xp_amount,
             "new_xp": new_xp,
             "new_tier": new_tier,
-            "tiers_gained": tiers_gained,
-            "rewards_available": tiers_gained > 0
+            "tiers_gained": len(tiers_reached),
+            "rewards_available": bool(tiers_reached)
         }
 
     async def claim_rewards(
@@ -295,46 +361,36 @@ class BattlePassService:
         tier: int
     ) -> Dict[str, Any]:
         """Claim rewards for a specific tier."""
+        compiled = await self.compiled_pass(pass_id)
+        if tier not in compiled.rewards:
+            raise ValueError("Invalid tier")
+
         progress = await self.get_player_progress(player_id, pass_id)
-        battle_pass = await self.db.battle_passes.find_one({"pass_id": pass_id})
 
         # Validate tier is unlocked
         if tier > progress["current_tier"]:
             raise ValueError("Tier not yet unlocked")
 
-        # Get tier data
-        tier_data = next(
-            (t for t in battle_pass["tiers"] if t["tier"] == tier),
-            None
-        )
-
-        if not tier_data:
-            raise ValueError("Invalid tier")
-
+        free_rewards, premium_rewards = compiled.rewards[tier]
         claimed_rewards = []
 
-        # Claim free rewards
-        if tier not in progress["claimed_free_rewards"]:
-            for reward in tier_data["free_rewards"]:
-                await self._grant_reward(player_id, reward)
-                claimed_rewards.append(reward)
-
-            await self.db.player_battle_pass.update_one(
-                {"player_id": player_id, "pass_id": pass_id},
-                {"$push": {"claimed_free_rewards": tier}}
+        # Each claim is marked before granting so a repeated request can't grant twice
+        claims = [("claimed_free_rewards", free_rewards, {})]
+        if progress["has_premium"]:
+            claims.append(("claimed_premium_rewards", premium_rewards, {"has_premium": True}))
+        for field, rewards, condition in claims:
+            if tier in progress[field]:
+                continue
+            marked = await self.db.player_battle_pass.update_one(
+                {"_id": progress["_id"], field: {"$ne": tier}, **condition},
+                {"$push": {field: tier}}
             )
-
-        # Claim premium rewards if has premium
-        if progress["has_premium"] and tier not in progress["claimed_premium_rewards"]:
-            for reward in tier_data["premium_rewards"]:
+            if not marked.modified_count:
+                continue
+            for reward in rewards:
                 await self._grant_reward(player_id, reward)
                 claimed_rewards.append(reward)
 
-            await self.db.player_battle_pass.update_one(
-                {"player_id": player_id, "pass_id": pass_id},
-                {"$push": {"claimed_premium_rewards": tier}}
-            )
-
         return {
             "tier": tier,
             "rewards_claimed": claimed_rewards
@@ -378,17 +434,17 @@ class BattlePassService:
         pass_id: str
     ) -> Dict[str, Any]:
         """Purchase premium battle pass."""
-        battle_pass = await self.db.battle_passes.find_one({"pass_id": pass_id})
+        battle_pass = await self.compiled_pass(pass_id)
         player = await self.db.players.find_one({"_id": player_id})
 
         # Check if player has enough credits
-        if player["currencies"]["credits"] < battle_pass["premium_price"]:
+        if player["currencies"]["credits"] < battle_pass.premium_price:
             raise ValueError("Insufficient credits")
 
         # Deduct credits
         await self.db.players.update_one(
             {"_id": player_id},
-            {"$inc": {"currencies.credits": -battle_pass["premium_price"]}}
+            {"$inc": {"currencies.credits": -battle_pass.premium_price}}
         )
 
         # Unlock premium
@@ -398,7 +454,7 @@ class BattlePassService:
                 "$set": {
                     "has_premium": True,
                     "premium_purchased_at": datetime.utcnow(),
-                    "premium_price_paid": battle_pass["premium_price"]
+                    "premium_price_paid": battle_pass.premium_price
                 }
             }
         )
@@ -412,5 +468,5 @@ class BattlePassService:
         return {
             "success": True,
             "message": "Premium battle pass purchased",
-            "price_paid": battle_pass["premium_price"]
+            "price_paid": battle_pass.premium_price
         }
@@ -2,6 +2,7 @@ from .relationships import RelationshipService
 from .alliances import AllianceService
 from .marriage import MarriageService
 from .mentorship import MentorshipService
+from .graph import SocialGraph, social_graph
 
 __all__ = ["RelationshipService", "AllianceService",
-    "MarriageService", "MentorshipService"]
+    "MarriageService", "MentorshipService", "SocialGraph", "social_graph"]
@@ -1,6 +1,7 @@
 from typing import Optional, List
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from backend.models.social.relationship import Alliance
+from backend.models.social.relationship import Alliance, RelationshipType
+from backend.services.social.graph import social_graph
 
 
 class AllianceService:
@@ -54,6 +55,11 @@ class AllianceService:
             {"id": alliance_id},
             {"$push": {"members": player_id}}
         )
+        await social_graph.link_many(
+            self.db, RelationshipType.ALLIANCE,
+            [(member, player_id) for member in alliance.get("members", [])],
+            ref=alliance_id
+        )
 
         # Update player
         await self.players.update_one(
@@ -74,6 +80,7 @@ class AllianceService:
             {"id": alliance_id},
             {"$pull": {"members": player_id}}
         )
+        await social_graph.unlink_ref(self.db, alliance_id, player_id)
 
         # Update player
         await self.players.update_one(
@@ -103,6 +110,7 @@ class AllianceService:
 
         # Delete alliance
         await self.alliances.delete_one({"id": alliance_id})
+        await social_graph.unlink_ref(self.db, alliance_id)
 
         return True
 
@@ -0,0 +1,391 @@
+"""Social graph - one edge collection for every relation between players.
+
+Relationships, alliances, marriages and mentorships keep their own
+records, and every active one is also a pair of edges in
+``social_edges``: ``{_id, src, dst, type, role, ref, since}``. There is
+one edge per direction, so a player's neighbours are a single indexed
+range on (src, type, dst), paginated in that order. ``role`` says what
+``dst`` is to ``src`` for relations that aren't symmetric (a mentorship
+edge from the mentor has role "apprentice"). ``ref`` is the id of the
+record the edge came from.
+
+The adjacency of recently seen players is cached in process (bounded,
+with a short TTL). Every write made through the graph keeps the cache
+current. For cached players, relatedness checks and neighbour pages cost
+no round-trip. Traversals cost one query per level.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, UpdateOne
+
+from backend.models.social.relationship import RelationshipType
+
+logger = logging.getLogger(__name__)
+
+# Players whose adjacency is kept in process, least recently used dropped first
+MAX_CACHED_PLAYERS = 20_000
+# Players with more edges than this are always read from MongoDB
+MAX_CACHED_DEGREE = 1_000
+# Seconds a cached adjacency is trusted, for edges written by other processes
+ADJACENCY_TTL = 60.0
+NEIGHBOR_PAGE = 50
+MAX_TRAVERSAL_DEPTH = 3
+MAX_TRAVERSAL_NODES = 5_000
+BACKFILL_BATCH = 1_000
+
+EDGE_FIELDS = {"src": 1, "dst": 1, "type": 1, "role": 1, "ref": 1, "since": 1}
+
+
+def edge_id(type: str, src: str, dst: str) -> str:
+    return f"{type}:{src}:{dst}"
+
+
+def _type_value(type: Any) -> str:
+    return type.value if isinstance(type, RelationshipType) else type
+
+
+def _edge_writes(
+    type: str,
+    a: str,
+    b: str,
+    ref: Optional[str],
+    roles: Tuple[Optional[str], Optional[str]],
+    now: datetime
+) -> List[UpdateOne]:
+    """Upserts for the a -> b and b -> a edges of one relation"""
+    return [
+        UpdateOne(
+            {"_id": edge_id(type, src, dst)},
+            {
+                "$set": {"src": src, "dst": dst, "type": type, "role": role, "ref": ref},
+                "$setOnInsert": {"since": now}
+            },
+            upsert=True
+        )
+        for src, dst, role in ((a, b, roles[0]), (b, a, roles[1]))
+    ]
+
+
+class SocialGraph:
+    """Edges between players, with an adjacency cache in front of ``social_edges``."""
+
+    def __init__(self, max_players: int = MAX_CACHED_PLAYERS, ttl: float = ADJACENCY_TTL):
+        self.max_players = max_players
+        self.ttl = ttl
+        # player_id -> (loaded at, {type: {neighbour: edge}})
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Dict[str, Dict]]]]" = OrderedDict()
+
+    async def ensure_indexes(self, db: AsyncIOMotorDatabase) -> None:
+        await db.social_edges.create_index([("src", ASCENDING), ("type", ASCENDING), ("dst", ASCENDING)])
+        await db.social_edges.create_index([("dst", ASCENDING), ("type", ASCENDING)])
+        await db.social_edges.create_index("ref", sparse=True)
+
+    # Cache
+
+    def _cached(self, player_id: str) -> Optional[Dict[str, Dict[str, Dict]]]:
+        entry = self._cache.get(player_id)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.ttl:
+            del self._cache[player_id]
+            return None
+        self._cache.move_to_end(player_id)
+        return entry[1]
+
+    def _store(self, player_id: str, edges: List[Dict]) -> Dict[str, Dict[str, Dict]]:
+        adjacency: Dict[str, Dict[str, Dict]] = {}
+        for edge in edges:
+            adjacency.setdefault(edge["type"], {})[edge["dst"]] = edge
+        self._cache[player_id] = (time.monotonic(), adjacency)
+        self._cache.move_to_end(player_id)
+        while len(self._cache) > self.max_players:
+            self._cache.popitem(last=False)
+        return adjacency
+
+    def _cache_edge(self, edge: Dict) -> None:
+        adjacency = self._cached(edge["src"])
+        if adjacency is not None:
+            adjacency.setdefault(edge["type"], {})[edge["dst"]] = edge
+
+    def _uncache_edge(self, type: str, src: str, dst: str) -> None:
+        adjacency = self._cached(src)
+        if adjacency is not None:
+            adjacency.get(type, {}).pop(dst, None)
+
+    def forget(self, player_id: str) -> None:
+        """Drop a player's cached adjacency, e.g. when they log out"""
+        self._cache.pop(player_id, None)
+
+    async def adjacency(self, db: AsyncIOMotorDatabase, player_id: str) -> Optional[Dict[str, Dict[str, Dict]]]:
+        """A player's edges by type and neighbour, cached; None for players with too many to cache"""
+        adjacency = self._cached(player_id)
+        if adjacency is not None:
+            return adjacency
+        edges = await db.social_edges.find(
+            {"src": player_id}, projection=EDGE_FIELDS
+        ).to_list(length=MAX_CACHED_DEGREE + 1)
+        if len(edges) > MAX_CACHED_DEGREE:
+            return None
+        return self._store(player_id, edges)
+
+    # Writes
+
+    async def link(
+        self,
+        db: AsyncIOMotorDatabase,
+        type: Any,
+        a: str,
+        b: str,
+        ref: Optional[str] = None,
+        roles: Tuple[Optional[str], Optional[str]] = (None, None)
+    ) -> None:
+        """Add the relation a <-> b; ``roles`` is (what b is to a, what a is to b)"""
+        await self.link_many(db, type, [(a, b)], ref, roles)
+
+    async def link_many(
+        self,
+        db: AsyncIOMotorDatabase,
+        type: Any,
+        pairs: Iterable[Tuple[str, str]],
+        ref: Optional[str] = None,
+        roles: Tuple[Optional[str], Optional[str]] = (None, None)
+    ) -> None:
+        """Add several relations of one type in one write"""
+        type = _type_value(type)
+        now = datetime.utcnow()
+        pairs = list(pairs)
+        if not pairs:
+            return
+        await db.social_edges.bulk_write(
+            [write for a, b in pairs for write in _edge_writes(type, a, b, ref, roles, now)],
+            ordered=False
+        )
+        for a, b in pairs:
+            for src, dst, role in ((a, b, roles[0]), (b, a, roles[1])):
+                self._cache_edge({
+                    "_id": edge_id(type, src, dst), "src": src, "dst": dst,
+                    "type": type, "role": role, "ref": ref, "since": now
+                })
+
+    async def unlink(self, db: AsyncIOMotorDatabase, type: Any, a: str, b: str) -> None:
+        """Remove the relation a <-> b"""
+        type = _type_value(type)
+        await db.social_edges.delete_many({"_id": {"$in": [edge_id(type, a, b), edge_id(type, b, a)]}})
+        self._uncache_edge(type, a, b)
+        self._uncache_edge(type, b, a)
+
+    async def unlink_ref(self, db: AsyncIOMotorDatabase, ref: str, player_id: Optional[str] = None) -> None:
+        """Remove the edges that came from one record, or only ``player_id``'s edges from it"""
+        query: Dict[str, Any] = {"ref": ref}
+        if player_id is not None:
+            query["$or"] = [{"src": player_id}, {"dst": player_id}]
+        edges = await db.social_edges.find(query, projection={"src": 1, "dst": 1, "type": 1}).to_list(length=None)
+        if not edges:
+            return
+        await db.social_edges.delete_many({"_id": {"$in": [edge["_id"] for edge in edges]}})
+        for edge in edges:
+            self._uncache_edge(edge["type"], edge["src"], edge["dst"])
+
+    # Reads
+
+    async def neighbors(
+        self,
+        db: AsyncIOMotorDatabase,
+        player_id: str,
+        types: Optional[Iterable[Any]] = None,
+        after: Optional[str] = None,
+        limit: int = NEIGHBOR_PAGE
+    ) -> Dict[str, Any]:
+        """One page of a player's edges, ordered by type then neighbour id.
+
+        Returns ``{"edges": [...], "next": cursor}``. Pass ``next`` back as
+        ``after`` for the following page; it is None on the last page.
+        """
+        wanted = None if types is None else {_type_value(type) for type in types}
+        after_key = tuple(after.split(":", 1)) if after else None
+        adjacency = await self.adjacency(db, player_id)
+        if adjacency is not None:
+            edges = sorted(
+                (edge for type, by_neighbour in adjacency.items() if wanted is None or type in wanted
+                 for edge in by_neighbour.values() if after_key is None or (edge["type"], edge["dst"]) > after_key),
+                key=lambda edge: (edge["type"], edge["dst"])
+            )[:limit + 1]
+        else:
+            query: Dict[str, Any] = {"src": player_id}
+            if wanted is not None:
+                query["type"] = {"$in": sorted(wanted)}
+            if after_key is not None:
+                after_type, after_dst = after_key
+                query["$or"] = [{"type": after_type, "dst": {"$gt": after_dst}}, {"type": {"$gt": after_type}}]
+            edges = await db.social_edges.find(query, projection=EDGE_FIELDS).sort(
+                [("type", ASCENDING), ("dst", ASCENDING)]
+            ).to_list(length=limit + 1)
+        page = edges[:limit]
+        last = page[-1] if page else None
+        return {"edges": page, "next": f"{last['type']}:{last['dst']}" if len(edges) > limit else None}
+
+    async def connections(
+        self,
+        db: AsyncIOMotorDatabase,
+        player_id: str,
+        types: Optional[Iterable[Any]] = None
+    ) -> Dict[str, List[str]]:
+        """A player's neighbours grouped by relation type (up to one page per type when uncached)"""
+        adjacency = await self.adjacency(db, player_id)
+        if adjacency is None:
+            page = await self.neighbors(db, player_id, types, limit=MAX_CACHED_DEGREE)
+            adjacency = {}
+            for edge in page["edges"]:
+                adjacency.setdefault(edge["type"], {})[edge["dst"]] = edge
+        wanted = None if types is None else {_type_value(type) for type in types}
+        return {
+            type: sorted(by_neighbour)
+            for type, by_neighbour in adjacency.items()
+            if by_neighbour and (wanted is None or type in wanted)
+        }
+
+    async def relations(self, db: AsyncIOMotorDatabase, player_id: str, others: Iterable[str]) -> Dict[str, List[str]]:
+        """Relation types between ``player_id`` and each of ``others``, in at most one round-trip"""
+        others = list(others)
+        adjacency = self._cached(player_id)
+        found: Dict[str, List[str]] = {other: [] for other in others}
+        if adjacency is not None:
+            for type, by_neighbour in adjacency.items():
+                for other in others:
+                    if other in by_neighbour:
+                        found[other].append(type)
+        elif others:
+            async for edge in db.social_edges.find(
+                {"src": player_id, "dst": {"$in": others}}, projection={"dst": 1, "type": 1}
+            ):
+                found[edge["dst"]].append(edge["type"])
+        return found
+
+    async def related(
+        self,
+        db: AsyncIOMotorDatabase,
+        a: str,
+        b: str,
+        types: Optional[Iterable[Any]] = None,
+        fresh: bool = False
+    ) -> bool:
+        """Whether a and b share a relation (of one of ``types``).
+
+        Pass ``fresh`` for checks that gate a write: the cache may not have
+        seen edges written by other processes yet, so MongoDB is asked.
+        """
+        wanted = None if types is None else [_type_value(type) for type in types]
+        for src, dst in ((a, b), (b, a)):
+            adjacency = None if fresh else self._cached(src)
+            if adjacency is not None:
+                return any(dst in by_neighbour for type, by_neighbour in adjacency.items() if wanted is None or type in wanted)
+        if wanted is not None:
+            query: Dict[str, Any] = {"_id": {"$in": [edge_id(type, a, b) for type in wanted]}}
+        else:
+            query = {"src": a, "dst": b}
+        return await db.social_edges.find_one(query, projection={"_id": 1}) is not None
+
+    async def traverse(
+        self,
+        db: AsyncIOMotorDatabase,
+        player_id: str,
+        types: Iterable[Any],
+        depth: int = 2,
+        limit: int = MAX_TRAVERSAL_NODES
+    ) -> Dict[str, int]:
+        """Players reachable over ``types`` edges within ``depth`` hops, with their distance.
+
+        Breadth first, one query per level for the players not in the
+        cache. Stops once ``limit`` players have been reached.
+        """
+        wanted = [_type_value(type) for type in types]
+        depth = max(0, min(depth, MAX_TRAVERSAL_DEPTH))
+        distances = {player_id: 0}
+        frontier = [player_id]
+        for level in range(1, depth + 1):
+            if not frontier or len(distances) > limit:
+                break
+            reached: List[str] = []
+            uncached = []
+            for node in frontier:
+                adjacency = self._cached(node)
+                if adjacency is None:
+                    uncached.append(node)
+                    continue
+                for type in wanted:
+                    reached.extend(adjacency.get(type, {}))
+            if uncached:
+                async for edge in db.social_edges.find(
+                    {"src": {"$in": uncached}, "type": {"$in": wanted}}, projection={"dst": 1}
+                ).limit(limit):
+                    reached.append(edge["dst"])
+            frontier = []
+            for node in reached:
+                if node not in distances and len(distances) <= limit:
+                    distances[node] = level
+                    frontier.append(node)
+        del distances[player_id]
+        return distances
+
+    async def friends_of_friends(self, db: AsyncIOMotorDatabase, player_id: str, limit: int = MAX_TRAVERSAL_NODES) -> List[str]:
+        """Friends' friends who aren't already friends"""
+        reached = await self.traverse(db, player_id, [RelationshipType.FRIEND], depth=2, limit=limit)
+        return sorted(player for player, distance in reached.items() if distance == 2)
+
+    async def alliance_reach(self, db: AsyncIOMotorDatabase, player_id: str, depth: int = 2) -> Dict[str, int]:
+        """Players reachable through alliances within ``depth`` hops"""
+        return await self.traverse(db, player_id, [RelationshipType.ALLIANCE], depth=depth)
+
+    # Migration
+
+    async def backfill(self, db: AsyncIOMotorDatabase) -> int:
+        """Build the edges of every active relation, alliance, marriage and mentorship once.
+
+        Does nothing when ``social_edges`` already has edges. Returns the
+        number of relations written.
+        """
+        if await db.social_edges.find_one({}, projection={"_id": 1}):
+            return 0
+        now = datetime.utcnow()
+        writes: List[UpdateOne] = []
+        count = 0
+
+        async def flush():
+            if writes:
+                await db.social_edges.bulk_write(writes, ordered=False)
+                writes.clear()
+
+        async def add(type: str, a: str, b: str, ref: Optional[str], roles=(None, None)):
+            nonlocal count
+            if not a or not b or a == b:
+                return
+            writes.extend(_edge_writes(type, a, b, ref, roles, now))
+            count += 1
+            if len(writes) >= BACKFILL_BATCH:
+                await flush()
+
+        async for doc in db.relationships.find({"active": True}, projection={"id": 1, "type": 1, "player1_id": 1, "player2_id": 1}):
+            await add(doc["type"], doc.get("player1_id"), doc.get("player2_id"), doc.get("id"))
+        async for doc in db.alliances.find({}, projection={"id": 1, "members": 1}):
+            members = doc.get("members", [])
+            for i, a in enumerate(members):
+                for b in members[i + 1:]:
+                    await add(RelationshipType.ALLIANCE.value, a, b, doc.get("id"))
+        async for doc in db.marriages.find({"active": True}, projection={"id": 1, "player1_id": 1, "player2_id": 1}):
+            await add(RelationshipType.MARRIAGE.value, doc.get("player1_id"), doc.get("player2_id"), doc.get("id"))
+        async for doc in db.mentorships.find({"active": True}, projection={"id": 1, "mentor_id": 1, "apprentice_id": 1}):
+            await add(RelationshipType.MENTORSHIP.value, doc.get("mentor_id"), doc.get("apprentice_id"), doc.get("id"),
+                      ("apprentice", "mentor"))
+        await flush()
+        if count:
+            logger.info(f"Social graph backfilled with {count} relations")
+        return count
+
+
+social_graph = SocialGraph()
@@ -1,7 +1,8 @@
 from datetime import datetime
 from typing import Optional, List
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from backend.models.social.relationship import Marriage
+from backend.models.social.relationship import Marriage, RelationshipType
+from backend.services.social.graph import social_graph
 
 
 class MarriageService:
@@ -65,6 +66,9 @@ class MarriageService:
         )
 
         await self.marriages.insert_one(marriage.model_dump())
+        await social_graph.link(
+            self.db, RelationshipType.MARRIAGE, marriage.player1_id, marriage.player2_id, ref=marriage.id
+        )
 
         # Update players
         await self.players.update_one(
@@ -112,6 +116,9 @@ class MarriageService:
                 }
             }
         )
+        await social_graph.unlink(
+            self.db, RelationshipType.MARRIAGE, marriage.get("player1_id"), marriage.get("player2_id")
+        )
 
         # Update players
         await self.players.update_one(
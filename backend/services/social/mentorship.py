@@ -1,7 +1,10 @@
 from datetime import datetime
 from typing import Optional, List
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from backend.models.social.relationship import Mentorship
+from backend.models.social.relationship import Mentorship, RelationshipType
+from backend.models.player.views import PlayerSocial
+from backend.services.player.repository import PlayerRepository
+from backend.services.social.graph import social_graph
 
 
 class MentorshipService:
@@ -9,6 +12,7 @@ class MentorshipService:
         self.db = db
         self.mentorships = db.mentorships
         self.players = db.players
+        self.repository = PlayerRepository(db)
 
     async def request_mentorship(self, apprentice_id: str, mentor_id: str) -> dict:
         """Request mentorship (creates pending request)"""
@@ -25,7 +29,7 @@ class MentorshipService:
             raise ValueError("Already have a mentor")
 
         # Check mentor level (must be at least level 50)
-        mentor = await self.players.find_one({"_id": mentor_id})
+        mentor = await self.repository.find(mentor_id, "identity")
         if not mentor or mentor.get("level", 0) < 50:
             raise ValueError("Mentor must be at least level 50")
 
@@ -51,7 +55,7 @@ class MentorshipService:
             raise ValueError("Request is not pending")
 
         # Get apprentice level
-        apprentice = await self.players.find_one({"_id": request.get("apprentice_id")})
+        apprentice = await self.repository.find(request.get("apprentice_id"), "identity")
 
         # Create mentorship
         mentorship = Mentorship(
@@ -61,6 +65,10 @@ class MentorshipService:
         )
 
         await self.mentorships.insert_one(mentorship.model_dump())
+        await social_graph.link(
+            self.db, RelationshipType.MENTORSHIP, mentorship.mentor_id, mentorship.apprentice_id,
+            ref=mentorship.id, roles=("apprentice", "mentor")
+        )
 
         # Update players
         await self.players.update_one(
@@ -99,7 +107,7 @@ class MentorshipService:
             raise ValueError("Mentorship is not active")
 
         # Check apprentice level
-        apprentice = await self.players.find_one({"_id": mentorship.get("apprentice_id")})
+        apprentice = await self.repository.find(mentorship.get("apprentice_id"), "identity")
         if not apprentice or apprentice.get("level", 0) < 50:
             raise ValueError(
                 "Apprentice must be at least level 50 to graduate")
@@ -114,6 +122,9 @@ class MentorshipService:
                 }
             }
         )
+        await social_graph.unlink(
+            self.db, RelationshipType.MENTORSHIP, mentorship.get("mentor_id"), mentorship.get("apprentice_id")
+        )
 
         # Update players
         await self.players.update_one(
@@ -185,7 +196,8 @@ class MentorshipService:
 
     async def list_mentors(self, skip: int = 0, limit: int = 20) -> List[dict]:
         """List available mentors (level 50+)"""
-        cursor = self.players.find({
-            "level": {"$gte": 50}
-        }).skip(skip).limit(limit)
+        cursor = self.players.find(
+            {"level": {"$gte": 50}},
+            projection=PlayerSocial.projection()
+        ).skip(skip).limit(limit)
         return await cursor.to_list(length=limit)
@@ -1,7 +1,17 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Dict, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from backend.models.social.relationship import Relationship, RelationshipType
+from backend.services.social.graph import social_graph
+
+RELATIONSHIP_PAGE = 100
+
+# Relation types recorded in the relationships collection; alliances,
+# marriages and mentorships have their own records
+RECORD_TYPES = [
+    type for type in RelationshipType
+    if type not in (RelationshipType.ALLIANCE, RelationshipType.MARRIAGE, RelationshipType.MENTORSHIP)
+]
 
 
 class RelationshipService:
@@ -22,16 +32,7 @@ class RelationshipService:
             raise ValueError("Cannot create relationship with yourself")
 
         # Check if relationship already exists
-        existing = await self.relationships.find_one({
-            "type": type.value,
-            "$or": [
-                {"player1_id": player1_id, "player2_id": player2_id},
-                {"player1_id": player2_id, "player2_id": player1_id}
-            ],
-            "active": True
-        })
-
-        if existing:
+        if await social_graph.related(self.db, player1_id, player2_id, [type], fresh=True):
             raise ValueError(f"{type.value} relationship already exists")
 
         relationship = Relationship(
@@ -42,19 +43,25 @@ class RelationshipService:
         )
 
         await self.relationships.insert_one(relationship.model_dump())
+        await social_graph.link(self.db, type, player1_id, player2_id, ref=relationship.id)
         return relationship
 
     async def end_relationship(self, relationship_id: str) -> bool:
         """End a relationship"""
-        await self.relationships.update_one(
-            {"id": relationship_id},
+        relationship = await self.relationships.find_one_and_update(
+            {"id": relationship_id, "active": True},
             {
                 "$set": {
                     "active": False,
                     "ended_at": datetime.utcnow()
                 }
-            }
+            },
+            projection={"type": 1, "player1_id": 1, "player2_id": 1}
         )
+        if relationship:
+            await social_graph.unlink(
+                self.db, relationship["type"], relationship["player1_id"], relationship["player2_id"]
+            )
         return True
 
     async def get_relationship(self, relationship_id: str) -> Optional[dict]:
@@ -65,24 +72,51 @@ class RelationshipService:
         self,
         player_id: str,
         type: Optional[RelationshipType] = None,
-        active_only: bool = True
-    ) -> List[dict]:
-        """Get all relationships for a player"""
-        query = {
-            "$or": [
-                {"player1_id": player_id},
-                {"player2_id": player_id}
-            ]
-        }
-
-        if type:
-            query["type"] = type.value
-
-        if active_only:
-            query["active"] = True
+        active_only: bool = True,
+        after: Optional[str] = None,
+        limit: int = RELATIONSHIP_PAGE
+    ) -> Dict[str, Any]:
+        """Get a page of a player's relationships.
+
+        Returns ``{"relationships": [...], "next_cursor": cursor}``; pass
+        ``next_cursor`` back as ``after`` for the following page, it is
+        None on the last one. Active relationships are read off the social
+        graph, ordered by type and other player.
+        """
+        if not active_only:
+            query: Dict[str, Any] = {
+                "$or": [
+                    {"player1_id": player_id},
+                    {"player2_id": player_id}
+                ]
+            }
+            if type:
+                query["type"] = type.value
+            if after:
+                query["id"] = {"$gt": after}
+            relationships = await self.relationships.find(query).sort("id", 1).to_list(length=limit + 1)
+            page = relationships[:limit]
+            return {
+                "relationships": page,
+                "next_cursor": page[-1]["id"] if len(relationships) > limit else None
+            }
 
-        cursor = self.relationships.find(query)
-        return await cursor.to_list(length=100)
+        page = await social_graph.neighbors(
+            self.db, player_id, [type] if type else RECORD_TYPES, after=after, limit=limit
+        )
+        refs = {
+            edge["ref"]: f"{edge['type']}:{edge['dst']}"
+            for edge in page["edges"] if edge.get("ref")
+        }
+        relationships = await self.relationships.find(
+            {"id": {"$in": list(refs)}, "active": True}
+        ).to_list(length=len(refs))
+        for relationship in relationships:
+            relationship["cursor"] = refs[relationship["id"]]
+        return {
+            "relationships": sorted(relationships, key=lambda relationship: relationship["cursor"]),
+            "next_cursor": page["next"]
+        }
 
     async def are_related(
         self,
@@ -90,17 +124,7 @@ class RelationshipService:
         player2_id: str,
         type: Optional[RelationshipType] = None
     ) -> bool:
-        """Check if two players are related"""
-        query = {
-            "$or": [
-                {"player1_id": player1_id, "player2_id": player2_id},
-                {"player1_id": player2_id, "player2_id": player1_id}
-            ],
-            "active": True
-        }
-
-        if type:
-            query["type"] = type.value
-
-        result = await self.relationships.find_one(query)
-        return result is not None
+        """Check if two players are related, as currently stored"""
+        return await social_graph.related(
+            self.db, player1_id, player2_id, [type] if type else None, fresh=True
+        )
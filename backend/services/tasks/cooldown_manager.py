@@ -1,15 +1,24 @@
 """Task cooldown manager service."""
 
-from datetime import datetime, timedelta
+import asyncio
+from datetime import datetime
 from typing import Dict, Any, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
 from backend.models.tasks.task_types import TaskType
+from backend.services.cooldowns import cooldowns
 import logging
 
 logger = logging.getLogger(__name__)
 
 class CooldownManager:
-    """Manages task type cooldowns to prevent grinding."""
+    """Manages task type cooldowns to prevent grinding.
+    
+    Completions are counted in ``task_cooldowns``; the cooldown itself is
+    held by the shared cooldown service under the ``task`` namespace.
+    """
+    
+    NAMESPACE = "task"
     
     # Cooldown durations by task type (in hours)
     COOLDOWN_DURATIONS = {
@@ -44,26 +53,11 @@ class CooldownManager:
         except ValueError:
             return {"on_cooldown": False, "can_attempt": True}
         
-        # Find cooldown record
-        cooldown = await db.task_cooldowns.find_one({
-            "player_id": player_id,
-            "task_type": task_type
-        })
+        cooldown_ends = await cooldowns.expires_at(player_id, self.NAMESPACE, task_type)
         
-        if not cooldown:
-            return {
-                "on_cooldown": False,
-                "can_attempt": True,
-                "remaining_attempts": self.MAX_COMPLETIONS.get(task_type_enum, 3)
-            }
-        
-        # Check if cooldown has expired
-        now = datetime.utcnow()
-        cooldown_ends = cooldown.get("cooldown_ends_at")
-        
-        if cooldown_ends and now < cooldown_ends:
+        if cooldown_ends:
             # Still on cooldown
-            seconds_remaining = (cooldown_ends - now).total_seconds()
+            seconds_remaining = max(0.0, (cooldown_ends - datetime.utcnow()).total_seconds())
             return {
                 "on_cooldown": True,
                 "can_attempt": False,
@@ -71,9 +65,6 @@ class CooldownManager:
                 "cooldown_ends_at": cooldown_ends.isoformat()
             }
         
-        # Cooldown expired, reset
-        await self._reset_cooldown(db, player_id, task_type)
-        
         return {
             "on_cooldown": False,
             "can_attempt": True,
@@ -90,55 +81,22 @@ class CooldownManager:
         max_completions = self.MAX_COMPLETIONS.get(task_type_enum, 3)
         cooldown_hours = self.COOLDOWN_DURATIONS.get(task_type_enum, 2)
         
-        # Find or create cooldown record
-        cooldown = await db.task_cooldowns.find_one({
-            "player_id": player_id,
-            "task_type": task_type
-        })
-        
-        now = datetime.utcnow()
-        
-        if not cooldown:
-            # First completion
-            await db.task_cooldowns.insert_one({
-                "player_id": player_id,
-                "task_type": task_type,
-                "last_completed_at": now,
-                "completed_count": 1,
-                "max_completions": max_completions,
-                "cooldown_ends_at": None  # No cooldown yet
-            })
-            logger.info(f"  ➡️ First {task_type} completion for player {player_id}")
-            return
+        # Count the completion in one upsert
+        counter = await db.task_cooldowns.find_one_and_update(
+            {"player_id": player_id, "task_type": task_type},
+            {
+                "$inc": {"completed_count": 1},
+                "$set": {"last_completed_at": datetime.utcnow(), "max_completions": max_completions}
+            },
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
         
-        # Check if we need to reset cooldown period
-        cooldown_ends = cooldown.get("cooldown_ends_at")
-        if cooldown_ends and now >= cooldown_ends:
-            # Reset the counter
+        if counter["completed_count"] >= max_completions:
+            # Start the cooldown; the count begins again once it's over
+            await cooldowns.set(player_id, self.NAMESPACE, task_type, cooldown_hours * 3600)
             await self._reset_cooldown(db, player_id, task_type)
-            cooldown = await db.task_cooldowns.find_one({
-                "player_id": player_id,
-                "task_type": task_type
-            })
-        
-        # Increment completion count
-        completed_count = cooldown.get("completed_count", 0) + 1
-        
-        update_data = {
-            "last_completed_at": now,
-            "completed_count": completed_count
-        }
-        
-        # Check if we've hit the max
-        if completed_count >= max_completions:
-            cooldown_ends_at = now + timedelta(hours=cooldown_hours)
-            update_data["cooldown_ends_at"] = cooldown_ends_at
             logger.info(f"  ⏰ {task_type} cooldown activated for player {player_id} (expires in {cooldown_hours}h)")
-        
-        await db.task_cooldowns.update_one(
-            {"player_id": player_id, "task_type": task_type},
-            {"$set": update_data}
-        )
     
     async def _reset_cooldown(self, db: AsyncIOMotorDatabase, player_id: str, task_type: str):
         """Reset cooldown counter for a task type."""
@@ -153,7 +111,6 @@ class CooldownManager:
             {
                 "$set": {
                     "completed_count": 0,
-                    "cooldown_ends_at": None,
                     "max_completions": max_completions
                 }
             },
@@ -162,29 +119,29 @@ class CooldownManager:
     
     async def get_all_cooldowns(self, db: AsyncIOMotorDatabase, player_id: str) -> Dict[str, Dict[str, Any]]:
         """Get all active cooldowns for a player."""
-        cooldowns = await db.task_cooldowns.find({"player_id": player_id}).to_list(length=None)
+        counters, running = await asyncio.gather(
+            db.task_cooldowns.find({"player_id": player_id}).to_list(length=None),
+            cooldowns.active(player_id, self.NAMESPACE)
+        )
         
         result = {}
         now = datetime.utcnow()
         
-        for cooldown in cooldowns:
-            task_type = cooldown.get("task_type")
-            cooldown_ends = cooldown.get("cooldown_ends_at")
-            completed_count = cooldown.get("completed_count", 0)
-            max_completions = cooldown.get("max_completions", 3)
-            
-            if cooldown_ends and now < cooldown_ends:
-                seconds_remaining = (cooldown_ends - now).total_seconds()
-                result[task_type] = {
-                    "on_cooldown": True,
-                    "seconds_remaining": int(seconds_remaining),
-                    "cooldown_ends_at": cooldown_ends.isoformat()
-                }
-            else:
-                result[task_type] = {
-                    "on_cooldown": False,
-                    "completed_count": completed_count,
-                    "remaining_attempts": max(0, max_completions - completed_count)
-                }
+        for counter in counters:
+            task_type = counter.get("task_type")
+            completed_count = counter.get("completed_count", 0)
+            max_completions = counter.get("max_completions", 3)
+            result[task_type] = {
+                "on_cooldown": False,
+                "completed_count": completed_count,
+                "remaining_attempts": max(0, max_completions - completed_count)
+            }
+        
+        for task_type, cooldown_ends in running.items():
+            result[task_type] = {
+                "on_cooldown": True,
+                "seconds_remaining": int(max(0.0, (cooldown_ends - now).total_seconds())),
+                "cooldown_ends_at": cooldown_ends.isoformat()
+            }
         
         return result
@@ -1,7 +1,7 @@
 """Relationship task generator service."""
 
 import random
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 class RelationshipTaskGenerator:
     """Generates relationship-focused tasks."""
@@ -38,10 +38,36 @@ class RelationshipTaskGenerator:
             "trust_level": "very_low"
         }
     ]
+
+    # Social graph relation a scenario's NPC can be played by
+    SCENARIO_RELATIONS = {
+        "former_ally": "alliance",
+        "old_friend": "friend",
+        "rival": "rival"
+    }
     
-    def generate_relationship_task(self, player_level: int, player_traits: Dict[str, float]) -> Dict[str, Any]:
-        """Generate a relationship task."""
-        scenario = random.choice(self.RELATIONSHIP_SCENARIOS)
+    def generate_relationship_task(
+        self,
+        player_level: int,
+        player_traits: Dict[str, float],
+        connections: Optional[Dict[str, List[str]]] = None
+    ) -> Dict[str, Any]:
+        """Generate a relationship task.
+
+        ``connections`` is the player's social graph neighbours by relation
+        type. When given, a scenario is cast with a real connected player
+        where possible.
+        """
+        related_player_id = None
+        castable = [
+            scenario for scenario in self.RELATIONSHIP_SCENARIOS
+            if (connections or {}).get(self.SCENARIO_RELATIONS.get(scenario["npc_type"]))
+        ]
+        if castable:
+            scenario = random.choice(castable)
+            related_player_id = random.choice(connections[self.SCENARIO_RELATIONS[scenario["npc_type"]]])
+        else:
+            scenario = random.choice(self.RELATIONSHIP_SCENARIOS)
         
         choices = self._generate_relationship_choices(
             scenario,
@@ -50,7 +76,7 @@ class RelationshipTaskGenerator:
             player_traits.get("cunning", 50)
         )
         
-        return {
+        task = {
             "task_id": f"relationship_{random.randint(10000, 99999)}",
             "title": scenario["title"],
             "description": scenario["description"],
@@ -60,6 +86,9 @@ class RelationshipTaskGenerator:
             "credits_reward": 150,
             "choices": choices
         }
+        if related_player_id:
+            task["related_player_id"] = related_player_id
+        return task
     
     def _generate_relationship_choices(
         self,
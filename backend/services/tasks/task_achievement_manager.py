@@ -1,8 +1,264 @@
-"""Task achievement manager - manages achievements for task completions."""
+"""Task achievement manager - manages achievements for task completions.
 
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+Progress is kept as per-player counters on the ``player_achievements``
+document (``counters.total_tasks``, ``counters.task_type.coop``, ...),
+incremented in one update when a task is completed. Only the achievements
+watching a counter that changed are then evaluated, against the counters
+the update returned, so awarding needs no ``task_history`` queries. Players
+without counters are seeded from their task history on first use.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from datetime import date, datetime, timedelta
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from backend.services.achievements.engine import AchievementIndex, counter_path, counter_value
+from backend.services.player.inventory_manager import InventoryManager
+
+# History fields read when seeding a player's counters
+HISTORY_COUNTER_FIELDS = {
+    "task_type": 1, "difficulty": 1, "karma_change": 1, "completed_at": 1,
+    "time_taken_minutes": 1, "duration_minutes": 1, "success": 1, "result": 1
+}
+
+# A task finished in under this share of its time limit counts as fast
+FAST_COMPLETION_RATIO = 0.7
+
+TASK_ACHIEVEMENTS: List[Dict] = [
+    {
+        "id": "first_task",
+        "name": "First Steps",
+        "description": "Complete your first task",
+        "icon": "🎯",
+        "requirement": {"type": "total_tasks", "value": 1},
+        "rewards": {"xp": 100, "credits": 500}
+    },
+    {
+        "id": "task_10",
+        "name": "Getting Started",
+        "description": "Complete 10 tasks",
+        "icon": "⭐",
+        "requirement": {"type": "total_tasks", "value": 10},
+        "rewards": {"xp": 500, "credits": 2000}
+    },
+    {
+        "id": "task_50",
+        "name": "Experienced",
+        "description": "Complete 50 tasks",
+        "icon": "🏆",
+        "requirement": {"type": "total_tasks", "value": 50},
+        "rewards": {"xp": 2000, "credits": 10000, "items": ["veteran_badge"]}
+    },
+    {
+        "id": "task_100",
+        "name": "Task Master",
+        "description": "Complete 100 tasks",
+        "icon": "👑",
+        "requirement": {"type": "total_tasks", "value": 100},
+        "rewards": {"xp": 5000, "credits": 25000, "items": ["task_master_crown"]}
+    },
+    {
+        "id": "good_deeds_10",
+        "name": "Good Samaritan",
+        "description": "Complete 10 tasks with positive karma",
+        "icon": "😇",
+        "requirement": {"type": "karma_tasks", "karma_type": "positive", "value": 10},
+        "rewards": {"xp": 1000, "karma": 50, "credits": 5000}
+    },
+    {
+        "id": "dark_path_10",
+        "name": "Dark Path",
+        "description": "Complete 10 tasks with negative karma",
+        "icon": "😈",
+        "requirement": {"type": "karma_tasks", "karma_type": "negative", "value": 10},
+        "rewards": {"xp": 1000, "karma": -50, "credits": 5000}
+    },
+    {
+        "id": "perfect_week",
+        "name": "Perfect Week",
+        "description": "Complete at least 1 task every day for 7 days",
+        "icon": "📅",
+        "requirement": {"type": "streak", "value": 7},
+        "rewards": {"xp": 1500, "credits": 7500}
+    },
+    {
+        "id": "legendary_complete",
+        "name": "Legend",
+        "description": "Complete 5 legendary difficulty tasks",
+        "icon": "💎",
+        "requirement": {"type": "difficulty", "difficulty": "legendary", "value": 5},
+        "rewards": {"xp": 3000, "credits": 15000, "items": ["legendary_gem"]}
+    },
+    {
+        "id": "versatile",
+        "name": "Versatile",
+        "description": "Complete at least 5 tasks of each type",
+        "icon": "🎭",
+        "requirement": {"type": "variety", "value": 5},
+        "rewards": {"xp": 2500, "credits": 12000}
+    },
+    {
+        "id": "speed_runner",
+        "name": "Speed Runner",
+        "description": "Complete 10 tasks in under 70% of the time limit",
+        "icon": "⚡",
+        "requirement": {"type": "fast_completion", "value": 10},
+        "rewards": {"xp": 2000, "credits": 10000}
+    },
+    {
+        "id": "team_player",
+        "name": "Team Player",
+        "description": "Complete 20 co-op tasks",
+        "icon": "🤝",
+        "requirement": {"type": "task_type", "task_type": "coop", "value": 20},
+        "rewards": {"xp": 2500, "credits": 12500}
+    },
+    {
+        "id": "champion",
+        "name": "Champion",
+        "description": "Win 15 competitive challenges",
+        "icon": "🥇",
+        "requirement": {"type": "competitive_wins", "value": 15},
+        "rewards": {"xp": 3000, "credits": 15000, "items": ["champion_trophy"]}
+    },
+    {
+        "id": "moral_compass",
+        "name": "Moral Compass",
+        "description": "Complete 25 moral choice tasks",
+        "icon": "⚖️",
+        "requirement": {"type": "task_type", "task_type": "moral_choice", "value": 25},
+        "rewards": {"xp": 2000, "credits": 10000}
+    },
+    {
+        "id": "guild_hero",
+        "name": "Guild Hero",
+        "description": "Complete 10 guild benefit tasks",
+        "icon": "🛡️",
+        "requirement": {"type": "task_type", "task_type": "guild_benefit", "value": 10},
+        "rewards": {"xp": 2000, "guild_reputation": 100, "credits": 10000}
+    },
+    {
+        "id": "karma_neutral",
+        "name": "Balanced",
+        "description": "Maintain karma between -10 and +10 for 30 days",
+        "icon": "☯️",
+        "requirement": {"type": "karma_balance", "days": 30},
+        "rewards": {"xp": 1500, "credits": 7500}
+    }
+]
+
+
+def requirement_counter(requirement: Dict) -> Optional[str]:
+    """Counter path a requirement is measured by (None if it has none)."""
+    req_type = requirement["type"]
+    if req_type == "karma_tasks":
+        return counter_path("karma_tasks", requirement.get("karma_type"))
+    if req_type == "difficulty":
+        return counter_path("difficulty", requirement.get("difficulty"))
+    if req_type == "task_type":
+        return counter_path("task_type", requirement.get("task_type"))
+    if req_type == "variety":
+        return "task_type"
+    if req_type in ("total_tasks", "streak", "fast_completion", "competitive_wins"):
+        return req_type
+    return None
+
+
+def requirement_progress(requirement: Dict, counters: Dict[str, Any]) -> int:
+    """Current value of a requirement's counter."""
+    path = requirement_counter(requirement)
+    if path is None:
+        return 0
+    if requirement["type"] == "variety":
+        # Fewest completions of any task type done so far
+        return min((counters.get(path) or {}).values(), default=0)
+    return counter_value(counters, path)
+
+
+def requirement_met(requirement: Dict, counters: Dict[str, Any]) -> bool:
+    if requirement_counter(requirement) is None:
+        return False
+    return requirement_progress(requirement, counters) >= requirement["value"]
+
+
+def task_counter_increments(record: Dict) -> Dict[str, int]:
+    """Counters a completed task (a ``task_history`` record) adds to."""
+    paths = ["total_tasks", counter_path("task_type", record.get("task_type")),
+             counter_path("difficulty", record.get("difficulty"))]
+
+    karma_change = record.get("karma_change") or 0
+    if karma_change:
+        paths.append(counter_path("karma_tasks", "positive" if karma_change > 0 else "negative"))
+
+    time_taken = record.get("time_taken_minutes")
+    duration = record.get("duration_minutes")
+    if time_taken and duration and time_taken < duration * FAST_COMPLETION_RATIO:
+        paths.append("fast_completion")
+
+    if record.get("task_type") == "competitive" and record.get("success", True) and record.get("result") == "won":
+        paths.append("competitive_wins")
+
+    return {path: 1 for path in paths if path}
+
+
+def add_counts(counters: Dict[str, Any], increments: Dict[str, int]) -> None:
+    """Add dotted-path increments into a nested counters dict."""
+    for path, amount in increments.items():
+        *parents, name = path.split(".")
+        node = counters
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[name] = node.get(name, 0) + amount
+
+
+def trailing_streak(days: Iterable[date]) -> Tuple[int, Optional[date]]:
+    """Consecutive days ending on the latest of ``days``, and that day."""
+    remaining = set(days)
+    if not remaining:
+        return 0, None
+    last = max(remaining)
+    streak = 0
+    while last - timedelta(days=streak) in remaining:
+        streak += 1
+    return streak, last
+
+
+def current_counters(progress: Dict, today: date) -> Dict[str, Any]:
+    """A progress document's counters, with the streak dropped if it lapsed."""
+    counters = dict(progress.get("counters") or {})
+    if progress.get("last_task_day") != today.isoformat():
+        counters["streak"] = 0
+    return counters
+
+
+def counter_pipeline(increments: Dict[str, int], today: date, now: datetime) -> List[Dict]:
+    """Update pipeline adding ``increments`` and extending the daily streak."""
+    fields: Dict[str, Any] = {
+        f"counters.{path}": {"$add": [{"$ifNull": [f"$counters.{path}", 0]}, amount]}
+        for path, amount in increments.items()
+    }
+    streak = {"$ifNull": ["$counters.streak", 0]}
+    fields["counters.streak"] = {"$switch": {
+        "branches": [
+            {"case": {"$eq": ["$last_task_day", today.isoformat()]}, "then": {"$max": [streak, 1]}},
+            {"case": {"$eq": ["$last_task_day", (today - timedelta(days=1)).isoformat()]},
+             "then": {"$add": [streak, 1]}},
+        ],
+        "default": 1
+    }}
+    fields["last_task_day"] = today.isoformat()
+    fields["last_updated"] = now
+    return [{"$set": fields}]
+
+
+TASK_ACHIEVEMENT_INDEX = AchievementIndex(
+    TASK_ACHIEVEMENTS,
+    lambda achievement: [path for path in [requirement_counter(achievement["requirement"])] if path],
+    key=lambda achievement: achievement["id"]
+)
+
 
 class TaskAchievementManager:
     """Manages task-related achievements and milestones."""
@@ -11,130 +267,86 @@ class TaskAchievementManager:
         self.db = db
         self.achievements_collection = db.player_achievements
         self.history_collection = db.task_history
+        self.achievements = TASK_ACHIEVEMENTS
+    
+    async def ensure_indexes(self):
+        """One progress document per player; history scanned per player when seeding."""
+        await self.achievements_collection.create_index("player_id", unique=True)
+        await self.history_collection.create_index([("player_id", ASCENDING), ("completed_at", ASCENDING)])
+    
+    async def seed_counters(self, player_id: str, exclude_id: Optional[str] = None) -> None:
+        """Build a player's counters from their task history, once.
         
-        # Define task achievements
-        self.achievements = [
-            {
-                "id": "first_task",
-                "name": "First Steps",
-                "description": "Complete your first task",
-                "icon": "🎯",
-                "requirement": {"type": "total_tasks", "value": 1},
-                "rewards": {"xp": 100, "credits": 500}
-            },
-            {
-                "id": "task_10",
-                "name": "Getting Started",
-                "description": "Complete 10 tasks",
-                "icon": "⭐",
-                "requirement": {"type": "total_tasks", "value": 10},
-                "rewards": {"xp": 500, "credits": 2000}
-            },
-            {
-                "id": "task_50",
-                "name": "Experienced",
-                "description": "Complete 50 tasks",
-                "icon": "🏆",
-                "requirement": {"type": "total_tasks", "value": 50},
-                "rewards": {"xp": 2000, "credits": 10000, "items": ["veteran_badge"]}
-            },
-            {
-                "id": "task_100",
-                "name": "Task Master",
-                "description": "Complete 100 tasks",
-                "icon": "👑",
-                "requirement": {"type": "total_tasks", "value": 100},
-                "rewards": {"xp": 5000, "credits": 25000, "items": ["task_master_crown"]}
-            },
-            {
-                "id": "good_deeds_10",
-                "name": "Good Samaritan",
-                "description": "Complete 10 tasks with positive karma",
-                "icon": "😇",
-                "requirement": {"type": "karma_tasks", "karma_type": "positive", "value": 10},
-                "rewards": {"xp": 1000, "karma": 50, "credits": 5000}
-            },
-            {
-                "id": "dark_path_10",
-                "name": "Dark Path",
-                "description": "Complete 10 tasks with negative karma",
-                "icon": "😈",
-                "requirement": {"type": "karma_tasks", "karma_type": "negative", "value": 10},
-                "rewards": {"xp": 1000, "karma": -50, "credits": 5000}
-            },
-            {
-                "id": "perfect_week",
-                "name": "Perfect Week",
-                "description": "Complete at least 1 task every day for 7 days",
-                "icon": "📅",
-                "requirement": {"type": "streak", "value": 7},
-                "rewards": {"xp": 1500, "credits": 7500}
-            },
-            {
-                "id": "legendary_complete",
-                "name": "Legend",
-                "description": "Complete 5 legendary difficulty tasks",
-                "icon": "💎",
-                "requirement": {"type": "difficulty", "difficulty": "legendary", "value": 5},
-                "rewards": {"xp": 3000, "credits": 15000, "items": ["legendary_gem"]}
-            },
-            {
-                "id": "versatile",
-                "name": "Versatile",
-                "description": "Complete at least 5 tasks of each type",
-                "icon": "🎭",
-                "requirement": {"type": "variety", "value": 5},
-                "rewards": {"xp": 2500, "credits": 12000}
-            },
-            {
-                "id": "speed_runner",
-                "name": "Speed Runner",
-                "description": "Complete 10 tasks in under 70% of the time limit",
-                "icon": "⚡",
-                "requirement": {"type": "fast_completion", "value": 10},
-                "rewards": {"xp": 2000, "credits": 10000}
-            },
-            {
-                "id": "team_player",
-                "name": "Team Player",
-                "description": "Complete 20 co-op tasks",
-                "icon": "🤝",
-                "requirement": {"type": "task_type", "task_type": "coop", "value": 20},
-                "rewards": {"xp": 2500, "credits": 12500}
-            },
-            {
-                "id": "champion",
-                "name": "Champion",
-                "description": "Win 15 competitive challenges",
-                "icon": "🥇",
-                "requirement": {"type": "competitive_wins", "value": 15},
-                "rewards": {"xp": 3000, "credits": 15000, "items": ["champion_trophy"]}
-            },
-            {
-                "id": "moral_compass",
-                "name": "Moral Compass",
-                "description": "Complete 25 moral choice tasks",
-                "icon": "⚖️",
-                "requirement": {"type": "task_type", "task_type": "moral_choice", "value": 25},
-                "rewards": {"xp": 2000, "credits": 10000}
-            },
-            {
-                "id": "guild_hero",
-                "name": "Guild Hero",
-                "description": "Complete 10 guild benefit tasks",
-                "icon": "🛡️",
-                "requirement": {"type": "task_type", "task_type": "guild_benefit", "value": 10},
-                "rewards": {"xp": 2000, "guild_reputation": 100, "credits": 10000}
-            },
-            {
-                "id": "karma_neutral",
-                "name": "Balanced",
-                "description": "Maintain karma between -10 and +10 for 30 days",
-                "icon": "☯️",
-                "requirement": {"type": "karma_balance", "days": 30},
-                "rewards": {"xp": 1500, "credits": 7500}
-            }
-        ]
+        Args:
+            player_id: Player's ID
+            exclude_id: History record already being counted by the caller
+        """
+        query: Dict[str, Any] = {"player_id": player_id}
+        if exclude_id is not None:
+            query["_id"] = {"$ne": exclude_id}
+        
+        counters: Dict[str, Any] = {}
+        days: Set[date] = set()
+        async for record in self.history_collection.find(query, projection=HISTORY_COUNTER_FIELDS):
+            add_counts(counters, task_counter_increments(record))
+            if isinstance(record.get("completed_at"), datetime):
+                days.add(record["completed_at"].date())
+        counters["streak"], last_day = trailing_streak(days)
+        
+        try:
+            await self.achievements_collection.update_one(
+                {"player_id": player_id, "counters_seeded": {"$ne": True}},
+                {
+                    "$set": {
+                        "counters": counters,
+                        "counters_seeded": True,
+                        "last_task_day": last_day.isoformat() if last_day else None,
+                        "last_updated": datetime.now()
+                    },
+                    "$setOnInsert": {"earned": []}
+                },
+                upsert=True
+            )
+        except DuplicateKeyError:
+            pass  # Seeded concurrently
+    
+    async def _get_progress(self, player_id: str) -> Dict:
+        """Player's progress document, seeding counters if needed."""
+        progress = await self.achievements_collection.find_one({"player_id": player_id})
+        if not progress or not progress.get("counters_seeded"):
+            await self.seed_counters(player_id)
+            progress = await self.achievements_collection.find_one({"player_id": player_id})
+        return progress or {"player_id": player_id, "earned": [], "counters": {}}
+    
+    async def task_completed(self, player_id: str, record: Dict) -> List[Dict]:
+        """Count a completed task and award the achievements it unlocks.
+        
+        Args:
+            player_id: Player's ID
+            record: The task's history record
+        
+        Returns:
+            List of newly earned achievements
+        """
+        increments = task_counter_increments(record)
+        today = datetime.now().date()
+        
+        progress = None
+        for _ in range(2):
+            progress = await self.achievements_collection.find_one_and_update(
+                {"player_id": player_id, "counters_seeded": True},
+                counter_pipeline(increments, today, datetime.now()),
+                projection={"counters": 1, "last_task_day": 1, "earned.achievement_id": 1},
+                return_document=ReturnDocument.AFTER
+            )
+            if progress is not None:
+                break
+            await self.seed_counters(player_id, exclude_id=record.get("_id"))
+        if progress is None:
+            return []
+        
+        affected = TASK_ACHIEVEMENT_INDEX.affected([*increments, "streak"])
+        return await self._award(player_id, progress, affected, today)
     
     async def check_and_award_achievements(
         self,
@@ -148,155 +360,50 @@ class TaskAchievementManager:
         Returns:
             List of newly earned achievements
         """
-        # Get player's current achievements
-        player_achievements = await self.achievements_collection.find_one(
-            {"player_id": player_id}
-        ) or {"player_id": player_id, "earned": []}
-        
-        earned_ids = set(a["achievement_id"] for a in player_achievements.get("earned", []))
+        progress = await self._get_progress(player_id)
+        return await self._award(player_id, progress, self.achievements, datetime.now().date())
+    
+    async def _award(
+        self,
+        player_id: str,
+        progress: Dict,
+        candidates: List[Dict],
+        today: date
+    ) -> List[Dict]:
+        """Award every candidate whose requirement the counters meet."""
+        earned_ids = set(a["achievement_id"] for a in progress.get("earned", []))
+        counters = current_counters(progress, today)
         
-        # Check each achievement
         newly_earned = []
-        
-        for achievement in self.achievements:
+        for achievement in candidates:
             if achievement["id"] in earned_ids:
                 continue  # Already earned
+            if not requirement_met(achievement["requirement"], counters):
+                continue
             
-            # Check if requirement is met
-            if await self._check_requirement(player_id, achievement["requirement"]):
-                # Award achievement
-                earned_achievement = {
-                    "achievement_id": achievement["id"],
-                    "name": achievement["name"],
-                    "description": achievement["description"],
-                    "icon": achievement["icon"],
-                    "earned_at": datetime.now(),
-                    "rewards": achievement["rewards"]
-                }
-                
-                newly_earned.append(earned_achievement)
-        
-        # Update player achievements
-        if newly_earned:
-            await self.achievements_collection.update_one(
-                {"player_id": player_id},
+            earned_achievement = {
+                "achievement_id": achievement["id"],
+                "name": achievement["name"],
+                "description": achievement["description"],
+                "icon": achievement["icon"],
+                "earned_at": datetime.now(),
+                "rewards": achievement["rewards"]
+            }
+            
+            # Conditional push so concurrent completions award it once
+            result = await self.achievements_collection.update_one(
+                {"player_id": player_id, "earned.achievement_id": {"$ne": achievement["id"]}},
                 {
-                    "$push": {"earned": {"$each": newly_earned}},
+                    "$push": {"earned": earned_achievement},
                     "$set": {"last_updated": datetime.now()}
-                },
-                upsert=True
+                }
             )
-            
-            # Apply rewards to player
-            for achievement in newly_earned:
+            if result.modified_count:
                 await self._apply_achievement_rewards(player_id, achievement["rewards"])
+                newly_earned.append(earned_achievement)
         
         return newly_earned
     
-    async def _check_requirement(
-        self,
-        player_id: str,
-        requirement: Dict
-    ) -> bool:
-        """Check if player meets achievement requirement.
-        
-        Args:
-            player_id: Player's ID
-            requirement: Requirement specification
-        
-        Returns:
-            True if requirement is met
-        """
-        req_type = requirement["type"]
-        
-        if req_type == "total_tasks":
-            count = await self.history_collection.count_documents({"player_id": player_id})
-            return count >= requirement["value"]
-        
-        elif req_type == "karma_tasks":
-            karma_type = requirement["karma_type"]
-            if karma_type == "positive":
-                query = {"player_id": player_id, "karma_change": {"$gt": 0}}
-            else:
-                query = {"player_id": player_id, "karma_change": {"$lt": 0}}
-            count = await self.history_collection.count_documents(query)
-            return count >= requirement["value"]
-        
-        elif req_type == "streak":
-            # Check streak from task history
-            history = await self.history_collection.find(
-                {"player_id": player_id}
-            ).sort("completed_at", -1).limit(100).to_list(length=100)
-            
-            if not history:
-                return False
-            
-            # Count consecutive days with completions
-            streak = 0
-            check_date = datetime.now().date()
-            
-            for record in history:
-                if record["completed_at"].date() == check_date:
-                    streak += 1
-                    check_date = check_date - timedelta(days=1)
-                elif record["completed_at"].date() < check_date:
-                    break
-            
-            return streak >= requirement["value"]
-        
-        elif req_type == "difficulty":
-            count = await self.history_collection.count_documents({
-                "player_id": player_id,
-                "difficulty": requirement["difficulty"]
-            })
-            return count >= requirement["value"]
-        
-        elif req_type == "variety":
-            # Check if player has completed required count of each task type
-            pipeline = [
-                {"$match": {"player_id": player_id}},
-                {"$group": {"_id": "$task_type", "count": {"$sum": 1}}}
-            ]
-            cursor = self.history_collection.aggregate(pipeline)
-            type_counts = await cursor.to_list(length=100)
-            
-            # Check if all types have at least the required count
-            min_count = min((tc["count"] for tc in type_counts), default=0)
-            return min_count >= requirement["value"]
-        
-        elif req_type == "fast_completion":
-            # Count tasks completed under 70% time
-            fast_count = 0
-            history = await self.history_collection.find(
-                {"player_id": player_id, "time_taken_minutes": {"$ne": None}}
-            ).to_list(length=1000)
-            
-            for record in history:
-                if record.get("time_taken_minutes") and record.get("duration_minutes"):
-                    if record["time_taken_minutes"] < record["duration_minutes"] * 0.7:
-                        fast_count += 1
-            
-            return fast_count >= requirement["value"]
-        
-        elif req_type == "task_type":
-            count = await self.history_collection.count_documents({
-                "player_id": player_id,
-                "task_type": requirement["task_type"]
-            })
-            return count >= requirement["value"]
-        
-        elif req_type == "competitive_wins":
-            # Check competitive task wins
-            count = await self.history_collection.count_documents({
-                "player_id": player_id,
-                "task_type": "competitive",
-                "success": True,
-                "result": "won"  # Assuming this field exists
-            })
-            return count >= requirement["value"]
-        
-        return False
-    
     async def _apply_achievement_rewards(
         self,
         player_id: str,
@@ -330,12 +437,9 @@ class TaskAchievementManager:
         
         # Add items to inventory
         if "items" in rewards:
+            inventory = InventoryManager(self.db)
             for item in rewards["items"]:
-                await self.db.player_inventory.update_one(
-                    {"player_id": player_id},
-                    {"$push": {"items": {"item_id": item, "acquired_at": datetime.now()}}},
-                    upsert=True
-                )
+                await inventory.add_item(player_id, item)
     
     async def get_player_achievements(
         self,
@@ -393,23 +497,10 @@ class TaskAchievementManager:
             return {"error": "Achievement not found"}
         
         requirement = achievement["requirement"]
-        req_type = requirement["type"]
-        target = requirement["value"]
+        target = requirement.get("value", 0)
         
-        # Calculate current progress based on type
-        if req_type == "total_tasks":
-            current = await self.history_collection.count_documents({"player_id": player_id})
-        elif req_type == "karma_tasks":
-            karma_type = requirement["karma_type"]
-            query = {"player_id": player_id, "karma_change": {"$gt" if karma_type == "positive" else "$lt": 0}}
-            current = await self.history_collection.count_documents(query)
-        elif req_type == "task_type":
-            current = await self.history_collection.count_documents({
-                "player_id": player_id,
-                "task_type": requirement["task_type"]
-            })
-        else:
-            current = 0  # Default for complex requirements
+        progress = await self._get_progress(player_id)
+        current = requirement_progress(requirement, current_counters(progress, datetime.now().date()))
         
         return {
             "achievement_id": achievement_id,
@@ -418,5 +509,5 @@ class TaskAchievementManager:
             "current": current,
             "target": target,
             "percentage": round(min(current / target * 100, 100), 1) if target > 0 else 0,
-            "completed": current >= target
+            "completed": target > 0 and current >= target
         }
@@ -3,6 +3,9 @@
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from motor.motor_asyncio import AsyncIOMotorDatabase
+import uuid
+
+from backend.services.tasks.task_achievement_manager import TaskAchievementManager
 
 class TaskHistoryManager:
     """Manages player task completion history."""
@@ -30,7 +33,7 @@ class TaskHistoryManager:
             History record
         """
         history_record = {
-            "_id": f"history_{datetime.now().strftime('%Y%m%d%H%M%S')}_{player_id[:8]}",
+            "_id": f"history_{datetime.now().strftime('%Y%m%d%H%M%S')}_{player_id[:8]}_{uuid.uuid4().hex[:8]}",
             "player_id": player_id,
             "task_id": task_data.get("task_id"),
             "task_type": task_data.get("type"),
@@ -48,6 +51,9 @@ class TaskHistoryManager:
         }
         
         await self.history_collection.insert_one(history_record)
+        history_record["achievements_earned"] = await TaskAchievementManager(self.db).task_completed(
+            player_id, history_record
+        )
         return history_record
     
     async def get_player_history(
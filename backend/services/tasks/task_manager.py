@@ -9,6 +9,8 @@ from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorDatabase
 import uuid
 
+from backend.services.tasks.task_history_manager import TaskHistoryManager
+
 logger = logging.getLogger(__name__)
 
 class TaskManager:
@@ -83,8 +85,21 @@ class TaskManager:
                 }
             )
             
+            # Recording the completion also feeds the achievement counters
+            history = await TaskHistoryManager(self.db).record_task_completion(
+                player_id,
+                {**task, 'task_id': task_id, 'type': task.get('task_type', task.get('type'))},
+                completion_result={
+                    'success': True,
+                    'rewards': {'credits': actual_reward},
+                    'karma_change': task.get('karma_change', 0),
+                }
+            )
+            achievements = history['achievements_earned']
+            
             return {
                 'success': True,
+                'achievements_earned': achievements,
                 'base_reward': base_reward,
                 'bonus_percentage': bonus_percentage,
                 'actual_reward': actual_reward,
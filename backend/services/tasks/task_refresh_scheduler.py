@@ -91,6 +91,7 @@ class TaskRefreshScheduler:
         from backend.services.tasks.combat_task_generator import CombatTaskGenerator
         from backend.services.tasks.economic_task_generator import EconomicTaskGenerator
         from backend.services.tasks.relationship_task_generator import RelationshipTaskGenerator
+        from backend.services.social.graph import social_graph
         
         generators = [
             CombatTaskGenerator(),
@@ -105,8 +106,11 @@ class TaskRefreshScheduler:
             try:
                 if isinstance(generator, EconomicTaskGenerator):
                     task = generator.generate_economic_task(player_level, player_credits, player_traits)
+                elif isinstance(generator, RelationshipTaskGenerator):
+                    connections = await social_graph.connections(db, player_id)
+                    task = generator.generate_relationship_task(player_level, player_traits, connections)
                 else:
-                    task = generator.generate_relationship_task(player_level, player_traits) if isinstance(generator, RelationshipTaskGenerator) else generator.generate_combat_task(player_level, player_traits)
+                    task = generator.generate_combat_task(player_level, player_traits)
                 
                 # Add daily task metadata
                 task["player_id"] = player_id
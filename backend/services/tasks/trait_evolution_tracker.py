@@ -2,15 +2,47 @@
 
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+import numpy as np
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from backend.core.config import settings
+from backend.models.player.traits import ALL_TRAIT_FIELDS
+from backend.services.tasks.trait_snapshot_store import TraitSeries, TraitSnapshotStore
+
+MILESTONES = np.array([25, 50, 75, 100], dtype=np.float32)
 
 class TraitEvolutionTracker:
     """Tracks and analyzes trait evolution over time."""
     
-    def __init__(self, db: AsyncIOMotorDatabase):
+    def __init__(self, db: AsyncIOMotorDatabase, storage_mode: Optional[str] = None):
         self.db = db
         self.snapshots_collection = db.trait_snapshots
         self.history_collection = db.task_history
+        self.storage_mode = storage_mode or settings.TRAIT_SNAPSHOT_STORAGE
+        self.store = TraitSnapshotStore(db)
+    
+    async def _load_series(
+        self,
+        player_id: str,
+        start_date: Optional[datetime] = None,
+        limit: int = 5000
+    ) -> TraitSeries:
+        """Load the player's trait history as a timestamp/value matrix."""
+        if self.storage_mode == "columnar":
+            return await self.store.load_series(player_id, start_date)
+        
+        query = {"player_id": player_id}
+        if start_date is not None:
+            query["timestamp"] = {"$gte": start_date}
+        snapshots = await self.snapshots_collection.find(query).sort("timestamp", 1).to_list(length=limit)
+        return TraitSeries.from_documents(snapshots)
+    
+    @staticmethod
+    def _trend(total_change: float) -> str:
+        if total_change > 5:
+            return "increasing"
+        if total_change < -5:
+            return "decreasing"
+        return "stable"
     
     async def create_trait_snapshot(
         self,
@@ -28,6 +60,9 @@ class TraitEvolutionTracker:
         Returns:
             Snapshot record
         """
+        if self.storage_mode == "columnar":
+            return await self.store.append(player_id, traits, source)
+        
         snapshot = {
             "_id": f"snapshot_{datetime.now().strftime('%Y%m%d%H%M%S')}_{player_id[:8]}",
             "player_id": player_id,
@@ -56,14 +91,9 @@ class TraitEvolutionTracker:
             Evolution data for charting
         """
         start_date = datetime.now() - timedelta(days=days)
+        series = await self._load_series(player_id, start_date, limit=1000)
         
-        # Get snapshots
-        snapshots = await self.snapshots_collection.find({
-            "player_id": player_id,
-            "timestamp": {"$gte": start_date}
-        }).sort("timestamp", 1).to_list(length=1000)
-        
-        if not snapshots:
+        if not len(series):
             return {
                 "player_id": player_id,
                 "trait_name": trait_name,
@@ -76,29 +106,20 @@ class TraitEvolutionTracker:
                 }
             }
         
-        # Extract data points
+        timestamps = [timestamp.isoformat() for timestamp in series.timestamps]
+        
         if trait_name:
             # Single trait evolution
+            values = series.column(trait_name)
             data_points = [
-                {
-                    "timestamp": snapshot["timestamp"].isoformat(),
-                    "value": snapshot["traits"].get(trait_name, 50)
-                }
-                for snapshot in snapshots
+                {"timestamp": timestamp, "value": round(float(value), 2)}
+                for timestamp, value in zip(timestamps, values)
             ]
             
-            start_value = data_points[0]["value"] if data_points else 50
-            end_value = data_points[-1]["value"] if data_points else 50
+            start_value = float(values[0])
+            end_value = float(values[-1])
             total_change = end_value - start_value
             
-            # Determine trend
-            if total_change > 5:
-                trend = "increasing"
-            elif total_change < -5:
-                trend = "decreasing"
-            else:
-                trend = "stable"
-            
             return {
                 "player_id": player_id,
                 "trait_name": trait_name,
@@ -107,41 +128,33 @@ class TraitEvolutionTracker:
                     "start_value": round(start_value, 1),
                     "end_value": round(end_value, 1),
                     "total_change": round(total_change, 1),
-                    "trend": trend
+                    "trend": self._trend(total_change)
                 }
             }
-        else:
-            # All traits evolution
-            all_traits = set()
-            for snapshot in snapshots:
-                all_traits.update(snapshot["traits"].keys())
-            
-            traits_evolution = {}
-            for trait in all_traits:
-                data_points = [
-                    {
-                        "timestamp": snapshot["timestamp"].isoformat(),
-                        "value": snapshot["traits"].get(trait, 50)
-                    }
-                    for snapshot in snapshots
-                ]
-                
-                start_value = data_points[0]["value"] if data_points else 50
-                end_value = data_points[-1]["value"] if data_points else 50
-                total_change = end_value - start_value
-                
-                traits_evolution[trait] = {
-                    "data_points": data_points,
-                    "start_value": round(start_value, 1),
-                    "end_value": round(end_value, 1),
-                    "total_change": round(total_change, 1)
-                }
-            
-            return {
-                "player_id": player_id,
-                "traits_evolution": traits_evolution,
-                "period_days": days
+        
+        # All traits evolution: one pass over the matrix columns
+        start_values = series.values[0]
+        end_values = series.values[-1]
+        total_changes = end_values - start_values
+        rounded = np.round(series.values.astype(np.float64), 2)
+        
+        traits_evolution = {}
+        for index, trait in enumerate(ALL_TRAIT_FIELDS):
+            traits_evolution[trait] = {
+                "data_points": [
+                    {"timestamp": timestamp, "value": float(value)}
+                    for timestamp, value in zip(timestamps, rounded[:, index])
+                ],
+                "start_value": round(float(start_values[index]), 1),
+                "end_value": round(float(end_values[index]), 1),
+                "total_change": round(float(total_changes[index]), 1)
             }
+        
+        return {
+            "player_id": player_id,
+            "traits_evolution": traits_evolution,
+            "period_days": days
+        }
     
     async def get_trait_changes_from_tasks(
         self,
@@ -194,34 +207,26 @@ class TraitEvolutionTracker:
         Returns:
             List of milestone achievements
         """
-        milestones = [25, 50, 75, 100]
-        
-        # Get all snapshots for this trait
-        snapshots = await self.snapshots_collection.find({
-            "player_id": player_id
-        }).sort("timestamp", 1).to_list(length=5000)
-        
-        if not snapshots:
+        series = await self._load_series(player_id)
+        if not len(series):
             return []
         
-        achieved_milestones = []
-        previous_value = 0
+        values = series.column(trait_name)
+        previous = np.concatenate(([0.0], values[:-1])).astype(values.dtype)
         
-        for snapshot in snapshots:
-            current_value = snapshot["traits"].get(trait_name, 50)
-            
-            # Check if crossed any milestone
-            for milestone in milestones:
-                if previous_value < milestone <= current_value:
-                    achieved_milestones.append({
-                        "milestone": milestone,
-                        "achieved_at": snapshot["timestamp"].isoformat(),
-                        "trait_name": trait_name
-                    })
-            
-            previous_value = current_value
+        # (milestones x snapshots) crossing matrix, evaluated in one comparison
+        crossed = (previous[None, :] < MILESTONES[:, None]) & (MILESTONES[:, None] <= values[None, :])
+        milestone_rows, snapshot_cols = np.nonzero(crossed)
+        order = np.lexsort((milestone_rows, snapshot_cols))
         
-        return achieved_milestones
+        return [
+            {
+                "milestone": int(MILESTONES[milestone_rows[i]]),
+                "achieved_at": series.timestamps[snapshot_cols[i]].isoformat(),
+                "trait_name": trait_name
+            }
+            for i in order
+        ]
     
     async def get_trait_velocity(
         self,
@@ -238,35 +243,17 @@ class TraitEvolutionTracker:
             Dictionary mapping trait names to velocity (points per day)
         """
         start_date = datetime.now() - timedelta(days=days)
+        series = await self._load_series(player_id, start_date, limit=1000)
         
-        # Get snapshots in period
-        snapshots = await self.snapshots_collection.find({
-            "player_id": player_id,
-            "timestamp": {"$gte": start_date}
-        }).sort("timestamp", 1).to_list(length=1000)
-        
-        if len(snapshots) < 2:
+        if len(series) < 2:
             return {}
         
-        first_snapshot = snapshots[0]
-        last_snapshot = snapshots[-1]
-        
-        time_diff_days = (last_snapshot["timestamp"] - first_snapshot["timestamp"]).days
+        time_diff_days = (series.timestamps[-1] - series.timestamps[0]).days
         if time_diff_days == 0:
             time_diff_days = 1  # Avoid division by zero
         
-        velocities = {}
-        all_traits = set(first_snapshot["traits"].keys()) | set(last_snapshot["traits"].keys())
-        
-        for trait in all_traits:
-            start_value = first_snapshot["traits"].get(trait, 50)
-            end_value = last_snapshot["traits"].get(trait, 50)
-            change = end_value - start_value
-            velocity = change / time_diff_days
-            
-            velocities[trait] = round(velocity, 2)
-        
-        return velocities
+        velocities = (series.values[-1] - series.values[0]).astype(np.float64) / time_diff_days
+        return {trait: round(float(velocity), 2) for trait, velocity in zip(ALL_TRAIT_FIELDS, velocities)}
     
     async def predict_trait_value(
         self,
@@ -285,7 +272,7 @@ class TraitEvolutionTracker:
             Prediction data
         """
         # Get current velocity
-        velocities = await self.trait_velocity(player_id, days=7)
+        velocities = await self.get_trait_velocity(player_id, days=7)
         velocity = velocities.get(trait_name, 0)
         
         # Get current value
@@ -326,11 +313,16 @@ class TraitEvolutionTracker:
         """
         cutoff_time = datetime.now() - timedelta(hours=interval_hours)
         
+        if self.storage_mode == "columnar":
+            snapshots_from, timestamp_field = "trait_snapshot_buckets", "bucket_end"
+        else:
+            snapshots_from, timestamp_field = "trait_snapshots", "timestamp"
+        
         # Find players who need new snapshots
         pipeline = [
             {
                 "$lookup": {
-                    "from": "trait_snapshots",
+                    "from": snapshots_from,
                     "localField": "_id",
                     "foreignField": "player_id",
                     "as": "recent_snapshots"
@@ -340,7 +332,7 @@ class TraitEvolutionTracker:
                 "$match": {
                     "$or": [
                         {"recent_snapshots": {"$size": 0}},
-                        {"recent_snapshots.timestamp": {"$lt": cutoff_time}}
+                        {f"recent_snapshots.{timestamp_field}": {"$lt": cutoff_time}}
                     ]
                 }
             }
@@ -354,7 +346,7 @@ class TraitEvolutionTracker:
             if "traits" in player:
                 await self.create_trait_snapshot(
                     player_id=player["_id"],
-                    traits=player["traits"],
+                    traits={**player["traits"], **player.get("meta_traits", {})},
                     source="automatic"
                 )
                 snapshots_created += 1
@@ -0,0 +1,351 @@
+"""Columnar trait snapshot store - bucketed, delta-encoded trait history."""
+
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta
+import logging
+import numpy as np
+from bson.binary import Binary
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from backend.models.player.traits import ALL_TRAIT_FIELDS, TRAIT_INDEX, DEFAULT_TRAIT_VALUE
+
+# Snapshots per bucket document (auto snapshots run every 6h, so a month fits in one)
+BUCKET_CAPACITY = 500
+MAX_APPEND_RETRIES = 5
+TRAIT_DTYPE = np.float32
+INDEX_DTYPE = np.uint8
+# Buckets written per insert while migrating legacy snapshot documents
+MIGRATION_BATCH = 200
+# A migration claimed longer ago than this is assumed dead and may be retaken
+MIGRATION_LEASE = timedelta(hours=1)
+MIGRATION_ID = "trait_snapshot_buckets"
+
+logger = logging.getLogger(__name__)
+
+
+def encode_traits(traits: Dict[str, float]) -> np.ndarray:
+    """Encode a trait dict into a fixed-order float32 vector.
+
+    Unknown keys are ignored and missing traits take the default value.
+    """
+    vector = np.full(len(ALL_TRAIT_FIELDS), DEFAULT_TRAIT_VALUE, dtype=TRAIT_DTYPE)
+    for name, value in traits.items():
+        index = TRAIT_INDEX.get(name)
+        if index is not None and value is not None:
+            vector[index] = value
+    return vector
+
+
+def decode_traits(vector: np.ndarray) -> Dict[str, float]:
+    """Decode a trait vector back into a trait dict."""
+    return {name: round(float(value), 2) for name, value in zip(ALL_TRAIT_FIELDS, vector)}
+
+
+def encode_delta(previous: np.ndarray, current: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Delta-encode ``current`` against ``previous``.
+
+    Returns:
+        (changed indices, float32 deltas, reconstructed vector). The reconstructed
+        vector is what a reader will rebuild, so it becomes the next ``previous``.
+    """
+    changed = np.nonzero(current != previous)[0].astype(INDEX_DTYPE)
+    deltas = (current[changed] - previous[changed]).astype(TRAIT_DTYPE)
+    reconstructed = previous.copy()
+    reconstructed[changed] += deltas
+    return changed, deltas, reconstructed
+
+
+class TraitSeries:
+    """Decoded trait history: timestamps plus an (n_snapshots x n_traits) matrix."""
+
+    def __init__(self, timestamps: List[datetime], values: np.ndarray, sources: List[str]):
+        self.timestamps = timestamps
+        self.values = values
+        self.sources = sources
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def since(self, start: Optional[datetime]) -> "TraitSeries":
+        """Return the part of the series at or after ``start``."""
+        if start is None or not self.timestamps:
+            return self
+        seconds = np.array([ts.timestamp() for ts in self.timestamps])
+        first = int(np.searchsorted(seconds, start.timestamp(), side="left"))
+        return TraitSeries(self.timestamps[first:], self.values[first:], self.sources[first:])
+
+    def column(self, trait_name: str) -> np.ndarray:
+        """Values of a single trait over time."""
+        index = TRAIT_INDEX.get(trait_name)
+        if index is None:
+            return np.full(len(self), DEFAULT_TRAIT_VALUE, dtype=TRAIT_DTYPE)
+        return self.values[:, index]
+
+    @classmethod
+    def empty(cls) -> "TraitSeries":
+        return cls([], np.empty((0, len(ALL_TRAIT_FIELDS)), dtype=TRAIT_DTYPE), [])
+
+    @classmethod
+    def from_documents(cls, snapshots: List[Dict]) -> "TraitSeries":
+        """Build a series from legacy one-document-per-snapshot records."""
+        if not snapshots:
+            return cls.empty()
+        return cls(
+            [snapshot["timestamp"] for snapshot in snapshots],
+            np.vstack([encode_traits(snapshot.get("traits", {})) for snapshot in snapshots]),
+            [snapshot.get("source", "manual") for snapshot in snapshots]
+        )
+
+
+def decode_bucket(bucket: Dict) -> np.ndarray:
+    """Rebuild the full value matrix of a bucket from its base vector and deltas."""
+    count = bucket["count"]
+    width = len(ALL_TRAIT_FIELDS)
+    dense = np.zeros((count, width), dtype=TRAIT_DTYPE)
+    dense[0] = np.frombuffer(bucket["base"], dtype=TRAIT_DTYPE)
+
+    index_blobs = bucket["idx"][:count]
+    lengths = np.fromiter(map(len, index_blobs), dtype=np.int64, count=count)
+    if lengths.sum():
+        rows = np.repeat(np.arange(count), lengths)
+        cols = np.frombuffer(b"".join(index_blobs), dtype=INDEX_DTYPE)
+        deltas = np.frombuffer(b"".join(bucket["val"][:count]), dtype=TRAIT_DTYPE)
+        dense[rows, cols] = deltas
+
+    # Sequential float32 accumulation mirrors how ``encode_delta`` rebuilt ``last``
+    return np.cumsum(dense, axis=0, dtype=TRAIT_DTYPE)
+
+
+class TraitSnapshotStore:
+    """Stores trait snapshots as bucketed, delta-encoded float32 arrays.
+
+    Each bucket document holds up to ``BUCKET_CAPACITY`` snapshots of one player
+    for one calendar month in parallel arrays (``ts``, ``src``, ``idx``, ``val``).
+    The first snapshot is stored in full as ``base``; later ones only store the
+    indices and deltas of traits that changed.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self.buckets_collection = db.trait_snapshot_buckets
+
+    async def ensure_indexes(self) -> None:
+        """Create the indexes used by append and range reads."""
+        await self.buckets_collection.create_index([("player_id", 1), ("month", 1), ("seq", -1)])
+        await self.buckets_collection.create_index([("player_id", 1), ("bucket_end", 1)])
+        await self.buckets_collection.create_index([("player_id", 1), ("bucket_start", 1), ("seq", 1)])
+        # Documents mode reads and the one-off migration scan
+        await self.db.trait_snapshots.create_index([("player_id", 1), ("timestamp", 1)])
+
+    async def append(
+        self,
+        player_id: str,
+        traits: Dict[str, float],
+        source: str = "manual",
+        timestamp: Optional[datetime] = None
+    ) -> Dict:
+        """Append a snapshot to the player's open bucket.
+
+        Uses compare-and-swap on the bucket ``count`` so concurrent appends never
+        compute deltas against a stale ``last`` vector.
+        """
+        timestamp = timestamp or datetime.now()
+        month = timestamp.strftime("%Y%m")
+        vector = encode_traits(traits)
+
+        for _ in range(MAX_APPEND_RETRIES):
+            bucket = await self.buckets_collection.find_one(
+                {"player_id": player_id, "month": month},
+                projection={"last": 1, "count": 1, "seq": 1},
+                sort=[("seq", -1)]
+            )
+
+            if bucket is None or bucket["count"] >= BUCKET_CAPACITY:
+                seq = 0 if bucket is None else bucket["seq"] + 1
+                try:
+                    await self.buckets_collection.insert_one(
+                        self._new_bucket(player_id, month, seq, vector, source, timestamp)
+                    )
+                except DuplicateKeyError:
+                    continue
+                return {"player_id": player_id, "timestamp": timestamp, "source": source, "bucket_seq": seq}
+
+            previous = np.frombuffer(bucket["last"], dtype=TRAIT_DTYPE)
+            changed, deltas, reconstructed = encode_delta(previous, vector)
+            result = await self.buckets_collection.update_one(
+                {"_id": bucket["_id"], "count": bucket["count"]},
+                {
+                    "$push": {
+                        "ts": timestamp,
+                        "src": source,
+                        "idx": Binary(changed.tobytes()),
+                        "val": Binary(deltas.tobytes())
+                    },
+                    "$set": {"last": Binary(reconstructed.tobytes()), "bucket_end": timestamp},
+                    "$inc": {"count": 1}
+                }
+            )
+            if result.modified_count:
+                return {
+                    "player_id": player_id,
+                    "timestamp": timestamp,
+                    "source": source,
+                    "bucket_seq": bucket["seq"],
+                    "changed_traits": len(changed)
+                }
+
+        raise RuntimeError(f"Could not append trait snapshot for {player_id} after {MAX_APPEND_RETRIES} attempts")
+
+    async def load_series(self, player_id: str, start: Optional[datetime] = None) -> TraitSeries:
+        """Load and decode the player's history, optionally from ``start`` onwards."""
+        query = {"player_id": player_id}
+        if start is not None:
+            query["bucket_end"] = {"$gte": start}
+
+        buckets = await self.buckets_collection.find(
+            query, projection={"last": 0}
+        ).sort([("bucket_start", 1), ("seq", 1)]).to_list(length=None)
+
+        if not buckets:
+            return TraitSeries.empty()
+
+        timestamps: List[datetime] = []
+        sources: List[str] = []
+        for bucket in buckets:
+            timestamps.extend(bucket["ts"][:bucket["count"]])
+            sources.extend(bucket["src"][:bucket["count"]])
+        values = np.vstack([decode_bucket(bucket) for bucket in buckets])
+
+        return TraitSeries(timestamps, values, sources).since(start)
+
+    async def migrate_documents(self, batch_size: int = MIGRATION_BATCH) -> int:
+        """Copy legacy one-document-per-snapshot history into buckets, once.
+
+        Migrated buckets take negative ``seq`` values, so they never collide
+        with buckets appended since columnar storage became the default, and
+        their ids are deterministic, so an interrupted run can be repeated.
+        Only one process runs the migration; the others return straight away.
+
+        Returns:
+            Number of snapshots copied
+        """
+        now = datetime.utcnow()
+        try:
+            await self.db.schema_migrations.update_one(
+                {
+                    "_id": MIGRATION_ID,
+                    "completed_at": {"$exists": False},
+                    "started_at": {"$lt": now - MIGRATION_LEASE}
+                },
+                {"$set": {"started_at": now}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Finished already, or another process holds it
+            return 0
+
+        copied = 0
+        group: List[Dict] = []
+        pending: List[Dict] = []
+
+        async def close_group():
+            nonlocal copied
+            pending.extend(self._legacy_buckets(group))
+            copied += len(group)
+            group.clear()
+            if len(pending) >= batch_size:
+                await self._insert_buckets(pending)
+
+        async for snapshot in self.db.trait_snapshots.find(
+            {}, projection={"_id": 0, "player_id": 1, "timestamp": 1, "traits": 1, "source": 1}
+        ).sort([("player_id", 1), ("timestamp", 1)]):
+            if group and (
+                snapshot["player_id"] != group[0]["player_id"]
+                or snapshot["timestamp"].strftime("%Y%m") != group[0]["timestamp"].strftime("%Y%m")
+            ):
+                await close_group()
+            group.append(snapshot)
+        if group:
+            await close_group()
+        await self._insert_buckets(pending)
+
+        await self.db.schema_migrations.update_one(
+            {"_id": MIGRATION_ID},
+            {"$set": {"completed_at": datetime.utcnow(), "snapshots": copied}}
+        )
+        if copied:
+            logger.info(f"Migrated {copied} trait snapshots into buckets")
+        return copied
+
+    async def _insert_buckets(self, buckets: List[Dict]) -> None:
+        if not buckets:
+            return
+        try:
+            await self.buckets_collection.insert_many(buckets, ordered=False)
+        except BulkWriteError as e:
+            # Buckets left by an earlier, interrupted run are already in place
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+                raise
+        buckets.clear()
+
+    @classmethod
+    def _legacy_buckets(cls, snapshots: List[Dict]) -> List[Dict]:
+        """Buckets for one player-month of legacy snapshots, oldest first"""
+        player_id = snapshots[0]["player_id"]
+        month = snapshots[0]["timestamp"].strftime("%Y%m")
+        chunks = [snapshots[i:i + BUCKET_CAPACITY] for i in range(0, len(snapshots), BUCKET_CAPACITY)]
+        return [
+            cls.build_bucket(
+                player_id, month, position - len(chunks),
+                [(s["timestamp"], s.get("source", "manual"), encode_traits(s.get("traits", {}))) for s in chunk]
+            )
+            for position, chunk in enumerate(chunks)
+        ]
+
+    @classmethod
+    def build_bucket(
+        cls,
+        player_id: str,
+        month: str,
+        seq: int,
+        snapshots: List[Tuple[datetime, str, np.ndarray]]
+    ) -> Dict:
+        """Encode (timestamp, source, vector) snapshots into one bucket document."""
+        first_timestamp, first_source, last = snapshots[0]
+        bucket = cls._new_bucket(player_id, month, seq, last, first_source, first_timestamp)
+        for timestamp, source, vector in snapshots[1:]:
+            changed, deltas, last = encode_delta(last, vector)
+            bucket["ts"].append(timestamp)
+            bucket["src"].append(source)
+            bucket["idx"].append(Binary(changed.tobytes()))
+            bucket["val"].append(Binary(deltas.tobytes()))
+        bucket["count"] = len(snapshots)
+        bucket["bucket_end"] = snapshots[-1][0]
+        bucket["last"] = Binary(last.tobytes())
+        return bucket
+
+    @staticmethod
+    def _new_bucket(
+        player_id: str,
+        month: str,
+        seq: int,
+        vector: np.ndarray,
+        source: str,
+        timestamp: datetime
+    ) -> Dict:
+        empty = Binary(b"")
+        return {
+            "_id": f"{player_id}:{month}:{seq}",
+            "player_id": player_id,
+            "month": month,
+            "seq": seq,
+            "bucket_start": timestamp,
+            "bucket_end": timestamp,
+            "count": 1,
+            "base": Binary(vector.tobytes()),
+            "last": Binary(vector.tobytes()),
+            "ts": [timestamp],
+            "src": [source],
+            "idx": [empty],
+            "val": [empty]
+        }
@@ -1,5 +1,6 @@
 """Tournament services package."""
 
+from .brackets import BracketEngine
 from .manager import TournamentManager
 
-__all__ = ['TournamentManager']
+__all__ = ['BracketEngine', 'TournamentManager']
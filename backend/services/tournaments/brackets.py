@@ -0,0 +1,520 @@
+"""Tournament brackets - matches as documents, advanced one result at a time.
+
+Every match is its own document in ``tournament_matches``, indexed by
+(tournament, bracket, round, slot). A tournament document never holds
+its bracket. Elimination matches carry the id and side of the match
+their winner moves to, and in double elimination also their loser's.
+A result updates the finished match and places the players into the
+next matches. A match is dispatched to the combat engine once both of
+its sides are filled. A side can be filled with a bye, which moves the
+other player straight on.
+
+Swiss rounds are paired from the participant records once the previous
+round has finished. The tournament document keeps a pending-match
+counter for this, so no query has to look at the whole round.
+
+Matches that become ready together are dispatched concurrently. A match
+whose battle fails to start goes back to ready; the scheduler retries the
+ready matches of active tournaments every minute.
+"""
+
+import asyncio
+import logging
+import math
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+
+from backend.models.tournaments.tournament import BracketType
+
+logger = logging.getLogger(__name__)
+
+WINNERS = "winners"
+LOSERS = "losers"
+FINAL = "final"
+SWISS = "swiss"
+
+# Battles started at once when a round is dispatched
+MAX_CONCURRENT_DISPATCH = 64
+INSERT_BATCH = 1_000
+
+# (match id, side 1 or 2, player id or None for a bye)
+Placement = Tuple[str, int, Optional[str]]
+Dispatch = Callable[[Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+
+
+def match_id(tournament_id: str, bracket: str, round_number: int, slot: int) -> str:
+    return f"{tournament_id}:{bracket}:{round_number}:{slot}"
+
+
+def _match(
+    tournament_id: str,
+    bracket: str,
+    round_number: int,
+    slot: int,
+    next_match: Optional[Tuple[str, int]] = None,
+    loser_match: Optional[Tuple[str, int]] = None
+) -> Dict[str, Any]:
+    return {
+        "match_id": match_id(tournament_id, bracket, round_number, slot),
+        "tournament_id": tournament_id,
+        "bracket": bracket,
+        "round_number": round_number,
+        "bracket_position": slot,
+        "player1_id": None,
+        "player2_id": None,
+        # Sides decided so far, by a player or a bye
+        "filled": 0,
+        "winner_id": None,
+        "loser_id": None,
+        "score": None,
+        "status": "pending",
+        "next_match_id": next_match[0] if next_match else None,
+        "next_side": next_match[1] if next_match else None,
+        "loser_match_id": loser_match[0] if loser_match else None,
+        "loser_side": loser_match[1] if loser_match else None,
+        "battle_id": None,
+        "scheduled_time": None,
+        "completed_time": None
+    }
+
+
+def elimination_matches(tournament_id: str, players: List[str], double: bool = False) -> List[Dict[str, Any]]:
+    """Every match of a single or double elimination bracket, in playing order.
+
+    ``players`` are in seed order. The bracket is padded to a power of
+    two; the byes go to the top seeds, at most one per first-round match.
+    Double elimination sends each winners-bracket loser into the losers
+    bracket, and a single grand final decides between the two bracket
+    winners. The returned matches have their byes already resolved.
+    """
+    size = 2 ** max(1, math.ceil(math.log2(max(len(players), 2))))
+    rounds = int(math.log2(size))
+    tid = tournament_id
+    has_losers = double and rounds > 1
+    losers_rounds = 2 * (rounds - 1) if has_losers else 0
+    matches: List[Dict[str, Any]] = []
+
+    def loser_target(round_number: int, slot: int) -> Optional[Tuple[str, int]]:
+        if not double:
+            return None
+        if not has_losers:
+            return match_id(tid, FINAL, 1, 0), 2
+        if round_number == 1:
+            return match_id(tid, LOSERS, 1, slot // 2), slot % 2 + 1
+        return match_id(tid, LOSERS, 2 * (round_number - 1), slot), 2
+
+    for round_number in range(1, rounds + 1):
+        for slot in range(size >> round_number):
+            if round_number < rounds:
+                next_match = (match_id(tid, WINNERS, round_number + 1, slot // 2), slot % 2 + 1)
+            elif double:
+                next_match = (match_id(tid, FINAL, 1, 0), 1)
+            else:
+                next_match = None
+            matches.append(_match(tid, WINNERS, round_number, slot, next_match, loser_target(round_number, slot)))
+
+    for round_number in range(1, losers_rounds + 1):
+        # Odd rounds pair losers-bracket players; even rounds take in the
+        # losers of the next winners round
+        count = size >> (round_number // 2 + 2) if round_number % 2 else size >> (round_number // 2 + 1)
+        for slot in range(count):
+            if round_number == losers_rounds:
+                next_match = (match_id(tid, FINAL, 1, 0), 2)
+            elif round_number % 2:
+                next_match = (match_id(tid, LOSERS, round_number + 1, slot), 1)
+            else:
+                next_match = (match_id(tid, LOSERS, round_number + 1, slot // 2), slot % 2 + 1)
+            matches.append(_match(tid, LOSERS, round_number, slot, next_match))
+
+    if double:
+        matches.append(_match(tid, FINAL, 1, 0))
+
+    # Seed the first round: seed i meets seed size-1-i, byes for missing seeds
+    by_id = {match["match_id"]: match for match in matches}
+    placements: List[Placement] = []
+    for slot in range(size // 2):
+        first = match_id(tid, WINNERS, 1, slot)
+        bottom = size - 1 - slot
+        placements.append((first, 1, players[slot] if slot < len(players) else None))
+        placements.append((first, 2, players[bottom] if bottom < len(players) else None))
+    _place_in_memory(by_id, placements)
+    return matches
+
+
+def _fill(match: Dict[str, Any], side: int, player: Optional[str]) -> None:
+    match[f"player{side}_id"] = player
+    match["filled"] += 1
+
+
+def resolve(match: Dict[str, Any], winner: Optional[str]) -> List[Placement]:
+    """Where the players of a decided match go next"""
+    players = [match["player1_id"], match["player2_id"]]
+    loser = next((player for player in players if player != winner), None) if winner else None
+    placements: List[Placement] = []
+    if match.get("next_match_id"):
+        placements.append((match["next_match_id"], match["next_side"], winner))
+    if match.get("loser_match_id"):
+        placements.append((match["loser_match_id"], match["loser_side"], loser))
+    return placements
+
+
+def _bye_winner(match: Dict[str, Any]) -> Optional[str]:
+    return match["player1_id"] or match["player2_id"]
+
+
+def _is_bye(match: Dict[str, Any]) -> bool:
+    return match["filled"] == 2 and not (match["player1_id"] and match["player2_id"])
+
+
+def _place_in_memory(by_id: Dict[str, Dict[str, Any]], placements: List[Placement]) -> None:
+    while placements:
+        target, side, player = placements.pop()
+        match = by_id[target]
+        _fill(match, side, player)
+        if match["filled"] < 2:
+            continue
+        if _is_bye(match):
+            winner = _bye_winner(match)
+            match.update(status="bye", winner_id=winner)
+            placements.extend(resolve(match, winner))
+        else:
+            match["status"] = "ready"
+
+
+def swiss_rounds(players: int) -> int:
+    return max(1, math.ceil(math.log2(max(players, 2))))
+
+
+def swiss_pairings(standings: List[Dict[str, Any]]) -> Tuple[List[Tuple[str, str]], Optional[str]]:
+    """Pairs for the next Swiss round, and the player with the bye.
+
+    ``standings`` are ``{player_id, wins, opponents, byes}`` records.
+    Players are paired down the score table, each with the nearest
+    player below them they haven't met yet (the nearest at all if they
+    have met everyone). The bye goes to the lowest player without one.
+    """
+    table = sorted(standings, key=lambda record: (-record.get("wins", 0), record["player_id"]))
+    bye = None
+    if len(table) % 2:
+        bye_record = next(
+            (record for record in reversed(table) if not record.get("byes")), table[-1]
+        )
+        bye = bye_record["player_id"]
+        table = [record for record in table if record is not bye_record]
+    pairs = []
+    unpaired = list(table)
+    while unpaired:
+        top = unpaired.pop(0)
+        met = set(top.get("opponents", []))
+        index = next((i for i, record in enumerate(unpaired) if record["player_id"] not in met), 0)
+        pairs.append((top["player_id"], unpaired.pop(index)["player_id"]))
+    return pairs, bye
+
+
+def swiss_round_matches(
+    tournament_id: str,
+    round_number: int,
+    standings: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    pairs, bye = swiss_pairings(standings)
+    matches = []
+    for slot, (player1, player2) in enumerate(pairs):
+        match = _match(tournament_id, SWISS, round_number, slot)
+        match.update(player1_id=player1, player2_id=player2, filled=2, status="ready")
+        matches.append(match)
+    if bye:
+        match = _match(tournament_id, SWISS, round_number, len(pairs))
+        match.update(player1_id=bye, filled=2, status="bye", winner_id=bye)
+        matches.append(match)
+    return matches
+
+
+async def start_battle(match: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Default dispatch: a tournament battle in the combat engine"""
+    from backend.services.combat.engine import CombatEngine
+    return await CombatEngine().create_tournament_battle(
+        match["player1_id"], match["player2_id"], match["match_id"]
+    )
+
+
+class BracketEngine:
+    """Stores, advances and dispatches the matches of tournaments."""
+
+    def __init__(self, db: AsyncIOMotorDatabase, dispatch: Dispatch = start_battle):
+        self.db = db
+        self.matches = db.tournament_matches
+        self.participants = db.tournament_participants
+        self.tournaments = db.tournaments
+        self.dispatch_match = dispatch
+
+    async def ensure_indexes(self):
+        await self.matches.create_index("match_id", unique=True)
+        await self.matches.create_index([
+            ("tournament_id", ASCENDING), ("bracket", ASCENDING),
+            ("round_number", ASCENDING), ("bracket_position", ASCENDING)
+        ])
+        await self.matches.create_index([("tournament_id", ASCENDING), ("status", ASCENDING)])
+        await self.participants.create_index([("tournament_id", ASCENDING), ("player_id", ASCENDING)], unique=True)
+        await self.participants.create_index([("player_id", ASCENDING), ("registration_time", DESCENDING)])
+
+    async def _insert(self, matches: List[Dict[str, Any]]) -> None:
+        for start in range(0, len(matches), INSERT_BATCH):
+            await self.matches.insert_many(matches[start:start + INSERT_BATCH], ordered=False)
+
+    async def create(self, tournament_id: str, players: List[str], bracket_type: str) -> Dict[str, Any]:
+        """Store the opening matches of a bracket; returns its round count and the matches to dispatch"""
+        if bracket_type == BracketType.SWISS.value:
+            standings = [{"player_id": player} for player in players]
+            matches = swiss_round_matches(tournament_id, 1, standings)
+            await self._record_swiss_round(tournament_id, matches)
+            total_rounds = swiss_rounds(len(players))
+        elif bracket_type in (BracketType.SINGLE_ELIMINATION.value, BracketType.DOUBLE_ELIMINATION.value):
+            double = bracket_type == BracketType.DOUBLE_ELIMINATION.value
+            matches = elimination_matches(tournament_id, players, double)
+            total_rounds = max(match["round_number"] for match in matches if match["bracket"] == WINNERS)
+        else:
+            raise ValueError(f"Unsupported bracket type: {bracket_type}")
+        await self._insert(matches)
+        return {
+            "total_matches": len(matches),
+            "total_rounds": total_rounds,
+            "ready": [match for match in matches if match["status"] == "ready"]
+        }
+
+    async def _record_swiss_round(self, tournament_id: str, matches: List[Dict[str, Any]]) -> None:
+        """Credit the round's bye and arm the counter that triggers the next round"""
+        byes = [match["winner_id"] for match in matches if match["status"] == "bye"]
+        if byes:
+            await self.participants.update_one(
+                {"tournament_id": tournament_id, "player_id": byes[0]},
+                {"$inc": {"wins": 1, "byes": 1}}
+            )
+        await self.tournaments.update_one(
+            {"tournament_id": tournament_id},
+            {"$set": {
+                "pending_matches": sum(1 for match in matches if match["status"] == "ready"),
+                "current_round": matches[0]["round_number"],
+                "updated_at": datetime.utcnow()
+            }}
+        )
+
+    # Dispatch
+
+    async def dispatch(self, matches: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Start the battles of ready matches, concurrently; returns the matches started"""
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_DISPATCH)
+
+        async def start(match: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                claimed = await self.matches.find_one_and_update(
+                    {"match_id": match["match_id"], "status": "ready"},
+                    {"$set": {"status": "in_progress", "scheduled_time": datetime.utcnow()}},
+                    return_document=ReturnDocument.AFTER
+                )
+                if not claimed:
+                    return None
+                try:
+                    battle = await self.dispatch_match(claimed)
+                except Exception as e:
+                    logger.error(f"Failed to start tournament match {claimed['match_id']}: {e}")
+                    await self.matches.update_one(
+                        {"match_id": claimed["match_id"]}, {"$set": {"status": "ready"}}
+                    )
+                    return None
+                battle_id = battle.get("id") if battle else None
+                await asyncio.gather(
+                    self.matches.update_one({"match_id": claimed["match_id"]}, {"$set": {"battle_id": battle_id}}),
+                    self.participants.update_many(
+                        {"tournament_id": claimed["tournament_id"],
+                         "player_id": {"$in": [claimed["player1_id"], claimed["player2_id"]]}},
+                        {"$set": {"current_match_id": claimed["match_id"]}}
+                    )
+                )
+                return claimed
+
+        started = await asyncio.gather(*(start(match) for match in matches))
+        return [match for match in started if match]
+
+    async def dispatch_round(self, tournament_id: str, round_number: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Start every ready match of a tournament (or of one round)"""
+        query: Dict[str, Any] = {"tournament_id": tournament_id, "status": "ready"}
+        if round_number is not None:
+            query["round_number"] = round_number
+        ready = await self.matches.find(query, projection={"match_id": 1}).to_list(length=None)
+        return await self.dispatch(ready)
+
+    async def dispatch_stalled(self) -> List[Dict[str, Any]]:
+        """Start the ready matches of every active tournament, e.g. after a battle failed to start"""
+        tournament_ids = [
+            tournament["tournament_id"]
+            async for tournament in self.tournaments.find({"status": "active"}, projection={"tournament_id": 1})
+        ]
+        if not tournament_ids:
+            return []
+        ready = await self.matches.find(
+            {"tournament_id": {"$in": tournament_ids}, "status": "ready"}, projection={"match_id": 1}
+        ).to_list(length=None)
+        return await self.dispatch(ready)
+
+    # Advancement
+
+    async def report_result(
+        self,
+        match_id: str,
+        winner_id: str,
+        score: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """Record a match result and move its players on"""
+        match = await self.matches.find_one_and_update(
+            {
+                "match_id": match_id,
+                "status": {"$in": ["ready", "in_progress"]},
+                "$or": [{"player1_id": winner_id}, {"player2_id": winner_id}]
+            },
+            {"$set": {"status": "completed", "winner_id": winner_id, "score": score,
+                      "completed_time": datetime.utcnow()}},
+            return_document=ReturnDocument.AFTER
+        )
+        if not match:
+            raise ValueError("Match not found, already decided, or winner not in match")
+        loser_id = match["player2_id"] if match["player1_id"] == winner_id else match["player1_id"]
+        match["loser_id"] = loser_id
+
+        eliminated = match["bracket"] != SWISS and not match.get("loser_match_id")
+        await asyncio.gather(
+            self.matches.update_one({"match_id": match_id}, {"$set": {"loser_id": loser_id}}),
+            self.participants.bulk_write([
+                UpdateOne(
+                    {"tournament_id": match["tournament_id"], "player_id": winner_id},
+                    {"$inc": {"wins": 1}, "$push": {"opponents": loser_id}, "$set": {"current_match_id": None}}
+                ),
+                UpdateOne(
+                    {"tournament_id": match["tournament_id"], "player_id": loser_id},
+                    {"$inc": {"losses": 1}, "$push": {"opponents": winner_id},
+                     "$set": {"current_match_id": None, "eliminated": eliminated}}
+                )
+            ], ordered=False)
+        )
+
+        if match["bracket"] == SWISS:
+            await self._advance_swiss(match["tournament_id"])
+        elif match.get("next_match_id"):
+            ready = await self._place(resolve(match, winner_id))
+            await self.dispatch(ready)
+        else:
+            await self._finish_elimination(match)
+        return match
+
+    async def _place(self, placements: List[Placement]) -> List[Dict[str, Any]]:
+        """Fill match sides; returns the matches that became ready"""
+        ready = []
+        while placements:
+            target, side, player = placements.pop()
+            match = await self.matches.find_one_and_update(
+                {"match_id": target},
+                {"$set": {f"player{side}_id": player}, "$inc": {"filled": 1}},
+                return_document=ReturnDocument.AFTER
+            )
+            if not match or match["filled"] < 2:
+                continue
+            if _is_bye(match):
+                winner = _bye_winner(match)
+                await self.matches.update_one(
+                    {"match_id": target}, {"$set": {"status": "bye", "winner_id": winner}}
+                )
+                if match.get("next_match_id"):
+                    placements.extend(resolve(match, winner))
+                else:
+                    await self._finish_elimination({**match, "winner_id": winner, "loser_id": None})
+            else:
+                await self.matches.update_one({"match_id": target}, {"$set": {"status": "ready"}})
+                ready.append(match)
+        return ready
+
+    async def _advance_swiss(self, tournament_id: str) -> None:
+        tournament = await self.tournaments.find_one_and_update(
+            {"tournament_id": tournament_id},
+            {"$inc": {"pending_matches": -1}},
+            projection={"pending_matches": 1, "current_round": 1, "total_rounds": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if not tournament or tournament.get("pending_matches", 0) > 0:
+            return
+        standings = await self.participants.find(
+            {"tournament_id": tournament_id},
+            projection={"player_id": 1, "wins": 1, "opponents": 1, "byes": 1}
+        ).to_list(length=None)
+        if tournament["current_round"] >= tournament["total_rounds"]:
+            await self._complete(tournament_id, self._swiss_placements(standings))
+            return
+        matches = swiss_round_matches(tournament_id, tournament["current_round"] + 1, standings)
+        await self._insert(matches)
+        await self._record_swiss_round(tournament_id, matches)
+        await self.dispatch([match for match in matches if match["status"] == "ready"])
+
+    @staticmethod
+    def _swiss_placements(standings: List[Dict[str, Any]]) -> Dict[int, List[str]]:
+        """Top three by wins, then by opponents' wins (Buchholz)"""
+        wins = {record["player_id"]: record.get("wins", 0) for record in standings}
+        table = sorted(
+            standings,
+            key=lambda record: (
+                -record.get("wins", 0),
+                -sum(wins.get(opponent, 0) for opponent in record.get("opponents", [])),
+                record["player_id"]
+            )
+        )
+        return {place: [record["player_id"]] for place, record in enumerate(table[:3], 1)}
+
+    async def _finish_elimination(self, final: Dict[str, Any]) -> None:
+        placements: Dict[int, List[str]] = {1: [final["winner_id"]]}
+        if final.get("loser_id"):
+            placements[2] = [final["loser_id"]]
+        if final["bracket"] == FINAL:
+            # Third is the losers-bracket runner-up
+            third_query = {"tournament_id": final["tournament_id"], "bracket": LOSERS, "next_match_id": final["match_id"]}
+        else:
+            third_query = {"tournament_id": final["tournament_id"], "bracket": WINNERS,
+                           "round_number": final["round_number"] - 1}
+        semifinals = await self.matches.find(third_query, projection={"loser_id": 1}).to_list(length=2)
+        third = [match["loser_id"] for match in semifinals if match.get("loser_id")]
+        if third:
+            placements[3] = third
+        await self._complete(final["tournament_id"], placements)
+
+    async def _complete(self, tournament_id: str, placements: Dict[int, List[str]]) -> None:
+        writes = [
+            UpdateOne(
+                {"tournament_id": tournament_id, "player_id": player_id},
+                {"$set": {"placement": place, "current_match_id": None}}
+            )
+            for place, player_ids in placements.items() for player_id in player_ids if player_id
+        ]
+        if writes:
+            await self.participants.bulk_write(writes, ordered=False)
+        await self.tournaments.update_one(
+            {"tournament_id": tournament_id},
+            {"$set": {"status": "completed", "end_time": datetime.utcnow(), "updated_at": datetime.utcnow()}}
+        )
+
+    # Reads
+
+    async def get_bracket(
+        self,
+        tournament_id: str,
+        bracket: Optional[str] = None,
+        round_number: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """A tournament's matches in bracket, round and slot order, optionally one bracket or round"""
+        query: Dict[str, Any] = {"tournament_id": tournament_id}
+        if bracket is not None:
+            query["bracket"] = bracket
+        if round_number is not None:
+            query["round_number"] = round_number
+        cursor = self.matches.find(query, projection={"_id": 0}).sort([
+            ("bracket", ASCENDING), ("round_number", ASCENDING), ("bracket_position", ASCENDING)
+        ])
+        return await cursor.to_list(length=None)
@@ -2,12 +2,16 @@
 
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
 from backend.core.database import get_database
 from backend.models.tournaments.tournament import (
     TournamentType
 )
+from backend.services.economy.ledger import CurrencyLedger
+from backend.services.player.repository import PlayerRepository
+from backend.services.tournaments.brackets import BracketEngine
+import random
 import uuid
-import math
 
 
 class TournamentManager:
@@ -15,6 +19,7 @@ class TournamentManager:
 
     def __init__(self):
         self.db = get_database()
+        self.brackets = BracketEngine(self.db)
 
     async def create_tournament(
         self,
@@ -48,11 +53,12 @@ class TournamentManager:
             "min_level": kwargs.get('min_level'),
             "min_karma": kwargs.get('min_karma'),
             "entry_fee": kwargs.get('entry_fee', 0),
-            "registered_players": [],
+            # Registrations are tournament_participants records; matches
+            # are tournament_matches documents
             "total_registered": 0,
-            "matches": [],
             "current_round": 0,
             "total_rounds": 0,
+            "pending_matches": 0,
             "prize_pool": kwargs.get('prize_pool', 0),
             "rewards": self._generate_default_rewards(kwargs.get('prize_pool', 0)),
             "season_id": kwargs.get('season_id'),
@@ -90,8 +96,19 @@ class TournamentManager:
         tournament_id: str,
         player_id: str
     ) -> Dict[str, Any]:
-        """Register a player for a tournament."""
-        tournament = await self.db.tournaments.find_one({"tournament_id": tournament_id})
+        """Register a player for a tournament.
+
+        Registering adds one participant record and takes a seat on the
+        tournament's counter, so it costs the same with 10 or 10,000
+        players registered.
+        """
+        tournament = await self.db.tournaments.find_one(
+            {"tournament_id": tournament_id},
+            projection={
+                "registration_start": 1, "registration_end": 1, "max_participants": 1,
+                "total_registered": 1, "min_level": 1, "min_karma": 1, "entry_fee": 1
+            }
+        )
 
         if not tournament:
             raise ValueError("Tournament not found")
@@ -105,12 +122,8 @@ class TournamentManager:
         if tournament["total_registered"] >= tournament["max_participants"]:
             raise ValueError("Tournament is full")
 
-        # Check if already registered
-        if player_id in tournament["registered_players"]:
-            raise ValueError("Already registered")
-
         # Check player requirements
-        player = await self.db.players.find_one({"_id": player_id})
+        player = await PlayerRepository(self.db).find(player_id, "economy")
         if not player:
             raise ValueError("Player not found")
 
@@ -122,38 +135,11 @@ class TournamentManager:
             raise ValueError(
                 f"Minimum karma {tournament['min_karma']} required")
 
-        # Check entry fee
-        if tournament["entry_fee"] > 0:
-            if player["currencies"]["credits"] < tournament["entry_fee"]:
-                raise ValueError("Insufficient credits for entry fee")
-
-            # Deduct entry fee
-            await self.db.players.update_one(
-                {"_id": player_id},
-                {"$inc": {"currencies.credits": -tournament["entry_fee"]}}
-            )
-
-            # Add to prize pool
-            await self.db.tournaments.update_one(
-                {"tournament_id": tournament_id},
-                {"$inc": {"prize_pool": tournament["entry_fee"]}}
-            )
-
-        # Register player
-        await self.db.tournaments.update_one(
-            {"tournament_id": tournament_id},
-            {
-                "$push": {"registered_players": player_id},
-                "$inc": {"total_registered": 1},
-                "$set": {"updated_at": datetime.utcnow()}
-            }
-        )
-
-        # Create participant record
+        # Create participant record (unique per tournament and player)
         participant = {
             "tournament_id": tournament_id,
             "player_id": player_id,
-            "registration_time": datetime.utcnow(),
+            "registration_time": now,
             "checked_in": False,
             "current_match_id": None,
             "wins": 0,
@@ -161,31 +147,69 @@ class TournamentManager:
             "placement": None,
             "eliminated": False
         }
-        await self.db.tournament_participants.insert_one(participant)
+        try:
+            await self.db.tournament_participants.insert_one(participant)
+        except DuplicateKeyError:
+            raise ValueError("Already registered")
+
+        # Take a seat, unless the last one went in the meantime
+        entry_fee = tournament["entry_fee"]
+        seat = await self.db.tournaments.update_one(
+            {"tournament_id": tournament_id, "total_registered": {"$lt": tournament["max_participants"]}},
+            {
+                "$inc": {"total_registered": 1, "prize_pool": entry_fee},
+                "$set": {"updated_at": now}
+            }
+        )
+        if not seat.modified_count:
+            await self.db.tournament_participants.delete_one({"tournament_id": tournament_id, "player_id": player_id})
+            raise ValueError("Tournament is full")
+
+        # Charge entry fee
+        if entry_fee > 0:
+            try:
+                await CurrencyLedger(self.db).debit(
+                    player_id, "credits", entry_fee, f"tournament_entry_{tournament_id}"
+                )
+            except ValueError:
+                await self.db.tournament_participants.delete_one(
+                    {"tournament_id": tournament_id, "player_id": player_id}
+                )
+                await self.db.tournaments.update_one(
+                    {"tournament_id": tournament_id},
+                    {"$inc": {"total_registered": -1, "prize_pool": -entry_fee}}
+                )
+                raise ValueError("Insufficient credits for entry fee")
 
         return {"success": True, "message": "Registered successfully"}
 
     async def start_tournament(self, tournament_id: str):
-        """Start a tournament and generate brackets."""
-        tournament = await self.db.tournaments.find_one({"tournament_id": tournament_id})
+        """Start a tournament, store its opening matches and dispatch them."""
+        tournament = await self.db.tournaments.find_one(
+            {"tournament_id": tournament_id},
+            projection={"status": 1, "total_registered": 1, "min_participants": 1, "bracket_type": 1}
+        )
 
         if not tournament:
             raise ValueError("Tournament not found")
 
+        if tournament["status"] != "registration":
+            raise ValueError("Tournament already started")
+
         if tournament["total_registered"] < tournament["min_participants"]:
             raise ValueError(
                 f"Minimum {tournament['min_participants']} participants required")
 
-        # Generate bracket
-        matches = await self._generate_bracket(
-            tournament_id=tournament_id,
-            players=tournament["registered_players"],
-            bracket_type=tournament["bracket_type"]
-        )
+        players = [
+            participant["player_id"]
+            async for participant in self.db.tournament_participants.find(
+                {"tournament_id": tournament_id}, projection={"player_id": 1}
+            )
+        ]
+        random.shuffle(players)  # Shuffle for fairness
 
-        # Calculate total rounds
-        total_rounds = math.ceil(
-            math.log2(len(tournament["registered_players"])))
+        # Generate bracket
+        bracket = await self.brackets.create(tournament_id, players, tournament["bracket_type"])
 
         # Update tournament
         await self.db.tournaments.update_one(
@@ -193,64 +217,35 @@ class TournamentManager:
             {
                 "$set": {
                     "status": "active",
-                    "matches": matches,
                     "current_round": 1,
-                    "total_rounds": total_rounds,
+                    "total_rounds": bracket["total_rounds"],
                     "updated_at": datetime.utcnow()
                 }
             }
         )
 
-        return {"success": True, "total_matches": len(matches)}
+        # The first round's battles start together
+        started = await self.brackets.dispatch(bracket["ready"])
 
-    async def _generate_bracket(
+        return {"success": True, "total_matches": bracket["total_matches"], "started_matches": len(started)}
+
+    async def report_match_result(
         self,
-        tournament_id: str,
-        players: List[str],
-        bracket_type: str
-    ) -> List[Dict[str, Any]]:
-        """Generate tournament bracket."""
-        if bracket_type == "single_elimination":
-            return await self._generate_single_elimination_bracket(tournament_id, players)
-        # Add other bracket types as needed
-        return []
+        match_id: str,
+        winner_id: str,
+        score: Optional[Dict[str, int]] = None
+    ) -> Dict[str, Any]:
+        """Record a match result; the winner (and loser, if still in) move on."""
+        return await self.brackets.report_result(match_id, winner_id, score)
 
-    async def _generate_single_elimination_bracket(
+    async def get_bracket(
         self,
         tournament_id: str,
-        players: List[str]
+        bracket: Optional[str] = None,
+        round_number: Optional[int] = None
     ) -> List[Dict[str, Any]]:
-        """Generate single elimination bracket."""
-        import random
-        random.shuffle(players)  # Shuffle for fairness
-
-        # Round to next power of 2
-        2 ** math.ceil(math.log2(len(players)))
-
-        matches = []
-        match_position = 0
-
-        # First round
-        for i in range(0, len(players), 2):
-            player1 = players[i] if i < len(players) else None
-            player2 = players[i + 1] if i + 1 < len(players) else None
-
-            match = {
-                "match_id": str(uuid.uuid4()),
-                "round_number": 1,
-                "bracket_position": match_position,
-                "player1_id": player1,
-                "player2_id": player2,
-                "winner_id": player2 if not player1 else None,  # Bye if only one player
-                "score": None,
-                "status": "bye" if not player1 or not player2 else "pending",
-                "scheduled_time": None,
-                "completed_time": None
-            }
-            matches.append(match)
-            match_position += 1
-
-        return matches
+        """Get a tournament's matches, optionally one bracket or round."""
+        return await self.brackets.get_bracket(tournament_id, bracket, round_number)
 
     async def get_active_tournaments(self) -> List[Dict[str, Any]]:
         """Get all active tournaments."""
@@ -270,7 +265,13 @@ class TournamentManager:
         status: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """Get tournaments for a specific player."""
-        query = {"registered_players": player_id}
+        tournament_ids = [
+            participant["tournament_id"]
+            async for participant in self.db.tournament_participants.find(
+                {"player_id": player_id}, projection={"tournament_id": 1}
+            ).sort("registration_time", -1).limit(100)
+        ]
+        query = {"tournament_id": {"$in": tournament_ids}}
         if status:
             query["status"] = status
 
@@ -0,0 +1,284 @@
+"""Ability engine - runs trait abilities from their TRAIT_ABILITIES definitions.
+
+Every trait ability goes through the same steps: check the trait is
+equipped, check range, claim the cooldown and energy, run the ability and
+record the use. The engine does them with a fixed number of round-trips.
+The cooldown is claimed in the cooldown service and the energy is checked
+and spent in one conditional update on the player. The ability
+implementation only supplies the effect.
+"""
+
+import math
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from backend.models.player.trait_cooldown import TraitUsageHistory
+from backend.services.cooldowns import cooldowns
+from backend.services.player.trait_ability_service import TRAIT_ABILITIES, TRAIT_COOLDOWNS
+from backend.services.traits.arrogance_ability import ArroganceAbility
+from backend.services.traits.empathy_ability import EmpathyAbility
+from backend.services.traits.greed_ability import GreedAbility
+from backend.services.traits.hacking_ability import HackingAbility
+from backend.services.traits.integrity_ability import IntegrityAbility
+from backend.services.traits.leadership_ability import LeadershipAbility
+from backend.services.traits.meditation_ability import MeditationAbility
+from backend.services.traits.stealth_ability import StealthAbility
+from backend.services.world.position_index import position_index
+from backend.services.world.spatial_grid import as_point
+
+SLOT_FIELDS = {f"slot_{slot}.trait_id": 1 for slot in range(1, 7)}
+
+
+class AbilityAction:
+    """How one trait ability is run and logged.
+
+    ``run(db, player, target_id, trait_level)`` performs the effect and
+    returns the ability's result. ``usage(result)`` returns the karma and
+    credit figures logged for a use. With ``charge_on_failure`` the
+    cooldown and energy are spent even if the result reports failure.
+    """
+
+    def __init__(
+        self,
+        trait_id: str,
+        action_type: str,
+        run: Callable[[AsyncIOMotorDatabase, Dict, Optional[str], int], Awaitable[Dict]],
+        target: Optional[str] = None,
+        needs_position: bool = False,
+        check_range: bool = False,
+        charge_on_failure: bool = False,
+        level_trait: Optional[str] = None,
+        usage: Callable[[Dict], Dict[str, int]] = lambda result: {}
+    ):
+        self.trait_id = trait_id
+        self.action_type = action_type
+        self.run = run
+        # Kind of target the ability needs ("player", "ally", "enemy"), None if untargeted
+        self.target = target
+        self.needs_position = needs_position or check_range
+        self.check_range = check_range
+        self.charge_on_failure = charge_on_failure
+        # Trait whose level powers the ability, when it differs from the ability's trait id
+        self.level_trait = level_trait or trait_id
+        self.usage = usage
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return TRAIT_ABILITIES[self.trait_id]
+
+
+ABILITY_ACTIONS: Dict[str, AbilityAction] = {
+    action.action_type: action for action in [
+        AbilityAction(
+            "hacking", "credit_hack",
+            lambda db, player, target_id, level: HackingAbility(db).credit_hack(
+                hacker_id=player["_id"],
+                target_id=target_id,
+                hacker_level=player.get("level", 1),
+                hacker_trait_level=level
+            ),
+            target="player",
+            check_range=True,
+            usage=lambda result: {
+                "karma_change": -result.get("karma_loss", 0),
+                "credits_affected": result.get("amount_stolen", 0)
+            }
+        ),
+        AbilityAction(
+            "stealth", "shadow_walk",
+            lambda db, player, target_id, level: StealthAbility(db).shadow_walk(
+                player_id=player["_id"],
+                trait_level=level
+            ),
+            charge_on_failure=True
+        ),
+        AbilityAction(
+            "leadership", "rally_cry",
+            lambda db, player, target_id, level: LeadershipAbility(db).rally_cry(
+                leader_id=player["_id"],
+                leader_position=player["position"],
+                trait_level=level
+            ),
+            needs_position=True,
+            usage=lambda result: {"karma_change": 5}
+        ),
+        AbilityAction(
+            "meditation_sp", "karmic_trace",
+            lambda db, player, target_id, level: MeditationAbility(db).karmic_trace(
+                player_id=player["_id"],
+                trait_level=level
+            ),
+            level_trait="meditation",
+            usage=lambda result: {"karma_change": 10}
+        ),
+        AbilityAction(
+            "empathy", "emotional_shield",
+            lambda db, player, target_id, level: EmpathyAbility(db).emotional_shield(
+                caster_id=player["_id"],
+                target_id=target_id,
+                trait_level=level
+            ),
+            target="ally",
+            usage=lambda result: {"karma_change": 10}
+        ),
+        AbilityAction(
+            "integrity", "unbreakable_will",
+            lambda db, player, target_id, level: IntegrityAbility(db).unbreakable_will(
+                player_id=player["_id"],
+                trait_level=level
+            ),
+            charge_on_failure=True,
+            usage=lambda result: {"karma_change": 8}
+        ),
+        AbilityAction(
+            "greed", "plunder",
+            lambda db, player, target_id, level: GreedAbility(db).plunder(
+                plunderer_id=player["_id"],
+                target_id=target_id,
+                trait_level=level
+            ),
+            target="enemy",
+            usage=lambda result: {
+                "karma_change": -15,
+                "credits_affected": result.get("extra_credits", 0)
+            }
+        ),
+        AbilityAction(
+            "arrogance", "crushing_ego",
+            lambda db, player, target_id, level: ArroganceAbility(db).crushing_ego(
+                caster_id=player["_id"],
+                target_id=target_id,
+                trait_level=level
+            ),
+            target="player",
+            usage=lambda result: {"karma_change": -10}
+        ),
+    ]
+}
+
+
+class AbilityEngine:
+    """Runs the abilities in ``ABILITY_ACTIONS`` for a player.
+
+    A use costs one read of the equipped traits, a claim in the cooldown
+    service (never MongoDB) and one conditional update that checks and spends the energy.
+    Then the ability runs and the use is logged.
+    Invalid uses raise ValueError with the reason.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+
+    async def claim(self, player_id: str, trait_id: str) -> datetime:
+        """Check the trait is equipped, then start its cooldown and spend its energy.
+
+        The cooldown is claimed atomically in the cooldown service and the
+        energy is checked and spent in one conditional update; a claim whose
+        energy check fails is handed back. Returns when the ability is next
+        available.
+        """
+        config = TRAIT_ABILITIES.get(trait_id)
+        if not config:
+            raise ValueError("Trait configuration not found")
+
+        equipped = await self.db.player_equipped_traits.find_one(
+            {"player_id": player_id},
+            projection=SLOT_FIELDS
+        )
+        if not equipped:
+            raise ValueError("No traits equipped")
+        if not any((equipped.get(f"slot_{slot}") or {}).get("trait_id") == trait_id for slot in range(1, 7)):
+            raise ValueError("Trait not equipped")
+
+        claimed, available_at = await cooldowns.claim(
+            player_id, TRAIT_COOLDOWNS, trait_id, config["cooldown_seconds"]
+        )
+        if not claimed:
+            remaining = int((available_at - datetime.utcnow()).total_seconds())
+            raise ValueError(f"Ability on cooldown ({remaining}s remaining)")
+
+        result = await self.db.players.update_one(
+            {"_id": player_id, "status.energy": {"$gte": config["energy_cost"]}},
+            {"$inc": {"status.energy": -config["energy_cost"]}}
+        )
+        if result.modified_count:
+            return available_at
+
+        await cooldowns.clear(player_id, TRAIT_COOLDOWNS, trait_id)
+        # Only a refused use pays for the read that explains why
+        if not await self.db.players.find_one({"_id": player_id}, projection={"_id": 1}):
+            raise ValueError("Player not found")
+        raise ValueError(f"Not enough energy (need {config['energy_cost']})")
+
+    async def release(self, player_id: str, trait_id: str) -> None:
+        """Give back a claim when the ability didn't go off"""
+        await cooldowns.clear(player_id, TRAIT_COOLDOWNS, trait_id)
+        await self.db.players.update_one(
+            {"_id": player_id},
+            {"$inc": {"status.energy": TRAIT_ABILITIES[trait_id]["energy_cost"]}}
+        )
+
+    async def execute(
+        self,
+        player: Dict[str, Any],
+        action_type: str,
+        target_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Use an ability as ``player``; returns the ability's result"""
+        action = ABILITY_ACTIONS.get(action_type)
+        if action is None:
+            raise ValueError(f"Unknown ability: {action_type}")
+        if action.target and not target_id:
+            raise ValueError(f"Target {action.target} ID required")
+        if action.needs_position and "position" not in player:
+            raise ValueError("Position not available")
+        if action.check_range and not await self.in_range(player, target_id, action.config["range_meters"]):
+            raise ValueError(f"Target not in range (need within {action.config['range_meters']}m)")
+
+        player_id = player["_id"]
+        await self.claim(player_id, action.trait_id)
+        try:
+            result = await action.run(
+                self.db, player, target_id,
+                int(player.get("traits", {}).get(action.level_trait, 1))
+            )
+        except Exception:
+            await self.release(player_id, action.trait_id)
+            raise
+
+        if not result.get("success") and not action.charge_on_failure:
+            await self.release(player_id, action.trait_id)
+            return result
+
+        await self.record(player, action, target_id, result)
+        return result
+
+    async def in_range(self, player: Dict[str, Any], target_id: str, range_meters: float) -> bool:
+        """Whether the target is within range of the player, from the live position index"""
+        center = as_point(player["position"])
+        target = await position_index.position(target_id)
+        if center is None or target is None:
+            return False
+        return math.dist(center, target) <= range_meters
+
+    async def record(
+        self,
+        player: Dict[str, Any],
+        action: AbilityAction,
+        target_id: Optional[str],
+        result: Dict[str, Any]
+    ) -> None:
+        """Write the usage log for a use"""
+        history = TraitUsageHistory(
+            player_id=player["_id"],
+            trait_id=action.trait_id,
+            trait_type=action.config["type"],
+            action_type=action.action_type,
+            target_id=target_id,
+            success=True,
+            location=player.get("position"),
+            **action.usage(result)
+        )
+        await self.db.trait_usage_history.insert_one(history.model_dump())
@@ -1,7 +1,9 @@
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 import random
-import math
+
+from backend.services.traits.target_effects import Strike, apply_strikes, distinct_targets
+from backend.services.world.position_index import position_index
 
 class CryokinesisAbility:
     """Cryokinesis superpower - Control ice and cold, freeze enemies, create ice constructs"""
@@ -33,56 +35,43 @@ class CryokinesisAbility:
         slow_percentage = 30 + (trait_level * 0.4)  # 30-70% movement slow
         slow_duration = 8 + (trait_level * 0.12)  # 8-20 seconds
         
-        affected_targets = []
-        
-        for target_id in target_ids:
-            if target_id == player_id:
-                continue
-            
-            target = await self.players_collection.find_one({"id": target_id})
-            if target:
-                # Apply damage
-                current_hp = target.get("health", {}).get("current", 100)
-                new_hp = max(0, current_hp - ice_damage)
-                
-                # Apply slow debuff
-                await self.players_collection.update_one(
-                    {"id": target_id},
-                    {
-                        "$set": {"health.current": new_hp},
-                        "$push": {
-                            "debuffs": {
-                                "type": "slowed",
-                                "value": slow_percentage,
-                                "expires_at": datetime.utcnow() + timedelta(seconds=slow_duration),
-                                "applied_by": player_id
-                            }
+        now = datetime.utcnow()
+        applied = await apply_strikes(
+            self.players_collection,
+            self.notifications_collection,
+            [
+                Strike(
+                    target_id,
+                    damage=ice_damage,
+                    debuff={
+                        "type": "slowed",
+                        "value": slow_percentage,
+                        "expires_at": now + timedelta(seconds=slow_duration),
+                        "applied_by": player_id
+                    },
+                    notification={
+                        "title": "Frozen!",
+                        "message": f"{player.get('username', 'A cryokinetic')} hit you with ice blast! {ice_damage:.0f} damage, {slow_percentage:.0f}% slowed.",
+                        "data": {
+                            "ability": "Cryokinesis - Ice Blast",
+                            "damage": ice_damage,
+                            "slow": slow_percentage,
+                            "duration": slow_duration
                         }
                     }
                 )
-                
-                affected_targets.append({
-                    "target_id": target_id,
-                    "damage": ice_damage,
-                    "slow_percentage": slow_percentage,
-                    "duration": slow_duration
-                })
-                
-                # Notify target
-                await self.notifications_collection.insert_one({
-                    "player_id": target_id,
-                    "type": "combat",
-                    "title": "Frozen!",
-                    "message": f"{player.get('username', 'A cryokinetic')} hit you with ice blast! {ice_damage:.0f} damage, {slow_percentage:.0f}% slowed.",
-                    "data": {
-                        "ability": "Cryokinesis - Ice Blast",
-                        "damage": ice_damage,
-                        "slow": slow_percentage,
-                        "duration": slow_duration
-                    },
-                    "created_at": datetime.utcnow(),
-                    "read": False
-                })
+                for target_id in distinct_targets(target_ids, player_id)
+            ]
+        )
+        affected_targets = [
+            {
+                "target_id": strike.target_id,
+                "damage": ice_damage,
+                "slow_percentage": slow_percentage,
+                "duration": slow_duration
+            }
+            for strike in applied
+        ]
         
         # Deduct energy
         await self.players_collection.update_one(
@@ -342,71 +331,62 @@ class CryokinesisAbility:
         blizzard_duration = 15 + (trait_level * 0.2)  # 15-35 seconds
         movement_reduction = 60 + (trait_level * 0.3)  # 60-90% movement slow
         
-        # Find all players in radius
-        all_players = await self.players_collection.find({}).to_list(length=None)
+        # Players in radius, from the live position index
+        in_range = await position_index.within(position, blizzard_radius, exclude=player_id)
+        now = datetime.utcnow()
         affected_targets = []
-        
-        for target in all_players:
-            target_id = target.get("id")
-            if target_id == player_id:
-                continue
+        notifications = []
+        
+        for target_id, _, distance in in_range:
+            total_damage = damage_per_tick * (blizzard_duration / 2)
+            affected_targets.append({
+                "target_id": target_id,
+                "distance": distance,
+                "damage_per_tick": damage_per_tick,
+                "total_damage": total_damage
+            })
             
-            # Calculate distance
-            target_pos = target.get("position", {"x": 0, "y": 0, "z": 0})
-            distance = math.sqrt(
-                (target_pos.get("x", 0) - position.get("x", 0)) ** 2 +
-                (target_pos.get("y", 0) - position.get("y", 0)) ** 2 +
-                (target_pos.get("z", 0) - position.get("z", 0)) ** 2
-            )
-            
-            if distance <= blizzard_radius:
-                # Apply blizzard debuffs
-                await self.players_collection.update_one(
-                    {"id": target_id},
-                    {
-                        "$push": {
-                            "debuffs": [
-                                {
-                                    "type": "blizzard_damage",
-                                    "damage_per_tick": damage_per_tick,
-                                    "tick_interval": 2,
-                                    "expires_at": datetime.utcnow() + timedelta(seconds=blizzard_duration),
-                                    "applied_by": player_id
-                                },
-                                {
-                                    "type": "blizzard_slow",
-                                    "value": movement_reduction,
-                                    "expires_at": datetime.utcnow() + timedelta(seconds=blizzard_duration),
-                                    "applied_by": player_id
-                                }
-                            ]
-                        }
-                    }
-                )
-                
-                total_damage = damage_per_tick * (blizzard_duration / 2)
-                affected_targets.append({
-                    "target_id": target_id,
-                    "distance": distance,
+            # Notify target
+            notifications.append({
+                "player_id": target_id,
+                "type": "combat",
+                "title": "Blizzard!",
+                "message": f"{player.get('username', 'A cryokinetic')} summoned a blizzard! {damage_per_tick:.1f} damage per tick, {movement_reduction:.0f}% slowed.",
+                "data": {
+                    "ability": "Cryokinesis - Blizzard",
                     "damage_per_tick": damage_per_tick,
-                    "total_damage": total_damage
-                })
-                
-                # Notify target
-                await self.notifications_collection.insert_one({
-                    "player_id": target_id,
-                    "type": "combat",
-                    "title": "Blizzard!",
-                    "message": f"{player.get('username', 'A cryokinetic')} summoned a blizzard! {damage_per_tick:.1f} damage per tick, {movement_reduction:.0f}% slowed.",
-                    "data": {
-                        "ability": "Cryokinesis - Blizzard",
-                        "damage_per_tick": damage_per_tick,
-                        "duration": blizzard_duration,
-                        "slow": movement_reduction
-                    },
-                    "created_at": datetime.utcnow(),
-                    "read": False
-                })
+                    "duration": blizzard_duration,
+                    "slow": movement_reduction
+                },
+                "created_at": now,
+                "read": False
+            })
+        
+        # Same debuffs for every target: one update for all of them
+        if affected_targets:
+            await self.players_collection.update_many(
+                {"id": {"$in": [target["target_id"] for target in affected_targets]}},
+                {
+                    "$push": {
+                        "debuffs": [
+                            {
+                                "type": "blizzard_damage",
+                                "damage_per_tick": damage_per_tick,
+                                "tick_interval": 2,
+                                "expires_at": now + timedelta(seconds=blizzard_duration),
+                                "applied_by": player_id
+                            },
+                            {
+                                "type": "blizzard_slow",
+                                "value": movement_reduction,
+                                "expires_at": now + timedelta(seconds=blizzard_duration),
+                                "applied_by": player_id
+                            }
+                        ]
+                    }
+                }
+            )
+            await self.notifications_collection.insert_many(notifications, ordered=False)
         
         # Deduct energy
         await self.players_collection.update_one(
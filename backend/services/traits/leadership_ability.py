@@ -4,6 +4,8 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from typing import Dict, List
 from datetime import datetime, timedelta
 
+from backend.services.world.position_index import position_index
+
 class LeadershipAbility:
     """Implementation of Leadership skill - Rally Cry ability."""
     
@@ -39,53 +41,50 @@ class LeadershipAbility:
         party_members = leader.get("party", {}).get("members", [])
         guild_id = leader.get("guild", {}).get("guild_id")
         
-        # Find nearby allies
+        # Find nearby allies: players in range from the position index, then
+        # just those that are in the leader's party or guild
         range_meters = 200
+        in_range = {
+            player_id: distance
+            for player_id, _, distance in await position_index.within(leader_position, range_meters, exclude=leader_id)
+        }
         allies_query = {
-            "_id": {"$ne": leader_id},
-            "status.is_online": True,
+            "_id": {"$in": list(in_range)},
             "$or": [
                 {"_id": {"$in": party_members}},
                 {"guild.guild_id": guild_id} if guild_id else {"_id": {"$in": []}}
             ]
         }
         
-        cursor = self.db.players.find(allies_query)
-        all_allies = await cursor.to_list(length=None)
+        allies = await self.db.players.find(allies_query, projection={"username": 1}).to_list(length=None) if in_range else []
+        allies.sort(key=lambda ally: in_range[ally["_id"]])
         
-        # Filter by range
-        buffed_allies = []
         buff_duration = timedelta(minutes=10)
         buff_expires = datetime.utcnow() + buff_duration
+        buffed_allies = [
+            {
+                "player_id": ally["_id"],
+                "username": ally.get("username", "Unknown"),
+                "distance": round(in_range[ally["_id"]], 1)
+            }
+            for ally in allies
+        ]
         
-        for ally in all_allies:
-            if "position" in ally:
-                distance = self._calculate_distance(
-                    leader_position,
-                    ally["position"]
-                )
-                
-                if distance <= range_meters:
-                    # Apply buff
-                    await self.db.players.update_one(
-                        {"_id": ally["_id"]},
-                        {
-                            "$set": {
-                                "buffs.rally_cry": {
-                                    "active": True,
-                                    "stat_bonus": 15,  # +15% all stats
-                                    "expires_at": buff_expires,
-                                    "from_leader": leader_id
-                                }
-                            }
+        # Apply buff
+        if buffed_allies:
+            await self.db.players.update_many(
+                {"_id": {"$in": [ally["player_id"] for ally in buffed_allies]}},
+                {
+                    "$set": {
+                        "buffs.rally_cry": {
+                            "active": True,
+                            "stat_bonus": 15,  # +15% all stats
+                            "expires_at": buff_expires,
+                            "from_leader": leader_id
                         }
-                    )
-                    
-                    buffed_allies.append({
-                        "player_id": ally["_id"],
-                        "username": ally.get("username", "Unknown"),
-                        "distance": round(distance, 1)
-                    })
+                    }
+                }
+            )
         
         if len(buffed_allies) == 0:
             return {
@@ -107,11 +106,3 @@ class LeadershipAbility:
             "duration_minutes": 10,
             "karma_gain": 5
         }
-    
-    def _calculate_distance(self, pos1: dict, pos2: dict) -> float:
-        """Calculate distance between positions."""
-        import math
-        dx = pos1.get("x", 0) - pos2.get("x", 0)
-        dy = pos1.get("y", 0) - pos2.get("y", 0)
-        dz = pos1.get("z", 0) - pos2.get("z", 0)
-        return math.sqrt(dx*dx + dy*dy + dz*dz)
\ No newline at end of file
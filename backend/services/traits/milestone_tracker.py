@@ -5,8 +5,34 @@ from typing import Dict, Any, List
 from motor.motor_asyncio import AsyncIOMotorDatabase
 import logging
 
+import numpy as np
+from pymongo.errors import BulkWriteError
+
+from backend.models.player.traits import ALL_TRAIT_FIELDS
+from backend.services.player.trait_engine import trait_vector
+
 logger = logging.getLogger(__name__)
 
+
+def record_id(player_id: str, trait: str, threshold: int) -> str:
+    """Key of a milestone or unlock record: each threshold is recorded once per player"""
+    return f"{player_id}:{trait}:{threshold}"
+
+
+async def insert_new(collection, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert keyed records, returning just those that weren't recorded before"""
+    if not records:
+        return []
+    try:
+        await collection.insert_many(records, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != 11000 for error in errors):
+            raise
+        recorded = {error["index"] for error in errors}
+        return [record for index, record in enumerate(records) if index not in recorded]
+    return records
+
 class MilestoneTracker:
     """Tracks trait milestones for players."""
     
@@ -19,53 +45,69 @@ class MilestoneTracker:
         old_traits: Dict[str, float],
         new_traits: Dict[str, float]
     ) -> List[Dict[str, Any]]:
-        """Check if any milestones were reached."""
-        milestones_reached = []
+        """Check if any milestones were reached, recording them and their rewards in one batch.
         
-        for trait, new_value in new_traits.items():
-            old_value = old_traits.get(trait, 0)
-            
-            # Check each threshold
-            for threshold in self.MILESTONE_THRESHOLDS:
-                if old_value < threshold <= new_value:
-                    milestone = await self._create_milestone(
-                        db, player_id, trait, threshold, new_value
-                    )
-                    milestones_reached.append(milestone)
+        Milestones the player already reached before aren't rewarded again.
+        """
+        milestones_reached = await insert_new(
+            db.trait_milestones, self.find_milestones(player_id, old_traits, new_traits)
+        )
+        if not milestones_reached:
+            return []
+        
+        await self._apply_milestone_rewards(
+            db, player_id, self.combine_rewards([m["rewards"] for m in milestones_reached])
+        )
+        
+        for milestone in milestones_reached:
+            logger.info(f"🎉 Milestone reached: {player_id} - {milestone['trait']} level {milestone['threshold']}")
         
         return milestones_reached
     
-    async def _create_milestone(
+    def find_milestones(
         self,
-        db: AsyncIOMotorDatabase,
         player_id: str,
-        trait: str,
-        threshold: int,
-        current_value: float
-    ) -> Dict[str, Any]:
-        """Create a milestone record."""
-        # Calculate rewards
-        rewards = self._calculate_milestone_rewards(trait, threshold)
-        
-        milestone = {
-            "player_id": player_id,
-            "trait": trait,
-            "threshold": threshold,
-            "value_at_milestone": current_value,
-            "reached_at": datetime.utcnow(),
-            "rewards": rewards,
-            "acknowledged": False
-        }
-        
-        # Save milestone
-        await db.trait_milestones.insert_one(milestone)
-        
-        # Apply rewards
-        await self._apply_milestone_rewards(db, player_id, rewards)
-        
-        logger.info(f"🎉 Milestone reached: {player_id} - {trait} level {threshold}")
-        
-        return milestone
+        old_traits: Dict[str, float],
+        new_traits: Dict[str, float]
+    ) -> List[Dict[str, Any]]:
+        """Milestone records for every threshold crossed between two trait snapshots.
+        
+        Traits missing from ``old_traits`` count as 0; traits missing from
+        ``new_traits`` didn't change and cross nothing.
+        """
+        old = trait_vector(old_traits, missing=0, dtype=np.float64)
+        new = trait_vector(new_traits, dtype=np.float64)
+        thresholds = np.array(self.MILESTONE_THRESHOLDS, dtype=np.float64)
+        with np.errstate(invalid="ignore"):
+            crossed = (old[:, np.newaxis] < thresholds) & (thresholds <= new[:, np.newaxis])
+        
+        now = datetime.utcnow()
+        return [
+            {
+                "_id": record_id(player_id, ALL_TRAIT_FIELDS[index], self.MILESTONE_THRESHOLDS[column]),
+                "player_id": player_id,
+                "trait": ALL_TRAIT_FIELDS[index],
+                "threshold": self.MILESTONE_THRESHOLDS[column],
+                "value_at_milestone": new_traits[ALL_TRAIT_FIELDS[index]],
+                "reached_at": now,
+                "rewards": self._calculate_milestone_rewards(
+                    ALL_TRAIT_FIELDS[index], self.MILESTONE_THRESHOLDS[column]
+                ),
+                "acknowledged": False
+            }
+            for index, column in zip(*np.nonzero(crossed))
+        ]
+    
+    @staticmethod
+    def combine_rewards(rewards_list: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Several milestones' rewards as one, so they are applied in a single update."""
+        combined = {"xp": 0, "credits": 0, "karma": 0, "unlocks": []}
+        for rewards in rewards_list:
+            combined["xp"] += rewards.get("xp", 0)
+            combined["credits"] += rewards.get("credits", 0)
+            combined["karma"] += rewards.get("karma", 0)
+            combined["unlocks"].extend(rewards.get("unlocks", []))
+        return combined
     
     def _calculate_milestone_rewards(self, trait: str, threshold: int) -> Dict[str, Any]:
         """Calculate rewards for reaching a milestone."""
@@ -97,6 +139,17 @@ class MilestoneTracker:
         rewards: Dict[str, Any]
     ):
         """Apply milestone rewards to player."""
+        update_data = self.reward_update(rewards)
+        
+        if update_data:
+            await db.players.update_one(
+                {"_id": player_id},
+                update_data
+            )
+    
+    @staticmethod
+    def reward_update(rewards: Dict[str, Any]) -> Dict[str, Any]:
+        """The player update that grants ``rewards``."""
         update_data = {}
         
         if rewards.get("xp", 0) > 0:
@@ -118,11 +171,7 @@ class MilestoneTracker:
                 "$each": rewards["unlocks"]
             }
         
-        if update_data:
-            await db.players.update_one(
-                {"_id": player_id},
-                update_data
-            )
+        return update_data
     
     async def get_player_milestones(
         self,
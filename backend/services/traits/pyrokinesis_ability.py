@@ -1,7 +1,9 @@
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 import random
-import math
+
+from backend.services.traits.target_effects import Strike, apply_strikes, distinct_targets
+from backend.services.world.position_index import position_index
 
 class PyrokinesisAbility:
     """Pyrokinesis superpower - Control and generate fire, create explosions, and burn damage over time"""
@@ -33,58 +35,45 @@ class PyrokinesisAbility:
         burn_damage_per_tick = 5 + (trait_level * 0.1)  # 5-15 damage per tick
         burn_duration = 10 + (trait_level * 0.15)  # 10-25 seconds
         
-        affected_targets = []
-        
-        for target_id in target_ids:
-            if target_id == player_id:
-                continue
-            
-            target = await self.players_collection.find_one({"id": target_id})
-            if target:
-                # Apply initial damage
-                current_hp = target.get("health", {}).get("current", 100)
-                new_hp = max(0, current_hp - initial_damage)
-                
-                # Apply burning debuff
-                await self.players_collection.update_one(
-                    {"id": target_id},
-                    {
-                        "$set": {"health.current": new_hp},
-                        "$push": {
-                            "debuffs": {
-                                "type": "burning",
-                                "damage_per_tick": burn_damage_per_tick,
-                                "tick_interval": 2,  # Damage every 2 seconds
-                                "expires_at": datetime.utcnow() + timedelta(seconds=burn_duration),
-                                "applied_by": player_id
-                            }
+        now = datetime.utcnow()
+        total_burn_damage = burn_damage_per_tick * (burn_duration / 2)
+        applied = await apply_strikes(
+            self.players_collection,
+            self.notifications_collection,
+            [
+                Strike(
+                    target_id,
+                    damage=initial_damage,
+                    debuff={
+                        "type": "burning",
+                        "damage_per_tick": burn_damage_per_tick,
+                        "tick_interval": 2,  # Damage every 2 seconds
+                        "expires_at": now + timedelta(seconds=burn_duration),
+                        "applied_by": player_id
+                    },
+                    notification={
+                        "title": "Engulfed in Flames!",
+                        "message": f"{player.get('username', 'A pyrokinetic')} hit you with a flame burst! {initial_damage:.0f} damage + burning for {burn_duration:.0f}s.",
+                        "data": {
+                            "ability": "Pyrokinesis - Flame Burst",
+                            "initial_damage": initial_damage,
+                            "burn_damage_per_tick": burn_damage_per_tick,
+                            "duration": burn_duration
                         }
                     }
                 )
-                
-                total_burn_damage = burn_damage_per_tick * (burn_duration / 2)
-                affected_targets.append({
-                    "target_id": target_id,
-                    "initial_damage": initial_damage,
-                    "burn_damage_total": total_burn_damage,
-                    "burn_duration": burn_duration
-                })
-                
-                # Notify target
-                await self.notifications_collection.insert_one({
-                    "player_id": target_id,
-                    "type": "combat",
-                    "title": "Engulfed in Flames!",
-                    "message": f"{player.get('username', 'A pyrokinetic')} hit you with a flame burst! {initial_damage:.0f} damage + burning for {burn_duration:.0f}s.",
-                    "data": {
-                        "ability": "Pyrokinesis - Flame Burst",
-                        "initial_damage": initial_damage,
-                        "burn_damage_per_tick": burn_damage_per_tick,
-                        "duration": burn_duration
-                    },
-                    "created_at": datetime.utcnow(),
-                    "read": False
-                })
+                for target_id in distinct_targets(target_ids, player_id)
+            ]
+        )
+        affected_targets = [
+            {
+                "target_id": strike.target_id,
+                "initial_damage": initial_damage,
+                "burn_damage_total": total_burn_damage,
+                "burn_duration": burn_duration
+            }
+            for strike in applied
+        ]
         
         # Deduct energy
         await self.players_collection.update_one(
@@ -170,74 +159,46 @@ class PyrokinesisAbility:
         explosion_radius = 15 + (trait_level * 0.15)  # 15-30 meter radius
         aftershock_duration = 8 + (trait_level * 0.1)  # 8-18 seconds of fire patches
         
-        # Find all players within explosion radius
-        all_players = await self.players_collection.find({}).to_list(length=None)
-        affected_targets = []
-        
-        for target in all_players:
-            target_id = target.get("id")
-            if target_id == player_id:
-                continue
-            
-            # Calculate distance (assume target has position)
-            target_pos = target.get("position", {"x": 0, "y": 0, "z": 0})
-            distance = math.sqrt(
-                (target_pos.get("x", 0) - position.get("x", 0)) ** 2 +
-                (target_pos.get("y", 0) - position.get("y", 0)) ** 2 +
-                (target_pos.get("z", 0) - position.get("z", 0)) ** 2
-            )
-            
-            if distance <= explosion_radius:
-                # Damage falloff based on distance
-                damage_multiplier = max(0.3, 1 - (distance / explosion_radius))
-                actual_damage = max_damage * damage_multiplier
-                
-                # Apply damage
-                current_hp = target.get("health", {}).get("current", 100)
-                new_hp = max(0, current_hp - actual_damage)
-                
-                # Apply stunned effect for close targets
-                if distance < explosion_radius * 0.5:
-                    await self.players_collection.update_one(
-                        {"id": target_id},
-                        {
-                            "$set": {"health.current": new_hp},
-                            "$push": {
-                                "debuffs": {
-                                    "type": "stunned",
-                                    "value": 100,
-                                    "expires_at": datetime.utcnow() + timedelta(seconds=3),
-                                    "applied_by": player_id
-                                }
-                            }
-                        }
-                    )
-                else:
-                    await self.players_collection.update_one(
-                        {"id": target_id},
-                        {"$set": {"health.current": new_hp}}
-                    )
-                
-                affected_targets.append({
-                    "target_id": target_id,
-                    "damage": actual_damage,
-                    "distance": distance
-                })
-                
-                # Notify target
-                await self.notifications_collection.insert_one({
-                    "player_id": target_id,
-                    "type": "combat",
+        # Players within explosion radius, from the live position index
+        in_range = await position_index.within(position, explosion_radius, exclude=player_id)
+        now = datetime.utcnow()
+        distances = {}
+        strikes = []
+        for target_id, _, distance in in_range:
+            # Damage falloff based on distance
+            damage_multiplier = max(0.3, 1 - (distance / explosion_radius))
+            actual_damage = max_damage * damage_multiplier
+            distances[target_id] = distance
+            strikes.append(Strike(
+                target_id,
+                damage=actual_damage,
+                # Stunned effect for close targets
+                debuff={
+                    "type": "stunned",
+                    "value": 100,
+                    "expires_at": now + timedelta(seconds=3),
+                    "applied_by": player_id
+                } if distance < explosion_radius * 0.5 else None,
+                notification={
                     "title": "Pyroclasm!",
                     "message": f"{player.get('username', 'A pyrokinetic')} unleashed Pyroclasm! {actual_damage:.0f} damage.",
                     "data": {
                         "ability": "Pyrokinesis - Pyroclasm",
                         "damage": actual_damage,
                         "distance": distance
-                    },
-                    "created_at": datetime.utcnow(),
-                    "read": False
-                })
+                    }
+                }
+            ))
+        
+        applied = await apply_strikes(self.players_collection, self.notifications_collection, strikes)
+        affected_targets = [
+            {
+                "target_id": strike.target_id,
+                "damage": strike.damage,
+                "distance": distances[strike.target_id]
+            }
+            for strike in applied
+        ]
         
         # Deduct energy
         await self.players_collection.update_one(
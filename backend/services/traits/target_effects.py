@@ -0,0 +1,81 @@
+"""Target effects - damage, debuffs and notifications for multi-target abilities, applied in bulk."""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+
+class Strike:
+    """Damage and an optional debuff dealt to one target, with the notification sent to them.
+
+    ``notification`` holds the ``title``/``message``/``data`` of the
+    notification; the recipient and timestamps are filled in when applied.
+    """
+
+    def __init__(
+        self,
+        target_id: str,
+        damage: float = 0,
+        debuff: Optional[Dict[str, Any]] = None,
+        notification: Optional[Dict[str, Any]] = None
+    ):
+        self.target_id = target_id
+        self.damage = damage
+        self.debuff = debuff
+        self.notification = notification
+
+
+def distinct_targets(target_ids: Iterable[str], caster_id: str) -> List[str]:
+    """Target ids in order, without duplicates or the caster"""
+    return [target_id for target_id in dict.fromkeys(target_ids) if target_id != caster_id]
+
+
+async def apply_strikes(
+    players_collection,
+    notifications_collection,
+    strikes: List[Strike],
+    key: str = "id"
+) -> List[Strike]:
+    """Apply strikes in three round-trips whatever the number of targets.
+
+    Target health is read with one ``$in`` query, damage and debuffs go out
+    as one unordered ``bulk_write`` and notifications as one ``insert_many``.
+    Strikes against players that don't exist are dropped; the ones applied
+    are returned in order.
+    """
+    if not strikes:
+        return []
+
+    targets = await players_collection.find(
+        {key: {"$in": [strike.target_id for strike in strikes]}},
+        projection={key: 1, "health": 1}
+    ).to_list(length=None)
+    health = {target[key]: target.get("health", {}).get("current", 100) for target in targets}
+
+    now = datetime.utcnow()
+    applied = []
+    writes = []
+    notifications = []
+    for strike in strikes:
+        if strike.target_id not in health:
+            continue
+        update: Dict[str, Any] = {"$set": {"health.current": max(0, health[strike.target_id] - strike.damage)}}
+        if strike.debuff is not None:
+            update["$push"] = {"debuffs": strike.debuff}
+        writes.append(UpdateOne({key: strike.target_id}, update))
+        if strike.notification is not None:
+            notifications.append({
+                "player_id": strike.target_id,
+                "type": "combat",
+                **strike.notification,
+                "created_at": now,
+                "read": False
+            })
+        applied.append(strike)
+
+    if writes:
+        await players_collection.bulk_write(writes, ordered=False)
+    if notifications:
+        await notifications_collection.insert_many(notifications, ordered=False)
+    return applied
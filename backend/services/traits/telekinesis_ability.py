@@ -3,6 +3,8 @@ from typing import Dict, Any, Optional
 import random
 import math
 
+from backend.services.traits.target_effects import Strike, apply_strikes, distinct_targets
+
 class TelekinesisAbility:
     """Telekinesis superpower - Move objects with the mind, create force fields, and manipulate the environment"""
     
@@ -33,54 +35,42 @@ class TelekinesisAbility:
         knockback_distance = 5 + (trait_level * 0.1)  # 5-15 meters
         stun_duration = 2 + (trait_level * 0.03)  # 2-5 seconds
         
-        affected_targets = []
-        
-        for target_id in target_ids:
-            if target_id == player_id:
-                continue
-            
-            target = await self.players_collection.find_one({"id": target_id})
-            if target:
-                # Apply damage
-                new_hp = max(0, target.get("health", {}).get("current", 100) - force_damage)
-                
-                # Apply stun debuff
-                await self.players_collection.update_one(
-                    {"id": target_id},
-                    {
-                        "$set": {"health.current": new_hp},
-                        "$push": {
-                            "debuffs": {
-                                "type": "stunned",
-                                "value": 100,  # 100% movement reduction
-                                "expires_at": datetime.utcnow() + timedelta(seconds=stun_duration),
-                                "applied_by": player_id
-                            }
+        now = datetime.utcnow()
+        applied = await apply_strikes(
+            self.players_collection,
+            self.notifications_collection,
+            [
+                Strike(
+                    target_id,
+                    damage=force_damage,
+                    debuff={
+                        "type": "stunned",
+                        "value": 100,  # 100% movement reduction
+                        "expires_at": now + timedelta(seconds=stun_duration),
+                        "applied_by": player_id
+                    },
+                    notification={
+                        "title": "Force Pushed!",
+                        "message": f"{player.get('username', 'Someone')} used Telekinesis to push you away! {force_damage:.0f} damage, {stun_duration:.1f}s stun.",
+                        "data": {
+                            "ability": "Telekinesis - Force Push",
+                            "damage": force_damage,
+                            "knockback": knockback_distance
                         }
                     }
                 )
-                
-                affected_targets.append({
-                    "target_id": target_id,
-                    "damage": force_damage,
-                    "knockback": knockback_distance,
-                    "stunned": stun_duration
-                })
-                
-                # Notify target
-                await self.notifications_collection.insert_one({
-                    "player_id": target_id,
-                    "type": "combat",
-                    "title": "Force Pushed!",
-                    "message": f"{player.get('username', 'Someone')} used Telekinesis to push you away! {force_damage:.0f} damage, {stun_duration:.1f}s stun.",
-                    "data": {
-                        "ability": "Telekinesis - Force Push",
-                        "damage": force_damage,
-                        "knockback": knockback_distance
-                    },
-                    "created_at": datetime.utcnow(),
-                    "read": False
-                })
+                for target_id in distinct_targets(target_ids, player_id)
+            ]
+        )
+        affected_targets = [
+            {
+                "target_id": strike.target_id,
+                "damage": force_damage,
+                "knockback": knockback_distance,
+                "stunned": stun_duration
+            }
+            for strike in applied
+        ]
         
         # Deduct energy
         await self.players_collection.update_one(
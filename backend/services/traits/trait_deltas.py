@@ -0,0 +1,115 @@
+"""Trait deltas - milestone and unlock detection for every trait change.
+
+Code that changes a player's traits passes the values before and after
+the change to ``apply_trait_delta``, or lets ``change_traits`` make the
+change. One vector comparison over the 80 traits finds every milestone
+and unlock crossed. They are recorded with one insert per record
+collection, then everything they grant is written in one player update.
+The cost doesn't grow with the number of traits changed.
+
+Records are keyed by player, trait and threshold, so a threshold crossed
+again (a trait that dropped and came back, or the same change seen by two
+paths) is recorded and rewarded only once.
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+
+from backend.models.player.traits import trait_field
+from backend.services.achievements.achievement_service import AchievementService
+from backend.services.traits.milestone_tracker import MilestoneTracker, insert_new
+from backend.services.traits.unlock_manager import UnlockManager
+
+logger = logging.getLogger(__name__)
+
+TRAIT_MIN = 0
+TRAIT_MAX = 100
+
+
+def trait_snapshot(player: Dict[str, Any]) -> Dict[str, float]:
+    """A player document's traits and meta traits as one dict"""
+    return {**(player.get("traits") or {}), **(player.get("meta_traits") or {})}
+
+
+async def apply_trait_delta(
+    db: AsyncIOMotorDatabase,
+    player_id: str,
+    old_traits: Dict[str, float],
+    new_traits: Dict[str, float]
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Record the milestones and unlocks crossed by one trait change.
+
+    ``new_traits`` only needs the traits that changed. Returns the
+    milestone and unlock records that were written.
+    """
+    milestones = MilestoneTracker().find_milestones(player_id, old_traits, new_traits)
+    unlocks = UnlockManager().find_unlocks(player_id, old_traits, new_traits)
+    if not milestones and not unlocks:
+        return {"milestones": [], "unlocks": []}
+
+    # Only thresholds recorded for the first time are rewarded
+    milestones, unlocks = await asyncio.gather(
+        insert_new(db.trait_milestones, milestones),
+        insert_new(db.trait_unlocks, unlocks)
+    )
+    if not milestones and not unlocks:
+        return {"milestones": [], "unlocks": []}
+
+    rewards = MilestoneTracker.combine_rewards([milestone["rewards"] for milestone in milestones])
+    rewards["unlocks"].extend(UnlockManager.unlocked_abilities(unlocks))
+
+    writes = [db.players.update_one({"_id": player_id}, MilestoneTracker.reward_update(rewards))]
+    if milestones:
+        # Trait achievements are set at milestone values
+        writes.append(AchievementService.award_changed(
+            db, player_id, sorted({trait_field(milestone["trait"]) for milestone in milestones})
+        ))
+    await asyncio.gather(*writes)
+
+    logger.info(f"🎉 Trait delta: {player_id} - {len(milestones)} milestones, {len(unlocks)} unlocks")
+    return {"milestones": milestones, "unlocks": unlocks}
+
+
+async def change_traits(
+    db: AsyncIOMotorDatabase,
+    player_id: str,
+    changes: Dict[str, float],
+    default: float = 0
+) -> Dict[str, Any]:
+    """Add ``changes`` to a player's traits, clamped to 0-100, then record what they crossed.
+
+    The change is one atomic update that returns the values it replaced,
+    so the deltas are exact even with concurrent changes. Returns the new
+    values under ``traits`` with the ``milestones`` and ``unlocks``
+    recorded. A trait the player doesn't have yet starts from ``default``.
+    """
+    if not changes:
+        return {"traits": {}, "milestones": [], "unlocks": []}
+
+    fields = {trait: trait_field(trait) for trait in changes}
+    before = await db.players.find_one_and_update(
+        {"_id": player_id},
+        [{"$set": {
+            field: {"$min": [TRAIT_MAX, {"$max": [TRAIT_MIN, {"$add": [{"$ifNull": [f"${field}", default]}, changes[trait]]}]}]}
+            for trait, field in fields.items()
+        }}],
+        projection={field: 1 for field in fields.values()},
+        return_document=ReturnDocument.BEFORE
+    )
+    if before is None:
+        return {"traits": {}, "milestones": [], "unlocks": []}
+
+    old_traits = trait_snapshot(before)
+    for trait in changes:
+        if old_traits.get(trait) is None:
+            old_traits[trait] = default
+    new_traits = {
+        trait: min(TRAIT_MAX, max(TRAIT_MIN, old_traits[trait] + change))
+        for trait, change in changes.items()
+    }
+    crossed = await apply_trait_delta(db, player_id, old_traits, new_traits)
+    return {"traits": new_traits, **crossed}
@@ -5,6 +5,12 @@ from typing import Dict, Any, List, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 import logging
 
+import numpy as np
+
+from backend.models.player.traits import TRAIT_INDEX
+from backend.services.player.trait_engine import RequirementMatrix, trait_vector
+from backend.services.traits.milestone_tracker import insert_new, record_id
+
 logger = logging.getLogger(__name__)
 
 class UnlockManager:
@@ -52,7 +58,7 @@ class UnlockManager:
                 "effects": ["+40% XP gain", "Perfect foresight", "Mentor others"]
             }
         },
-        "compassion": {
+        "empathy": {
             50: {
                 "name": "Healing Touch",
                 "type": "ability",
@@ -68,11 +74,11 @@ class UnlockManager:
             100: {
                 "name": "Saint",
                 "type": "title",
-                "description": "Master of compassion: Ultimate healing and saintly reputation",
+                "description": "Master of empathy: Ultimate healing and saintly reputation",
                 "effects": ["Revive fallen allies", "+100% karma gains", "Divine protection"]
             }
         },
-        "strength": {
+        "physical_strength": {
             50: {
                 "name": "Iron Fist",
                 "type": "ability",
@@ -123,60 +129,71 @@ class UnlockManager:
         old_value: float
     ) -> List[Dict[str, Any]]:
         """Check if any unlocks were triggered."""
-        unlocks = []
-        
-        if trait not in self.TRAIT_UNLOCKS:
-            return unlocks
-        
-        trait_unlocks = self.TRAIT_UNLOCKS[trait]
+        return await self.record_unlocks(
+            db, player_id, self.find_unlocks(player_id, {trait: old_value}, {trait: new_value})
+        )
+    
+    def find_unlocks(
+        self,
+        player_id: str,
+        old_traits: Dict[str, float],
+        new_traits: Dict[str, float]
+    ) -> List[Dict[str, Any]]:
+        """Unlock records for every threshold crossed between two trait snapshots.
         
-        for threshold, unlock_data in trait_unlocks.items():
-            if old_value < threshold <= new_value:
-                unlock = await self._create_unlock(
-                    db, player_id, trait, threshold, unlock_data
-                )
-                unlocks.append(unlock)
+        Traits missing from ``old_traits`` count as 0; traits missing from
+        ``new_traits`` didn't change and cross nothing.
+        """
+        old = trait_vector(old_traits, missing=0, dtype=np.float64)[_UNLOCK_INDEX]
+        new = trait_vector(new_traits, dtype=np.float64)[_UNLOCK_INDEX]
+        with np.errstate(invalid="ignore"):
+            crossed = (old < _UNLOCK_THRESHOLDS) & (_UNLOCK_THRESHOLDS <= new)
         
+        now = datetime.utcnow()
+        unlocks = []
+        for row in np.flatnonzero(crossed):
+            trait, threshold = _UNLOCK_KEYS[row]
+            unlock_data = self.TRAIT_UNLOCKS[trait][threshold]
+            unlocks.append({
+                "_id": record_id(player_id, trait, threshold),
+                "player_id": player_id,
+                "trait": trait,
+                "threshold": threshold,
+                "name": unlock_data["name"],
+                "type": unlock_data["type"],
+                "description": unlock_data["description"],
+                "effects": unlock_data["effects"],
+                "unlocked_at": now,
+                "is_active": True,
+                "acknowledged": False
+            })
         return unlocks
     
-    async def _create_unlock(
+    async def record_unlocks(
         self,
         db: AsyncIOMotorDatabase,
         player_id: str,
-        trait: str,
-        threshold: int,
-        unlock_data: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Create an unlock record."""
-        unlock = {
-            "player_id": player_id,
-            "trait": trait,
-            "threshold": threshold,
-            "name": unlock_data["name"],
-            "type": unlock_data["type"],
-            "description": unlock_data["description"],
-            "effects": unlock_data["effects"],
-            "unlocked_at": datetime.utcnow(),
-            "is_active": True,
-            "acknowledged": False
-        }
-        
-        # Save unlock
-        await db.trait_unlocks.insert_one(unlock)
+        unlocks: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Save unlock records and add them to the player's unlocked abilities.
         
-        # Add to player's unlocked abilities
+        Returns the unlocks that are new; ones already recorded are skipped.
+        """
+        unlocks = await insert_new(db.trait_unlocks, unlocks)
+        if not unlocks:
+            return []
         await db.players.update_one(
             {"_id": player_id},
-            {
-                "$addToSet": {
-                    "unlocked_abilities": f"{trait}_{threshold}"
-                }
-            }
+            {"$addToSet": {"unlocked_abilities": {"$each": self.unlocked_abilities(unlocks)}}}
         )
         
-        logger.info(f"🔓 Unlock: {player_id} - {unlock_data['name']} ({trait} {threshold})")
-        
-        return unlock
+        for unlock in unlocks:
+            logger.info(f"🔓 Unlock: {player_id} - {unlock['name']} ({unlock['trait']} {unlock['threshold']})")
+        return unlocks
+    
+    @staticmethod
+    def unlocked_abilities(unlocks: List[Dict[str, Any]]) -> List[str]:
+        return [f"{unlock['trait']}_{unlock['threshold']}" for unlock in unlocks]
     
     async def get_player_unlocks(
         self,
@@ -233,27 +250,43 @@ class UnlockManager:
             return {}
         
         traits = player.get("traits", {})
-        available = {}
+        unlocked = {
+            (unlock["trait"], unlock["threshold"])
+            async for unlock in db.trait_unlocks.find(
+                {"player_id": player_id},
+                projection={"trait": 1, "threshold": 1, "_id": 0}
+            )
+        }
+        vector = trait_vector(traits, missing=0, dtype=np.float64)
+        can_unlock = UNLOCK_REQUIREMENTS.eligible(vector)
+        progress = UNLOCK_REQUIREMENTS.progress(vector)
+        available = {trait: [] for trait in self.TRAIT_UNLOCKS}
         
-        for trait, unlocks in self.TRAIT_UNLOCKS.items():
-            trait_value = traits.get(trait, 0)
-            trait_unlocks = []
-            
-            for threshold, unlock_data in unlocks.items():
-                is_unlocked = await self.is_ability_unlocked(db, player_id, trait, threshold)
-                
-                trait_unlocks.append({
-                    "threshold": threshold,
-                    "name": unlock_data["name"],
-                    "type": unlock_data["type"],
-                    "description": unlock_data["description"],
-                    "effects": unlock_data["effects"],
-                    "is_unlocked": is_unlocked,
-                    "current_value": trait_value,
-                    "can_unlock": trait_value >= threshold,
-                    "progress": min(100, (trait_value / threshold) * 100)
-                })
-            
-            available[trait] = trait_unlocks
+        for row, (trait, threshold) in enumerate(UNLOCK_REQUIREMENTS.names):
+            unlock_data = self.TRAIT_UNLOCKS[trait][threshold]
+            available[trait].append({
+                "threshold": threshold,
+                "name": unlock_data["name"],
+                "type": unlock_data["type"],
+                "description": unlock_data["description"],
+                "effects": unlock_data["effects"],
+                "is_unlocked": (trait, threshold) in unlocked,
+                "current_value": traits.get(trait, 0),
+                "can_unlock": bool(can_unlock[row]),
+                "progress": float(progress[row])
+            })
         
         return available
+
+
+# Each unlock as a one-trait requirement set, keyed by (trait, threshold)
+UNLOCK_REQUIREMENTS = RequirementMatrix({
+    (trait, threshold): {trait: threshold}
+    for trait, unlocks in UnlockManager.TRAIT_UNLOCKS.items()
+    for threshold in unlocks
+})
+
+# Trait index and threshold of each unlock, for crossing checks
+_UNLOCK_KEYS = list(UNLOCK_REQUIREMENTS.names)
+_UNLOCK_INDEX = np.array([TRAIT_INDEX[trait] for trait, _ in _UNLOCK_KEYS], dtype=np.intp)
+_UNLOCK_THRESHOLDS = np.array([threshold for _, threshold in _UNLOCK_KEYS], dtype=np.float64)
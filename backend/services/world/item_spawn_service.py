@@ -2,10 +2,11 @@
 
 import random
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from backend.models.world.world_item import WorldItem, WorldItemPosition
 from backend.services.player.traits import TraitsService
+from backend.tasks.deadline_scheduler import deadline_scheduler
 import uuid
 
 class ItemSpawnService:
@@ -56,6 +57,10 @@ class ItemSpawnService:
         self.db = db
         self.traits_service = TraitsService()
     
+    async def ensure_indexes(self):
+        """Create the index used to find expiring items."""
+        await self.db.world_items.create_index([("status", 1), ("expires_at", 1)])
+    
     async def spawn_random_item(self, item_type: str) -> Optional[WorldItem]:
         """Spawn a random item of the given type."""
         
@@ -100,6 +105,7 @@ class ItemSpawnService:
         
         # Save to database
         await self.db.world_items.insert_one(world_item.model_dump(by_alias=True))
+        deadline_scheduler.schedule("world_item", world_item.id, expires_at)
         
         return world_item
     
@@ -137,6 +143,25 @@ class ItemSpawnService:
         })
         return result.deleted_count
     
+    async def expire_items(self, item_ids: List[str]) -> int:
+        """Remove a batch of items whose expiry is due (deadline scheduler handler)."""
+        result = await self.db.world_items.delete_many({
+            "_id": {"$in": item_ids},
+            "expires_at": {"$lte": datetime.utcnow()},
+            "status": "active"
+        })
+        return result.deleted_count
+    
+    async def pending_expiries(self, until: datetime) -> List[Tuple[str, datetime]]:
+        """Active items expiring before ``until`` (deadline scheduler rehydration)."""
+        return [
+            (item["_id"], item["expires_at"])
+            async for item in self.db.world_items.find(
+                {"status": "active", "expires_at": {"$lte": until}},
+                projection={"expires_at": 1}
+            )
+        ]
+    
     async def get_active_items(self, region: Optional[str] = None) -> List[WorldItem]:
         """Get all active items in the world or specific region."""
         query = {"status": "active"}
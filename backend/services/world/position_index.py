@@ -0,0 +1,399 @@
+"""Live player position index - radius and nearest-player queries shared by every worker.
+
+Positions live in Redis when it answers: a GEO set for area searches, a hash
+of exact x/y/z, and a last-seen sorted set. Every worker therefore sees the
+players connected to the others. Without Redis they fall back to an
+in-process spatial grid, which only sees this process's players.
+
+Each worker refreshes the last-seen score of the players connected to it.
+Entries that nobody refreshes for ``POSITION_TTL`` seconds are evicted: players
+seeded at startup who never came back, or players left behind by a worker that
+died.
+"""
+
+import asyncio
+import heapq
+import logging
+import math
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+
+from backend.services.world.spatial_grid import Point, SpatialGrid, as_point
+
+try:
+    from redis import asyncio as aioredis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+POSITION_CELL_SIZE = 100.0
+# Above this many candidates distances are computed as one NumPy array operation
+VECTORIZE_THRESHOLD = 64
+# Moved positions are written back to the players collection this often
+PERSIST_INTERVAL = 5.0
+# Players nobody has refreshed for this many seconds are dropped from the index
+POSITION_TTL = 120.0
+
+# Redis GEO works in degrees: one degree is this many metres along the equator
+# (Redis' earth radius). The projection never lengthens a distance, so a GEO
+# radius search returns every player within that planar distance, plus a few
+# extra that the exact check drops.
+METERS_PER_DEGREE = 6372797.560856 * math.pi / 180
+MAX_LATITUDE = 85.05112878
+# Search radius for nearest() without a limit: half the globe
+UNLIMITED_RADIUS = 20_000_000.0
+
+# (player_id, position, distance)
+Nearby = Tuple[str, Point, float]
+
+
+def position_dict(point: Point) -> Dict[str, float]:
+    return {"x": point[0], "y": point[1], "z": point[2]}
+
+
+def rank(center: Point, positions: Dict[str, Point], radius: Optional[float] = None) -> List[Nearby]:
+    """Exact 3D distances from ``center``, nearest first, cut at ``radius``"""
+    candidates = list(positions)
+    if len(candidates) > VECTORIZE_THRESHOLD:
+        points = np.array([positions[p] for p in candidates], dtype=np.float64)
+        distances = np.sqrt(((points - np.array(center)) ** 2).sum(axis=1))
+        hits = np.flatnonzero(distances <= radius) if radius is not None else np.arange(len(candidates))
+        order = hits[np.argsort(distances[hits], kind="stable")]
+        return [(candidates[i], positions[candidates[i]], float(distances[i])) for i in order]
+
+    found = []
+    for player_id in candidates:
+        distance = math.dist(center, positions[player_id])
+        if radius is None or distance <= radius:
+            found.append((player_id, positions[player_id], distance))
+    found.sort(key=lambda nearby: nearby[2])
+    return found
+
+
+class MemoryPositionStore:
+    """Positions in an in-process spatial grid; only this worker's players"""
+
+    def __init__(self, cell_size: float = POSITION_CELL_SIZE):
+        self.grid = SpatialGrid(cell_size)
+        self.seen: Dict[str, float] = {}
+
+    async def update(self, player_id: str, point: Point, now: float) -> bool:
+        self.grid.move(player_id, point)
+        self.seen[player_id] = now
+        return True
+
+    async def remove(self, player_id: str) -> None:
+        self.grid.remove(player_id)
+        self.seen.pop(player_id, None)
+
+    async def position(self, player_id: str) -> Optional[Point]:
+        return self.grid.positions.get(player_id)
+
+    def _candidates(self, center: Point, radius: float) -> List[str]:
+        low = self.grid.cell(center[0] - radius, center[1] - radius)
+        high = self.grid.cell(center[0] + radius, center[1] + radius)
+        cells = self.grid.cells
+        # A wide area over a sparse grid is cheaper to scan by occupied cell
+        if (high[0] - low[0] + 1) * (high[1] - low[1] + 1) > len(cells):
+            return [
+                player_id for (x, y), members in cells.items()
+                if low[0] <= x <= high[0] and low[1] <= y <= high[1]
+                for player_id in members
+            ]
+        return [
+            player_id
+            for x in range(low[0], high[0] + 1)
+            for y in range(low[1], high[1] + 1)
+            for player_id in cells.get((x, y), ())
+        ]
+
+    async def within(self, center: Point, radius: float, exclude: Optional[str]) -> List[Nearby]:
+        positions = self.grid.positions
+        return rank(center, {
+            p: positions[p] for p in self._candidates(center, radius) if p != exclude
+        }, radius)
+
+    async def nearest(self, center: Point, k: int, max_radius: Optional[float], exclude: Optional[str]) -> List[Nearby]:
+        """Searches outward from ``center`` ring by ring"""
+        if not len(self.grid):
+            return []
+        size = self.grid.cell_size
+        cx, cy = self.grid.cell(center[0], center[1])
+        positions = self.grid.positions
+        cells = self.grid.cells
+        best: List[Tuple[float, str]] = []  # max-heap of the k nearest, as (-distance, id)
+        ring = 0
+        seen = 0
+        # Stops once every tracked player has been looked at
+        while seen < len(positions):
+            # Nothing in this ring or beyond can be closer than this
+            bound = max(ring - 1, 0) * size
+            if max_radius is not None and bound > max_radius:
+                break
+            if len(best) == k and bound > -best[0][0]:
+                break
+            for x in range(cx - ring, cx + ring + 1):
+                edge = abs(x - cx) == ring
+                for y in (range(cy - ring, cy + ring + 1) if edge else (cy - ring, cy + ring)):
+                    members = cells.get((x, y), ())
+                    seen += len(members)
+                    for player_id in members:
+                        if player_id == exclude:
+                            continue
+                        distance = math.dist(center, positions[player_id])
+                        if max_radius is not None and distance > max_radius:
+                            continue
+                        if len(best) < k:
+                            heapq.heappush(best, (-distance, player_id))
+                        elif distance < -best[0][0]:
+                            heapq.heapreplace(best, (-distance, player_id))
+            ring += 1
+        return [(player_id, positions[player_id], -negative) for negative, player_id in sorted(best, reverse=True)]
+
+    async def touch(self, player_ids: Iterable[str], now: float) -> None:
+        for player_id in player_ids:
+            if player_id in self.seen:
+                self.seen[player_id] = now
+
+    async def evict(self, before: float) -> int:
+        stale = [player_id for player_id, seen in self.seen.items() if seen < before]
+        for player_id in stale:
+            await self.remove(player_id)
+        return len(stale)
+
+
+class RedisPositionStore:
+    """Positions in Redis, shared by every worker.
+
+    ``positions:geo`` is a GEO set used to find candidates, ``positions:xyz``
+    holds the exact coordinates the distances are computed from, and
+    ``positions:seen`` scores each player by when a worker last vouched for
+    them.
+    """
+
+    GEO_KEY = "positions:geo"
+    XYZ_KEY = "positions:xyz"
+    SEEN_KEY = "positions:seen"
+
+    def __init__(self, client):
+        self.client = client
+
+    @staticmethod
+    def _lonlat(point: Point) -> Optional[Tuple[float, float]]:
+        lon, lat = point[0] / METERS_PER_DEGREE, point[1] / METERS_PER_DEGREE
+        if abs(lon) > 180 or abs(lat) > MAX_LATITUDE:
+            return None
+        return lon, lat
+
+    @staticmethod
+    def _point(value: Optional[str]) -> Optional[Point]:
+        if value is None:
+            return None
+        x, y, z = value.split(",")
+        return float(x), float(y), float(z)
+
+    async def update(self, player_id: str, point: Point, now: float) -> bool:
+        lonlat = self._lonlat(point)
+        if lonlat is None:
+            return False
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.geoadd(self.GEO_KEY, [lonlat[0], lonlat[1], player_id])
+            pipe.hset(self.XYZ_KEY, player_id, ",".join(map(repr, point)))
+            pipe.zadd(self.SEEN_KEY, {player_id: now})
+            await pipe.execute()
+        return True
+
+    async def remove(self, player_id: str) -> None:
+        await self._remove([player_id])
+
+    async def _remove(self, player_ids: List[str]) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.zrem(self.GEO_KEY, *player_ids)
+            pipe.hdel(self.XYZ_KEY, *player_ids)
+            pipe.zrem(self.SEEN_KEY, *player_ids)
+            await pipe.execute()
+
+    async def position(self, player_id: str) -> Optional[Point]:
+        return self._point(await self.client.hget(self.XYZ_KEY, player_id))
+
+    async def _search(self, center: Point, radius: float, exclude: Optional[str], count: Optional[int] = None) -> Dict[str, Point]:
+        lonlat = self._lonlat(center)
+        if lonlat is None:
+            return {}
+        player_ids = await self.client.geosearch(
+            self.GEO_KEY, longitude=lonlat[0], latitude=lonlat[1],
+            radius=radius, unit="m", sort="ASC" if count else None, count=count
+        )
+        player_ids = [p for p in player_ids if p != exclude]
+        if not player_ids:
+            return {}
+        values = await self.client.hmget(self.XYZ_KEY, player_ids)
+        return {p: self._point(v) for p, v in zip(player_ids, values) if v is not None}
+
+    async def within(self, center: Point, radius: float, exclude: Optional[str]) -> List[Nearby]:
+        return rank(center, await self._search(center, radius, exclude), radius)
+
+    async def nearest(self, center: Point, k: int, max_radius: Optional[float], exclude: Optional[str]) -> List[Nearby]:
+        """The k nearest on the map, then everyone on the map no further than the worst of them in 3D"""
+        radius = max_radius if max_radius is not None else UNLIMITED_RADIUS
+        first = await self._search(center, radius, exclude, count=k + 1)
+        found = rank(center, first, max_radius)
+        if len(first) >= k:
+            # The search may have been cut short: anyone closer in 3D is at most this far away on the map
+            bound = found[k - 1][2] if len(found) >= k else radius
+            found = rank(center, await self._search(center, bound, exclude), max_radius)
+        return found[:k]
+
+    async def touch(self, player_ids: Iterable[str], now: float) -> None:
+        player_ids = list(player_ids)
+        if player_ids:
+            await self.client.zadd(self.SEEN_KEY, dict.fromkeys(player_ids, now), xx=True)
+
+    async def evict(self, before: float) -> int:
+        stale = await self.client.zrangebyscore(self.SEEN_KEY, "-inf", f"({before}")
+        if stale:
+            await self._remove(stale)
+        return len(stale)
+
+
+class PositionIndex:
+    """Online players' positions, answering range and k-nearest queries.
+
+    Positions come from WebSocket location updates and are persisted to the
+    players collection lazily, in one bulk write per ``PERSIST_INTERVAL``.
+    Queries only look at the players around the search area, and their
+    exact distances are computed in one vectorized NumPy pass when there are
+    many of them (area-of-effect abilities).
+    """
+
+    def __init__(self, cell_size: float = POSITION_CELL_SIZE, store=None):
+        self.store = store or MemoryPositionStore(cell_size)
+        # Positions not yet written to the players collection
+        self.unsaved: Dict[str, Point] = {}
+        # Players connected to this worker, kept alive in the index by it
+        self.local: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    async def update(self, player_id: str, location: Dict, persist: bool = True) -> bool:
+        """Record a player's position; False if the location isn't a valid position"""
+        point = as_point(location)
+        if point is None or not await self.store.update(player_id, point, time.time()):
+            return False
+        self.local.add(player_id)
+        if persist:
+            self.unsaved[player_id] = point
+        return True
+
+    async def remove(self, player_id: str) -> None:
+        """Stop tracking a player (gone offline); their last position is still persisted"""
+        self.local.discard(player_id)
+        await self.store.remove(player_id)
+
+    async def position(self, player_id: str) -> Optional[Point]:
+        return await self.store.position(player_id)
+
+    async def within(self, center: Dict, radius: float, exclude: Optional[str] = None) -> List[Nearby]:
+        """Players within ``radius`` (3D distance) of ``center``, nearest first"""
+        point = as_point(center)
+        if point is None or radius < 0:
+            return []
+        return await self.store.within(point, radius, exclude)
+
+    async def nearest(
+        self,
+        center: Dict,
+        k: int,
+        max_radius: Optional[float] = None,
+        exclude: Optional[str] = None
+    ) -> List[Nearby]:
+        """The ``k`` players nearest to ``center``"""
+        point = as_point(center)
+        if point is None or k <= 0:
+            return []
+        return await self.store.nearest(point, k, max_radius, exclude)
+
+    async def load(self, db: AsyncIOMotorDatabase) -> int:
+        """Seed the index with the stored positions of players marked online.
+
+        Seeded players aren't local to this worker, so unless they reconnect
+        they are evicted after ``POSITION_TTL``.
+        """
+        loaded = 0
+        now = time.time()
+        async for player in db.players.find(
+            {"status.is_online": True, "position": {"$exists": True}},
+            projection={"position": 1}
+        ):
+            point = as_point(player["position"])
+            if point is not None and await self.store.update(str(player["_id"]), point, now):
+                loaded += 1
+        return loaded
+
+    async def persist(self, db: AsyncIOMotorDatabase) -> int:
+        """Write moved positions back to the players collection in one bulk write"""
+        unsaved, self.unsaved = self.unsaved, {}
+        if not unsaved:
+            return 0
+        try:
+            await db.players.bulk_write([
+                UpdateOne({"_id": player_id}, {"$set": {"position": position_dict(point)}})
+                for player_id, point in unsaved.items()
+            ], ordered=False)
+        except Exception:
+            # Keep them for the next attempt unless the player has moved since
+            self.unsaved = {**unsaved, **self.unsaved}
+            raise
+        return len(unsaved)
+
+    async def refresh(self, now: Optional[float] = None) -> int:
+        """Vouch for this worker's players and evict everyone nobody vouched for; returns evictions"""
+        now = now if now is not None else time.time()
+        await self.store.touch(self.local, now)
+        return await self.store.evict(now - POSITION_TTL)
+
+    async def start(self, db: AsyncIOMotorDatabase, redis_url: Optional[str] = None) -> None:
+        """Use Redis when it answers, otherwise this process's own grid"""
+        if self._task is not None:
+            return
+        if REDIS_AVAILABLE and redis_url:
+            client = aioredis.from_url(redis_url, encoding="utf-8", decode_responses=True)
+            try:
+                await client.ping()
+                self.store = RedisPositionStore(client)
+                logger.info("Player positions indexed in Redis")
+            except Exception as e:
+                logger.warning(f"Redis unavailable for player positions ({e}); indexing them in process")
+        await self.load(db)
+        self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self, db: AsyncIOMotorDatabase) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.persist(db)
+
+    async def _run(self, db: AsyncIOMotorDatabase):
+        while True:
+            await asyncio.sleep(PERSIST_INTERVAL)
+            try:
+                await self.persist(db)
+            except Exception as e:
+                logger.error(f"Failed to persist player positions: {e}")
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Failed to refresh player positions: {e}")
+
+
+# Shared by the WebSocket handlers and ability services
+position_index = PositionIndex()
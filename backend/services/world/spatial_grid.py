@@ -0,0 +1,77 @@
+"""Spatial hash grid - live entity positions bucketed into square cells on the x/y plane."""
+
+import math
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+Cell = Tuple[int, int]
+Point = Tuple[float, float, float]
+
+DEFAULT_CELL_SIZE = 100.0
+
+
+def as_point(location: Any) -> Optional[Point]:
+    """An ``{"x", "y", "z"}`` location as a point, or None if it isn't one."""
+    if not isinstance(location, dict):
+        return None
+    try:
+        point = (float(location["x"]), float(location["y"]), float(location.get("z", 0)))
+    except (KeyError, TypeError, ValueError):
+        return None
+    return point if all(math.isfinite(c) for c in point) else None
+
+
+class SpatialGrid:
+    """Entity positions hashed into square cells of ``cell_size``.
+
+    Moving an entity is O(1); finding the entities around a point only
+    visits the cells that overlap the area, so the cost tracks local
+    density rather than the total number of entities.
+    """
+
+    def __init__(self, cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self.positions: Dict[str, Point] = {}
+        self.cell_of: Dict[str, Cell] = {}
+        self.cells: Dict[Cell, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __contains__(self, entity_id: str) -> bool:
+        return entity_id in self.positions
+
+    def cell(self, x: float, y: float) -> Cell:
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def move(self, entity_id: str, point: Point) -> Tuple[Optional[Cell], Cell]:
+        """Place an entity at ``point``; returns (previous cell, new cell)"""
+        new_cell = self.cell(point[0], point[1])
+        old_cell = self.cell_of.get(entity_id)
+        self.positions[entity_id] = point
+        if old_cell != new_cell:
+            if old_cell is not None:
+                self._discard(entity_id, old_cell)
+            self.cells.setdefault(new_cell, set()).add(entity_id)
+            self.cell_of[entity_id] = new_cell
+        return old_cell, new_cell
+
+    def remove(self, entity_id: str) -> Optional[Cell]:
+        self.positions.pop(entity_id, None)
+        cell = self.cell_of.pop(entity_id, None)
+        if cell is not None:
+            self._discard(entity_id, cell)
+        return cell
+
+    def _discard(self, entity_id: str, cell: Cell) -> None:
+        members = self.cells.get(cell)
+        if members is not None:
+            members.discard(entity_id)
+            if not members:
+                del self.cells[cell]
+
+    def around(self, cell: Cell, rings: int = 1) -> Iterator[str]:
+        """Entities in the (2 * rings + 1) square block of cells centred on ``cell``"""
+        cx, cy = cell
+        for x in range(cx - rings, cx + rings + 1):
+            for y in range(cy - rings, cy + rings + 1):
+                yield from self.cells.get((x, y), ())
@@ -1,9 +1,18 @@
-"""AI Task Scheduler"""
+"""AI Task Scheduler
+
+Every worker builds the scheduler, but only the holder of the ``ai_scheduler``
+leader lease runs it; the others keep it paused, ready to take over.
+"""
 
 import logging
+from datetime import datetime
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from .leader_lease import LeaderLease
 
 logger = logging.getLogger(__name__)
 
@@ -12,7 +21,12 @@ class AIScheduler:
     """Schedules AI-related background tasks"""
 
     def __init__(self):
-        self.scheduler = AsyncIOScheduler()
+        # Resets happen at UTC midnight, matching the quest period keys
+        self.scheduler = AsyncIOScheduler(
+            timezone="UTC",
+            job_defaults={"coalesce": True, "misfire_grace_time": 60}
+        )
+        self.lease = LeaderLease("ai_scheduler", self.resume, self.pause)
         self.started = False
 
     def setup_tasks(self) -> None:
@@ -22,24 +36,70 @@ class AIScheduler:
             logger.warning("AI Scheduler already started")
             return
 
+        # Stage tomorrow's daily quests well before the midnight reset
+        self.scheduler.add_job(
+            self._prepare_daily_quests,
+            CronTrigger(hour=22, minute=0, timezone="UTC"),
+            id="daily_quest_pregeneration",
+            name="Pre-generate Daily Quests",
+            replace_existing=True
+        )
+
         # Daily quest generation at midnight
         self.scheduler.add_job(
             self._generate_daily_quests,
-            CronTrigger(hour=0, minute=0),
+            CronTrigger(hour=0, minute=0, timezone="UTC"),
             id="daily_quest_generation",
             name="Generate Daily Quests",
             replace_existing=True
         )
 
-        # Weekly challenge generation on Sunday at midnight
+        # Stage next week's quests on Sunday evening
+        self.scheduler.add_job(
+            self._prepare_weekly_challenges,
+            CronTrigger(day_of_week="sun", hour=20, minute=0, timezone="UTC"),
+            id="weekly_challenge_pregeneration",
+            name="Pre-generate Weekly Challenges",
+            replace_existing=True
+        )
+
+        # Weekly challenge generation at the Monday midnight reset
         self.scheduler.add_job(
             self._generate_weekly_challenges,
-            CronTrigger(day_of_week="sun", hour=0, minute=0),
+            CronTrigger(day_of_week="mon", hour=0, minute=0, timezone="UTC"),
             id="weekly_challenge_generation",
             name="Generate Weekly Challenges",
             replace_existing=True
         )
 
+        # Refresh materialized quest leaderboards that are due, starting straight away
+        self.scheduler.add_job(
+            self._refresh_quest_leaderboards,
+            IntervalTrigger(minutes=5),
+            next_run_time=datetime.utcnow(),
+            id="quest_leaderboard_refresh",
+            name="Refresh Quest Leaderboards",
+            replace_existing=True
+        )
+
+        # Pay out property income, investment accruals and dividends
+        self.scheduler.add_job(
+            self._run_economy_tick,
+            IntervalTrigger(hours=1),
+            id="economy_tick",
+            name="Economy Tick",
+            replace_existing=True
+        )
+
+        # Retry tournament matches whose battle failed to start
+        self.scheduler.add_job(
+            self._dispatch_tournament_matches,
+            IntervalTrigger(minutes=1),
+            id="tournament_match_dispatch",
+            name="Dispatch Tournament Matches",
+            replace_existing=True
+        )
+
         # Process karma queue every 5 minutes
         self.scheduler.add_job(
             self._process_karma_queue,
@@ -60,16 +120,28 @@ class AIScheduler:
 
         logger.info("AI tasks scheduled")
 
-    def start(self) -> None:
-        """Start the scheduler"""
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        """Start the scheduler paused; it runs while this process holds the lease"""
         if not self.started:
-            self.scheduler.start()
+            self.scheduler.start(paused=True)
             self.started = True
+            await self.lease.start(db)
             logger.info("AI Scheduler started")
 
-    def shutdown(self) -> None:
-        """Shutdown the scheduler"""
+    def resume(self) -> None:
+        if self.started:
+            self.scheduler.resume()
+            logger.info("AI Scheduler running in this worker")
+
+    def pause(self) -> None:
+        if self.started:
+            self.scheduler.pause()
+            logger.info("AI Scheduler paused in this worker")
+
+    async def shutdown(self, db: AsyncIOMotorDatabase) -> None:
+        """Shutdown the scheduler and hand the lease to another worker"""
         if self.started:
+            await self.lease.stop(db)
             self.scheduler.shutdown()
             self.started = False
             logger.info("AI Scheduler stopped")
@@ -80,12 +152,55 @@ class AIScheduler:
         logger.info("Running scheduled daily quest generation")
         await generate_daily_quests()
 
+    async def _prepare_daily_quests(self) -> None:
+        """Pre-generate next day's daily quests"""
+        from .quest_generator import prepare_daily_quests
+        logger.info("Running scheduled daily quest pre-generation")
+        await prepare_daily_quests()
+
+    async def _prepare_weekly_challenges(self) -> None:
+        """Pre-generate next week's weekly quests"""
+        from .quest_generator import prepare_weekly_challenges
+        logger.info("Running scheduled weekly challenge pre-generation")
+        await prepare_weekly_challenges()
+
     async def _generate_weekly_challenges(self) -> None:
         """Generate weekly challenges"""
         from .quest_generator import generate_weekly_challenges
         logger.info("Running scheduled weekly challenge generation")
         await generate_weekly_challenges()
 
+    async def _refresh_quest_leaderboards(self) -> None:
+        """Refresh quest leaderboard snapshots"""
+        from backend.core.database import get_database
+        from backend.services.quests.leaderboard import QuestLeaderboardService
+        logger.info("Running scheduled quest leaderboard refresh")
+        try:
+            await QuestLeaderboardService(get_database()).refresh_due()
+        except Exception as e:
+            logger.error(f"Error refreshing quest leaderboards: {e}")
+
+    async def _run_economy_tick(self) -> None:
+        """Run one economy tick over all players"""
+        from backend.core.database import get_database
+        from backend.services.economy.tick import EconomyTickEngine
+        logger.info("Running scheduled economy tick")
+        try:
+            await EconomyTickEngine(get_database()).run_tick()
+        except Exception as e:
+            logger.error(f"Error running economy tick: {e}")
+
+    async def _dispatch_tournament_matches(self) -> None:
+        """Start tournament matches left ready"""
+        from backend.core.database import get_database
+        from backend.services.tournaments.brackets import BracketEngine
+        try:
+            started = await BracketEngine(get_database()).dispatch_stalled()
+            if started:
+                logger.info(f"Dispatched {len(started)} stalled tournament matches")
+        except Exception as e:
+            logger.error(f"Error dispatching tournament matches: {e}")
+
     async def _process_karma_queue(self) -> None:
         """Process karma evaluation queue"""
         from .karma_processor import process_karma_queue
@@ -102,7 +217,7 @@ class AIScheduler:
 ai_scheduler = AIScheduler()
 
 
-def setup_ai_tasks() -> None:
+async def setup_ai_tasks(db: AsyncIOMotorDatabase) -> None:
     """Setup and start AI background tasks"""
     ai_scheduler.setup_tasks()
-    ai_scheduler.start()
+    await ai_scheduler.start(db)
@@ -0,0 +1,250 @@
+"""Deadline scheduler - a hierarchical timer wheel that fires expiries in concurrent batches."""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+from backend.monitoring.metrics import metrics_collector
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+# Slots per wheel level: seconds, minutes, hours; later deadlines wait in the overflow list
+WHEEL_SLOTS = (60, 60, 24)
+
+# Deadlines are reloaded from the database this often, for this far ahead
+RESYNC_INTERVAL = 300
+RESYNC_HORIZON = timedelta(minutes=10)
+
+DEADLINE_BATCH_SIZE = 200
+DEADLINE_CONCURRENCY = 8
+
+# handler(keys) -> number of deadlines actually applied
+DeadlineHandler = Callable[[List[str]], Awaitable[int]]
+# rehydrate(until) -> (key, due_at) of every pending deadline due before ``until``
+DeadlineLoader = Callable[[datetime], Awaitable[List[Tuple[str, datetime]]]]
+
+
+def to_tick(at: datetime) -> int:
+    """Whole second (rounded up) at which a UTC deadline is due"""
+    seconds = (at - EPOCH).total_seconds()
+    tick = int(seconds)
+    return tick if tick == seconds else tick + 1
+
+
+class TimerWheel:
+    """Hierarchical timer wheel with one-tick resolution.
+
+    Adding and cancelling are O(1). A deadline is placed on the lowest level
+    whose span covers it and moves down a level each time the slot above is
+    reached, so advancing only touches deadlines that are close to due.
+    Cancelled or rescheduled entries are dropped lazily when their slot comes
+    up.
+    """
+
+    def __init__(self, current: int = 0, slots: Tuple[int, ...] = WHEEL_SLOTS):
+        self.current = current
+        self.slots = slots
+        self.spans = [1]
+        for count in slots[:-1]:
+            self.spans.append(self.spans[-1] * count)
+        self.levels: List[List[List[Tuple[int, Hashable]]]] = [[[] for _ in range(count)] for count in slots]
+        self.overflow: List[Tuple[int, Hashable]] = []
+        self.entries: Dict[Hashable, int] = {}
+        self._ready: List[Tuple[int, Hashable]] = []
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, key: Hashable, due: int) -> None:
+        """Schedule ``key`` at tick ``due``, replacing any earlier deadline for it"""
+        self.entries[key] = due
+        self._place(key, due)
+
+    def cancel(self, key: Hashable) -> bool:
+        return self.entries.pop(key, None) is not None
+
+    def _place(self, key: Hashable, due: int) -> None:
+        delta = due - self.current
+        if delta <= 0:
+            self._ready.append((due, key))
+            return
+        for level, (span, count) in enumerate(zip(self.spans, self.slots)):
+            if delta < span * count:
+                self.levels[level][(due // span) % count].append((due, key))
+                return
+        self.overflow.append((due, key))
+
+    def advance(self, to: int) -> List[Tuple[Hashable, int]]:
+        """Move the wheel to tick ``to``; returns (key, due) of every deadline reached"""
+        fired = self._collect(self._ready)
+        self._ready = []
+        top = self.spans[-1] * self.slots[-1]
+
+        while self.current < to:
+            self.current += 1
+            tick = self.current
+            if tick % top == 0 and self.overflow:
+                pending, self.overflow = self.overflow, []
+                for due, key in pending:
+                    self._place(key, due)
+            # Cascade from the highest level so entries can fall through several levels at once
+            for level in range(len(self.slots) - 1, 0, -1):
+                span = self.spans[level]
+                if tick % span == 0:
+                    slot = self.levels[level][(tick // span) % self.slots[level]]
+                    self.levels[level][(tick // span) % self.slots[level]] = []
+                    for due, key in slot:
+                        self._place(key, due)
+            slot = self.levels[0][tick % self.slots[0]]
+            self.levels[0][tick % self.slots[0]] = []
+            fired.extend(self._collect(slot + self._ready))
+            self._ready = []
+
+        return fired
+
+    def _collect(self, slot: List[Tuple[int, Hashable]]) -> List[Tuple[Hashable, int]]:
+        fired = []
+        for due, key in slot:
+            if self.entries.get(key) == due:
+                del self.entries[key]
+                fired.append((key, due))
+        return fired
+
+
+class DeadlineKind:
+    def __init__(self, handler: DeadlineHandler, rehydrate: Optional[DeadlineLoader]):
+        self.handler = handler
+        self.rehydrate = rehydrate
+
+
+class DeadlineScheduler:
+    """Fires registered deadline kinds (training completion, item expiry) when due.
+
+    Services call ``schedule`` when they create a deadline. Every second the
+    wheel advances and due keys are grouped by kind and handed to the kind's
+    handler in batches of ``batch_size``, at most ``concurrency`` batches at a
+    time. Handlers must be idempotent: the same deadline can fire twice
+    (e.g. from two processes), and missed ones are picked up by ``rehydrate``,
+    which reloads pending deadlines from the database on start and every
+    ``RESYNC_INTERVAL``.
+    """
+
+    def __init__(self, batch_size: int = DEADLINE_BATCH_SIZE, concurrency: int = DEADLINE_CONCURRENCY):
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.wheel = TimerWheel(int(time.time()))
+        self.kinds: Dict[str, DeadlineKind] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._dispatches: set = set()
+        self._last_resync = 0.0
+
+    def register(self, kind: str, handler: DeadlineHandler, rehydrate: Optional[DeadlineLoader] = None) -> None:
+        self.kinds[kind] = DeadlineKind(handler, rehydrate)
+        if self._task is not None and rehydrate is not None:
+            asyncio.create_task(self._rehydrate_logged(kind))
+
+    def schedule(self, kind: str, key: str, due_at: datetime) -> None:
+        self.wheel.add((kind, key), to_tick(due_at))
+
+    def cancel(self, kind: str, key: str) -> bool:
+        return self.wheel.cancel((kind, key))
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+    async def rehydrate(self) -> int:
+        """Load every registered kind's deadlines due within ``RESYNC_HORIZON``"""
+        self._last_resync = time.monotonic()
+        loaded = 0
+        for kind in list(self.kinds):
+            loaded += await self._rehydrate_logged(kind)
+        return loaded
+
+    async def _rehydrate_logged(self, kind: str) -> int:
+        loader = self.kinds[kind].rehydrate
+        if loader is None:
+            return 0
+        try:
+            deadlines = await loader(datetime.utcnow() + RESYNC_HORIZON)
+        except Exception as e:
+            logger.error(f"Failed to load {kind} deadlines: {e}")
+            return 0
+        for key, due_at in deadlines:
+            self.schedule(kind, key, due_at)
+        return len(deadlines)
+
+    async def _run(self):
+        await self.rehydrate()
+        while True:
+            now = time.time()
+            await asyncio.sleep(int(now) + 1 - now)
+            due = self.wheel.advance(int(time.time()))
+            if due:
+                task = asyncio.create_task(self.dispatch(due))
+                self._dispatches.add(task)
+                task.add_done_callback(self._dispatches.discard)
+            if time.monotonic() - self._last_resync >= RESYNC_INTERVAL:
+                await self.rehydrate()
+
+    async def dispatch(self, due: List[Tuple[Tuple[str, str], int]]) -> None:
+        """Run the handlers for a set of due (kind, key) deadlines"""
+        by_kind: Dict[str, List[Tuple[str, int]]] = {}
+        for (kind, key), due_tick in due:
+            by_kind.setdefault(kind, []).append((key, due_tick))
+        await asyncio.gather(*(self._fire(kind, entries) for kind, entries in by_kind.items()))
+
+    async def _fire(self, kind: str, entries: List[Tuple[str, int]]):
+        registered = self.kinds.get(kind)
+        if registered is None:
+            logger.warning(f"Dropping {len(entries)} deadlines of unregistered kind {kind}")
+            return
+
+        started = time.perf_counter()
+        fired_at = time.time()
+        latencies = [max(fired_at - due_tick, 0.0) for _, due_tick in entries]
+        keys = [key for key, _ in entries]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_batch(batch: List[str]) -> int:
+            async with semaphore:
+                try:
+                    return await registered.handler(batch)
+                except Exception as e:
+                    # Left for the next resync to pick up again
+                    logger.error(f"Failed to process {len(batch)} {kind} deadlines: {e}")
+                    return 0
+
+        batches = [keys[i:i + self.batch_size] for i in range(0, len(keys), self.batch_size)]
+        applied = await asyncio.gather(*(run_batch(batch) for batch in batches))
+
+        metrics_collector.record_job(
+            f"deadline_{kind}",
+            time.perf_counter() - started,
+            items=len(keys),
+            applied=sum(applied),
+            batches=len(batches),
+            expiry_latency_ms=round(sum(latencies) / len(latencies) * 1000, 2),
+            max_expiry_latency_ms=round(max(latencies) * 1000, 2)
+        )
+
+
+# Shared by every service in this process
+deadline_scheduler = DeadlineScheduler()
@@ -0,0 +1,105 @@
+"""Leader lease - keeps cluster-wide background work to one worker process.
+
+The backend runs under ``uvicorn --workers 4``, so everything started from
+the startup hook runs once per worker. Work that must happen once per
+cluster is gated on a lease document in ``leader_leases``: the holder renews
+it every ``RENEW_INTERVAL`` seconds, and when it stops renewing (crash,
+shutdown) the lease lapses after ``LEASE_TTL`` and another worker takes over.
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+LEASE_TTL = timedelta(seconds=30)
+RENEW_INTERVAL = 10.0
+
+
+class LeaderLease:
+    """A named lease held by at most one process at a time.
+
+    ``on_acquired`` and ``on_lost`` are called from the renew loop whenever
+    this process gains or loses the lease.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        on_acquired: Callable[[], None],
+        on_lost: Callable[[], None],
+        ttl: timedelta = LEASE_TTL,
+        renew_interval: float = RENEW_INTERVAL
+    ):
+        self.name = name
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.on_acquired = on_acquired
+        self.on_lost = on_lost
+        self.ttl = ttl
+        self.renew_interval = renew_interval
+        self.held = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def try_acquire(self, db: AsyncIOMotorDatabase) -> bool:
+        """Take the lease if it is free or lapsed, or renew it if already ours"""
+        now = datetime.utcnow()
+        try:
+            await db.leader_leases.update_one(
+                {"_id": self.name, "$or": [{"owner": self.owner}, {"expires_at": {"$lt": now}}]},
+                {"$set": {"owner": self.owner, "expires_at": now + self.ttl}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Held by another live process
+            return False
+        return True
+
+    async def release(self, db: AsyncIOMotorDatabase) -> None:
+        await db.leader_leases.delete_one({"_id": self.name, "owner": self.owner})
+
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        if self._task is None:
+            await self._renew(db)
+            self._task = asyncio.create_task(self._run(db))
+
+    async def stop(self, db: AsyncIOMotorDatabase) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.held:
+            self.held = False
+            self.on_lost()
+            await self.release(db)
+
+    async def _renew(self, db: AsyncIOMotorDatabase) -> None:
+        try:
+            held = await self.try_acquire(db)
+        except Exception as e:
+            # Without MongoDB we can't prove the lease is still ours
+            logger.error(f"Could not renew leader lease {self.name}: {e}")
+            held = False
+        if held and not self.held:
+            logger.info(f"Acquired leader lease {self.name} ({self.owner})")
+            self.held = True
+            self.on_acquired()
+        elif not held and self.held:
+            logger.warning(f"Lost leader lease {self.name} ({self.owner})")
+            self.held = False
+            self.on_lost()
+
+    async def _run(self, db: AsyncIOMotorDatabase) -> None:
+        while True:
+            await asyncio.sleep(self.renew_interval)
+            await self._renew(db)
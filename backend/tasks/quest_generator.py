@@ -13,39 +13,54 @@ class QuestGeneratorTask:
         self.last_daily_generation = None
         self.last_weekly_generation = None
 
-    async def generate_daily_quests_for_all(self) -> int:
-        """Generate daily quests for all active players"""
+    async def prepare_quests_for_next_period(self, period: str) -> int:
+        """Pre-generate next period's daily/weekly quests ahead of the reset"""
 
-        logger.info("Starting daily quest generation for all players")
+        logger.info(f"Pre-generating next {period} quests for active players")
 
         try:
             # Import here to avoid circular imports
+            from backend.core.database import get_database
+            from backend.services.quests.reset_pipeline import QuestResetPipeline
+
+            result = await QuestResetPipeline(get_database()).pregenerate(period)
+            return result["quests"]
+
+        except Exception as e:
+            logger.error(f"Error pre-generating {period} quests: {e}")
+            return 0
 
-            # Get all active players (logged in within last 7 days)
-            # cutoff_date = datetime.utcnow() - timedelta(days=7)  # Unused for now - placeholder for future
+    async def _activate_period(self, period: str) -> int:
+        """Swap in the pre-generated quests of the period that just started"""
+        from backend.core.database import get_database
+        from backend.services.quests.reset_pipeline import QuestResetPipeline
 
-            # This is a placeholder - actual implementation would query database
-            # players = await db.players.find({"last_login": {"$gte": cutoff_date}}).to_list(length=100)
+        result = await QuestResetPipeline(get_database()).activate(period)
+        return result["activated"]
+
+    async def generate_daily_quests_for_all(self) -> int:
+        """Activate pre-generated daily quests for all active players"""
 
-            # For now, just log
-            logger.info("Would generate daily quests for active players")
+        logger.info("Starting daily quest generation for all players")
 
+        try:
+            activated = await self._activate_period("daily")
             self.last_daily_generation = datetime.utcnow()
-            return 0
+            return activated
 
         except Exception as e:
             logger.error(f"Error generating daily quests: {e}")
             return 0
 
     async def generate_weekly_challenges_for_all(self) -> int:
-        """Generate weekly challenges for all active players"""
+        """Activate pre-generated weekly quests for all active players"""
 
         logger.info("Starting weekly challenge generation for all players")
 
         try:
-            # Similar to daily quest generation
+            activated = await self._activate_period("weekly")
             self.last_weekly_generation = datetime.utcnow()
-            return 0
+            return activated
 
         except Exception as e:
             logger.error(f"Error generating weekly challenges: {e}")
@@ -78,6 +93,16 @@ async def generate_daily_quests() -> None:
         await quest_generator_task.generate_daily_quests_for_all()
 
 
+async def prepare_daily_quests() -> None:
+    """Background task to stage tomorrow's daily quests"""
+    await quest_generator_task.prepare_quests_for_next_period("daily")
+
+
+async def prepare_weekly_challenges() -> None:
+    """Background task to stage next week's weekly quests"""
+    await quest_generator_task.prepare_quests_for_next_period("weekly")
+
+
 async def generate_weekly_challenges() -> None:
     """Background task to generate weekly challenges"""
     if quest_generator_task.should_generate_weekly():
@@ -57,7 +57,7 @@ class SeasonalTasksManager:
     async def check_battle_pass_end(self):
         """Check if battle pass has ended."""
         try:
-            battle_pass = await self.bp_service.get_active_battle_pass()
+            battle_pass = await self.bp_service.get_active_battle_pass(summary_only=True)
             if not battle_pass:
                 logger.info("No active battle pass found")
                 return
@@ -4,6 +4,7 @@ import asyncio
 import random
 from motor.motor_asyncio import AsyncIOMotorClient
 from backend.services.world.item_spawn_service import ItemSpawnService
+from backend.tasks.deadline_scheduler import deadline_scheduler
 import os
 
 class WorldItemSpawnerTask:
@@ -22,12 +23,19 @@ class WorldItemSpawnerTask:
         self.running = True
         print("[WorldItemSpawner] Starting...")
         
+        # Expiries fire from the deadline scheduler instead of a polling sweep
+        await self.spawn_service.ensure_indexes()
+        deadline_scheduler.register(
+            "world_item",
+            self.spawn_service.expire_items,
+            self.spawn_service.pending_expiries
+        )
+        
         # Run all spawners concurrently
         await asyncio.gather(
             self._spawn_skills(),
             self._spawn_superpower_tools(),
-            self._spawn_meta_traits(),
-            self._cleanup_expired()
+            self._spawn_meta_traits()
         )
     
     async def stop(self):
@@ -91,23 +99,6 @@ class WorldItemSpawnerTask:
             except Exception as e:
                 print(f"[WorldItemSpawner] Error spawning meta trait: {e}")
                 await asyncio.sleep(30)
-    
-    async def _cleanup_expired(self):
-        """Clean up expired items every 5 minutes."""
-        while self.running:
-            try:
-                await asyncio.sleep(300)  # 5 minutes
-                
-                if not self.running:
-                    break
-                
-                count = await self.spawn_service.cleanup_expired_items()
-                if count > 0:
-                    print(f"[WorldItemSpawner] Cleaned up {count} expired items")
-            
-            except Exception as e:
-                print(f"[WorldItemSpawner] Error cleaning up: {e}")
-                await asyncio.sleep(30)
 
 # Global instance
 _spawner_task = None
@@ -68,6 +68,21 @@ class KarmaNexusUser(HttpUser):
         """View robot marketplace."""
         self.client.get("/api/robots/marketplace", headers=self.get_headers())
 
+    @task(1)
+    def browse_robots(self):
+        """Browse filtered marketplace pages by cursor."""
+        response = self.client.get(
+            "/api/robots/marketplace?sort=price_asc&max_price=50000&limit=20",
+            headers=self.get_headers()
+        )
+        if response.status_code == 200 and response.json().get("next_cursor"):
+            self.client.get(
+                f"/api/robots/marketplace?sort=price_asc&max_price=50000&limit=20"
+                f"&cursor={response.json()['next_cursor']}",
+                headers=self.get_headers(),
+                name="/api/robots/marketplace?cursor"
+            )
+
     @task(1)
     def view_guilds(self):
         """View guild list."""
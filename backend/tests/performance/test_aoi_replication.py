@@ -0,0 +1,71 @@
+"""Load benchmark: area-of-interest movement replication at 1k, 5k and 10k clients"""
+
+import random
+import time
+
+import pytest
+
+from backend.api.websocket.interest import AOI_CELL_SIZE, InterestManager
+from backend.api.websocket.manager import ConnectionManager
+
+TICKS = 5
+# Average players per grid cell, kept constant as the world grows with the player count
+PLAYERS_PER_CELL = 4
+
+
+class CountingSocket:
+    def __init__(self):
+        self.frames = 0
+
+    async def send_json(self, message):
+        self.frames += 1
+
+
+def _connected(clients):
+    connections = ConnectionManager()
+    for i in range(clients):
+        connections.active_connections[f"player_{i}"] = CountingSocket()
+    return connections
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("clients", [1000, 5000, 10000])
+async def test_aoi_replication_throughput(clients):
+    """Every client moves every tick; each recipient gets one frame per tick"""
+    connections = _connected(clients)
+    interest = InterestManager(connections)
+    rng = random.Random(clients)
+    side = AOI_CELL_SIZE * (clients / PLAYERS_PER_CELL) ** 0.5
+
+    locations = {
+        player_id: {"x": rng.uniform(0, side), "y": rng.uniform(0, side), "z": 0}
+        for player_id in connections.active_connections
+    }
+
+    frames = 0
+    ingest = elapsed = 0.0
+    for _ in range(TICKS):
+        moved = []
+        for player_id, location in locations.items():
+            location["x"] = min(max(location["x"] + rng.uniform(-5, 5), 0), side)
+            location["y"] = min(max(location["y"] + rng.uniform(-5, 5), 0), side)
+            moved.append((player_id, dict(location)))
+        start = time.perf_counter()
+        for player_id, location in moved:
+            interest.move(player_id, location)
+        ingest += time.perf_counter() - start
+
+        start = time.perf_counter()
+        frames += await interest.flush()
+        elapsed += time.perf_counter() - start
+
+    sent = sum(socket.frames for socket in connections.active_connections.values())
+    broadcast = TICKS * clients * (clients - 1)
+    print(f"\n{clients} clients: {sent / elapsed:,.0f} msgs/s, "
+          f"{(ingest + elapsed) / TICKS * 1000:.1f}ms/tick ({ingest / TICKS * 1000:.1f}ms ingesting moves), "
+          f"{sent} frames vs {broadcast} broadcast messages")
+
+    assert sent == frames
+    # At most one frame per recipient per tick
+    assert sent <= TICKS * clients
+    assert sent < broadcast / 50
@@ -0,0 +1,41 @@
+"""Latency benchmark: cooldown checks and claims against the in-process store"""
+
+import random
+import time
+
+import pytest
+
+from backend.services.cooldowns.service import CooldownService
+
+PLAYERS = 10000
+CHECKS = 20000
+TRAITS = ["hacking", "stealth", "leadership", "empathy", "greed", "arrogance"]
+
+
+@pytest.mark.asyncio
+async def test_cooldown_check_latency():
+    """Claims and per-player reads stay well under a millisecond"""
+    rng = random.Random(7)
+    service = CooldownService()
+    for i in range(PLAYERS):
+        for trait in rng.sample(TRAITS, 3):
+            await service.set(f"player_{i}", "trait", trait, rng.uniform(1, 3600))
+    uses = [(f"player_{rng.randrange(PLAYERS)}", rng.choice(TRAITS)) for _ in range(CHECKS)]
+
+    start = time.perf_counter()
+    claimed = 0
+    for player_id, trait in uses:
+        ok, _ = await service.claim(player_id, "trait", trait, 30)
+        claimed += ok
+    claim_ms = (time.perf_counter() - start) / CHECKS * 1000
+
+    start = time.perf_counter()
+    for player_id, _ in uses:
+        await service.all_for(player_id)
+    read_ms = (time.perf_counter() - start) / CHECKS * 1000
+
+    print(f"\nclaim: {claim_ms * 1000:.1f}us, all cooldowns for a player: {read_ms * 1000:.1f}us, "
+          f"{claimed}/{CHECKS} claims granted")
+    assert 0 < claimed < CHECKS
+    assert claim_ms < 0.1
+    assert read_ms < 0.1
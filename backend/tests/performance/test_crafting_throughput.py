@@ -0,0 +1,52 @@
+"""Throughput benchmark: batched craft queues against per-item crafting"""
+
+import random
+import time
+
+import pytest
+
+from backend.services.crafting.engine import CraftingEngine
+
+CRAFTS = 200
+
+
+async def _seed_crafter(test_db, player_id):
+    await test_db.players.insert_one({
+        "_id": player_id,
+        "level": 10,
+        "xp": 0,
+        "traits": {"engineering": 100},
+        "inventory": {
+            "scrap_metal": {"name": "Scrap Metal", "quantity": 5 * CRAFTS},
+            "circuits": {"name": "Circuits", "quantity": 2 * CRAFTS},
+        },
+    })
+
+
+@pytest.mark.asyncio
+async def test_batch_craft_vs_per_item(test_db):
+    """One craft-N call does the work of N single crafts in one inventory update"""
+    await _seed_crafter(test_db, "single_crafter")
+    await _seed_crafter(test_db, "batch_crafter")
+    engine = CraftingEngine(test_db, rng=random.Random(1))
+
+    start = time.perf_counter()
+    for _ in range(CRAFTS):
+        await engine.craft_queue("single_crafter", [("basic_robot_parts", 1)])
+    per_item = time.perf_counter() - start
+
+    start = time.perf_counter()
+    outcome = await engine.craft_queue("batch_crafter", [("basic_robot_parts", CRAFTS)])
+    batched = time.perf_counter() - start
+
+    print(f"\n{CRAFTS} crafts: per-item {per_item * 1000:.1f}ms, batched {batched * 1000:.1f}ms "
+          f"({per_item / batched:.0f}x)")
+
+    player = await test_db.players.find_one({"_id": "batch_crafter"})
+    crafted = outcome["results"][0]["quantity_crafted"]
+    inventory = player["inventory"]
+
+    assert inventory.get("scrap_metal", {}).get("quantity", 0) == 5 * (CRAFTS - crafted)
+    assert inventory["basic_robot_parts"]["quantity"] == crafted
+    assert player["xp"] == outcome["xp_gained"]
+    assert batched < per_item
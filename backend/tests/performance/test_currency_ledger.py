@@ -0,0 +1,64 @@
+"""Throughput benchmark: purchase storms against the currency ledger"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.services.economy.ledger import CurrencyLedger
+
+STARTING_CREDITS = 1000
+PURCHASE_PRICE = 10
+CONCURRENT_PURCHASES = 500
+
+
+@pytest.mark.asyncio
+async def test_purchase_storm_never_overdraws(test_db):
+    """Concurrent purchases succeed exactly as often as the balance allows"""
+    await test_db.players.insert_one({"_id": "storm_buyer", "currencies": {"credits": STARTING_CREDITS}})
+    ledger = CurrencyLedger(test_db)
+
+    async def purchase():
+        try:
+            await ledger.debit("storm_buyer", "credits", PURCHASE_PRICE)
+            return True
+        except ValueError:
+            return False
+
+    start = time.perf_counter()
+    outcomes = await asyncio.gather(*(purchase() for _ in range(CONCURRENT_PURCHASES)))
+    elapsed = time.perf_counter() - start
+    written = await ledger.writer.flush()
+
+    player = await test_db.players.find_one({"_id": "storm_buyer"})
+    entries = await test_db.currency_transactions.count_documents({"player_id": "storm_buyer"})
+
+    print(f"\n{CONCURRENT_PURCHASES} purchases in {elapsed * 1000:.1f}ms "
+          f"({CONCURRENT_PURCHASES / elapsed:.0f}/s), {written} entries in final flush")
+
+    assert sum(outcomes) == STARTING_CREDITS // PURCHASE_PRICE
+    assert player["currencies"]["credits"] == 0
+    assert entries == sum(outcomes)
+
+
+@pytest.mark.asyncio
+async def test_batch_transfers(test_db):
+    """A batch settles with one debit per sender and one bulk credit"""
+    await test_db.players.insert_many([
+        {"_id": f"sender_{i}", "currencies": {"credits": 100 if i % 2 else 0}} for i in range(100)
+    ] + [{"_id": "merchant", "currencies": {"credits": 0}}])
+    ledger = CurrencyLedger(test_db)
+
+    start = time.perf_counter()
+    results = await ledger.transfer_batch([
+        {"from_player_id": f"sender_{i}", "to_player_id": "merchant", "currency_type": "credits", "amount": 50}
+        for i in range(100)
+    ])
+    elapsed = time.perf_counter() - start
+    await ledger.writer.flush()
+
+    merchant = await test_db.players.find_one({"_id": "merchant"})
+    print(f"\n100 batched transfers in {elapsed * 1000:.1f}ms")
+
+    assert sum(result["success"] for result in results) == 50
+    assert merchant["currencies"]["credits"] == 2500
@@ -0,0 +1,81 @@
+"""Benchmark: one economy tick's computation over 100k players"""
+
+import random
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from backend.services.economy.tick import DEFAULT_CHUNK_SIZE, accrue_dividends, accrue_players
+
+PLAYERS = 100_000
+# Compute budget for a full tick, excluding database round-trips
+COMPUTE_BUDGET_SECONDS = 10.0
+
+
+def _synthetic_players(count):
+    rng = random.Random(7)
+    now = datetime(2026, 10, 19)
+    players = []
+    for i in range(count):
+        players.append({
+            "_id": f"player_{i}",
+            "properties": [{"passive_income": rng.choice([100, 300, 2000])} for _ in range(rng.randint(0, 3))],
+            "investments": [
+                {
+                    "id": f"inv_{j}",
+                    "amount_invested": 10000,
+                    "current_value": 10000.0,
+                    "expected_return": rng.choice([5.0, 12.0, 25.0]),
+                    "risk_level": rng.choice(["low", "medium", "high"]),
+                    "maturity_date": now + timedelta(days=90),
+                    "status": "active",
+                }
+                for j in range(rng.randint(0, 2))
+            ],
+            "economy": {"income_carry": rng.random()},
+        })
+    return players
+
+
+def test_tick_over_100k_players_within_budget():
+    players = _synthetic_players(PLAYERS)
+    portfolios = [
+        {"_id": i, "player_id": f"player_{i}", "holdings": {"ROBO": 10, "GUILD": 5}}
+        for i in range(PLAYERS)
+    ]
+    tickers = ["ROBO", "HACK", "MEDIC", "KARMA", "GUILD", "NEXUS"]
+    per_share = np.array([100 * 0.02, 75 * 0.01, 120 * 0.03, 90 * 0.04, 150 * 0.05, 0.0]) / 365
+    rng = np.random.default_rng(1)
+    now = datetime(2026, 10, 19)
+    elapsed_days = 1 / 24
+
+    start = time.perf_counter()
+    updates = 0
+    income = 0
+    for offset in range(0, PLAYERS, DEFAULT_CHUNK_SIZE):
+        chunk_updates, totals = accrue_players(players[offset:offset + DEFAULT_CHUNK_SIZE], elapsed_days, now, rng)
+        updates += len(chunk_updates)
+        income += totals["property_income"]
+        accrue_dividends(portfolios[offset:offset + DEFAULT_CHUNK_SIZE], tickers, per_share, elapsed_days)
+    elapsed = time.perf_counter() - start
+
+    print(f"\nTick compute for {PLAYERS} players: {elapsed:.2f}s, {income} credits of property income")
+
+    assert updates == PLAYERS
+    assert elapsed < COMPUTE_BUDGET_SECONDS
+
+
+def test_fractional_income_carries_over():
+    player = {"_id": "p", "properties": [{"passive_income": 100}], "investments": []}
+    rng = np.random.default_rng(0)
+    now = datetime(2026, 10, 19)
+
+    paid = 0
+    for _ in range(24):
+        updates, totals = accrue_players([player], 1 / 24, now, rng)
+        player["economy"] = {"income_carry": updates[0]._doc["$set"]["economy.income_carry"]}
+        paid += totals["property_income"]
+
+    # 24 hourly ticks pay a full day's income despite 4.17 credits per tick
+    assert paid in (99, 100)
@@ -0,0 +1,90 @@
+"""Contention benchmark: many guilds fighting over one territory and one war"""
+
+import asyncio
+import time
+
+import pytest
+
+from backend.services.guilds.territories import TerritoryService
+from backend.services.guilds.wars import GuildWarService
+
+ATTACKING_GUILDS = 50
+WAR_CONTRIBUTIONS = 2000
+
+
+async def _seed_guilds(test_db, count):
+    guilds = [
+        {
+            "id": f"guild_{i}",
+            "name": f"Guild {i}",
+            "tag": f"G{i}",
+            "level": i + 1,
+            "total_members": 10,
+            "controlled_territories": [],
+            "active_wars": [],
+        }
+        for i in range(count)
+    ]
+    await test_db.guilds.insert_many(guilds)
+    return [guild["id"] for guild in guilds]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_territory_attacks(test_db):
+    """Every guild attacks the same territory at once; ownership stays consistent"""
+    guild_ids = await _seed_guilds(test_db, ATTACKING_GUILDS)
+    await test_db.territories.insert_one({
+        "territory_id": 1,
+        "name": "Central Plaza",
+        "description": "The heart of the city",
+        "controlling_guild_id": None,
+        "contested": False,
+        "defense_level": 1,
+        "version": 0,
+    })
+
+    async def attack(guild_id):
+        try:
+            return await TerritoryService(test_db).attack_territory(1, guild_id)
+        except ValueError as e:
+            return {"success": False, "message": str(e)}
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(attack(guild_id) for guild_id in guild_ids))
+    elapsed = time.perf_counter() - start
+
+    captures = sum(1 for result in results if result["success"])
+    territory = await test_db.territories.find_one({"territory_id": 1})
+    holders = await test_db.guilds.find(
+        {"controlled_territories": 1}, projection={"id": 1}
+    ).to_list(length=None)
+
+    print(f"\n{ATTACKING_GUILDS} concurrent attacks in {elapsed * 1000:.1f}ms, {captures} captures")
+
+    # Each successful capture is exactly one ownership change
+    assert territory["version"] == captures
+    assert [holder["id"] for holder in holders] == [territory["controlling_guild_id"]]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_war_points(test_db):
+    """Coalesced war points add up exactly under heavy concurrency"""
+    attacker_id, defender_id = await _seed_guilds(test_db, 2)
+    service = GuildWarService(test_db)
+    war = await service.declare_war(attacker_id, defender_id)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        service.add_war_points(war.id, attacker_id if i % 2 else defender_id, 1)
+        for i in range(WAR_CONTRIBUTIONS)
+    ))
+    await service.points.flush()
+    elapsed = time.perf_counter() - start
+
+    stored = await test_db.guild_wars.find_one({"id": war.id})
+    print(f"\n{WAR_CONTRIBUTIONS} war point contributions applied in {elapsed * 1000:.1f}ms")
+
+    # 1000 points each: both reach the threshold, the war ends exactly once
+    assert stored["attacker_points"] + stored["defender_points"] == WAR_CONTRIBUTIONS
+    assert stored["status"] == "ended"
+    assert stored["winner_guild_id"] == attacker_id
@@ -0,0 +1,42 @@
+"""Benchmark: validating a projected player view against the full Player model"""
+
+import time
+
+from backend.models.player.player import Player
+from backend.models.player.views import PlayerEconomy
+
+ROUNDS = 2000
+
+
+def _project(doc, projection):
+    """What MongoDB would return for ``projection``"""
+    projected = {"_id": doc["_id"]}
+    for path in projection:
+        head, _, rest = path.partition(".")
+        if head not in doc:
+            continue
+        if rest:
+            projected.setdefault(head, {})[rest] = doc[head][rest]
+        else:
+            projected[head] = doc[head]
+    return projected
+
+
+def test_projected_view_validates_faster():
+    """An action target read validates several times faster through its view"""
+    doc = Player(username="target", email="target@example.com", password_hash="x").model_dump(by_alias=True)
+    projected = _project(doc, PlayerEconomy.projection(traits=["perception", "survival_instinct"]))
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        Player(**doc)
+    full_us = (time.perf_counter() - start) / ROUNDS * 1e6
+
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        PlayerEconomy(**projected)
+    view_us = (time.perf_counter() - start) / ROUNDS * 1e6
+
+    print(f"\nfull Player: {full_us:.1f}us, economy view: {view_us:.1f}us, "
+          f"{len(doc['traits']) + len(doc['meta_traits'])} -> {len(projected['traits']) + len(projected['meta_traits'])} traits")
+    assert view_us * 2 < full_us
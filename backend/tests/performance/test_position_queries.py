@@ -0,0 +1,43 @@
+"""Latency benchmark: position index range and nearest queries with 10k online players"""
+
+import asyncio
+import random
+import time
+
+import pytest
+
+from backend.services.world.position_index import PositionIndex
+
+PLAYERS = 10000
+QUERIES = 2000
+WORLD_SIDE = 5000
+
+
+@pytest.mark.parametrize("query", ["within_100", "within_500", "nearest_10"])
+def test_position_query_latency(query):
+    """Ranged ability lookups stay sub-millisecond without touching the database"""
+    asyncio.run(_measure(query))
+
+
+async def _measure(query):
+    rng = random.Random(5)
+    index = PositionIndex()
+    for i in range(PLAYERS):
+        await index.update(f"player_{i}", {"x": rng.uniform(0, WORLD_SIDE), "y": rng.uniform(0, WORLD_SIDE), "z": 0})
+    centers = [{"x": rng.uniform(0, WORLD_SIDE), "y": rng.uniform(0, WORLD_SIDE), "z": 0} for _ in range(QUERIES)]
+
+    run = {
+        "within_100": lambda center: index.within(center, 100),
+        "within_500": lambda center: index.within(center, 500),
+        "nearest_10": lambda center: index.nearest(center, 10),
+    }[query]
+
+    found = 0
+    start = time.perf_counter()
+    for center in centers:
+        found += len(await run(center))
+    per_query_ms = (time.perf_counter() - start) / QUERIES * 1000
+
+    print(f"\n{query}: {per_query_ms:.3f}ms/query, {found / QUERIES:.1f} players per result")
+    assert found > 0
+    assert per_query_ms < 1.0
@@ -0,0 +1,31 @@
+"""Benchmark: building and pairing brackets for a large tournament"""
+
+import random
+import time
+
+from backend.services.tournaments.brackets import elimination_matches, swiss_pairings
+
+PLAYERS = 4096
+
+
+def test_large_brackets_build_quickly():
+    """A 4096-player double elimination bracket and a Swiss round pair well under a second"""
+    players = [f"player_{i}" for i in range(PLAYERS)]
+
+    start = time.perf_counter()
+    matches = elimination_matches("t", players, double=True)
+    double_ms = (time.perf_counter() - start) * 1000
+
+    rng = random.Random(5)
+    standings = [
+        {"player_id": player, "wins": rng.randint(0, 6), "opponents": rng.sample(players, 6)}
+        for player in players
+    ]
+    start = time.perf_counter()
+    pairs, bye = swiss_pairings(standings)
+    swiss_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n{PLAYERS} players: double elimination {len(matches)} matches in {double_ms:.1f}ms, "
+          f"swiss round of {len(pairs)} pairs in {swiss_ms:.1f}ms")
+    assert len(matches) == 2 * PLAYERS - 2 and len(pairs) == PLAYERS // 2 and bye is None
+    assert double_ms < 1000 and swiss_ms < 1000
@@ -0,0 +1,28 @@
+"""Throughput benchmark: superpower eligibility and top traits across a leaderboard"""
+
+import time
+
+import numpy as np
+
+from backend.services.player.superpowers import SUPERPOWER_REQUIREMENTS
+from backend.services.player.trait_engine import TRAIT_COUNT, TRAIT_DTYPE, top_traits
+
+PLAYERS = 10000
+
+
+def test_batched_eligibility_and_top_traits():
+    """All 25 powers and the top 10 traits for 10k players in well under a second"""
+    rng = np.random.default_rng(7)
+    matrix = rng.uniform(0, 100, size=(PLAYERS, TRAIT_COUNT)).astype(TRAIT_DTYPE)
+
+    start = time.perf_counter()
+    eligible = SUPERPOWER_REQUIREMENTS.eligible(matrix)
+    progress = SUPERPOWER_REQUIREMENTS.progress(matrix)
+    top = top_traits(matrix, 10)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print(f"\n{PLAYERS} players: {elapsed_ms:.1f}ms, {int(eligible.sum())} power unlocks available")
+    assert eligible.shape == progress.shape == (PLAYERS, len(SUPERPOWER_REQUIREMENTS))
+    assert top.shape == (PLAYERS, 10)
+    assert (np.take_along_axis(matrix, top[:, :1], axis=1)[:, 0] == matrix.max(axis=1)).all()
+    assert elapsed_ms < 500
@@ -0,0 +1,173 @@
+"""Benchmark: columnar trait snapshot buckets vs one document per snapshot"""
+
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta
+
+import bson
+import numpy as np
+from pymongo.errors import DuplicateKeyError
+
+from backend.models.player.traits import ALL_TRAIT_FIELDS
+from backend.services.tasks.trait_evolution_tracker import TraitEvolutionTracker
+from backend.services.tasks.trait_snapshot_store import (
+    BUCKET_CAPACITY,
+    TraitSnapshotStore,
+    decode_bucket,
+    encode_traits,
+)
+
+# One full bucket: 4 automatic snapshots a day plus task completions
+SNAPSHOTS_PER_MONTH = BUCKET_CAPACITY
+TRAITS_CHANGED_PER_SNAPSHOT = 4
+PLAYER_ID = "player0123"
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        value = doc.get(key)
+        if isinstance(condition, dict):
+            if "$exists" in condition and (key in doc) != condition["$exists"]:
+                return False
+            if "$lt" in condition and not (value is not None and value < condition["$lt"]):
+                return False
+            if "$gte" in condition and not (value is not None and value >= condition["$gte"]):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys, direction=1):
+        keys = [(keys, direction)] if isinstance(keys, str) else keys
+        for key, order in reversed(keys):
+            self.docs.sort(key=lambda doc: doc[key], reverse=order < 0)
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs if length is None else self.docs[:length]
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Collection:
+    """Holds documents as BSON so every read pays the decode cost MongoDB clients do"""
+
+    def __init__(self):
+        self.raw = {}
+
+    def find(self, query, projection=None):
+        return _Cursor([doc for doc in map(bson.decode, self.raw.values()) if _matches(doc, query)])
+
+    async def insert_many(self, docs, ordered=True):
+        for doc in docs:
+            doc.setdefault("_id", len(self.raw))
+            self.raw[doc["_id"]] = bson.encode(doc)
+
+    async def update_one(self, query, update, upsert=False):
+        for doc in map(bson.decode, self.raw.values()):
+            if _matches(doc, query):
+                doc.update(update["$set"])
+                self.raw[doc["_id"]] = bson.encode(doc)
+                return
+        if not upsert:
+            return
+        if query["_id"] in self.raw:
+            raise DuplicateKeyError("duplicate _id")
+        self.raw[query["_id"]] = bson.encode({"_id": query["_id"], **update["$set"]})
+
+
+class _Db:
+    def __init__(self):
+        self.trait_snapshots = _Collection()
+        self.trait_snapshot_buckets = _Collection()
+        self.schema_migrations = _Collection()
+        self.task_history = _Collection()
+
+
+def _simulate_month():
+    rng = random.Random(42)
+    traits = {name: 50.0 for name in ALL_TRAIT_FIELDS}
+    start = datetime(2026, 10, 1)
+    history = []
+    for i in range(SNAPSHOTS_PER_MONTH):
+        for name in rng.sample(ALL_TRAIT_FIELDS, TRAITS_CHANGED_PER_SNAPSHOT):
+            traits[name] = max(0.0, min(100.0, round(traits[name] + rng.uniform(-3, 3), 1)))
+        history.append((start + timedelta(minutes=72 * i), dict(traits)))
+    return history
+
+
+def _migrated_db(history):
+    """Legacy documents for one player-month, then migrated into buckets by the store"""
+    db = _Db()
+    asyncio.run(db.trait_snapshots.insert_many([
+        {
+            "_id": f"snapshot_{timestamp:%Y%m%d%H%M%S}_player01",
+            "player_id": PLAYER_ID,
+            "timestamp": timestamp,
+            "traits": traits,
+            "source": "automatic",
+        }
+        for timestamp, traits in history
+    ]))
+    assert asyncio.run(TraitSnapshotStore(db).migrate_documents()) == len(history)
+    return db
+
+
+def _time_milestones(tracker, rounds=20):
+    loop = asyncio.new_event_loop()
+    try:
+        result = loop.run_until_complete(tracker.get_trait_milestones(PLAYER_ID, "empathy"))
+        start = time.perf_counter()
+        for _ in range(rounds):
+            loop.run_until_complete(tracker.get_trait_milestones(PLAYER_ID, "empathy"))
+        return result, (time.perf_counter() - start) / rounds
+    finally:
+        loop.close()
+
+
+def test_migration_roundtrip_matches_snapshots():
+    """Migrated buckets reproduce every snapshot to float32 precision, once"""
+    history = _simulate_month()
+    db = _migrated_db(history)
+
+    buckets = list(map(bson.decode, db.trait_snapshot_buckets.raw.values()))
+    assert [bucket["seq"] for bucket in buckets] == [-1]
+    values = decode_bucket(buckets[0])
+    expected = np.vstack([encode_traits(traits) for _, traits in history])
+    assert values.shape == (SNAPSHOTS_PER_MONTH, len(ALL_TRAIT_FIELDS))
+    assert np.allclose(values, expected, atol=1e-3)
+
+    # Completed: other workers and later restarts skip it
+    assert asyncio.run(TraitSnapshotStore(db).migrate_documents()) == 0
+
+
+def test_storage_and_query_per_player_month():
+    """Columnar storage is an order of magnitude smaller and faster to query"""
+    db = _migrated_db(_simulate_month())
+    legacy_bytes = sum(map(len, db.trait_snapshots.raw.values()))
+    columnar_bytes = sum(map(len, db.trait_snapshot_buckets.raw.values()))
+
+    legacy_result, legacy_time = _time_milestones(TraitEvolutionTracker(db, storage_mode="documents"))
+    columnar_result, columnar_time = _time_milestones(TraitEvolutionTracker(db, storage_mode="columnar"))
+
+    print("\nTrait snapshot storage per player-month:")
+    print(f"Documents: {legacy_bytes / 1024:.1f} KiB, {legacy_time * 1000:.2f} ms per milestone query")
+    print(f"Columnar:  {columnar_bytes / 1024:.1f} KiB, {columnar_time * 1000:.2f} ms per milestone query")
+
+    assert columnar_result and columnar_result == legacy_result
+    assert legacy_bytes / columnar_bytes >= 10, "Columnar storage should be 10x smaller"
+    assert legacy_time / columnar_time >= 10, "Columnar milestone query should be 10x faster"
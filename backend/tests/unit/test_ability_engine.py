@@ -0,0 +1,42 @@
+"""Unit tests for the data-driven ability engine."""
+import pytest
+
+from backend.services.player.trait_ability_service import TRAIT_ABILITIES
+from backend.services.traits.ability_engine import ABILITY_ACTIONS, AbilityEngine
+from backend.services.traits.target_effects import distinct_targets
+from backend.services.world.position_index import position_index
+
+
+class TestAbilityEngine:
+    """Test ability definitions and the checks made before anything is spent."""
+
+    def test_every_action_has_a_trait_config(self):
+        for action in ABILITY_ACTIONS.values():
+            assert action.trait_id in TRAIT_ABILITIES
+
+    def test_targets_are_distinct_and_exclude_the_caster(self):
+        assert distinct_targets(["b", "me", "a", "b"], "me") == ["b", "a"]
+
+    @pytest.mark.asyncio
+    async def test_missing_target_is_refused_before_claiming(self):
+        # No database: a refusal here must not reach it
+        engine = AbilityEngine(None)
+
+        with pytest.raises(ValueError, match="Target ally ID required"):
+            await engine.execute({"_id": "p1"}, "emotional_shield")
+        with pytest.raises(ValueError, match="Position not available"):
+            await engine.execute({"_id": "p1"}, "rally_cry")
+        with pytest.raises(ValueError, match="Unknown ability"):
+            await engine.execute({"_id": "p1"}, "fireball")
+
+    @pytest.mark.asyncio
+    async def test_range_is_checked_against_live_positions(self):
+        engine = AbilityEngine(None)
+        player = {"_id": "hacker", "position": {"x": 0, "y": 0, "z": 0}}
+        await position_index.update("far_target", {"x": 150, "y": 0, "z": 0}, persist=False)
+        try:
+            with pytest.raises(ValueError, match="need within 100m"):
+                await engine.execute(player, "credit_hack", "far_target")
+            assert await engine.in_range(player, "far_target", 200)
+        finally:
+            await position_index.remove("far_target")
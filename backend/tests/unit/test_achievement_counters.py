@@ -0,0 +1,108 @@
+"""Unit tests for counter-based task achievement evaluation."""
+from datetime import date
+
+import pytest
+
+from backend.services.achievements.achievement_service import AchievementService
+from backend.services.tasks.task_achievement_manager import (
+    TASK_ACHIEVEMENT_INDEX,
+    add_counts,
+    current_counters,
+    requirement_met,
+    task_counter_increments,
+    trailing_streak,
+)
+
+
+def ids(definitions):
+    return {definition["id"] for definition in definitions}
+
+
+class TestTaskAchievementCounters:
+    """Test counter increments, subscriptions and requirement checks."""
+
+    def test_increments_for_a_completed_task(self):
+        increments = task_counter_increments({
+            "task_type": "coop", "difficulty": "legendary", "karma_change": 5,
+            "time_taken_minutes": 10, "duration_minutes": 60
+        })
+
+        assert increments == {
+            "total_tasks": 1, "task_type.coop": 1, "difficulty.legendary": 1,
+            "karma_tasks.positive": 1, "fast_completion": 1
+        }
+
+    def test_unsafe_values_are_not_counted(self):
+        assert task_counter_increments({"task_type": "a.b", "difficulty": "$x"}) == {"total_tasks": 1}
+
+    def test_only_subscribed_achievements_are_affected(self):
+        affected = ids(TASK_ACHIEVEMENT_INDEX.affected(["task_type.coop"]))
+
+        # Variety watches every task type, team_player just co-op
+        assert affected == {"team_player", "versatile"}
+        assert ids(TASK_ACHIEVEMENT_INDEX.affected(["total_tasks"])) == {
+            "first_task", "task_10", "task_50", "task_100"
+        }
+
+    def test_requirements_read_counters(self):
+        counters = {}
+        for _ in range(20):
+            add_counts(counters, {"total_tasks": 1, "task_type.coop": 1})
+        add_counts(counters, {"task_type.competitive": 1})
+
+        assert requirement_met({"type": "total_tasks", "value": 10}, counters)
+        assert requirement_met({"type": "task_type", "task_type": "coop", "value": 20}, counters)
+        assert not requirement_met({"type": "variety", "value": 5}, counters)
+        assert not requirement_met({"type": "karma_balance", "days": 30}, counters)
+
+    def test_streak_only_counts_when_current(self):
+        days = [date(2026, 3, d) for d in (1, 3, 4, 5)]
+
+        assert trailing_streak(days) == (3, date(2026, 3, 5))
+        progress = {"counters": {"streak": 3}, "last_task_day": "2026-03-05"}
+        assert current_counters(progress, date(2026, 3, 5))["streak"] == 3
+        assert current_counters(progress, date(2026, 3, 7))["streak"] == 0
+
+
+class _Result:
+    def __init__(self, modified_count):
+        self.modified_count = modified_count
+
+
+class _Players:
+    def __init__(self, player):
+        self.player = player
+        self.projections = []
+
+    async def find_one(self, query, projection=None):
+        self.projections.append(projection)
+        return self.player
+
+    async def update_one(self, query, update):
+        unlocked = self.player.setdefault("achievements", {}).setdefault("unlocked_achievements", [])
+        if any(a["achievement_id"] == query["achievements.unlocked_achievements.achievement_id"]["$ne"]
+               for a in unlocked):
+            return _Result(0)
+        unlocked.extend([update["$push"]["achievements.unlocked_achievements"]])
+        return _Result(1)
+
+
+class _Db:
+    def __init__(self, player):
+        self.players = _Players(player)
+
+
+class TestPlayerFieldAchievements:
+    """Test unlocking achievements from changed player fields."""
+
+    @pytest.mark.asyncio
+    async def test_trait_change_unlocks_once(self):
+        db = _Db({"_id": "p1", "traits": {"empathy": 100}})
+
+        first = await AchievementService.award_changed(db, "p1", ["traits.empathy"])
+        again = await AchievementService.award_changed(db, "p1", ["traits.empathy"])
+
+        assert "trait_master_empathy" in {d.achievement_id for d in first}
+        assert again == []
+        # "traits" is read whole for mastered-trait counts, so not also per trait
+        assert "traits.empathy" not in db.players.projections[0]
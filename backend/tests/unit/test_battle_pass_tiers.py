@@ -0,0 +1,38 @@
+"""Unit tests for compiled battle pass tier lookups."""
+from backend.services.seasonal.battle_pass import BattlePassService, CompiledPass
+
+
+def make_pass():
+    # Tier generation needs no database
+    tiers = BattlePassService.__new__(BattlePassService)._generate_tiers()
+    return CompiledPass({"pass_id": "bp_1", "season": 3, "premium_price": 1000, "tiers": tiers}), tiers
+
+
+class TestCompiledPass:
+    """Test tier resolution against the generated thresholds."""
+
+    def test_tier_for_matches_linear_scan(self):
+        compiled, tiers = make_pass()
+        for xp in range(0, tiers[-1]["xp_required"] + 5000, 337):
+            expected = 0
+            for tier in tiers:
+                if xp >= tier["xp_required"]:
+                    expected = tier["tier"]
+            assert compiled.tier_for(xp) == expected
+
+    def test_crossings_include_thresholds_reached_exactly(self):
+        compiled, tiers = make_pass()
+        first, second = tiers[0]["xp_required"], tiers[1]["xp_required"]
+
+        assert compiled.crossings(0, first - 1) == []
+        assert compiled.crossings(first - 1, first) == [1]
+        assert compiled.crossings(first, second + 1) == [2]
+        assert compiled.crossings(0, tiers[-1]["xp_required"] * 2) == list(range(1, 101))
+
+    def test_rewards_indexed_by_tier(self):
+        compiled, tiers = make_pass()
+        free, premium = compiled.rewards[50]
+
+        assert free == tiers[49]["free_rewards"]
+        assert any(r["reward_id"] == "battle_pass_robot_1" for r in premium)
+        assert compiled.season == 3 and compiled.premium_price == 1000
@@ -0,0 +1,40 @@
+"""Unit tests for the game definition catalogs."""
+from backend.services.catalog import Catalog, get_catalog
+
+
+ITEMS = [
+    {"id": "a", "kind": "x", "tier": 1, "price": 30},
+    {"id": "b", "kind": "y", "tier": 1, "price": 10},
+    {"id": "c", "kind": "x", "tier": 2, "price": 20},
+]
+
+
+class TestCatalog:
+    """Test indexed selection and facets."""
+
+    def test_select_matches_linear_filter(self):
+        catalog = Catalog("test", ITEMS, index_fields=("kind", "tier"), sort_field="price")
+
+        assert [item["id"] for item in catalog.select()] == ["b", "c", "a"]
+        assert [item["id"] for item in catalog.select(kind="x")] == ["c", "a"]
+        assert [item["id"] for item in catalog.select(kind="x", tier=1)] == ["a"]
+        assert [item["id"] for item in catalog.select(high=20, tier=None)] == ["b", "c"]
+        assert catalog.select(kind="z") == []
+
+    def test_facets_and_etag(self):
+        catalog = Catalog("test", ITEMS, index_fields=("kind",))
+
+        assert catalog.facets == {"kind": {"x": 2, "y": 1}}
+        assert catalog.etag == Catalog("test", list(ITEMS), index_fields=("tier",)).etag
+
+    def test_cached_body_keeps_its_etag(self):
+        catalog = Catalog("test", ITEMS)
+        body, etag = catalog.cache_body(("all",), b"{}")
+
+        assert catalog.cached_body(("all",)) == (body, etag)
+
+
+def test_skill_tree_node_ids_are_unique():
+    catalog = get_catalog("skill_tree_nodes")
+
+    assert len(catalog.by_id) == len(catalog)
@@ -0,0 +1,60 @@
+"""Unit tests for the shared cooldown service and its timer wheel."""
+import time
+
+import pytest
+
+from backend.services.cooldowns.service import CooldownService, TimerWheel
+
+
+class TestCooldownService:
+    """Test claims, reads and expiry with the in-process store."""
+
+    @pytest.mark.asyncio
+    async def test_claim_is_refused_while_running(self):
+        service = CooldownService()
+
+        claimed, expires_at = await service.claim("p1", "trait", "hacking", 60)
+        again, running = await service.claim("p1", "trait", "hacking", 60)
+
+        assert claimed and not again
+        assert running == expires_at
+        assert 59 < await service.remaining("p1", "trait", "hacking") <= 60
+        # Other players and namespaces are unaffected
+        assert await service.remaining("p2", "trait", "hacking") == 0
+        assert await service.remaining("p1", "action", "hacking") == 0
+
+    @pytest.mark.asyncio
+    async def test_all_for_groups_by_namespace(self):
+        service = CooldownService()
+        await service.set("p1", "action", "hack", 300)
+        await service.set("p1", "task", "combat", 7200)
+        await service.set("p1", "trait", "stealth", 45)
+
+        grouped = await service.all_for("p1")
+
+        assert {namespace: set(names) for namespace, names in grouped.items()} == {
+            "action": {"hack"}, "task": {"combat"}, "trait": {"stealth"}
+        }
+
+    @pytest.mark.asyncio
+    async def test_reduce_and_clear(self):
+        service = CooldownService()
+        await service.set("p1", "action", "hack", 300)
+
+        assert await service.reduce("p1", "action", "hack", 100) is not None
+        assert 199 < await service.remaining("p1", "action", "hack") <= 200
+        assert await service.reduce("p1", "action", "hack", 500) is None
+        assert not await service.clear("p1", "action", "hack")
+        assert [event["event"] for event in service.events] == ["set", "set", "clear"]
+
+    def test_wheel_returns_only_lapsed_entries(self):
+        wheel = TimerWheel(slots=8)
+        now = time.time()
+        wheel.advance(now)
+        wheel.schedule(("p1", "a"), now + 2)
+        # Same slot, one lap later
+        wheel.schedule(("p2", "a"), now + 10)
+
+        assert wheel.advance(now + 1) == []
+        assert wheel.advance(now + 3) == [("p1", "a")]
+        assert wheel.advance(now + 11) == [("p2", "a")]
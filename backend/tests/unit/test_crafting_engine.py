@@ -0,0 +1,77 @@
+"""Unit tests for craft queue planning."""
+import random
+from datetime import datetime
+
+from backend.services.catalog import get_catalog
+from backend.services.crafting.engine import craft_update, emptied_stacks, plan_crafts
+
+
+STACKS = {
+    "scrap_metal": {"quantity": 10},
+    "circuits": {"quantity": 6},
+}
+
+
+class TestPlanCrafts:
+    """Test queue validation against the in-memory inventory."""
+
+    def test_queue_spends_shared_materials_in_order(self):
+        recipe = get_catalog("recipes").get("basic_robot_parts")
+        rng = random.Random(0)
+        rng.random = lambda: 0.0  # every roll succeeds
+
+        used, produced, results, xp = plan_crafts(STACKS, 10, 50, [(recipe, 2), (recipe, 1)], rng)
+
+        assert [r["success"] for r in results] == [True, False]
+        assert results[1]["error"] == "Insufficient materials"
+        assert used == {"scrap_metal": 10, "circuits": 4}
+        assert produced == {"basic_robot_parts": 2}
+        assert xp == 2 * recipe["xp_reward"]
+
+    def test_level_requirement(self):
+        recipe = get_catalog("recipes").get("advanced_circuit")
+
+        used, produced, results, xp = plan_crafts(STACKS, 1, 50, [(recipe, 1)], random.Random(0))
+
+        assert results[0]["error"] == "Level requirement not met"
+        assert used == produced == {} and xp == 0
+
+    def test_update_guards_every_material(self):
+        condition, update = craft_update(
+            {"scrap_metal": 10, "circuits": 4}, {"basic_robot_parts": 2}, 50,
+            get_catalog("recipes").by_id, datetime(2026, 1, 1)
+        )
+
+        assert condition == {
+            "inventory.scrap_metal.quantity": {"$gte": 10},
+            "inventory.circuits.quantity": {"$gte": 4},
+        }
+        assert update["$inc"] == {
+            "inventory.scrap_metal.quantity": -10,
+            "inventory.circuits.quantity": -4,
+            "inventory.basic_robot_parts.quantity": 2,
+            "xp": 50,
+        }
+
+    def test_chained_queue_guards_only_net_consumption(self):
+        recipes = get_catalog("recipes")
+        stacks = {
+            "circuits": {"quantity": 6}, "rare_metals": {"quantity": 4}, "silicon": {"quantity": 2},
+            "bio_gel": {"quantity": 2}, "nano_fibers": {"quantity": 3},
+        }
+        rng = random.Random(0)
+        rng.random = lambda: 0.0  # every roll succeeds
+
+        used, produced, results, xp = plan_crafts(
+            stacks, 30, 50, [(recipes.get("advanced_circuit"), 2), (recipes.get("cybernetic_implant"), 1)], rng
+        )
+        condition, update = craft_update(used, produced, xp, recipes.by_id, datetime(2026, 1, 1))
+
+        assert all(r["success"] for r in results)
+        assert "inventory.advanced_circuit.quantity" not in condition
+        assert condition["inventory.circuits.quantity"] == {"$gte": 6}
+        assert update["$inc"]["inventory.advanced_circuit.quantity"] == 0
+        assert update["$inc"]["inventory.cybernetic_implant.quantity"] == 1
+        # The circuits crafted and used up in the queue leave an empty stack
+        assert emptied_stacks(stacks, used, produced)
+        assert not emptied_stacks({**stacks, "circuits": {"quantity": 9}}, {"circuits": 6}, {})
@@ -0,0 +1,145 @@
+"""Unit tests for the currency ledger writer and batch transfers."""
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect, BulkWriteError, OperationFailure
+
+from backend.services.economy.ledger import CurrencyLedger, LedgerWriter
+
+
+class _Entries:
+    def __init__(self):
+        self.docs = {}
+        self.failures = 0
+
+    async def insert_many(self, docs, ordered=True):
+        await asyncio.sleep(0.01)
+        errors = []
+        for index, doc in enumerate(docs):
+            if doc["_id"] in self.docs:
+                errors.append({"index": index, "code": 11000})
+            else:
+                self.docs[doc["_id"]] = doc
+        if self.failures:
+            # The batch landed but the acknowledgement was lost
+            self.failures -= 1
+            raise AutoReconnect("primary stepped down")
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(docs) - len(errors)})
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Result:
+    def __init__(self, modified_count):
+        self.modified_count = modified_count
+
+
+class _Players:
+    def __init__(self, balances):
+        self.docs = {player_id: {"_id": player_id, "currencies": {"credits": credits}}
+                     for player_id, credits in balances.items()}
+        self.credit_failures = set()
+
+    def find(self, query, projection=None):
+        return _Cursor([self.docs[key] for key in query["_id"]["$in"] if key in self.docs])
+
+    async def update_one(self, query, update, session=None):
+        currencies = self.docs[query["_id"]]["currencies"]
+        if currencies["credits"] < query["currencies.credits"]["$gte"]:
+            return _Result(0)
+        currencies["credits"] += update["$inc"]["currencies.credits"]
+        return _Result(1)
+
+    async def bulk_write(self, writes, ordered=True, session=None):
+        errors = []
+        for index, write in enumerate(writes):
+            if write._filter["_id"] in self.credit_failures:
+                errors.append({"index": index, "code": 121})
+                continue
+            self.docs[write._filter["_id"]]["currencies"]["credits"] += write._doc["$inc"]["currencies.credits"]
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+
+class _Client:
+    async def start_session(self):
+        raise OperationFailure("Transaction numbers are only allowed on a replica set member", code=20)
+
+
+class _Db:
+    def __init__(self, balances=None):
+        self.name = "test"
+        self.client = _Client()
+        self.players = _Players(balances or {})
+        self.currency_transactions = _Entries()
+
+
+async def _settle(writer):
+    while writer._flush_task and not writer._flush_task.done():
+        await asyncio.sleep(0.005)
+
+
+class TestLedgerWriter:
+    """Buffered entries are written exactly once, whatever happens mid-flush."""
+
+    @pytest.mark.asyncio
+    async def test_entries_appended_mid_flush_are_written(self):
+        db = _Db()
+        writer = LedgerWriter(db, flush_interval=0.001)
+
+        writer.append({"player_id": "a"})
+        await asyncio.sleep(0.005)  # the flush is now inside insert_many
+        writer.append({"player_id": "b"})
+        await _settle(writer)
+
+        assert sorted(doc["player_id"] for doc in db.currency_transactions.docs.values()) == ["a", "b"]
+        assert not writer._buffer
+
+    @pytest.mark.asyncio
+    async def test_retried_batch_skips_entries_already_written(self):
+        db = _Db()
+        db.currency_transactions.failures = 1
+        writer = LedgerWriter(db, flush_interval=0.001)
+
+        for player_id in ("a", "b", "c"):
+            writer.append({"player_id": player_id})
+        await _settle(writer)
+
+        assert len(db.currency_transactions.docs) == 3
+        assert not writer._buffer
+
+
+class TestTransferBatch:
+    """Without transactions, senders are refunded when their credit fails."""
+
+    @pytest.mark.asyncio
+    async def test_failed_credit_refunds_sender(self, monkeypatch):
+        monkeypatch.setattr(CurrencyLedger, "_transactions_supported", None)
+        db = _Db({"s1": 100, "s2": 100, "good": 0, "bad": 0})
+        db.players.credit_failures = {"bad"}
+        ledger = CurrencyLedger(db)
+
+        results = await ledger.transfer_batch([
+            {"from_player_id": "s1", "to_player_id": "good", "currency_type": "credits", "amount": 40},
+            {"from_player_id": "s2", "to_player_id": "bad", "currency_type": "credits", "amount": 40},
+        ])
+        await ledger.writer.flush()
+
+        assert [result["success"] for result in results] == [True, False]
+        balances = {key: doc["currencies"]["credits"] for key, doc in db.players.docs.items()}
+        assert balances == {"s1": 60, "s2": 100, "good": 40, "bad": 0}
+        assert len(db.currency_transactions.docs) == 2
@@ -0,0 +1,45 @@
+"""Unit tests for the deadline timer wheel."""
+import random
+from datetime import datetime
+
+from backend.tasks.deadline_scheduler import TimerWheel, to_tick
+
+
+class TestTimerWheel:
+    """Test deadline placement, cascading and cancellation."""
+
+    def test_fires_each_deadline_exactly_at_its_tick(self):
+        wheel = TimerWheel(current=1_000_000)
+        rng = random.Random(7)
+        deadlines = {f"item_{i}": 1_000_000 + rng.randint(1, 2 * 86400) for i in range(2000)}
+        for key, due in deadlines.items():
+            wheel.add(key, due)
+
+        fired = {}
+        for tick in range(1_000_001, 1_000_000 + 2 * 86400 + 1, 97):
+            for key, due in wheel.advance(tick):
+                assert due <= tick < due + 97
+                fired[key] = due
+
+        assert fired == deadlines
+        assert len(wheel) == 0
+
+    def test_overdue_deadline_fires_on_next_advance(self):
+        wheel = TimerWheel(current=500)
+        wheel.add("late", 450)
+
+        assert wheel.advance(500) == [("late", 450)]
+
+    def test_cancel_and_reschedule(self):
+        wheel = TimerWheel(current=0)
+        wheel.add("cancelled", 10)
+        wheel.add("moved", 10)
+        wheel.cancel("cancelled")
+        wheel.add("moved", 4000)
+
+        assert wheel.advance(3999) == []
+        assert wheel.advance(4000) == [("moved", 4000)]
+
+    def test_to_tick_rounds_up(self):
+        assert to_tick(datetime(1970, 1, 1, 0, 0, 5)) == 5
+        assert to_tick(datetime(1970, 1, 1, 0, 0, 5, 1)) == 6
@@ -0,0 +1,47 @@
+"""Unit tests for the economy tick's once-per-slot claim."""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from backend.services.economy.tick import EconomyTickEngine
+
+
+class _Claims:
+    def __init__(self):
+        self.docs = {}
+
+    async def update_one(self, query, update, upsert=False):
+        await asyncio.sleep(0)
+        doc = self.docs.get(query["_id"])
+        if doc is None:
+            self.docs[query["_id"]] = {"_id": query["_id"], **update["$set"]}
+        elif doc["slot"] < query["slot"]["$lt"]:
+            doc.update(update["$set"])
+        else:
+            raise DuplicateKeyError("slot already claimed")
+
+
+class _Db:
+    def __init__(self):
+        self.players = self.portfolios = self.stocks = self.economy_ticks = None
+        self.job_claims = _Claims()
+
+
+class TestEconomyTickClaim:
+    """Every worker fires the tick; one of them pays out per slot."""
+
+    @pytest.mark.asyncio
+    async def test_one_claim_per_slot(self):
+        db = _Db()
+        engines = [EconomyTickEngine(db) for _ in range(4)]
+        now = datetime(2026, 10, 19, 14, 37)
+
+        claims = await asyncio.gather(*(engine.claim_tick(now) for engine in engines))
+        assert sum(claims) == 1
+
+        # A late run in the same slot is skipped, the next slot is claimed again
+        assert not await engines[0].claim_tick(now + timedelta(minutes=20))
+        assert await engines[1].claim_tick(now + timedelta(minutes=30))
+        assert db.job_claims.docs["economy_tick"]["slot"] == datetime(2026, 10, 19, 15)
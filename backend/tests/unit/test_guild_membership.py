@@ -0,0 +1,169 @@
+"""Unit tests for out-of-document guild membership."""
+import pytest
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from backend.models.guilds.guild import GuildRank
+from backend.services.guilds.management import GuildManagementService
+from backend.services.guilds.membership import GuildMembershipService
+
+
+class _Result:
+    def __init__(self, matched=0, inserted_ids=()):
+        self.matched_count = matched
+        self.modified_count = matched
+        self.inserted_ids = list(inserted_ids)
+
+
+class _Rows:
+    def __init__(self, rows):
+        self.rows = iter(rows)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self.rows)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+def _apply(doc, update):
+    for key, value in update.get("$set", {}).items():
+        doc[key] = value
+    for key in update.get("$unset", {}):
+        doc.pop(key, None)
+    for path, amount in update.get("$inc", {}).items():
+        target, *rest = path.split(".")
+        if rest:
+            doc.setdefault(target, {})
+            doc[target][rest[0]] = doc[target].get(rest[0], 0) + amount
+        else:
+            doc[target] = doc.get(target, 0) + amount
+
+
+class _Guilds:
+    def __init__(self):
+        self.docs = []
+
+    async def find_one(self, query, projection=None):
+        return next((dict(doc) for doc in self.docs if all(
+            doc.get(key) == value if not isinstance(value, dict) else (key in doc) == value["$exists"]
+            for key, value in query.items()
+        )), None)
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    async def update_one(self, query, update):
+        for doc in self.docs:
+            if doc["id"] != query["id"]:
+                continue
+            if "$expr" in query and not doc.get("total_members", 0) < doc.get("max_members", 50):
+                return _Result()
+            _apply(doc, update)
+            return _Result(1)
+        return _Result()
+
+    async def delete_one(self, query):
+        self.docs = [doc for doc in self.docs if doc["id"] != query["id"]]
+
+
+class _Members:
+    """guild_members with its unique player_id index"""
+
+    def __init__(self):
+        self.docs = {}
+
+    def _check(self, doc):
+        if doc["_id"] in self.docs or any(m["player_id"] == doc["player_id"] for m in self.docs.values()):
+            raise DuplicateKeyError("duplicate member")
+
+    async def insert_one(self, doc):
+        self._check(doc)
+        self.docs[doc["_id"]] = dict(doc)
+
+    async def insert_many(self, docs, ordered=True):
+        errors, ids = [], []
+        for index, doc in enumerate(docs):
+            try:
+                await self.insert_one(doc)
+                ids.append(doc["_id"])
+            except DuplicateKeyError:
+                errors.append({"index": index, "code": 11000})
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(ids)})
+        return _Result(inserted_ids=ids)
+
+    def aggregate(self, pipeline):
+        guild_id = pipeline[0]["$match"]["guild_id"]
+        groups = {}
+        for doc in self.docs.values():
+            if doc["guild_id"] == guild_id:
+                group = groups.setdefault(doc["rank"], {"_id": doc["rank"], "count": 0, "contribution": 0})
+                group["count"] += 1
+                group["contribution"] += doc.get("contribution", 0)
+        return _Rows(groups.values())
+
+
+class _Players:
+    async def update_one(self, query, update):
+        return _Result(1)
+
+
+class _Db:
+    def __init__(self):
+        self.guilds = _Guilds()
+        self.guild_members = _Members()
+        self.players = _Players()
+
+
+class TestGuildMembership:
+    """Membership documents and guild counters stay in step."""
+
+    @pytest.mark.asyncio
+    async def test_capacity_and_duplicate_join_release_the_slot(self):
+        db = _Db()
+        guild = await GuildManagementService(db).create_guild("Alpha", "ALP", "", "leader")
+        db.guilds.docs[0]["max_members"] = 2
+        membership = GuildMembershipService(db)
+
+        await membership.add_member(guild.id, "p1")
+        with pytest.raises(ValueError, match="full"):
+            await membership.add_member(guild.id, "p2")
+        db.guilds.docs[0]["max_members"] = 3
+        with pytest.raises(ValueError, match="already"):
+            await membership.add_member(guild.id, "p1")
+
+        assert db.guilds.docs[0]["total_members"] == 2
+        assert db.guilds.docs[0]["rank_counts"] == {"leader": 1, "recruit": 1}
+
+    @pytest.mark.asyncio
+    async def test_create_guild_rolls_back_when_leader_has_a_guild(self):
+        db = _Db()
+        service = GuildManagementService(db)
+        await service.create_guild("Alpha", "ALP", "", "leader")
+
+        with pytest.raises(ValueError, match="already"):
+            await service.create_guild("Beta", "BET", "", "leader")
+
+        assert [guild["tag"] for guild in db.guilds.docs] == ["ALP"]
+
+    @pytest.mark.asyncio
+    async def test_migration_counts_only_members_it_holds(self):
+        db = _Db()
+        await GuildManagementService(db).create_guild("Alpha", "ALP", "", "p1")
+        db.guilds.docs.append({"id": "legacy", "members": [
+            {"player_id": "p1", "rank": GuildRank.MEMBER.value, "contribution": 50},
+            {"player_id": "p2", "rank": GuildRank.LEADER.value, "contribution": 10},
+            {"player_id": "p3", "rank": GuildRank.MEMBER.value, "contribution": 5},
+        ]})
+
+        moved = await GuildMembershipService(db).migrate_embedded_members("legacy")
+
+        legacy = db.guilds.docs[1]
+        assert moved == 2 and "members" not in legacy
+        # p1 already leads another guild, so it isn't counted here
+        assert legacy["total_members"] == 2
+        assert legacy["rank_counts"] == {"leader": 1, "member": 1}
+        assert legacy["total_contribution"] == 15
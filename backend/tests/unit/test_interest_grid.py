@@ -0,0 +1,93 @@
+"""Unit tests for area-of-interest movement replication."""
+import pytest
+
+from backend.api.websocket import interest as interest_module
+from backend.api.websocket.interest import InterestManager
+from backend.api.websocket.manager import ConnectionManager
+
+
+def at(x, y):
+    return {"x": x, "y": y, "z": 0}
+
+
+def movers(frame):
+    return [move["player_id"] for move in frame]
+
+
+class TestInterestManager:
+    """Test neighbour-cell delivery, coalescing and departures."""
+
+    def setup_method(self):
+        self.interest = InterestManager(ConnectionManager(), cell_size=100)
+        self.interest.move("near", at(150, 50))
+        self.interest.move("far", at(950, 950))
+        self.interest.frames()
+
+    def test_moves_reach_neighbouring_cells_only(self):
+        self.interest.move("mover", at(50, 50))
+
+        frames = self.interest.frames()
+
+        assert frames == {"near": [{"player_id": "mover", "location": at(50, 50)}]}
+
+    def test_moves_within_a_tick_are_coalesced(self):
+        self.interest.move("mover", at(10, 10))
+        self.interest.move("mover", at(20, 20))
+
+        assert self.interest.frames()["near"] == [{"player_id": "mover", "location": at(20, 20)}]
+        assert self.interest.frames() == {}
+
+    def test_area_left_sees_the_departure(self):
+        self.interest.move("mover", at(50, 50))
+        self.interest.frames()
+        self.interest.move("mover", at(900, 900))
+
+        frames = self.interest.frames()
+
+        assert movers(frames["near"]) == ["mover"]
+        assert movers(frames["far"]) == ["mover"]
+
+    def test_invalid_location_is_rejected(self):
+        assert not self.interest.move("mover", {"x": "nan?"})
+        assert "mover" not in self.interest.grid
+
+
+class _Connections:
+    def __init__(self, *players):
+        self.active_connections = dict.fromkeys(players)
+        self.sent = []
+
+    async def send_personal_message(self, message, player_id):
+        self.sent.append(player_id)
+
+
+class _Metrics:
+    def __init__(self):
+        self.runs = []
+
+    def record_job(self, job, duration, items=0, **details):
+        self.runs.append((job, items, details))
+
+
+class TestInterestMetrics:
+    """Tick timings are aggregated rather than recorded per tick."""
+
+    @pytest.mark.asyncio
+    async def test_ticks_recorded_once_per_window(self, monkeypatch):
+        metrics = _Metrics()
+        monkeypatch.setattr(interest_module, "metrics_collector", metrics)
+        interest = InterestManager(_Connections("a", "b"), cell_size=100)
+        interest.move("a", at(0, 0))
+        interest.move("b", at(10, 10))
+
+        for step in range(10):
+            interest.move("a", at(step, 0))
+            await interest.flush()
+        assert metrics.runs == []
+
+        monkeypatch.setattr(interest_module, "AOI_METRICS_INTERVAL", 0)
+        interest.move("a", at(20, 0))
+        await interest.flush()
+
+        [(job, movers, details)] = metrics.runs
+        assert job == "aoi_tick" and details["ticks"] == 11 and details["frames"] == 12
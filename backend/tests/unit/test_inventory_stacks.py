@@ -0,0 +1,43 @@
+"""Unit tests for keyed inventory stacks and the legacy migration."""
+import pytest
+
+from backend.services.player.inventory_manager import inventory_of, is_legacy, item_path, stacks_from_items
+
+
+def test_legacy_items_merge_into_stacks():
+    items = [
+        {"item_id": "potion", "name": "Potion", "quantity": 2},
+        {"item_id": "sword", "name": "Sword", "equipped": True},
+        {"item_id": "potion", "name": "Potion", "quantity": 3},
+    ]
+
+    assert stacks_from_items(items) == {
+        "potion": {"name": "Potion", "quantity": 5},
+        "sword": {"name": "Sword", "equipped": True, "quantity": 1},
+    }
+
+
+def test_inventory_of_reads_both_formats_and_skips_empty_stacks():
+    player = {
+        "inventory": {"potion": {"quantity": 1}, "empty": {"quantity": 0}},
+        "items": [{"item_id": "potion", "quantity": 2}],
+    }
+
+    assert inventory_of(player) == {"potion": {"quantity": 3}}
+    assert inventory_of({}) == {}
+
+
+def test_array_shaped_inventory_reads_as_legacy():
+    player = {"inventory": [{"item_id": "potion", "quantity": 1}, {"item_id": "potion", "quantity": 2}]}
+
+    assert is_legacy(player)
+    assert inventory_of(player) == {"potion": {"quantity": 3}}
+    assert not is_legacy({"inventory": {"potion": {"quantity": 3}}})
+
+
+def test_item_path_rejects_unsafe_ids():
+    assert item_path("potion", "quantity") == "inventory.potion.quantity"
+    with pytest.raises(ValueError):
+        item_path("a.b")
+    with pytest.raises(ValueError):
+        item_path("$where")
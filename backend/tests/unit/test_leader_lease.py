@@ -0,0 +1,69 @@
+"""Unit tests for the leader lease that keeps scheduled jobs to one worker."""
+from datetime import timedelta
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from backend.tasks.leader_lease import LeaderLease
+
+
+class _Leases:
+    def __init__(self):
+        self.docs = {}
+
+    async def update_one(self, query, update, upsert=False):
+        doc = self.docs.get(query["_id"])
+        if doc is not None and any(
+            doc.get("owner") == branch["owner"] if "owner" in branch
+            else doc["expires_at"] < branch["expires_at"]["$lt"]
+            for branch in query["$or"]
+        ):
+            doc.update(update["$set"])
+        elif doc is not None:
+            raise DuplicateKeyError("lease held")
+        elif upsert:
+            self.docs[query["_id"]] = {"_id": query["_id"], **update["$set"]}
+
+    async def delete_one(self, query):
+        if self.docs.get(query["_id"], {}).get("owner") == query["owner"]:
+            del self.docs[query["_id"]]
+
+
+class _Db:
+    def __init__(self):
+        self.leader_leases = _Leases()
+
+
+class TestLeaderLease:
+    """Only one process runs the scheduler, and another takes over when it stops."""
+
+    @pytest.mark.asyncio
+    async def test_one_holder_and_takeover(self):
+        db, events = _Db(), []
+        leases = [
+            LeaderLease("jobs", lambda n=n: events.append(("up", n)), lambda n=n: events.append(("down", n)))
+            for n in range(3)
+        ]
+        for lease in leases:
+            await lease._renew(db)
+        assert [lease.held for lease in leases] == [True, False, False]
+
+        # Renewal by the holder keeps it; the others still can't take it
+        for lease in leases:
+            await lease._renew(db)
+        assert [lease.held for lease in leases] == [True, False, False]
+
+        await leases[0].stop(db)
+        await leases[2]._renew(db)
+        assert [lease.held for lease in leases] == [False, False, True]
+        assert events == [("up", 0), ("down", 0), ("up", 2)]
+
+    @pytest.mark.asyncio
+    async def test_lapsed_lease_is_taken_over(self):
+        db = _Db()
+        stale = LeaderLease("jobs", lambda: None, lambda: None, ttl=timedelta(seconds=-1))
+        fresh = LeaderLease("jobs", lambda: None, lambda: None)
+        await stale._renew(db)
+        await fresh._renew(db)
+        await stale._renew(db)
+        assert fresh.held and not stale.held
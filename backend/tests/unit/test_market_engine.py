@@ -0,0 +1,183 @@
+"""Unit tests for the stock market engine."""
+import asyncio
+from datetime import datetime
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from backend.services.market import engine as engine_module
+from backend.services.market.engine import (
+    MAX_BATCH_MOVE,
+    MarketEngine,
+    candle_slot,
+    candle_time,
+    clearing_move,
+)
+
+
+class _Db:
+    def __init__(self):
+        self.name = "test"
+        self.client = object()
+        self.stocks = self.portfolios = self.stock_candles = self.players = self.currency_transactions = None
+
+
+class _Result:
+    def __init__(self, modified_count):
+        self.modified_count = modified_count
+
+
+class _Stocks:
+    def __init__(self, prices):
+        self.prices = prices
+
+    async def find(self, query, projection=None):
+        for ticker in query["ticker"]["$in"]:
+            yield {"ticker": ticker, "price": self.prices[ticker]}
+
+
+class _Portfolios:
+    def __init__(self, holdings, fail_writes=0):
+        self.holdings = holdings
+        self.fail_writes = fail_writes
+
+    async def update_one(self, query, update):
+        player = self.holdings.setdefault(query["player_id"], {})
+        (field, minimum), = ((k, v["$gte"]) for k, v in query.items() if k.startswith("holdings."))
+        ticker = field.split(".", 1)[1]
+        if player.get(ticker, 0) < minimum:
+            return _Result(0)
+        player[ticker] += update["$inc"][field]
+        return _Result(1)
+
+    async def bulk_write(self, operations, ordered=True):
+        if self.fail_writes:
+            self.fail_writes -= 1
+            raise BulkWriteError({"writeErrors": [{"index": i, "code": 1} for i in range(len(operations))]})
+        for operation in operations:
+            player = self.holdings.setdefault(operation._filter["player_id"], {})
+            for field, amount in operation._doc["$inc"].items():
+                ticker = field.split(".", 1)[1]
+                player[ticker] = player.get(ticker, 0) + amount
+
+
+class _Ledger:
+    def __init__(self, balances, fail_credits=0):
+        self.balances = balances
+        self.fail_credits = fail_credits
+
+    async def debit(self, player_id, currency_type, amount, reason):
+        if self.balances[player_id] < amount:
+            raise ValueError("Insufficient credits")
+        self.balances[player_id] -= amount
+
+    async def credit_many(self, credits):
+        if self.fail_credits:
+            self.fail_credits -= 1
+            raise RuntimeError("connection reset")
+        for player_id, _, amount, _ in credits:
+            self.balances[player_id] += amount
+
+
+class TestCandles:
+    """Test candle bucketing."""
+
+    def test_slots_round_trip(self):
+        at = datetime(2026, 10, 19, 14, 37, 12)
+
+        for interval, expected in (
+            ("1m", datetime(2026, 10, 19, 14, 37)),
+            ("1h", datetime(2026, 10, 19, 14)),
+            ("1d", datetime(2026, 10, 19)),
+        ):
+            bucket_start, slot = candle_slot(interval, at)
+            assert candle_time(interval, bucket_start, slot) == expected
+
+    def test_minute_candles_bucketed_per_hour(self):
+        first, _ = candle_slot("1m", datetime(2026, 10, 19, 14, 0))
+        last, _ = candle_slot("1m", datetime(2026, 10, 19, 14, 59))
+
+        assert first == last == datetime(2026, 10, 19, 14)
+
+
+class TestClearing:
+    """Test batch price impact."""
+
+    def test_balanced_batch_keeps_price(self):
+        assert clearing_move(0) == 0.0
+
+    def test_move_is_capped(self):
+        assert clearing_move(10**9) == MAX_BATCH_MOVE
+        assert clearing_move(-10**9) == -MAX_BATCH_MOVE
+
+
+class TestMatching:
+    """Test the matching loop."""
+
+    @pytest.mark.asyncio
+    async def test_order_submitted_mid_settle_is_matched(self, monkeypatch):
+        monkeypatch.setattr(engine_module, "MATCH_INTERVAL", 0.001)
+        engine = MarketEngine(_Db(), {"ACME": {"base_price": 10.0}})
+        engine.prices = {"ACME": 10.0}
+        engine._loaded_at = float("inf")
+        batches = []
+
+        async def settle(book):
+            orders = [order for ticker_orders in book.values() for order in ticker_orders]
+            batches.append(len(orders))
+            await asyncio.sleep(0.01)
+            for order in orders:
+                order.future.set_result({"success": True})
+
+        engine._settle = settle
+        first = asyncio.create_task(engine.submit("p1", "ACME", "buy", 1))
+        await asyncio.sleep(0.005)  # the first batch is now settling
+        second = await asyncio.wait_for(engine.submit("p2", "ACME", "buy", 1), timeout=1)
+
+        assert second["success"] and (await first)["success"]
+        assert batches == [1, 1]
+
+    def _engine(self, portfolios, ledger):
+        engine = MarketEngine(_Db(), {"ACME": {"base_price": 10.0}})
+        engine.prices = {"ACME": 10.0}
+        engine._loaded_at = float("inf")
+        engine.stocks = _Stocks({"ACME": 10.0})
+        engine.portfolios = portfolios
+        engine.ledger = ledger
+
+        async def publish(moves, volume, now):
+            pass
+
+        engine._publish = publish
+        return engine
+
+    async def _trade(self, engine):
+        return await asyncio.gather(
+            engine.submit("buyer", "ACME", "buy", 2),
+            engine.submit("seller", "ACME", "sell", 3),
+            return_exceptions=True
+        )
+
+    @pytest.mark.asyncio
+    async def test_failed_share_delivery_refunds_buyer(self):
+        portfolios = _Portfolios({"seller": {"ACME": 5}}, fail_writes=1)
+        ledger = _Ledger({"buyer": 100, "seller": 0})
+
+        bought, sold = await self._trade(self._engine(portfolios, ledger))
+
+        assert isinstance(bought, BulkWriteError)
+        assert sold["success"] and sold["total_proceeds"] == 30
+        assert ledger.balances == {"buyer": 100, "seller": 30}
+        assert portfolios.holdings == {"seller": {"ACME": 2}}
+
+    @pytest.mark.asyncio
+    async def test_failed_sale_credit_restores_shares(self):
+        portfolios = _Portfolios({"seller": {"ACME": 5}})
+        ledger = _Ledger({"buyer": 100, "seller": 0}, fail_credits=1)
+
+        bought, sold = await self._trade(self._engine(portfolios, ledger))
+
+        assert bought["success"] and bought["total_cost"] == 20
+        assert isinstance(sold, RuntimeError)
+        assert ledger.balances == {"buyer": 80, "seller": 0}
+        assert portfolios.holdings == {"seller": {"ACME": 5}, "buyer": {"ACME": 2}}
@@ -0,0 +1,79 @@
+"""Projected player reads, and a lint against full-document loads in hot paths."""
+import ast
+from pathlib import Path
+
+import pytest
+
+from backend.models.player.views import PlayerCombat, PlayerEconomy, PlayerIdentity
+from backend.services.player.repository import PLAYER_VIEWS, player_view
+
+BACKEND = Path(__file__).resolve().parents[2]
+
+# Modules on per-request paths: player reads here must name a projection
+HOT_PATHS = [
+    "api/v1/actions/router.py",
+    "services/combat/engine.py",
+    "services/economy/currency.py",
+    "services/economy/ledger.py",
+    "services/social/mentorship.py",
+    "services/traits/ability_engine.py",
+    "services/traits/trait_deltas.py",
+]
+
+
+def _reads_players(call: ast.Call) -> bool:
+    func = call.func
+    return (
+        isinstance(func, ast.Attribute)
+        and func.attr in ("find_one", "find", "find_one_and_update")
+        and isinstance(func.value, ast.Attribute)
+        and func.value.attr == "players"
+    )
+
+
+def full_document_loads(source: str):
+    """(line, reason) for player reads without a projection and for full ``Player`` validation"""
+    found = []
+    for node in ast.walk(ast.parse(source)):
+        if not isinstance(node, ast.Call):
+            continue
+        if _reads_players(node):
+            has_projection = any(keyword.arg == "projection" for keyword in node.keywords)
+            if not has_projection and len(node.args) < 2:
+                found.append((node.lineno, f"players.{node.func.attr} without a projection"))
+        elif isinstance(node.func, ast.Name) and node.func.id == "Player":
+            found.append((node.lineno, "full Player model validation"))
+    return sorted(found)
+
+
+class TestPlayerProjections:
+    """Views load only their fields; hot paths only read through them."""
+
+    @pytest.mark.parametrize("path", HOT_PATHS)
+    def test_hot_paths_read_projections(self, path):
+        assert full_document_loads((BACKEND / path).read_text()) == []
+
+    def test_lint_flags_full_loads(self):
+        source = "async def f(db):\n    doc = await db.players.find_one({'_id': 1})\n    return Player(**doc)\n"
+        assert [line for line, _ in full_document_loads(source)] == [2, 3]
+
+    def test_views_project_their_fields(self):
+        assert set(PLAYER_VIEWS) == {"identity", "combat", "economy", "traits", "social"}
+        assert player_view("combat") is PlayerCombat
+        assert "traits.speed" in PlayerCombat.projection()
+        assert PlayerEconomy.projection(traits=["perception", "fame"]) == {
+            **{field: 1 for field in PlayerEconomy.FIELDS}, "traits.perception": 1, "meta_traits.fame": 1
+        }
+        with pytest.raises(ValueError):
+            player_view("inventory")
+
+    def test_view_from_projected_document(self):
+        target = PlayerEconomy(**{
+            "_id": "p2", "username": "target", "currencies": {"credits": 40},
+            "traits": {"perception": 70.0}, "meta_traits": {"survival_instinct": 20.0}
+        })
+        assert target.id == "p2"
+        assert target.currencies.credits == 40
+        assert target.trait("perception") + target.trait("survival_instinct") == 90.0
+        assert target.trait("speed") == 50.0
+        assert PlayerIdentity(_id="p1", username="me").moral_class == "average"
@@ -0,0 +1,97 @@
+"""Unit tests for the live player position index."""
+import math
+import random
+
+import pytest
+
+from backend.services.world.position_index import POSITION_TTL, VECTORIZE_THRESHOLD, PositionIndex
+
+
+async def populated(count, side, seed=3):
+    rng = random.Random(seed)
+    index = PositionIndex(cell_size=50)
+    points = {}
+    for i in range(count):
+        point = {"x": rng.uniform(-side, side), "y": rng.uniform(-side, side), "z": rng.uniform(0, 20)}
+        await index.update(f"p{i}", point)
+        points[f"p{i}"] = point
+    return index, points
+
+
+def brute_force(points, center, radius=None, exclude=None):
+    found = []
+    for player_id, point in points.items():
+        distance = math.dist((center["x"], center["y"], center["z"]), (point["x"], point["y"], point["z"]))
+        if player_id != exclude and (radius is None or distance <= radius):
+            found.append((player_id, distance))
+    return sorted(found, key=lambda item: item[1])
+
+
+class _Players:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def _iter(self):
+        for doc in self.docs:
+            yield doc
+
+    def find(self, query, projection=None):
+        return self._iter()
+
+
+class _Db:
+    def __init__(self, docs):
+        self.players = _Players(docs)
+
+
+class TestPositionIndex:
+    """Test range and nearest queries against a linear scan."""
+
+    @pytest.mark.asyncio
+    async def test_within_matches_linear_scan(self):
+        index, points = await populated(3000, 500)
+        center = {"x": 12.5, "y": -40, "z": 5}
+
+        for radius in (0, 10, 75, 200, 2000):
+            found = [(p, round(d, 6)) for p, _, d in await index.within(center, radius, exclude="p0")]
+            expected = [(p, round(d, 6)) for p, d in brute_force(points, center, radius, exclude="p0")]
+            assert found == expected
+
+        # Large areas go through the vectorized path
+        assert len(await index.within(center, 300)) > VECTORIZE_THRESHOLD
+
+    @pytest.mark.asyncio
+    async def test_nearest_matches_linear_scan(self):
+        index, points = await populated(2000, 1000)
+        center = {"x": 300, "y": 300, "z": 0}
+
+        assert [p for p, _, _ in await index.nearest(center, 10)] == [p for p, _ in brute_force(points, center)[:10]]
+        assert len(await index.nearest(center, 5000)) == 2000
+        assert [p for p, _, _ in await index.nearest(center, 10, max_radius=60)] == [
+            p for p, _ in brute_force(points, center, 60)[:10]
+        ]
+
+    @pytest.mark.asyncio
+    async def test_moves_and_removals(self):
+        index = PositionIndex(cell_size=50)
+        await index.update("a", {"x": 0, "y": 0, "z": 0})
+        await index.update("a", {"x": 500, "y": 500, "z": 0})
+        await index.update("b", {"x": 10, "y": 0, "z": 0})
+        await index.remove("b")
+
+        assert await index.within({"x": 0, "y": 0, "z": 0}, 100) == []
+        assert (await index.nearest({"x": 0, "y": 0, "z": 0}, 1))[0][0] == "a"
+        assert set(index.unsaved) == {"a", "b"}
+        assert not await index.update("c", {"x": None})
+
+    @pytest.mark.asyncio
+    async def test_players_nobody_vouches_for_are_evicted(self):
+        index = PositionIndex(cell_size=50)
+        # Seeded from the database at startup, never connected to this worker
+        await index.load(_Db([{"_id": "ghost", "position": {"x": 5, "y": 0, "z": 0}}]))
+        await index.update("live", {"x": 0, "y": 0, "z": 0}, persist=False)
+        await index.refresh()
+
+        assert await index.refresh(now=index.store.seen["ghost"] + POSITION_TTL + 1) == 1
+        assert await index.position("ghost") is None
+        assert await index.position("live") is not None
@@ -0,0 +1,182 @@
+"""Unit tests for materialized quest leaderboards and their guarded swap."""
+import asyncio
+
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from backend.services.quests import leaderboard as leaderboard_module
+from backend.services.quests.leaderboard import QuestLeaderboardService
+
+
+def _eval(expr, row):
+    if isinstance(expr, str):
+        return row[expr[1:]] if expr.startswith("$") else expr
+    if isinstance(expr, dict) and "$concat" in expr:
+        return "".join(_eval(part, row) for part in expr["$concat"])
+    if isinstance(expr, dict) and "$toString" in expr:
+        return str(_eval(expr["$toString"], row))
+    return expr
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(doc, branch) for branch in condition):
+                return False
+        elif isinstance(condition, dict):
+            if "$exists" in condition and (key in doc) != condition["$exists"]:
+                return False
+            if "$lt" in condition and not (key in doc and doc[key] < condition["$lt"]):
+                return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, key, direction):
+        self.docs.sort(key=lambda doc: doc[key], reverse=direction < 0)
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs
+
+
+class _Deleted:
+    def __init__(self, count):
+        self.deleted_count = count
+
+
+class _Collection:
+    def __init__(self):
+        self.docs = {}
+
+    def find(self, query, projection=None):
+        return _Cursor([dict(doc) for doc in self.docs.values() if _matches(doc, query)])
+
+    async def find_one(self, query, projection=None):
+        return next((dict(doc) for doc in self.docs.values() if _matches(doc, query)), None)
+
+    async def find_one_and_update(self, query, update, projection=None, upsert=False):
+        doc = self.docs.get(query["_id"])
+        if doc is None:
+            self.docs[query["_id"]] = {"_id": query["_id"], **update["$set"]}
+            return None
+        if not _matches(doc, query):
+            raise DuplicateKeyError("newer refresh published")
+        previous = dict(doc)
+        doc.update(update["$set"])
+        return previous
+
+    async def count_documents(self, query):
+        return sum(_matches(doc, query) for doc in self.docs.values())
+
+    async def delete_many(self, query):
+        doomed = [key for key, doc in self.docs.items() if _matches(doc, query)]
+        for key in doomed:
+            del self.docs[key]
+        return _Deleted(len(doomed))
+
+
+class _Aggregation:
+    def __init__(self, db, pipeline):
+        self.db, self.pipeline = db, pipeline
+
+    async def to_list(self, length=None):
+        # Each run sees the standings of the moment it started
+        standings = list(self.db.standings)
+        await asyncio.sleep(self.db.delays.pop(0) if self.db.delays else 0)
+        projection = next(stage["$project"] for stage in self.pipeline if "$project" in stage)
+        target = getattr(self.db, self.pipeline[-1]["$merge"]["into"])
+        for row in standings:
+            doc = {
+                field: row[field] if expr == 1 else _eval(expr, row)
+                for field, expr in projection.items()
+            }
+            target.docs[doc["_id"]] = doc
+        return []
+
+
+class _Quests:
+    def __init__(self, db):
+        self.db = db
+
+    def aggregate(self, pipeline):
+        return _Aggregation(self.db, pipeline)
+
+
+class _Db:
+    def __init__(self):
+        self.quests = _Quests(self)
+        self.players = _Collection()
+        self.quest_leaderboard_snapshots = _Collection()
+        self.quest_speedrun_snapshots = _Collection()
+        self.quest_leaderboard_refreshes = _Collection()
+        self.standings = []
+        self.delays = []
+
+    def rank(self, *players):
+        self.standings = [
+            {"_id": player, "rank": rank, "username": player, "quests_completed": 10 - rank, "total_xp_earned": 0}
+            for rank, player in enumerate(players, start=1)
+        ]
+
+
+class TestQuestLeaderboard:
+    """Readers follow the published refresh; concurrent refreshes never clobber it."""
+
+    @pytest.mark.asyncio
+    async def test_refresh_publishes_and_trims_old_versions(self):
+        db = _Db()
+        service = QuestLeaderboardService(db)
+        for order in (("a", "b"), ("b", "a"), ("c", "b", "a")):
+            db.rank(*order)
+            await service.refresh("daily")
+
+        board = await service.get_completion_leaderboard("daily")
+        assert [row["player_id"] for row in board] == ["c", "b", "a"]
+        assert (await service.get_player_rank("a", "daily"))["rank"] == 3
+        # The current version and the one it replaced
+        assert len({doc["refresh_id"] for doc in db.quest_leaderboard_snapshots.docs.values()}) == 2
+
+    @pytest.mark.asyncio
+    async def test_older_refresh_finishing_last_is_discarded(self):
+        db = _Db()
+        service = QuestLeaderboardService(db)
+        db.rank("a", "b")
+        await service.refresh("daily")
+
+        # The first refresh starts on old standings but finishes after the second
+        db.delays = [0.02, 0]
+        first = asyncio.create_task(service.refresh("daily"))
+        await asyncio.sleep(0)
+        db.rank("b", "a", "c")
+        second = asyncio.create_task(service.refresh("daily"))
+        results = await asyncio.gather(first, second)
+
+        assert results[0]["superseded"] and not results[1].get("superseded")
+        board = await service.get_completion_leaderboard("daily")
+        assert [row["player_id"] for row in board] == ["b", "a", "c"]
+        assert results[0]["refresh_id"] not in {doc["refresh_id"] for doc in db.quest_leaderboard_snapshots.docs.values()}
+
+    @pytest.mark.asyncio
+    async def test_cold_board_builds_in_background(self):
+        db = _Db()
+        service = QuestLeaderboardService(db)
+        db.rank("a")
+        db.delays = [0.01]
+
+        assert await service.get_completion_leaderboard("weekly") == []
+        assert await service.get_completion_leaderboard("weekly") == []
+        assert set(leaderboard_module._cold_builds) == {"weekly"}
+        await leaderboard_module._cold_builds["weekly"]
+
+        assert [row["player_id"] for row in await service.get_completion_leaderboard("weekly")] == ["a"]
+        assert await db.quest_leaderboard_refreshes.count_documents({}) == 1
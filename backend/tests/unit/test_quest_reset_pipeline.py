@@ -0,0 +1,177 @@
+"""Unit tests for quest reset pipeline."""
+import asyncio
+from datetime import datetime
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from backend.models.quests.quest import QuestType
+from backend.services.quests.daily import DailyQuestService
+from backend.services.quests.generator import QuestGenerator
+from backend.services.quests.reset_pipeline import QuestResetPipeline, period_bounds, period_key
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return self.docs if length is None else self.docs[:length]
+
+
+class _Quests:
+    """A quests collection enforcing the unique (player, period, slot) index"""
+
+    def __init__(self):
+        self.docs = []
+
+    def find(self, query):
+        def matches(doc):
+            return all(
+                doc.get(key) in value["$in"] if isinstance(value, dict) else doc.get(key) == value
+                for key, value in query.items()
+            )
+        return _Cursor([dict(doc) for doc in self.docs if matches(doc)])
+
+    async def update_many(self, query, update):
+        await asyncio.sleep(0)
+        for doc in self.docs:
+            if doc["player_id"] == query["player_id"] and doc["status"] in query["status"]["$in"]:
+                doc.update(update["$set"])
+
+    async def insert_many(self, docs, ordered=True):
+        await asyncio.sleep(0)
+        slots = {(doc["player_id"], doc["period_key"], doc["period_slot"]) for doc in self.docs}
+        errors = []
+        for index, doc in enumerate(docs):
+            slot = (doc["player_id"], doc["period_key"], doc["period_slot"])
+            if slot in slots:
+                errors.append({"index": index, "code": 11000})
+            else:
+                slots.add(slot)
+                self.docs.append(dict(doc))
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(docs) - len(errors)})
+        return type("InsertManyResult", (), {"inserted_ids": [doc["_id"] for doc in docs]})
+
+
+class _Players:
+    async def find_one(self, query, projection=None):
+        return {"_id": query["_id"], "level": 2, "traits": {}}
+
+    async def update_one(self, query, update):
+        pass
+
+
+class TestPeriods:
+    """Test period boundaries and keys."""
+
+    def test_daily_period(self):
+        at = datetime(2026, 10, 21, 23, 59)
+        start, end = period_bounds("daily", at)
+
+        assert start == datetime(2026, 10, 21)
+        assert end == datetime(2026, 10, 22)
+        assert period_key("daily", at) == "daily:2026-10-21"
+
+    def test_weekly_period_starts_monday(self):
+        at = datetime(2026, 10, 25, 12, 0)  # Sunday
+        start, end = period_bounds("weekly", at)
+
+        assert start == datetime(2026, 10, 19)
+        assert end == datetime(2026, 10, 26)
+        assert period_key("weekly", at) == "weekly:2026-W43"
+
+    def test_next_period_key(self):
+        _, end = period_bounds("weekly", datetime(2026, 12, 30))
+
+        assert period_key("weekly", end) == "weekly:2027-W01"
+
+
+class TestTemplatedGeneration:
+    """Test template-based quest building."""
+
+    def test_build_period_quests(self):
+        generator = QuestGenerator.__new__(QuestGenerator)
+        expires_at = datetime(2026, 10, 22)
+
+        quests = generator.build_period_quests(
+            player_id="player_1",
+            player={"level": 3, "traits": {"hacking": 80}},
+            quest_type=QuestType.DAILY,
+            count=3,
+            expires_at=expires_at,
+            period_key="daily:2026-10-21",
+            status="scheduled",
+        )
+
+        assert len(quests) == 3
+        assert len({quest["_id"] for quest in quests}) == 3
+        for quest in quests:
+            assert quest["status"] == "scheduled"
+            assert quest["period_key"] == "daily:2026-10-21"
+            assert quest["expires_at"] == expires_at
+            assert quest["objectives"][0]["type"] == "hack"
+
+    def test_templates_are_not_shared(self):
+        generator = QuestGenerator.__new__(QuestGenerator)
+        player = {"level": 1, "traits": {"trading": 90}}
+
+        first = generator._generate_simple_quest("p1", player, QuestType.WEEKLY, "medium")
+        second = generator._generate_simple_quest("p2", player, QuestType.WEEKLY, "medium")
+        first["objectives"][0]["current"] = 3
+        first["rewards"]["items"].append("token")
+
+        assert second["objectives"][0]["current"] == 0
+        assert second["rewards"]["items"] == []
+        assert first["objectives"][0]["objective_id"] != second["objectives"][0]["objective_id"]
+
+
+class TestPeriodQuestFallback:
+    """On-demand generation fills each period slot exactly once."""
+
+    def _pipeline(self):
+        pipeline = QuestResetPipeline.__new__(QuestResetPipeline)
+        pipeline.quests = _Quests()
+        pipeline.generator = QuestGenerator.__new__(QuestGenerator)
+        return pipeline
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_fill_slots_once(self):
+        pipeline = self._pipeline()
+        player = {"level": 2, "traits": {}}
+
+        results = await asyncio.gather(*[
+            pipeline.get_period_quests("p1", player, "daily") for _ in range(4)
+        ])
+
+        assert len(pipeline.quests.docs) == 3
+        stored = {quest["_id"] for quest in pipeline.quests.docs}
+        for quests in results:
+            assert {quest["_id"] for quest in quests} == stored
+
+    @pytest.mark.asyncio
+    async def test_failed_quest_is_replaced_in_a_new_slot(self):
+        pipeline = self._pipeline()
+        player = {"level": 2, "traits": {}}
+        quests = await pipeline.get_period_quests("p1", player, "daily")
+        pipeline.quests.docs[0]["status"] = "failed"
+
+        quests = await pipeline.get_period_quests("p1", player, "daily")
+
+        assert len(quests) == 3
+        assert sorted(quest["period_slot"] for quest in pipeline.quests.docs) == [0, 1, 2, 3]
+
+    @pytest.mark.asyncio
+    async def test_concurrent_refreshes_make_one_daily_set(self):
+        pipeline = self._pipeline()
+        db = type("Db", (), {"players": _Players(), "quests": pipeline.quests})()
+        service = DailyQuestService(db)
+        service.generator, service.quest_service, service.reset_pipeline = pipeline.generator, object(), pipeline
+        await pipeline.get_period_quests("p1", {"level": 2, "traits": {}}, "daily")
+
+        await asyncio.gather(*[service._generate_new_daily_quests("p1") for _ in range(3)])
+
+        open_quests = [quest for quest in pipeline.quests.docs if quest["status"] != "expired"]
+        assert len(open_quests) == 3
+        assert all("period_slot" in quest for quest in pipeline.quests.docs)
@@ -0,0 +1,28 @@
+"""Unit tests for the robot marketplace listing read model."""
+from datetime import datetime
+
+import pytest
+
+from backend.services.robots.listings import decode_cursor, encode_cursor, robot_summary
+
+
+class TestCursor:
+    """Test keyset pagination cursors."""
+
+    def test_round_trip_datetime(self):
+        listed_at = datetime(2026, 10, 19, 12, 30, 5, 123000)
+
+        assert decode_cursor(encode_cursor(listed_at, "abc")) == (listed_at, "abc")
+
+    def test_round_trip_price(self):
+        assert decode_cursor(encode_cursor(1500, "abc")) == (1500, "abc")
+
+    def test_invalid_cursor(self):
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor")
+
+
+def test_robot_summary():
+    robot = {"id": "r1", "name": "Bolt", "robot_type": "harvester", "stats": {"speed": 5}, "owner_id": "p1"}
+
+    assert robot_summary(robot) == {"name": "Bolt", "type": "harvester", "level": 1, "stats": {"speed": 5}}
@@ -0,0 +1,185 @@
+"""Unit tests for the social graph edge store and adjacency cache."""
+import pytest
+
+from backend.models.social.relationship import RelationshipType
+from backend.services.social import graph as graph_module
+from backend.services.social.graph import SocialGraph
+from backend.services.social import relationships as relationships_module
+from backend.services.social.relationships import RelationshipService
+from backend.services.tasks.relationship_task_generator import RelationshipTaskGenerator
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(doc, branch) for branch in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = doc.get(key)
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$gt" in condition and not (value is not None and value > condition["$gt"]):
+                return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys):
+        self.docs = sorted(self.docs, key=lambda doc: tuple(doc[key] for key, _ in keys))
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs if length is None else self.docs[:length]
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Edges:
+    """Just enough of a motor collection for ``social_edges``"""
+
+    def __init__(self):
+        self.docs = {}
+        self.reads = 0
+
+    def find(self, query, projection=None):
+        self.reads += 1
+        return _Cursor([dict(doc) for doc in self.docs.values() if _matches(doc, query)])
+
+    async def find_one(self, query, projection=None):
+        self.reads += 1
+        return next((doc for doc in self.docs.values() if _matches(doc, query)), None)
+
+    async def bulk_write(self, writes, ordered=True):
+        for write in writes:
+            doc = write._doc
+            edge = self.docs.setdefault(write._filter["_id"], {"_id": write._filter["_id"], **doc["$setOnInsert"]})
+            edge.update(doc["$set"])
+
+    async def delete_many(self, query):
+        for key in [key for key, doc in self.docs.items() if _matches(doc, query)]:
+            del self.docs[key]
+
+
+class _Relationships:
+    def __init__(self):
+        self.docs = []
+
+    def find(self, query, projection=None):
+        return _Cursor([dict(doc) for doc in self.docs if _matches(doc, query)])
+
+    async def insert_one(self, doc):
+        self.docs.append(doc)
+
+
+class _Db:
+    def __init__(self):
+        self.social_edges = _Edges()
+        self.relationships = _Relationships()
+        self.players = None
+
+
+async def _graph_with_friends():
+    db, graph = _Db(), SocialGraph()
+    await graph.link_many(db, RelationshipType.FRIEND, [("a", "b"), ("a", "c"), ("b", "d"), ("c", "e")])
+    await graph.link(db, RelationshipType.RIVAL, "a", "e")
+    return db, graph
+
+
+class TestSocialGraph:
+    """Edges are symmetric, cached reads skip MongoDB, pages and traversals agree."""
+
+    @pytest.mark.asyncio
+    async def test_related_from_cache(self):
+        db, graph = await _graph_with_friends()
+        await graph.adjacency(db, "a")
+        reads = db.social_edges.reads
+
+        assert await graph.related(db, "a", "b", [RelationshipType.FRIEND])
+        assert await graph.related(db, "e", "a")
+        assert not await graph.related(db, "a", "e", [RelationshipType.FRIEND])
+        assert await graph.relations(db, "a", ["b", "e", "z"]) == {"b": ["friend"], "e": ["rival"], "z": []}
+        assert db.social_edges.reads == reads
+
+        await graph.unlink(db, "friend", "b", "a")
+        assert not await graph.related(db, "a", "b")
+        assert db.social_edges.reads == reads
+
+    @pytest.mark.asyncio
+    async def test_pages_match_cached_and_uncached(self, monkeypatch):
+        db, graph = _Db(), SocialGraph()
+        await graph.link_many(db, "friend", [("hub", f"p{i:02d}") for i in range(7)])
+        await graph.link(db, "rival", "hub", "x")
+
+        async def walk(graph):
+            edges, after = [], None
+            while True:
+                page = await graph.neighbors(db, "hub", after=after, limit=3)
+                edges.extend((edge["type"], edge["dst"]) for edge in page["edges"])
+                if page["next"] is None:
+                    return edges
+                after = page["next"]
+
+        cached = await walk(graph)
+        # Too many edges to cache: pages come from indexed range queries
+        monkeypatch.setattr(graph_module, "MAX_CACHED_DEGREE", 2)
+        uncached = await walk(SocialGraph())
+        assert cached == uncached == [("friend", f"p{i:02d}") for i in range(7)] + [("rival", "x")]
+
+    @pytest.mark.asyncio
+    async def test_traversal_and_alliance_removal(self):
+        db, graph = await _graph_with_friends()
+        assert await graph.friends_of_friends(db, "a") == ["d", "e"]
+        assert await graph.traverse(db, "a", ["friend"], depth=1) == {"b": 1, "c": 1}
+
+        await graph.link_many(db, "alliance", [("a", "b"), ("a", "c"), ("b", "c")], ref="al1")
+        await graph.unlink_ref(db, "al1", "c")
+        assert await graph.connections(db, "c", ["alliance"]) == {}
+        assert (await graph.connections(db, "a"))["alliance"] == ["b"]
+
+    def test_relationship_task_cast_from_connections(self):
+        task = RelationshipTaskGenerator().generate_relationship_task(10, {}, {"rival": ["e"], "mentorship": ["m"]})
+        assert task["title"] == "Rival's Offer"
+        assert task["related_player_id"] == "e"
+        assert "related_player_id" not in RelationshipTaskGenerator().generate_relationship_task(10, {})
+
+    @pytest.mark.asyncio
+    async def test_relationship_pages_skip_other_relations(self, monkeypatch):
+        db, graph = _Db(), SocialGraph()
+        monkeypatch.setattr(relationships_module, "social_graph", graph)
+        service = RelationshipService(db)
+        await graph.link_many(db, "alliance", [("hub", f"a{i}") for i in range(5)], ref="al1")
+        for i in range(4):
+            await service.create_relationship(RelationshipType.FRIEND, "hub", f"f{i}")
+
+        names, after = [], None
+        while True:
+            page = await service.get_player_relationships("hub", after=after, limit=3)
+            names.extend(relationship["player2_id"] for relationship in page["relationships"])
+            if page["next_cursor"] is None:
+                break
+            after = page["next_cursor"]
+        assert names == ["f0", "f1", "f2", "f3"]
+
+        # An edge written by another worker isn't in this one's cache yet
+        await SocialGraph().link(db, RelationshipType.RIVAL, "hub", "x")
+        assert await service.are_related("hub", "x", RelationshipType.RIVAL)
+        await service.create_relationship(RelationshipType.RIVAL, "hub", "y")
+        with pytest.raises(ValueError, match="already exists"):
+            await service.create_relationship(RelationshipType.RIVAL, "hub", "x")
@@ -0,0 +1,243 @@
+"""Unit tests for the tournament bracket engine."""
+import asyncio
+import math
+import uuid
+
+import pytest
+
+from backend.services.combat import engine as combat_engine
+from backend.services.tournaments.brackets import (
+    BracketEngine, elimination_matches, swiss_pairings, swiss_rounds
+)
+
+
+def _matches(doc, query):
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(doc, branch) for branch in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = doc.get(key)
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$lt" in condition and not value < condition["$lt"]:
+                return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+def _apply(doc, update):
+    for key, value in update.get("$set", {}).items():
+        doc[key] = value
+    for key, value in update.get("$inc", {}).items():
+        doc[key] = doc.get(key, 0) + value
+    for key, value in update.get("$push", {}).items():
+        doc.setdefault(key, []).append(value)
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys, direction=None):
+        keys = [(keys, direction)] if isinstance(keys, str) else keys
+        self.docs.sort(key=lambda doc: tuple(doc.get(key) or 0 for key, _ in keys))
+        return self
+
+    def limit(self, n):
+        self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs if length is None else self.docs[:length]
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Result:
+    def __init__(self, count):
+        self.modified_count = count
+
+
+class _Collection:
+    """Just enough of a motor collection for the bracket engine"""
+
+    def __init__(self):
+        self.docs = []
+
+    def find(self, query, projection=None):
+        return _Cursor([dict(doc) for doc in self.docs if _matches(doc, query)])
+
+    async def find_one(self, query, projection=None):
+        return next((dict(doc) for doc in self.docs if _matches(doc, query)), None)
+
+    async def find_one_and_update(self, query, update, projection=None, return_document=None):
+        await asyncio.sleep(0)
+        doc = next((doc for doc in self.docs if _matches(doc, query)), None)
+        if doc is None:
+            return None
+        _apply(doc, update)
+        return dict(doc)
+
+    async def update_one(self, query, update):
+        doc = next((doc for doc in self.docs if _matches(doc, query)), None)
+        if doc is not None:
+            _apply(doc, update)
+        return _Result(int(doc is not None))
+
+    async def update_many(self, query, update):
+        for doc in self.docs:
+            if _matches(doc, query):
+                _apply(doc, update)
+
+    async def insert_one(self, doc):
+        self.docs.append(dict(doc))
+
+    async def insert_many(self, docs, ordered=True):
+        self.docs.extend(dict(doc) for doc in docs)
+
+    async def bulk_write(self, writes, ordered=True):
+        for write in writes:
+            await self.update_one(write._filter, write._doc)
+
+
+class _Db:
+    def __init__(self):
+        self.tournament_matches = _Collection()
+        self.tournament_participants = _Collection()
+        self.tournaments = _Collection()
+        self.players = _Collection()
+        self.battles = _Collection()
+
+
+async def _run(bracket_type, count):
+    """Play a whole tournament where the lower-numbered player always wins"""
+    db = _Db()
+    players = [f"p{i:04d}" for i in range(count)]
+    db.tournaments.docs.append({"tournament_id": "t1", "status": "active"})
+    db.tournament_participants.docs.extend({"tournament_id": "t1", "player_id": p, "wins": 0} for p in players)
+    in_flight, peak, started = 0, 0, []
+
+    async def dispatch(match):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        started.append(match["match_id"])
+        return {"id": f"battle-{match['match_id']}"}
+
+    engine = BracketEngine(db, dispatch)
+    bracket = await engine.create("t1", players, bracket_type)
+    db.tournaments.docs[0]["total_rounds"] = bracket["total_rounds"]
+    first_round = await engine.dispatch(bracket["ready"])
+    first_peak = peak
+
+    while True:
+        playing = [m for m in db.tournament_matches.docs if m["status"] == "in_progress"]
+        if not playing:
+            break
+        for match in playing:
+            await engine.report_result(match["match_id"], min(match["player1_id"], match["player2_id"]))
+
+    participants = {p["player_id"]: p for p in db.tournament_participants.docs}
+    return db, bracket, participants, len(first_round), first_peak, started
+
+
+class TestTournamentBrackets:
+    """Brackets are wired correctly and tournaments play out one result at a time."""
+
+    @pytest.mark.parametrize("count", [2, 3, 5, 8, 13, 64])
+    @pytest.mark.parametrize("double", [False, True])
+    def test_every_match_is_fed_twice(self, count, double):
+        size = 2 ** max(1, math.ceil(math.log2(count)))
+        matches = elimination_matches("t", [f"p{i}" for i in range(count)], double)
+        by_id = {m["match_id"]: m for m in matches}
+        assert len(matches) == (2 * size - 2 if double and size > 2 else size if double else size - 1)
+
+        feeds = {m["match_id"]: 0 for m in matches}
+        for match in matches:
+            for target in (match["next_match_id"], match["loser_match_id"]):
+                if target:
+                    feeds[target] += 1
+        first_round = [m for m in matches if m["bracket"] == "winners" and m["round_number"] == 1]
+        assert all(feeds[m["match_id"]] == 0 for m in first_round)
+        assert all(feeds[m_id] == 2 for m_id, m in by_id.items() if m not in first_round)
+        assert sum(m["status"] == "bye" for m in first_round) == size - count
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("count", [8, 13])
+    async def test_single_elimination_plays_out(self, count):
+        db, bracket, participants, first_round, peak, _ = await _run("single_elimination", count)
+        assert db.tournaments.docs[0]["status"] == "completed"
+        assert participants["p0000"]["placement"] == 1
+        assert participants["p0000"]["wins"] == bracket["total_rounds"] - (1 if count < 2 ** bracket["total_rounds"] else 0)
+        assert sum(p.get("eliminated", False) for p in participants.values()) == count - 1
+        # Round one is started as one concurrent batch
+        assert first_round == sum(1 for m in bracket["ready"]) and peak == first_round
+
+    @pytest.mark.asyncio
+    async def test_double_elimination_plays_out(self):
+        db, bracket, participants, _, _, started = await _run("double_elimination", 13)
+        assert participants["p0000"]["placement"] == 1
+        assert participants["p0001"]["placement"] == 2
+        losers_final = next(m for m in db.tournament_matches.docs if m["next_match_id"] == "t1:final:1:0"
+                            and m["bracket"] == "losers")
+        assert [name for name, p in participants.items() if p.get("placement") == 3] == [losers_final["loser_id"]]
+        # Everyone but the champion is out after exactly two losses
+        assert all(p["losses"] == 2 for name, p in participants.items() if name != "p0000")
+        assert "t1:final:1:0" in started
+
+    @pytest.mark.asyncio
+    async def test_swiss_plays_out(self):
+        db, bracket, participants, _, _, _ = await _run("swiss", 9)
+        assert bracket["total_rounds"] == swiss_rounds(9) == 4
+        assert participants["p0000"]["placement"] == 1
+        for record in participants.values():
+            assert record["wins"] + record.get("losses", 0) == 4
+            assert len(set(record.get("opponents", []))) == len(record.get("opponents", []))
+        assert sum(record.get("byes", 0) for record in participants.values()) == 4
+
+    @pytest.mark.asyncio
+    async def test_stalled_match_is_retried_into_a_battle(self, monkeypatch):
+        db = _Db()
+        monkeypatch.setattr(combat_engine, "get_database", lambda: db)
+        players = [str(uuid.uuid4()) for _ in range(2)]
+        db.tournaments.docs.append({"tournament_id": "t1", "status": "active"})
+        db.tournament_participants.docs.extend({"tournament_id": "t1", "player_id": p} for p in players)
+        engine = BracketEngine(db)
+        bracket = await engine.create("t1", players, "single_elimination")
+
+        # One player's record isn't readable yet: the match goes back to ready
+        db.players.docs.append({"_id": players[0], "username": "first", "traits": {}})
+        assert await engine.dispatch(bracket["ready"]) == []
+        match = db.tournament_matches.docs[0]
+        assert match["status"] == "ready"
+
+        db.players.docs.append({"_id": players[1], "username": "second", "traits": {}})
+        assert [m["match_id"] for m in await engine.dispatch_stalled()] == [match["match_id"]]
+        battle = db.battles.docs[0]
+        assert battle["tournament_match_id"] == match["match_id"]
+        assert {c["player_id"] for c in battle["combatants"]} == set(players)
+        assert match["status"] == "in_progress" and match["battle_id"] == battle["id"]
+
+    def test_swiss_pairings_avoid_rematches(self):
+        standings = [
+            {"player_id": "a", "wins": 1, "opponents": ["b"]},
+            {"player_id": "b", "wins": 1, "opponents": ["a"]},
+            {"player_id": "c", "wins": 0, "opponents": ["d"]},
+            {"player_id": "d", "wins": 0, "opponents": ["c"]},
+            {"player_id": "e", "wins": 0, "byes": 1},
+        ]
+        pairs, bye = swiss_pairings(standings)
+        assert bye == "d"
+        assert pairs == [("a", "c"), ("b", "e")]
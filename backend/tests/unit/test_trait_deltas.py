@@ -0,0 +1,105 @@
+"""Unit tests for batched milestone and unlock detection on trait deltas."""
+import random
+
+import pytest
+from pymongo.errors import BulkWriteError
+
+from backend.models.player.traits import ALL_TRAIT_FIELDS, trait_field
+from backend.services.traits.milestone_tracker import MilestoneTracker
+from backend.services.traits.trait_deltas import apply_trait_delta
+from backend.services.traits.unlock_manager import UnlockManager
+
+
+class _Collection:
+    def __init__(self, calls, name):
+        self.calls = calls
+        self.name = name
+        self.ids = set()
+
+    async def find_one(self, query, projection=None):
+        return None
+
+    async def update_one(self, query, update):
+        self.calls.append((self.name, "update_one", update))
+
+    async def insert_many(self, docs, ordered=True):
+        self.calls.append((self.name, "insert_many", docs))
+        errors = [{"index": index, "code": 11000} for index, doc in enumerate(docs) if doc["_id"] in self.ids]
+        self.ids.update(doc["_id"] for doc in docs)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+
+class _Db:
+    def __init__(self):
+        self.calls = []
+        self.players = _Collection(self.calls, "players")
+        self.trait_milestones = _Collection(self.calls, "trait_milestones")
+        self.trait_unlocks = _Collection(self.calls, "trait_unlocks")
+
+
+class TestTraitDeltas:
+    """Crossings match the per-trait loops and are written in one batch."""
+
+    def test_crossings_match_per_trait_loops(self):
+        rng = random.Random(11)
+        tracker, manager = MilestoneTracker(), UnlockManager()
+        for _ in range(100):
+            old = {name: rng.randint(0, 100) for name in ALL_TRAIT_FIELDS}
+            new = {name: min(100, old[name] + rng.randint(0, 40)) for name in rng.sample(ALL_TRAIT_FIELDS, 10)}
+
+            expected_milestones = sorted(
+                (trait, threshold) for trait, value in new.items()
+                for threshold in MilestoneTracker.MILESTONE_THRESHOLDS
+                if old[trait] < threshold <= value
+            )
+            expected_unlocks = sorted(
+                (trait, threshold) for trait, value in new.items()
+                for threshold in UnlockManager.TRAIT_UNLOCKS.get(trait, {})
+                if old[trait] < threshold <= value
+            )
+            milestones = tracker.find_milestones("p1", old, new)
+            unlocks = manager.find_unlocks("p1", old, new)
+
+            assert sorted((m["trait"], m["threshold"]) for m in milestones) == expected_milestones
+            assert sorted((u["trait"], u["threshold"]) for u in unlocks) == expected_unlocks
+
+    @pytest.mark.asyncio
+    async def test_one_batch_of_writes_per_delta(self):
+        db = _Db()
+        result = await apply_trait_delta(db, "p1", {"courage": 20, "wisdom": 70}, {"courage": 80, "wisdom": 75})
+
+        assert [(m["trait"], m["threshold"]) for m in result["milestones"]] == [
+            ("courage", 25), ("courage", 50), ("courage", 75), ("wisdom", 75)
+        ]
+        assert [(u["trait"], u["threshold"]) for u in result["unlocks"]] == [
+            ("courage", 50), ("courage", 75), ("wisdom", 75)
+        ]
+        assert sorted((name, op) for name, op, _ in db.calls) == [
+            ("players", "update_one"), ("trait_milestones", "insert_many"), ("trait_unlocks", "insert_many")
+        ]
+        update = next(update for name, _, update in db.calls if name == "players")
+        assert update["$inc"]["xp"] == (25 + 50 + 75 + 75) * 2
+        assert {"courage_50", "courage_75", "courage_advanced_ability"} <= set(update["$addToSet"]["unlocked_abilities"]["$each"])
+
+    @pytest.mark.asyncio
+    async def test_recrossed_thresholds_are_rewarded_once(self):
+        db = _Db()
+        await apply_trait_delta(db, "p1", {"physical_strength": 40}, {"physical_strength": 60})
+        db.calls.clear()
+
+        # Dropped back below 50 and crossed it again
+        result = await apply_trait_delta(db, "p1", {"physical_strength": 45}, {"physical_strength": 80})
+
+        assert [(m["trait"], m["threshold"]) for m in result["milestones"]] == [("physical_strength", 75)]
+        assert [(u["trait"], u["threshold"]) for u in result["unlocks"]] == [("physical_strength", 75)]
+        update = next(update for name, _, update in db.calls if name == "players")
+        assert update["$inc"]["xp"] == 75 * 2
+
+    @pytest.mark.asyncio
+    async def test_no_crossing_writes_nothing(self):
+        db = _Db()
+        await apply_trait_delta(db, "p1", {"courage": 51}, {"courage": 60})
+        assert db.calls == []
+        assert trait_field("fame") == "meta_traits.fame"
+        assert trait_field("courage") == "traits.courage"
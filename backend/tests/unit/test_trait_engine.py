@@ -0,0 +1,122 @@
+"""Unit tests for trait vectors and compiled requirement matrices."""
+import random
+
+import numpy as np
+import pytest
+
+from backend.models.player.traits import ALL_TRAIT_FIELDS, TRAIT_INDEX
+from backend.services.player.stats_calculator import StatsCalculator
+from backend.services.player.superpowers import SUPERPOWER_DEFINITIONS, SuperpowerService
+from backend.services.player.trait_engine import (
+    RequirementMatrix, field_names, top_traits, trait_vector
+)
+from backend.services.traits.unlock_manager import UnlockManager
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        self._iter = iter(self.docs)
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._iter)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _Collection:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def find_one(self, query, **kwargs):
+        return next((doc for doc in self.docs if doc["_id"] == query["_id"]), None)
+
+    def find(self, query, **kwargs):
+        return _Cursor([doc for doc in self.docs if doc["player_id"] == query["player_id"]])
+
+
+class _Db:
+    def __init__(self, players, unlocks):
+        self.players = _Collection(players)
+        self.trait_unlocks = _Collection(unlocks)
+
+
+class TestTraitEngine:
+    """Array results match the per-trait loops they replace."""
+
+    def test_top_traits_match_a_stable_sort(self):
+        rng = random.Random(3)
+        players = [{"traits": {name: rng.choice([10, 50, 90]) for name in ALL_TRAIT_FIELDS}} for _ in range(50)]
+        matrix = np.vstack([trait_vector(player["traits"]) for player in players])
+        batch = top_traits(matrix, 10)
+
+        for row, player in enumerate(players):
+            expected = [name for name, _ in sorted(player["traits"].items(), key=lambda x: x[1], reverse=True)[:10]]
+            assert field_names(top_traits(matrix[row], 10)) == expected
+            assert field_names(batch[row]) == expected
+
+    def test_requirements_with_missing_and_unknown_traits(self):
+        matrix = RequirementMatrix({
+            "a": {"hacking": 80, "stealth": 60},
+            "b": {"hacking": 50},
+            "c": {"strength": 10},
+            "d": {},
+        })
+        vector = trait_vector({"hacking": 70})
+
+        assert matrix.eligible_names(vector) == ["b", "d"]
+        assert matrix.progress(vector).tolist() == pytest.approx([43.75, 100.0, 0.0, 100.0])
+        assert matrix.shortfalls(vector, "a")[0] == ("hacking", 80, 70.0)
+        assert np.isnan(matrix.shortfalls(vector, "a")[1][2])
+
+    def test_derived_traits_and_unlock_requirements(self):
+        traits = {"charisma": 91, "kindness": 40, "deceit": 99, "leadership": 77, "honesty": 3}
+        derived = StatsCalculator.calculate_derived_traits({"traits": traits})
+        assert derived["reputation"] == 10
+        assert derived["influence"] == 84
+        assert derived["trustworthiness"] == 0
+        assert derived["business_acumen"] == 50
+        assert derived["karmic_balance"] == 50
+
+        result = StatsCalculator.calculate_power_unlock_requirements(
+            {"requirements": {"charisma": 90, "leadership": 80}}, traits
+        )
+        assert not result["unlockable"]
+        assert result["missing_requirements"] == [
+            {"trait": "leadership", "required": 80, "current": 77, "difference": 3}
+        ]
+        assert result["progress_percentage"] == 98.12
+
+    def test_available_powers_keep_first_unmet_message(self):
+        power_id, power_def = next(iter(SUPERPOWER_DEFINITIONS.items()))
+        traits = {trait: value for trait, value in power_def.requirements.items()}
+        powers = {power["power_id"]: power for power in SuperpowerService.get_available_powers(traits)}
+        assert powers[power_id]["eligible"]
+        assert powers[power_id]["message"] == "Requirements met"
+
+        first, minimum = next(iter(power_def.requirements.items()))
+        traits[first] = minimum - 1
+        powers = {power["power_id"]: power for power in SuperpowerService.get_available_powers(traits)}
+        assert powers[power_id]["message"] == f"Requires {first} >= {minimum}"
+
+    @pytest.mark.asyncio
+    async def test_available_unlocks_from_one_unlock_read(self):
+        traits = {"courage": 60, "integrity": 100, "empathy": 75, "physical_strength": 30}
+        db = _Db(
+            [{"_id": "p1", "traits": traits}],
+            [{"player_id": "p1", "trait": "courage", "threshold": 50}]
+        )
+        available = await UnlockManager().get_available_unlocks(db, "p1")
+
+        assert list(available) == list(UnlockManager.TRAIT_UNLOCKS)
+        assert all(trait in TRAIT_INDEX for trait in available)
+        for trait, unlocks in available.items():
+            value = traits.get(trait, 0)
+            for unlock in unlocks:
+                assert unlock["can_unlock"] == (value >= unlock["threshold"])
+                assert unlock["progress"] == pytest.approx(min(100, value / unlock["threshold"] * 100))
+                assert unlock["is_unlocked"] == ((trait, unlock["threshold"]) == ("courage", 50))
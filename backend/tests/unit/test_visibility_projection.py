@@ -0,0 +1,126 @@
+"""Compiled visibility projections against the per-setting rules, and the profile cache."""
+import itertools
+
+from backend.services.player.visibility import (
+    UNTRACEABLE_TIERS, VISIBILITY_FIELDS, PublicProfileCache, VisibilityService, visible_projection
+)
+
+REMOVE = object()
+
+
+def _path(doc, path):
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return None
+        doc = doc[part]
+    return doc
+
+
+def _eval(expr, doc, this=None):
+    """The aggregation operators the projections use"""
+    if isinstance(expr, str):
+        if expr == "$$REMOVE":
+            return REMOVE
+        if expr.startswith("$$this."):
+            return this[expr[len("$$this."):]]
+        return _path(doc, expr[1:]) if expr.startswith("$") else expr
+    if isinstance(expr, list):
+        return [_eval(item, doc, this) for item in expr]
+    if not isinstance(expr, dict):
+        return expr
+    (op, args), = expr.items()
+    if op == "$cond":
+        return _eval(args[1] if _eval(args[0], doc, this) else args[2], doc, this)
+    if op == "$ifNull":
+        value = _eval(args[0], doc, this)
+        return _eval(args[1], doc, this) if value is None else value
+    if op == "$in":
+        return _eval(args[0], doc, this) in _eval(args[1], doc, this)
+    if op == "$not":
+        return not _eval(args[0], doc, this)
+    if op == "$and":
+        return all(_eval(arg, doc, this) for arg in args)
+    if op == "$objectToArray":
+        return [{"k": k, "v": v} for k, v in _eval(args, doc, this).items()]
+    if op == "$arrayToObject":
+        return {item["k"]: item["v"] for item in _eval(args, doc, this)}
+    if op == "$filter":
+        return [item for item in _eval(args["input"], doc, this) if _eval(args["cond"], doc, item)]
+    raise AssertionError(f"unexpected operator {op}")
+
+
+def project(projection, doc):
+    out = {"_id": doc["_id"]}
+    for field, expr in projection.items():
+        value = _path(doc, field) if expr == 1 else _eval(expr, doc)
+        if value is not REMOVE and value is not None:
+            out[field] = value
+    return out
+
+
+def expected(doc, close):
+    """What the endpoints used to work out by hand, plus close relations"""
+    visibility = doc.get("visibility", {})
+    tier = visibility.get("privacy_tier", "public")
+    out = {"_id": doc["_id"], "username": doc["username"], "privacy_tier": tier, "visibility_version": 3}
+    if tier in UNTRACEABLE_TIERS:
+        return out
+    out.update(level=doc["level"], online=doc["online"])
+    defaults = VisibilityService.PRIVACY_TIERS[tier]["defaults"]
+    for setting, fields in VISIBILITY_FIELDS.items():
+        if close or visibility.get(setting, defaults.get(setting, False)):
+            out.update({field: doc[field] for field in fields if field in doc})
+    out["traits"] = {
+        name: value for name, value in doc["traits"].items()
+        if close or name in visibility.get("traits_public", [])
+    }
+    return out
+
+
+def _player(player_id, tier, overrides):
+    visibility = {"privacy_tier": tier, **overrides} if tier else dict(overrides)
+    return {
+        "_id": player_id, "username": f"user_{player_id}", "email": "secret@example.com", "password_hash": "x",
+        "level": 12, "online": True, "visibility_version": 3, "currencies": {"credits": 500},
+        "economic_class": "upper", "moral_class": "good", "karma_points": 40, "guild_id": "g1",
+        "guild_rank": "officer", "superpowers": [{"name": "flight"}], "traits": {"courage": 70.0, "greed": 20.0},
+        "visibility": visibility,
+    }
+
+
+class TestVisibilityProjection:
+    """Projections return exactly what each tier and override allows."""
+
+    def test_matches_rules_for_every_tier_and_override(self):
+        tiers = [None, *VisibilityService.PRIVACY_TIERS]
+        overrides = [{}, {"cash": True, "guild": False}, {"karma_score": True, "traits_public": ["courage"]}]
+        players = [
+            _player(f"p{i}", tier, override)
+            for i, (tier, override) in enumerate(itertools.product(tiers, overrides))
+        ]
+        close = {"p1", "p5", "p16"}
+        mixed = visible_projection(close=sorted(close))
+        for player in players:
+            assert project(visible_projection(), player) == expected(player, close=False)
+            assert project(mixed, player) == expected(player, close=player["_id"] in close)
+            assert "email" not in project(mixed, player)
+
+    def test_projection_is_compiled_once(self):
+        assert visible_projection() is visible_projection()
+        assert "traits" not in visible_projection(("guild",), traits=False)
+
+    def test_profile_cache_keyed_by_version(self):
+        cache = PublicProfileCache(max_entries=2)
+        cache.put("a", 1, {"username": "a"})
+        assert cache.get("a", 1) == {"username": "a"}
+        # Settings changed by another process
+        assert cache.get("a", 2) is None
+
+        cache.put("a", 2, {"username": "a2"})
+        assert cache.get("a", 2) == {"username": "a2"}
+        cache.invalidate("a")
+        assert cache.get("a", 2) is None
+
+        for player_id in "bcd":
+            cache.put(player_id, 1, {"username": player_id})
+        assert cache.get("b", 1) is None and cache.get("d", 1) is not None
@@ -0,0 +1,86 @@
+"""Unit tests for the war point accumulator's flush loop."""
+import asyncio
+
+import pytest
+from pymongo.errors import AutoReconnect
+
+from backend.services.guilds.wars import WarPointAccumulator
+
+
+class _Cursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return self.docs
+
+
+class _Wars:
+    def __init__(self, *wars):
+        self.docs = {war["id"]: war for war in wars}
+        self.failures = 0
+
+    async def find_one(self, query, projection=None):
+        return self.docs.get(query["id"])
+
+    async def bulk_write(self, writes, ordered=True):
+        await asyncio.sleep(0.01)
+        if self.failures:
+            self.failures -= 1
+            raise AutoReconnect("primary stepped down")
+        for write in writes:
+            war = self.docs[write._filter["id"]]
+            if war["status"] != write._filter["status"]["$ne"]:
+                for field, points in write._doc["$inc"].items():
+                    war[field] = war.get(field, 0) + points
+
+    def find(self, query, projection=None):
+        return _Cursor([])
+
+
+class _Db:
+    def __init__(self, *wars):
+        self.guild_wars = _Wars(*wars)
+
+
+def _war(war_id, status="active"):
+    return {"id": war_id, "attacker_guild_id": "a", "defender_guild_id": "d", "status": status}
+
+
+async def _settle(accumulator):
+    while accumulator._flush_task and not accumulator._flush_task.done():
+        await asyncio.sleep(0.005)
+
+
+class TestWarPointAccumulator:
+    """Queued points always reach MongoDB, even across failures and busy flushes."""
+
+    @pytest.mark.asyncio
+    async def test_points_added_mid_flush_are_written(self):
+        db = _Db(_war("w1"), _war("w2", status="peace_negotiation"))
+        points = WarPointAccumulator(db, flush_interval=0.001)
+
+        await points.add("w1", "a", 5)
+        await asyncio.sleep(0.005)  # the flush is now inside bulk_write
+        await points.add("w1", "d", 3)
+        await points.add("w2", "a", 7)
+        await _settle(points)
+
+        assert db.guild_wars.docs["w1"]["attacker_points"] == 5
+        assert db.guild_wars.docs["w1"]["defender_points"] == 3
+        assert db.guild_wars.docs["w2"]["attacker_points"] == 7
+
+    @pytest.mark.asyncio
+    async def test_failed_flush_puts_points_back(self):
+        db = _Db(_war("w1"), _war("w2", status="ended"))
+        db.guild_wars.failures = 2
+        points = WarPointAccumulator(db, flush_interval=0.001)
+
+        await points.add("w1", "a", 5)
+        await points.add("w2", "a", 5)
+        await points.add("w1", "a", 2)
+        await _settle(points)
+
+        assert db.guild_wars.docs["w1"]["attacker_points"] == 7
+        assert "attacker_points" not in db.guild_wars.docs["w2"]
+        assert not points._pending
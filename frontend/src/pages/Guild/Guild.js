@@ -9,6 +9,7 @@ const Guild = () => {
     const { user } = useAuth();
     const [guild, setGuild] = useState(null);
     const [members, setMembers] = useState([]);
+    const [membersPage, setMembersPage] = useState(null);
     const [loading, setLoading] = useState(true);
     useEffect(() => {
         loadGuildData();
@@ -20,7 +21,8 @@ const Guild = () => {
                 const guildData = await guildsService.getGuild(guildId);
                 setGuild(guildData);
                 const membersData = await guildsService.getGuildMembers(guildId);
-                setMembers(membersData);
+                setMembers(membersData.members);
+                setMembersPage(membersData);
             }
         }
         catch (error) {
@@ -30,6 +32,16 @@ const Guild = () => {
             setLoading(false);
         }
     };
+    const loadMoreMembers = async () => {
+        try {
+            const membersData = await guildsService.getGuildMembers(guild.id, membersPage.page + 1);
+            setMembers([...members, ...membersData.members]);
+            setMembersPage(membersData);
+        }
+        catch (error) {
+            console.error('Failed to load guild members:', error);
+        }
+    };
     if (loading) {
         return _jsx("div", { className: "p-8", children: "Loading guild..." });
     }
@@ -43,6 +55,6 @@ const Guild = () => {
                                             .then(() => loadGuildData())
                                             .catch(console.error);
                                     }
-                                }, children: "Contribute Credits" })] })] }), _jsxs(Card, { className: "p-6 mt-6", children: [_jsxs("h2", { className: "text-2xl font-bold mb-4", children: ["Members (", members.length, ")"] }), _jsx("div", { className: "space-y-2", children: members.map((member) => (_jsxs("div", { className: "flex justify-between items-center p-2 border-b", children: [_jsxs("div", { children: [_jsx("span", { className: "font-medium", children: member.username }), _jsxs("span", { className: "text-sm text-gray-500 ml-2", children: ["Level ", member.level] })] }), _jsx("span", { className: "text-sm", children: member.guild_rank })] }, member._id))) })] })] }));
+                                }, children: "Contribute Credits" })] })] }), _jsxs(Card, { className: "p-6 mt-6", children: [_jsxs("h2", { className: "text-2xl font-bold mb-4", children: ["Members (", membersPage ? membersPage.total : members.length, ")"] }), _jsx("div", { className: "space-y-2", children: members.map((member) => (_jsxs("div", { className: "flex justify-between items-center p-2 border-b", children: [_jsxs("div", { children: [_jsx("span", { className: "font-medium", children: member.username }), _jsxs("span", { className: "text-sm text-gray-500 ml-2", children: ["Level ", member.level] })] }), _jsx("span", { className: "text-sm", children: member.rank })] }, member.player_id))) }), membersPage?.has_more && (_jsx(Button, { className: "mt-4", onClick: loadMoreMembers, children: "Load More" }))] })] }));
 };
 export default Guild;
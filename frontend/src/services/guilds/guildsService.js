@@ -27,8 +27,8 @@ class GuildsService {
     return response.data;
   }
 
-  async getGuildMembers(guildId) {
-    const response = await apiClient.get(`/api/guilds/${guildId}/members`);
+  async getGuildMembers(guildId, page = 1, sort = 'rank') {
+    const response = await apiClient.get(`/api/guilds/${guildId}/members`, { params: { page, sort } });
     return response.data;
   }
 